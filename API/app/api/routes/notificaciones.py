@@ -4,8 +4,10 @@ Endpoints REST para notificaciones
 from fastapi import APIRouter, HTTPException, status
 from app.models.notificacion import (
     RutaAsignadaRequest,
+    RutasAsignadasRequest,
     IncidenciaRequest,
-    NotificacionResponse
+    NotificacionResponse,
+    NotificacionLoteResponse
 )
 from app.services.notificacion_service import NotificacionService
 
@@ -25,6 +27,18 @@ async def notificar_ruta_asignada(request: RutaAsignadaRequest):
     return NotificacionResponse(**resultado)
 
 
+@router.post("/rutas-asignadas", response_model=NotificacionLoteResponse)
+async def notificar_rutas_asignadas(request: RutasAsignadasRequest):
+    resultado = await notificacion_service.notificar_rutas_asignadas(
+        [a.model_dump() for a in request.asignaciones]
+    )
+    
+    if not resultado['success']:
+        raise HTTPException(status_code=400, detail=resultado)
+    
+    return NotificacionLoteResponse(**resultado)
+
+
 @router.post("/incidencia-nueva", response_model=NotificacionResponse)
 async def notificar_incidencia_nueva(request: IncidenciaRequest):
     resultado = await notificacion_service.notificar_incidencia_nueva(
@@ -2,7 +2,7 @@
 Modelos Pydantic para notificaciones
 """
 from pydantic import BaseModel, Field
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from enum import Enum
 
 
@@ -17,6 +17,10 @@ class RutaAsignadaRequest(BaseModel):
     id_ruta: str
 
 
+class RutasAsignadasRequest(BaseModel):
+    asignaciones: List[RutaAsignadaRequest]
+
+
 class IncidenciaRequest(BaseModel):
     id_incidencia: str
 
@@ -24,4 +28,12 @@ class IncidenciaRequest(BaseModel):
 class NotificacionResponse(BaseModel):
     success: bool
     mensaje: str
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+
+
+class NotificacionLoteResponse(BaseModel):
+    success: bool
+    mensaje: str
+    enviadas: int = 0
+    fallidas: int = 0
+    errores: List[Dict[str, str]] = []
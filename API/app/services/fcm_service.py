@@ -1,7 +1,7 @@
 """
 Servicio FCM para enviar notificaciones
 """
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from app.core.firebase import firebase_client
 
 
@@ -10,6 +10,34 @@ class FCMService:
     def __init__(self):
         self.messaging = firebase_client.messaging
     
+    # Máximo de mensajes por llamada a send_each
+    TAMANO_LOTE = 500
+    
+    def _construir_mensaje(
+        self,
+        token: str,
+        titulo: str,
+        mensaje: str,
+        datos: Optional[Dict[str, str]] = None,
+        tipo: str = "general"
+    ):
+        return self.messaging.Message(
+            notification=self.messaging.Notification(
+                title=titulo,
+                body=mensaje,
+            ),
+            data={'tipo': tipo, **(datos or {})},
+            token=token,
+            android=self.messaging.AndroidConfig(
+                priority='high',
+                notification=self.messaging.AndroidNotification(
+                    icon='ic_notification',
+                    color='#2196F3',
+                    sound='default'
+                )
+            )
+        )
+    
     async def enviar_notificacion(
         self,
         token: str,
@@ -19,22 +47,7 @@ class FCMService:
         tipo: str = "general"
     ) -> bool:
         try:
-            message = self.messaging.Message(
-                notification=self.messaging.Notification(
-                    title=titulo,
-                    body=mensaje,
-                ),
-                data={'tipo': tipo, **(datos or {})},
-                token=token,
-                android=self.messaging.AndroidConfig(
-                    priority='high',
-                    notification=self.messaging.AndroidNotification(
-                        icon='ic_notification',
-                        color='#2196F3',
-                        sound='default'
-                    )
-                )
-            )
+            message = self._construir_mensaje(token, titulo, mensaje, datos, tipo)
             
             response = self.messaging.send(message)
             print(f"✅ Notificación enviada: {response}")
@@ -42,4 +55,37 @@ class FCMService:
             
         except Exception as e:
             print(f"❌ Error: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    async def enviar_lote(self, notificaciones: List[Dict]) -> List[bool]:
+        """
+        Envía muchas notificaciones con send_each (una petición por cada 500).
+        
+        Args:
+            notificaciones: Lista de dicts con token, titulo, mensaje, datos, tipo
+        
+        Returns:
+            Lista de bool (una por notificación, en el mismo orden)
+        """
+        resultados = []
+        
+        for inicio in range(0, len(notificaciones), self.TAMANO_LOTE):
+            lote = notificaciones[inicio:inicio + self.TAMANO_LOTE]
+            try:
+                mensajes = [
+                    self._construir_mensaje(
+                        n['token'], n['titulo'], n['mensaje'],
+                        n.get('datos'), n.get('tipo', 'general')
+                    )
+                    for n in lote
+                ]
+                
+                response = self.messaging.send_each(mensajes)
+                resultados.extend(r.success for r in response.responses)
+                print(f"✅ Lote enviado: {response.success_count} ok, {response.failure_count} fallidas")
+                
+            except Exception as e:
+                print(f"❌ Error enviando lote: {e}")
+                resultados.extend([False] * len(lote))
+        
+        return resultados
@@ -1,7 +1,7 @@
 """
 Servicio de lógica de negocio para notificaciones
 """
-from typing import Dict
+from typing import Dict, List
 from app.repositories.firebase_repository import FirebaseRepository
 from app.services.fcm_service import FCMService
 
@@ -38,6 +38,71 @@ class NotificacionService:
         except Exception as e:
             return {"success": False, "mensaje": "Error interno", "error": str(e)}
     
+    async def notificar_rutas_asignadas(self, asignaciones: List[Dict[str, str]]) -> Dict:
+        """
+        Notifica muchas asignaciones de una vez (importación masiva).
+        Cada conductor y ruta se lee una sola vez y los mensajes se
+        envían en lote con FCM.
+        """
+        try:
+            tokens = {}
+            rutas = {}
+            notificaciones = []
+            errores = []
+            
+            for asignacion in asignaciones:
+                id_conductor = asignacion['id_conductor']
+                id_ruta = asignacion['id_ruta']
+                
+                if id_conductor not in tokens:
+                    tokens[id_conductor] = self.firebase_repo.obtener_token_conductor(id_conductor)
+                if id_ruta not in rutas:
+                    rutas[id_ruta] = self.firebase_repo.obtener_ruta(id_ruta)
+                
+                token = tokens[id_conductor]
+                ruta = rutas[id_ruta]
+                
+                if not token:
+                    errores.append({"id_conductor": id_conductor, "id_ruta": id_ruta, "error": "NO_TOKEN"})
+                    continue
+                if not ruta:
+                    errores.append({"id_conductor": id_conductor, "id_ruta": id_ruta, "error": "NO_RUTA"})
+                    continue
+                
+                notificaciones.append({
+                    'token': token,
+                    'titulo': "🚗 Nueva Ruta Asignada",
+                    'mensaje': f"{ruta.get('nombre', '')}\n{ruta.get('origen')} → {ruta.get('destino')}",
+                    'datos': {'id_ruta': id_ruta},
+                    'tipo': "ruta_asignada",
+                    'id_conductor': id_conductor,
+                })
+            
+            resultados = await self.fcm_service.enviar_lote(notificaciones)
+            
+            for notificacion, enviado in zip(notificaciones, resultados):
+                if not enviado:
+                    errores.append({
+                        "id_conductor": notificacion['id_conductor'],
+                        "id_ruta": notificacion['datos']['id_ruta'],
+                        "error": "FCM_ERROR"
+                    })
+            
+            enviadas = sum(1 for enviado in resultados if enviado)
+            return {
+                "success": enviadas > 0 or not asignaciones,
+                "mensaje": f"{enviadas} de {len(asignaciones)} notificaciones enviadas",
+                "enviadas": enviadas,
+                "fallidas": len(asignaciones) - enviadas,
+                "errores": errores
+            }
+        except Exception as e:
+            return {
+                "success": False, "mensaje": "Error interno",
+                "enviadas": 0, "fallidas": len(asignaciones),
+                "errores": [{"error": str(e)}]
+            }
+    
     async def notificar_incidencia_nueva(self, id_incidencia: str) -> Dict:
         try:
             incidencia = self.firebase_repo.obtener_incidencia(id_incidencia)
@@ -1,8 +1,6 @@
 
-import pyrebase
-import firebase_admin
-from firebase_admin import credentials, db as admin_db
 import os
+import threading
 
 
 # ============================================================================
@@ -27,18 +25,8 @@ FIREBASE_CONFIG = {
 
 }
 
-# Inicializar Pyrebase (global)
-firebase_pyrebase = None
-auth_service = None
-database_pyrebase = None
-
-try:
-    firebase_pyrebase = pyrebase.initialize_app(FIREBASE_CONFIG)
-    auth_service = firebase_pyrebase.auth()
-    database_pyrebase = firebase_pyrebase.database()
-    print("Pyrebase inicializado correctamente")
-except Exception as e:
-    print(f"Error al inicializar Pyrebase: {e}")
+# La app de pyrebase (sesión HTTP, auth y database) se crea una sola vez,
+# bajo demanda, en app/data/conexion_firebase.py
 
 
 # ============================================================================
@@ -47,6 +35,7 @@ except Exception as e:
 
 admin_initialized = False
 admin_db_ref = None
+_admin_lock = threading.Lock()
 
 # Ruta al archivo de credenciales (dentro de app/config/)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -57,50 +46,58 @@ def init_firebase_admin():
     """
     Inicializa Firebase Admin SDK para listeners en tiempo real.
     Busca serviceAccountKey.json en app/config/
+    
+    No se llama al importar el módulo: la lanza AppController en segundo
+    plano mientras se muestra el login (o get_admin_db() si hace falta antes).
+    Es segura entre threads: si ya hay otra inicialización en curso, espera.
     """
     global admin_initialized, admin_db_ref
     
-    if admin_initialized:
-        print("Firebase Admin SDK ya está inicializado")
-        return True
-    
-    # Verificar que existe el archivo
-    if not os.path.exists(SERVICE_ACCOUNT_PATH):
-        print(f"Archivo serviceAccountKey.json NO encontrado en:")
-        print(f"{SERVICE_ACCOUNT_PATH}")
-        print("   Los listeners en tiempo real NO funcionarán")
-        print("   Descárgalo desde Firebase Console → Settings → Service Accounts")
-        return False
-    
-    try:
-        # Inicializar Admin SDK
-        cred = credentials.Certificate(SERVICE_ACCOUNT_PATH)
-        firebase_admin.initialize_app(cred, {
-            'databaseURL': FIREBASE_CONFIG['databaseURL']
-        })
-        
-        # Obtener referencia a la base de datos
-        admin_db_ref = admin_db.reference()
+    with _admin_lock:
+        if admin_initialized:
+            return True
         
-        admin_initialized = True
-        print(f"Firebase Admin SDK inicializado correctamente")
-        print(f"   Archivo: {SERVICE_ACCOUNT_PATH}")
-        return True
+        # Verificar que existe el archivo
+        if not os.path.exists(SERVICE_ACCOUNT_PATH):
+            print(f"Archivo serviceAccountKey.json NO encontrado en:")
+            print(f"{SERVICE_ACCOUNT_PATH}")
+            print("   Los listeners en tiempo real NO funcionarán")
+            print("   Descárgalo desde Firebase Console → Settings → Service Accounts")
+            return False
         
-    except Exception as e:
-        print(f"❌ Error al inicializar Firebase Admin SDK: {e}")
-        return False
+        try:
+            # Import diferido: firebase_admin arrastra las librerías de Google
+            import firebase_admin
+            from firebase_admin import credentials, db as admin_db
+            
+            # Inicializar Admin SDK
+            cred = credentials.Certificate(SERVICE_ACCOUNT_PATH)
+            firebase_admin.initialize_app(cred, {
+                'databaseURL': FIREBASE_CONFIG['databaseURL']
+            })
+            
+            # Obtener referencia a la base de datos
+            admin_db_ref = admin_db.reference()
+            
+            admin_initialized = True
+            print(f"Firebase Admin SDK inicializado correctamente")
+            print(f"   Archivo: {SERVICE_ACCOUNT_PATH}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error al inicializar Firebase Admin SDK: {e}")
+            return False
 
 
 def get_admin_db():
     """
     Obtiene la referencia a la base de datos de Admin SDK.
+    La inicializa si todavía no se ha hecho.
     
     Returns:
         Reference de Admin SDK o None si no está inicializado
     """
     if not admin_initialized:
-        print("Firebase Admin SDK no inicializado. Llamando a init_firebase_admin()...")
         init_firebase_admin()
     
     return admin_db_ref
@@ -114,15 +111,3 @@ def is_admin_available():
         True si está disponible, False si no
     """
     return admin_initialized and admin_db_ref is not None
-
-
-# ============================================================================
-# INICIALIZACIÓN AUTOMÁTICA DE ADMIN SDK
-# ============================================================================
-
-# Intentar inicializar Admin SDK automáticamente al importar el módulo
-try:
-    init_firebase_admin()
-except Exception as e:
-    print(f"No se pudo inicializar Admin SDK automáticamente: {e}")
-    print("El sistema funcionará con Pyrebase (sin listeners en tiempo real)")
@@ -23,6 +23,7 @@ TRANSLATIONS = {
         "update": "Actualizar",
         "change_status": "Cambiar Estado",
         "delete_stop": "Eliminar Parada",
+        "optimize_route": "Optimizar",
         "save_route": "Guardar Ruta",
         "update_route": "Actualizar Ruta",
         "new_route": "Nueva Ruta",
@@ -82,6 +83,8 @@ TRANSLATIONS = {
         "destination": "Destino",
         "stops": "Paradas",
         "num_stops": "N Paradas",
+        "distance_km": "Km",
+        "duration": "Duracion",
         "add_stop": "Anadir Parada",
         "new_stop": "Nueva Parada",
         "start_datetime": "Fecha/Hora Inicio",
@@ -131,6 +134,7 @@ TRANSLATIONS = {
         "update": "Update",
         "change_status": "Change Status",
         "delete_stop": "Delete Stop",
+        "optimize_route": "Optimize",
         "save_route": "Save Route",
         "update_route": "Update Route",
         "new_route": "New Route",
@@ -190,6 +194,8 @@ TRANSLATIONS = {
         "destination": "Destination",
         "stops": "Stops",
         "num_stops": "N Stops",
+        "distance_km": "Km",
+        "duration": "Duration",
         "add_stop": "Add Stop",
         "new_stop": "New Stop",
         "start_datetime": "Start Date/Time",
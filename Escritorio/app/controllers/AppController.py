@@ -1,8 +1,8 @@
 from PySide6.QtWidgets import QApplication, QMessageBox
 from app.controllers.LoginController import LoginController
-from app.controllers.MainController import MainWindowController
 from app.styles.style_manager import StyleManager
 from app.services.settings_service import SettingsService
+from app.utils.workers import GestorTareas
 
 class AppController:
     def __init__(self):
@@ -22,6 +22,22 @@ class AppController:
         self.login_window.show()
 
         self.main_window = None
+        
+        # 3. CONEXIÓN CON FIREBASE EN SEGUNDO PLANO
+        # Mientras el usuario escribe sus credenciales. Si pulsa "Entrar"
+        # antes de que termine, el login espera a esta misma inicialización.
+        self.tareas = GestorTareas()
+        self.tareas.ejecutar(self.inicializar_firebase, clave="firebase")
+    
+    @staticmethod
+    def inicializar_firebase():
+        """Crea la conexión de pyrebase y el Admin SDK (thread del pool)"""
+        # Imports aquí: cargar estos módulos ya cuesta tiempo
+        from app.data.conexion_firebase import conexion_firebase
+        from app.config.config import init_firebase_admin
+        
+        conexion_firebase.inicializar()
+        init_firebase_admin()
 
     def abrir_menu_principal(self, user_data):
         
@@ -39,6 +55,10 @@ class AppController:
         
         self.login_window.close()
         
+        # Import diferido: la ventana principal arrastra todas las pantallas
+        # (mapas, QtWebEngine...) y no hace falta para mostrar el login
+        from app.controllers.MainController import MainWindowController
+        
         # Abrir Main Window pasando TAMBIÉN el servicio de ajustes para poder guardar
         self.main_window = MainWindowController(self.app_state, self.settings_service)
         self.main_window.show()
\ No newline at end of file
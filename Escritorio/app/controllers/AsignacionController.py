@@ -1,14 +1,13 @@
-
-import threading
-
-from PySide6.QtWidgets import QWidget, QMessageBox, QTableWidgetItem, QAbstractItemView, QHeaderView
-from PySide6.QtCore import QDateTime, Signal
+from PySide6.QtWidgets import QWidget, QMessageBox, QAbstractItemView, QHeaderView, QFileDialog
+from PySide6.QtCore import QDateTime, Signal, Qt
 
 from app.views.AsignacionWidget_ui import Ui_AsignacionWidget
 from app.models.asignacion import Asignacion
 from app.services.asignaciones_service import AsignacionesService
 from app.services.notificaciones_api_service import notificaciones_api
 from app.utils.language_utils import LanguageService
+from app.utils.table_models import DataclassTableModel, FiltroTablaProxy
+from app.utils.workers import GestorTareas
 
 
 class AsignacionController(QWidget, Ui_AsignacionWidget):
@@ -29,6 +28,22 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
         self.rutas_en_tabla = []
         self.dic_asignaciones = {}
         
+        # Modelo en memoria (una fila por ruta) + proxy de orden
+        self.modelo = DataclassTableModel([
+            ("Ruta", "nombre"),
+            ("Conductor", lambda r: self._dato_asignacion(r, "nombre_conductor")),
+            ("Vehículo", lambda r: self._dato_asignacion(r, "matricula_vehiculo")),
+            ("Estado", lambda r: "Asignada" if r.id_ruta in self.dic_asignaciones else "Disponible"),
+        ], "id_ruta", vacio="-", parent=self)
+        self.proxy = FiltroTablaProxy(self)
+        self.proxy.setSourceModel(self.modelo)
+        
+        # Lecturas en segundo plano (se cancelan al salir de la página)
+        self.tareas = GestorTareas(self, al_reanudar=self.cargar_datos)
+        
+        # Importación CSV (lecturas + escritura): no se cancela al salir
+        self.importaciones = GestorTareas(self)
+        
         # Configuración inicial
         self.configurar_tabla()
         self.dtInicio.setDateTime(QDateTime.currentDateTime())
@@ -36,7 +51,8 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
         # Conectar botones
         self.btnConfirmar.clicked.connect(self.registrar_asignacion)
         self.btnEliminarAsignacion.clicked.connect(self.borrar_asignacion)
-        self.tableWidget.cellClicked.connect(self.seleccionar_ruta_de_tabla)
+        self.btnImportarCSV.clicked.connect(self.importar_csv)
+        self.tableWidget.clicked.connect(self.seleccionar_ruta_de_tabla)
         
         # Cargar datos iniciales
         self.cargar_datos()
@@ -46,7 +62,10 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
     # =========================================================================
     
     def configurar_tabla(self):
-        """Configura el estilo de la tabla"""
+        """Configura el modelo y el estilo de la tabla"""
+        self.tableWidget.setModel(self.proxy)
+        self.tableWidget.setSortingEnabled(True)
+        self.tableWidget.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.tableWidget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.tableWidget.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tableWidget.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -63,23 +82,33 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
     # =========================================================================
     
     def cargar_combos(self):
-        """Carga todos los combos desde el servicio"""
+        """Carga todos los combos desde el servicio (en segundo plano)"""
+        def leer():
+            return (
+                self.service.obtener_todas_rutas(),
+                self.service.obtener_todos_conductores(),
+                self.service.obtener_vehiculos_disponibles()
+            )
+        
+        self.tareas.ejecutar(leer, self.llenar_combos, clave="combos")
+    
+    def llenar_combos(self, datos):
+        """Rellena los combos con el resultado de la carga (thread de la UI)"""
+        todas_rutas, todos_conductores, vehiculos_disponibles = datos
+        
         self.cbRuta.clear()
         self.cbConductor.clear()
         self.cbVehiculo.clear()
         
         # Rutas
-        todas_rutas = self.service.obtener_todas_rutas()
         for r in todas_rutas:
             self.cbRuta.addItem(r.nombre, r.id_ruta)
         
         # Conductores
-        todos_conductores = self.service.obtener_todos_conductores()
         for c in todos_conductores:
             self.cbConductor.addItem(f"{c.nombre} ({c.dni})", c.id_conductor)
         
         # Vehículos (solo disponibles)
-        vehiculos_disponibles = self.service.obtener_vehiculos_disponibles()
         for v in vehiculos_disponibles:
             self.cbVehiculo.addItem(
                 f"{v.marca} {v.modelo} - {v.matricula}", 
@@ -204,43 +233,63 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
     # =========================================================================
     
     def cargar_tabla(self):
-        """Muestra las rutas y sus asignaciones"""
-        self.tableWidget.setRowCount(0)
+        """Muestra las rutas y sus asignaciones (carga en segundo plano)"""
+        def leer():
+            return (self.service.obtener_todas_rutas(), self.service.obtener_todas())
         
-        # Obtener datos del servicio
-        self.rutas_en_tabla = self.service.obtener_todas_rutas()
-        lista_asignaciones = self.service.obtener_todas()
+        self.tareas.ejecutar(leer, self.mostrar_tabla, clave="tabla")
+    
+    def mostrar_tabla(self, datos):
+        """Recibe el resultado de la carga (thread de la UI)"""
+        self.rutas_en_tabla, lista_asignaciones = datos
         
         # Diccionario para saber qué rutas tienen asignación
         self.dic_asignaciones = {a.id_ruta: a for a in lista_asignaciones}
         
-        for i, ruta in enumerate(self.rutas_en_tabla):
-            self.tableWidget.insertRow(i)
-            
-            # Nombre de la Ruta
-            self.tableWidget.setItem(i, 0, QTableWidgetItem(ruta.nombre))
-            
-            if ruta.id_ruta in self.dic_asignaciones:
-                # Ruta asignada
-                asignacion = self.dic_asignaciones[ruta.id_ruta]
-                
-                self.tableWidget.setItem(i, 1, QTableWidgetItem(asignacion.nombre_conductor))
-                self.tableWidget.setItem(i, 2, QTableWidgetItem(asignacion.matricula_vehiculo))
-                self.tableWidget.setItem(i, 3, QTableWidgetItem("Asignada"))
-            else:
-                # Ruta disponible
-                self.tableWidget.setItem(i, 1, QTableWidgetItem("-"))
-                self.tableWidget.setItem(i, 2, QTableWidgetItem("-"))
-                self.tableWidget.setItem(i, 3, QTableWidgetItem("Disponible"))
+        # Un único reset del modelo; la vista solo pide las celdas visibles
+        self.modelo.set_items(self.rutas_en_tabla)
+    
+    def _dato_asignacion(self, ruta, campo):
+        """Valor de la asignación de una ruta (None si está disponible)"""
+        asignacion = self.dic_asignaciones.get(ruta.id_ruta)
+        return getattr(asignacion, campo, None) if asignacion else None
+    
+    def marcar_asignacion(self, id_ruta, asignacion):
+        """
+        Actualiza solo la fila de una ruta tras asignarla o liberarla.
+        
+        Args:
+            id_ruta: ID de la ruta
+            asignacion: Asignacion nueva o None si la ruta queda disponible
+        """
+        if asignacion is None:
+            self.dic_asignaciones.pop(id_ruta, None)
+        else:
+            self.dic_asignaciones[id_ruta] = asignacion
+        
+        ruta = self.modelo.obtener(id_ruta)
+        if ruta is not None:
+            self.modelo.actualizar(ruta)
+        
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("tabla")
     
-    def seleccionar_ruta_de_tabla(self, fila, columna):
+    def obtener_ruta_seleccionada(self):
+        """Devuelve la ruta de la fila seleccionada o None"""
+        fila = self.tableWidget.currentIndex().row()
+        if fila < 0:
+            return None
+        return self.proxy.objeto_en(fila)
+    
+    def seleccionar_ruta_de_tabla(self, indice):
         """Al hacer clic en la tabla, selecciona esa ruta en el combo"""
-        if fila < len(self.rutas_en_tabla):
-            ruta_seleccionada = self.rutas_en_tabla[fila]
-            
-            index = self.cbRuta.findData(ruta_seleccionada.id_ruta)
-            if index >= 0:
-                self.cbRuta.setCurrentIndex(index)
+        ruta_seleccionada = self.proxy.objeto_en(indice.row())
+        if ruta_seleccionada is None:
+            return
+        
+        index = self.cbRuta.findData(ruta_seleccionada.id_ruta)
+        if index >= 0:
+            self.cbRuta.setCurrentIndex(index)
     
     # =========================================================================
     # CREAR ASIGNACIÓN
@@ -259,32 +308,29 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
         texto_vehiculo = self.cbVehiculo.currentText()
         matricula = texto_vehiculo.split("-")[-1].strip() if "-" in texto_vehiculo else texto_vehiculo
         
-        # 2. Validación básica usando el servicio
-        valido, mensaje = self.service.validar_asignacion_basica(
-            id_ruta, id_conductor, id_vehiculo
+        # 2. Validar todo de una vez (una sola foto de los datos)
+        conflictos = self.service.validar_candidato(
+            id_ruta, id_conductor, id_vehiculo,
+            nombre_ruta=nombre_ruta,
+            nombre_conductor=nombre_conductor,
+            matricula=matricula
         )
         
-        if not valido:
-            QMessageBox.warning(self, "Faltan datos", mensaje)
-            return
-        
-        # 3. Validar que la ruta esté disponible
-        valido, mensaje = self.service.validar_ruta_disponible(id_ruta, nombre_ruta)
-        
-        if not valido:
-            QMessageBox.warning(self, "Ruta Ya Asignada", mensaje)
+        bloqueantes = [c for c in conflictos if c['bloqueante']]
+        if bloqueantes:
+            QMessageBox.warning(
+                self,
+                bloqueantes[0]['titulo'],
+                "\n\n".join(c['mensaje'] for c in bloqueantes)
+            )
             return
         
-        # 4. Validar conductor (puede reasignarse)
-        valido, mensaje, ruta_anterior = self.service.validar_conductor(
-            id_conductor, nombre_conductor
-        )
-        
-        if mensaje:  # Hay un mensaje de confirmación
+        # 3. Conflictos que se pueden confirmar (reasignar conductor)
+        for conflicto in conflictos:
             respuesta = QMessageBox.question(
                 self,
-                "Conductor Ya Asignado",
-                mensaje,
+                conflicto['titulo'],
+                conflicto['mensaje'],
                 QMessageBox.Yes | QMessageBox.No,
                 QMessageBox.No
             )
@@ -292,14 +338,7 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
             if respuesta != QMessageBox.Yes:
                 return
         
-        # 5. Validar vehículo (NO puede reasignarse)
-        valido, mensaje = self.service.validar_vehiculo(id_vehiculo, matricula)
-        
-        if not valido:
-            QMessageBox.warning(self, "Vehículo Ya Asignado", mensaje)
-            return
-        
-        # 6. Crear objeto Asignacion
+        # 4. Crear objeto Asignacion
         nueva_asignacion = Asignacion(
             id_ruta=id_ruta,
             nombre_ruta=nombre_ruta,
@@ -311,7 +350,7 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
             estado="Asignada"
         )
         
-        # 7. Guardar usando el servicio
+        # 5. Guardar usando el servicio
         exito, asignacion_creada, mensaje = self.service.crear_asignacion(nueva_asignacion)
         
         if exito:
@@ -323,20 +362,157 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
 
             QMessageBox.information(self, "Exito", "Ruta asignada correctamente.")
 
-            # Actualizar tabla
-            self.cargar_tabla()
+            # Actualizar solo la fila de la ruta
+            self.marcar_asignacion(id_ruta, asignacion_creada)
         else:
             QMessageBox.critical(self, "Error", mensaje)
     
+    # =========================================================================
+    # IMPORTACIÓN MASIVA
+    # =========================================================================
+    
+    def importar_csv(self):
+        """
+        Importa muchas asignaciones desde un CSV (ruta, conductor, vehiculo).
+        Se valida todo antes de guardar y se guarda todo o nada. Lectura,
+        validación y guardado van en segundo plano.
+        """
+        ruta_archivo, _ = QFileDialog.getOpenFileName(
+            self, "Importar asignaciones", "", "CSV (*.csv);;Todos (*)"
+        )
+        if not ruta_archivo:
+            return
+        
+        # 1. Leer, resolver nombres/matrículas/DNI a IDs y validar el lote
+        self.btnImportarCSV.setEnabled(False)
+        self.importaciones.ejecutar(
+            lambda: self.service.preparar_importacion(ruta_archivo),
+            self.cuando_termine_validar_csv,
+            self.cuando_falle_importacion,
+            clave="importar"
+        )
+    
+    def cuando_termine_validar_csv(self, resultado):
+        """Lote leído y validado (thread de la UI)"""
+        ok, candidatos, resultados, mensaje = resultado
+        if not ok:
+            self.btnImportarCSV.setEnabled(True)
+            QMessageBox.warning(self, "CSV no válido", mensaje)
+            return
+        
+        # 2. Conflictos que impiden importar
+        bloqueantes = [
+            (fila, [c for c in conflictos if c['bloqueante']])
+            for fila, conflictos in enumerate(resultados, start=1)
+        ]
+        bloqueantes = [(fila, lista) for fila, lista in bloqueantes if lista]
+        
+        if bloqueantes:
+            self.btnImportarCSV.setEnabled(True)
+            QMessageBox.warning(
+                self,
+                "Importación Cancelada",
+                f"{len(bloqueantes)} de {len(candidatos)} filas tienen conflictos. "
+                "No se ha guardado nada.\n\n" + self._resumen_conflictos(bloqueantes)
+            )
+            return
+        
+        # 3. Reasignaciones de conductores: se confirman una sola vez
+        reasignar = False
+        reasignaciones = sum(1 for conflictos in resultados if conflictos)
+        if reasignaciones:
+            respuesta = QMessageBox.question(
+                self,
+                "Conductores Ya Asignados",
+                f"{reasignaciones} conductores ya tienen una ruta asignada.\n\n"
+                "¿Quieres reasignarlos? (Sus asignaciones anteriores se eliminarán)",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if respuesta != QMessageBox.Yes:
+                self.btnImportarCSV.setEnabled(True)
+                return
+            reasignar = True
+        
+        # 4. Guardar todo en una sola escritura (con la validación ya hecha)
+        fecha_inicio = self.dtInicio.dateTime().toString("dd/MM/yyyy HH:mm")
+        self.importaciones.ejecutar(
+            lambda: self.service.crear_asignaciones_lote(
+                candidatos, fecha_inicio,
+                reasignar_conductores=reasignar,
+                resultados=resultados
+            ),
+            self.cuando_termine_importar,
+            self.cuando_falle_importacion,
+            clave="importar"
+        )
+    
+    def cuando_termine_importar(self, resultado):
+        """Resultado del guardado del lote (thread de la UI)"""
+        self.btnImportarCSV.setEnabled(True)
+        exito, asignaciones, informe, mensaje = resultado
+        
+        if not exito:
+            detalle = self._resumen_conflictos(informe) if informe else ""
+            QMessageBox.critical(self, "Error", f"{mensaje}\n\n{detalle}".strip())
+            return
+        
+        for asignacion in asignaciones:
+            self.asignacion_creada.emit(asignacion)
+        
+        # 5. Notificaciones en una sola petición (sin bloquear la UI)
+        pares = [(a.id_conductor, a.id_ruta) for a in asignaciones]
+        self.importaciones.ejecutar(
+            lambda: notificaciones_api.notificar_rutas_asignadas(pares),
+            self.cuando_termine_notificar,
+            self.cuando_falle_notificar,
+            clave="notificar"
+        )
+        
+        QMessageBox.information(self, "Exito", mensaje)
+        self.cargar_tabla()
+    
+    def cuando_termine_notificar(self, resultado):
+        """Resultado de las notificaciones del lote (thread de la UI)"""
+        exito, mensaje = resultado
+        if not exito:
+            self.cuando_falle_notificar(mensaje)
+    
+    def cuando_falle_notificar(self, error):
+        """Las asignaciones ya están guardadas: solo se avisa"""
+        QMessageBox.warning(
+            self, "Aviso",
+            f"Las asignaciones se guardaron, pero no se pudieron enviar todas "
+            f"las notificaciones a los conductores.\n\n{error}"
+        )
+    
+    def cuando_falle_importacion(self, error):
+        """Error inesperado en la importación (thread de la UI)"""
+        self.btnImportarCSV.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Error: {error}")
+    
+    def _resumen_conflictos(self, informe, maximo=10):
+        """Texto con los conflictos de las primeras filas"""
+        lineas = []
+        for fila, conflictos in informe[:maximo]:
+            for conflicto in conflictos:
+                primera_linea = conflicto['mensaje'].split("\n")[0]
+                lineas.append(f"Fila {fila}: {primera_linea}")
+        
+        if len(informe) > maximo:
+            lineas.append(f"... y {len(informe) - maximo} filas más")
+        
+        return "\n".join(lineas)
+    
     # =========================================================================
     # ELIMINAR ASIGNACIÓN
     # =========================================================================
     
     def borrar_asignacion(self):
         """Elimina la asignación de la ruta seleccionada"""
-        fila = self.tableWidget.currentRow()
+        ruta_seleccionada = self.obtener_ruta_seleccionada()
         
-        if fila < 0:
+        if ruta_seleccionada is None:
             QMessageBox.warning(
                 self,
                 "Aviso",
@@ -344,12 +520,6 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
             )
             return
         
-        # Verificar que la fila esté en rango
-        if fila >= len(self.rutas_en_tabla):
-            return
-        
-        ruta_seleccionada = self.rutas_en_tabla[fila]
-        
         # Verificar si esa ruta tiene asignación
         if ruta_seleccionada.id_ruta not in self.dic_asignaciones:
             QMessageBox.information(
@@ -387,7 +557,7 @@ class AsignacionController(QWidget, Ui_AsignacionWidget):
                 "Asignación eliminada. La ruta vuelve a estar disponible."
             )
             
-            # Actualizar tabla
-            self.cargar_tabla()
+            # Actualizar solo la fila de la ruta
+            self.marcar_asignacion(ruta_seleccionada.id_ruta, None)
         else:
             QMessageBox.critical(self, "Error", mensaje)
\ No newline at end of file
@@ -3,8 +3,9 @@ CommandCenterController - Versión refactorizada
 
 RESPONSABILIDADES:
 - Manejo de UI (mapa en tiempo real)
-- Usar MapUtils para crear el mapa
+- Usar MapUtils para crear el mapa (una sola vez) y enviarle cambios
 - Usar CommandCenterService para datos y listener
+- Reaccionar a las señales por vehículo del estado de la flota
 - Lógica de zoom inteligente
 
 Código simple y claro.
@@ -14,6 +15,8 @@ from PySide6.QtWidgets import QWidget
 from app.views.CommandCenterPage_ui import Ui_CommandCenterPage
 from app.services.command_center_service import CommandCenterService
 from app.utils.map_utils import MapUtils
+from app.utils.refresh_scheduler import RefreshScheduler
+from app.utils.workers import GestorTareas
 
 
 class CommandCenterController(QWidget, Ui_CommandCenterPage):
@@ -23,11 +26,12 @@ class CommandCenterController(QWidget, Ui_CommandCenterPage):
     Características:
     - Listener de Firebase para actualizaciones GPS
     - Zoom inteligente (solo ajusta la primera vez)
+    - Mapa persistente: cada cambio GPS mueve un marcador, no recarga la página
     - Usa MapUtils para crear mapas
     - Usa CommandCenterService para datos
     """
     
-    def __init__(self, coords_iniciales=None):
+    def __init__(self, coords_iniciales=None, max_fps=RefreshScheduler.FPS_DEFECTO):
         super().__init__()
         self.setupUi(self)
         
@@ -43,13 +47,34 @@ class CommandCenterController(QWidget, Ui_CommandCenterPage):
         # Control de zoom inteligente
         self.es_primera_carga = True
         
+        # Estado del mapa persistente
+        # La página se carga una sola vez; después solo se envían cambios
+        self.mapa_listo = False
+        self.vehiculos_en_mapa = {}
+        
         # Conectar botones
         if hasattr(self, 'btnActualizar'):
-            self.btnActualizar.clicked.connect(self.actualizar_mapa)
+            self.btnActualizar.clicked.connect(self.recargar_ubicaciones)
+        if hasattr(self, 'webMap'):
+            self.webMap.loadFinished.connect(self.cuando_cargue_mapa)
+        
+        # Scheduler: agrupa ráfagas de eventos en como mucho max_fps repintados/s
+        self.scheduler = RefreshScheduler(max_fps, self)
+        
+        # Descargas manuales fuera del thread de la UI
+        self.tareas = GestorTareas(self)
+        self.scheduler.refrescar.connect(self.refrescar_mapa)
+        
+        # Señales del estado de la flota (una por vehículo que cambia)
+        estado = self.service.estado_flota
+        estado.vehiculo_agregado.connect(self.cuando_cambie_vehiculo)
+        estado.vehiculo_actualizado.connect(self.cuando_cambie_vehiculo)
+        estado.vehiculo_eliminado.connect(self.scheduler.solicitar)
+        estado.flota_reiniciada.connect(self.scheduler.solicitar)
         
         # Inicializar
-        self.actualizar_mapa()
-        self.service.iniciar_listener(self.actualizar_mapa)
+        self.cargar_mapa_base()
+        self.service.iniciar_listener()
     
     # =========================================================================
     # ACTUALIZACIÓN DE EMPRESA
@@ -63,59 +88,147 @@ class CommandCenterController(QWidget, Ui_CommandCenterPage):
         if nuevas_coords:
             self.empresa_coords = nuevas_coords
             self.es_primera_carga = True
-            self.actualizar_mapa()
+            self.cargar_mapa_base()
     
     # =========================================================================
     # MAPA
     # =========================================================================
     
+    def cargar_mapa_base(self):
+        """
+        Carga la página del mapa (solo empresa + capa JS de vehículos).
+        
+        Es la única vez que se renderiza Folium. Los vehículos se dibujan
+        cuando la página termina de cargar (ver cuando_cargue_mapa).
+        """
+        self.mapa_listo = False
+        self.vehiculos_en_mapa = {}
+        
+        mapa = MapUtils.create_live_fleet_map(
+            company_coords=self.empresa_coords,
+            company_name="FleetSmart HQ"
+        )
+        
+        html = MapUtils.render_to_html(mapa)
+        if hasattr(self, 'webMap'):
+            self.webMap.setHtml(html)
+    
+    def cuando_cargue_mapa(self, ok):
+        """Cuando la página está lista, dibuja todos los vehículos activos"""
+        if not ok:
+            print("Error cargando la página del mapa")
+            return
+        
+        self.mapa_listo = True
+        self.actualizar_mapa()
+    
+    def recargar_ubicaciones(self):
+        """Recarga manual: vuelve a descargar todas las ubicaciones (en segundo plano)"""
+        self.tareas.ejecutar(
+            self.service.descargar_ubicaciones,
+            self.service.estado_flota.reemplazar,
+            clave="recargar"
+        )
+    
     def actualizar_mapa(self):
         """
-        Dibuja el mapa con empresa y vehículos activos.
+        Sincroniza el mapa ya cargado con todo el estado en memoria.
+        
+        Se usa al cargar la página y cuando el estado se reemplaza entero
+        (evento inicial del listener o recarga manual). Solo se envían los
+        marcadores que cambian, así que el usuario conserva su zoom.
         
         ZOOM INTELIGENTE:
         - Primera carga: fit_bounds para mostrar todos los puntos
         - Siguientes actualizaciones: mantiene el zoom actual
-          para no interrumpir si el usuario está haciendo zoom manual
         """
-        # 1. Obtener ubicaciones del servicio
-        ubicaciones = self.service.obtener_ubicaciones_activas()
+        if not self.mapa_listo:
+            # La página aún no existe; se dibujará todo en cuando_cargue_mapa()
+            return
+        
+        # 1. Obtener ubicaciones del estado en memoria (sin red)
+        ubicaciones = self.service.obtener_ubicaciones_en_memoria()
         
         # 2. Convertir al formato que necesita MapUtils
         vehiculos = self.service.preparar_datos_mapa(ubicaciones)
         
-        # 3. Crear mapa usando MapUtils
-        # Pasamos fit_to_bounds solo en primera carga
-        mapa = MapUtils.create_fleet_map(
-            company_coords=self.empresa_coords,
-            company_name="FleetSmart HQ",
-            vehicles=vehiculos,
+        # 3. Calcular qué marcadores cambian respecto a lo dibujado
+        upserts, removes, self.vehiculos_en_mapa = self.service.calcular_cambios(
+            self.vehiculos_en_mapa, vehiculos
+        )
+        
+        # 4. Enviar solo los cambios a la página
+        self.enviar_cambios_mapa(upserts, removes)
+    
+    def cuando_cambie_vehiculo(self, ubicacion):
+        """Marca un vehículo como pendiente de repintar"""
+        self.scheduler.solicitar(ubicacion.id_localizacion)
+    
+    def refrescar_mapa(self, claves):
+        """
+        Repinta lo acumulado por el scheduler.
+        
+        Args:
+            claves: set de vehículos cambiados, o None para sincronizar todo
+        """
+        if claves is None:
+            self.actualizar_mapa()
+            return
+        
+        if not self.mapa_listo:
+            return
+        
+        upserts = []
+        removes = []
+        
+        # Leer el estado más reciente (puede haber cambiado varias veces)
+        for id_asignacion in claves:
+            ubicacion = self.service.estado_flota.obtener(id_asignacion)
+            
+            if ubicacion is None:
+                if self.vehiculos_en_mapa.pop(id_asignacion, None) is not None:
+                    removes.append(id_asignacion)
+                continue
+            
+            vehiculo = self.service.preparar_datos_mapa([ubicacion])[0]
+            if self.vehiculos_en_mapa.get(id_asignacion) != vehiculo:
+                self.vehiculos_en_mapa[id_asignacion] = vehiculo
+                upserts.append(vehiculo)
+        
+        self.enviar_cambios_mapa(upserts, removes)
+    
+    def enviar_cambios_mapa(self, upserts, removes):
+        """Aplica los cambios de marcadores en la página con runJavaScript"""
+        if not upserts and not removes and not self.es_primera_carga:
+            return
+        
+        script = MapUtils.build_fleet_update_js(
+            upserts,
+            removes,
             fit_to_bounds=self.es_primera_carga
         )
         
-        # 4. Desactivar fit_bounds para futuras actualizaciones
+        # Desactivar fit_bounds para futuras actualizaciones
         if self.es_primera_carga:
             self.es_primera_carga = False
         
-        # 5. Renderizar mapa
-        html = MapUtils.render_to_html(mapa)
         if hasattr(self, 'webMap'):
-            self.webMap.setHtml(html)
+            self.webMap.page().runJavaScript(script)
     
     # =========================================================================
     # LIMPIEZA AL CERRAR
     # =========================================================================
     
-    def detener_listener(self):
-        """Detiene el listener de Firebase (llamado desde MainController)"""
-        self.service.detener_listener()
-
     def closeEvent(self, event):
         """Detener listener al cerrar"""
+        self.scheduler.cancelar()
+        self.tareas.cancelar()
         self.service.detener_listener()
         event.accept()
         
         
     def detener_listener(self):
         """Permite que MainController detenga el listener externamente"""
+        self.scheduler.cancelar()
+        self.tareas.cancelar()
         self.service.detener_listener()
\ No newline at end of file
@@ -8,13 +8,15 @@ RESPONSABILIDADES:
 
 Código simple sin lambdas ni funciones complejas.
 """
-from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QWidget, QTableWidgetItem, QMessageBox, QHeaderView
+from PySide6.QtCore import Signal, Qt
+from PySide6.QtWidgets import QWidget, QMessageBox, QHeaderView
 
 from app.views.ConductoresWidget_ui import Ui_ConductoresWidget
 from app.controllers.ConductorDialogController import ConductorDialogController
 from app.services.conductores_service import ConductoresService
 from app.utils.language_utils import LanguageService
+from app.utils.table_models import DataclassTableModel, FiltroTablaProxy
+from app.utils.workers import GestorTareas
 
 
 class ConductoresController(QWidget, Ui_ConductoresWidget):
@@ -28,6 +30,16 @@ class ConductoresController(QWidget, Ui_ConductoresWidget):
     conductor_eliminado = Signal(str)
     conductor_estado_cambiado = Signal(str, str)
     
+    # Columnas: (cabecera, atributo de Conductor)
+    COLUMNAS = [
+        ("Nombre", "nombre"),
+        ("DNI", "dni"),
+        ("Licencia", "licencia"),
+        ("Estado", "estado"),
+        ("Email", "email"),
+        ("Teléfono", "telefono"),
+    ]
+    
     def __init__(self, db_connection=None):
         super().__init__()
         self.setupUi(self)
@@ -39,6 +51,14 @@ class ConductoresController(QWidget, Ui_ConductoresWidget):
         self.lista_conductores = []
         self.cache_conductores = {}
         
+        # Modelo en memoria + proxy de orden (sin QTableWidgetItem por celda)
+        self.modelo = DataclassTableModel(self.COLUMNAS, "id_conductor", parent=self)
+        self.proxy = FiltroTablaProxy(self)
+        self.proxy.setSourceModel(self.modelo)
+        
+        # Lecturas en segundo plano (se cancelan al salir de la página)
+        self.tareas = GestorTareas(self, al_reanudar=self.cargar_tabla)
+        
         # Configuración inicial
         self.configurar_tabla()
         self.cargar_tabla()
@@ -49,7 +69,10 @@ class ConductoresController(QWidget, Ui_ConductoresWidget):
     # =========================================================================
     
     def configurar_tabla(self):
-        """Configura el estilo de la tabla"""
+        """Configura el modelo y el estilo de la tabla"""
+        self.tablaCondcutores.setModel(self.proxy)
+        self.tablaCondcutores.setSortingEnabled(True)
+        self.tablaCondcutores.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.tablaCondcutores.horizontalHeader().setStretchLastSection(False)
         self.tablaCondcutores.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
     
@@ -70,82 +93,59 @@ class ConductoresController(QWidget, Ui_ConductoresWidget):
         self.btnEditar.setText(LanguageService.get_text("edit", idioma))
         self.btnBorrar.setText(LanguageService.get_text("delete", idioma))
 
-        claves_columnas = {
-            0: "name",
-            1: "dni",
-            2: "license",
-            3: "status",
-            4: "email",
-            5: "phone"
-        }
-
-        for col, clave in claves_columnas.items():
-            texto = LanguageService.get_text(clave, idioma)
-            item = self.tablaCondcutores.horizontalHeaderItem(col)
-            if item:
-                item.setText(texto)
+        claves_columnas = ["name", "dni", "license", "status", "email", "phone"]
+        self.modelo.set_cabeceras([
+            LanguageService.get_text(clave, idioma) for clave in claves_columnas
+        ])
     
     # =========================================================================
     # GESTIÓN DE TABLA
     # =========================================================================
     
     def cargar_tabla(self):
-        """Carga todos los conductores desde el servicio"""
-        # Obtener datos del servicio
-        self.lista_conductores = self.service.obtener_todos()
+        """Carga todos los conductores desde el servicio (en segundo plano)"""
+        self.tareas.ejecutar(self.service.obtener_todos, self.mostrar_datos, clave="cargar")
+    
+    def mostrar_datos(self, lista):
+        """Recibe el resultado de la carga (thread de la UI)"""
+        self.lista_conductores = lista
         self.cache_conductores = {c.id_conductor: c for c in self.lista_conductores}
         
-        # Limpiar tabla
-        self.tablaCondcutores.setRowCount(0)
-        
-        # Llenar tabla
-        for i, conductor in enumerate(self.lista_conductores):
-            self.tablaCondcutores.insertRow(i)
-            self.llenar_fila(i, conductor)
-    
-    def llenar_fila(self, fila, conductor):
-        """Llena una fila de la tabla con datos de un conductor"""
-        self.tablaCondcutores.setItem(fila, 0, QTableWidgetItem(conductor.nombre))
-        self.tablaCondcutores.setItem(fila, 1, QTableWidgetItem(conductor.dni))
-        self.tablaCondcutores.setItem(fila, 2, QTableWidgetItem(conductor.licencia))
-        self.tablaCondcutores.setItem(fila, 3, QTableWidgetItem(conductor.estado))
-        self.tablaCondcutores.setItem(fila, 4, QTableWidgetItem(conductor.email))
-        self.tablaCondcutores.setItem(fila, 5, QTableWidgetItem(conductor.telefono))
+        # Un único reset del modelo; la vista solo pide las celdas visibles
+        self.modelo.set_items(self.lista_conductores)
     
     def agregar_a_tabla(self, conductor):
         """Agrega un conductor a la tabla sin recargar todo"""
         self.lista_conductores.append(conductor)
         self.cache_conductores[conductor.id_conductor] = conductor
+        self.modelo.agregar(conductor)
         
-        nueva_fila = self.tablaCondcutores.rowCount()
-        self.tablaCondcutores.insertRow(nueva_fila)
-        self.llenar_fila(nueva_fila, conductor)
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
-    def actualizar_en_tabla(self, fila, conductor):
-        """Actualiza una fila específica"""
-        self.lista_conductores[fila] = conductor
+    def actualizar_en_tabla(self, conductor):
+        """Actualiza la fila de un conductor"""
+        for i, c in enumerate(self.lista_conductores):
+            if c.id_conductor == conductor.id_conductor:
+                self.lista_conductores[i] = conductor
+                break
+        
         self.cache_conductores[conductor.id_conductor] = conductor
-        self.llenar_fila(fila, conductor)
+        self.modelo.actualizar(conductor)
+        
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
     def eliminar_de_tabla(self, id_conductor):
         """Elimina un conductor de la tabla"""
-        # Buscar fila
-        fila = None
-        for i, conductor in enumerate(self.lista_conductores):
-            if conductor.id_conductor == id_conductor:
-                fila = i
-                break
-        
-        if fila is None:
-            return
+        self.lista_conductores = [
+            c for c in self.lista_conductores if c.id_conductor != id_conductor
+        ]
+        self.cache_conductores.pop(id_conductor, None)
+        self.modelo.eliminar(id_conductor)
         
-        # Eliminar de lista y caché
-        del self.lista_conductores[fila]
-        if id_conductor in self.cache_conductores:
-            del self.cache_conductores[id_conductor]
-        
-        # Eliminar fila de tabla
-        self.tablaCondcutores.removeRow(fila)
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
     # =========================================================================
     # OBTENER SELECCIÓN
@@ -153,13 +153,13 @@ class ConductoresController(QWidget, Ui_ConductoresWidget):
     
     def obtener_seleccionado(self):
         """Devuelve el conductor seleccionado o None"""
-        fila = self.tablaCondcutores.currentRow()
+        fila = self.tablaCondcutores.currentIndex().row()
         
         if fila == -1:
             QMessageBox.warning(self, "Aviso", "Selecciona un conductor de la tabla.")
             return None
         
-        return self.lista_conductores[fila]
+        return self.proxy.objeto_en(fila)
     
     # =========================================================================
     # CREAR CONDUCTOR
@@ -236,7 +236,6 @@ class ConductoresController(QWidget, Ui_ConductoresWidget):
         if not conductor:
             return
         
-        fila_actual = self.tablaCondcutores.currentRow()
         estado_anterior = conductor.estado
         
         # 2. Abrir diálogo
@@ -258,7 +257,7 @@ class ConductoresController(QWidget, Ui_ConductoresWidget):
         # 5. Manejar resultado
         if exito:
             # Actualizar tabla
-            self.actualizar_en_tabla(fila_actual, conductor_editado)
+            self.actualizar_en_tabla(conductor_editado)
             
             # Emitir señales
             self.conductor_actualizado.emit(conductor_editado.id_conductor)
@@ -333,12 +332,7 @@ class ConductoresController(QWidget, Ui_ConductoresWidget):
             
             if conductor.estado != nuevo_estado:
                 conductor.estado = nuevo_estado
-                
-                # Buscar y actualizar fila
-                for i, c in enumerate(self.lista_conductores):
-                    if c.id_conductor == id_conductor:
-                        self.llenar_fila(i, conductor)
-                        break
+                self.modelo.actualizar(conductor)
     
     def recargar_conductor_especifico(self, id_conductor):
         """Recarga un conductor específico desde Firebase"""
@@ -346,8 +340,5 @@ class ConductoresController(QWidget, Ui_ConductoresWidget):
         if not conductor_actualizado:
             return
         
-        # Buscar y actualizar fila
-        for i, c in enumerate(self.lista_conductores):
-            if c.id_conductor == id_conductor:
-                self.actualizar_en_tabla(i, conductor_actualizado)
-                break
\ No newline at end of file
+        if id_conductor in self.cache_conductores:
+            self.actualizar_en_tabla(conductor_actualizado)
\ No newline at end of file
@@ -1,11 +1,13 @@
-from PySide6.QtWidgets import QWidget, QTableWidgetItem, QMessageBox, QHeaderView
-from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QWidget, QMessageBox, QHeaderView
+from PySide6.QtCore import Signal, Qt
 
 from app.views.IncidenciasWidget_ui import Ui_IncidenciasWidget
 from app.services.incidencias_service import IncidenciasService
 from app.controllers.IncidenciaDialogController import IncidenciaDialogController
 from app.services.notificaciones_api_service import notificaciones_api
 from app.utils.language_utils import LanguageService
+from app.utils.table_models import DataclassTableModel, FiltroTablaProxy, clave_fecha
+from app.utils.workers import GestorTareas
 
 class IncidenciasController(QWidget, Ui_IncidenciasWidget):
     
@@ -15,6 +17,18 @@ class IncidenciasController(QWidget, Ui_IncidenciasWidget):
     incidencia_eliminada = Signal(str)
     incidencia_estado_cambiado = Signal(str, str)
     
+    # Columnas: (cabecera, atributo de Incidencia[, clave de ordenación])
+    COLUMNAS = [
+        ("Fecha", "fecha", lambda inc: clave_fecha(inc.fecha, inc.hora)),
+        ("Hora", "hora"),
+        ("Vehículo", "matricula"),
+        ("Tipo", "tipo"),
+        ("Estado", "estado"),
+        ("Descripción", "descripcion"),
+        ("Conductor", "nombre_conductor"),
+    ]
+    COL_ESTADO = 4
+    
     def __init__(self, db_connection, app_state):
         super().__init__()
         self.setupUi(self)
@@ -27,6 +41,14 @@ class IncidenciasController(QWidget, Ui_IncidenciasWidget):
         self.lista_incidencias = []
         self.cache_incidencias = {}
         
+        # Modelo en memoria + proxy de filtro/orden (sin QTableWidgetItem por celda)
+        self.modelo = DataclassTableModel(self.COLUMNAS, "id_incidencia", vacio="-", parent=self)
+        self.proxy = FiltroTablaProxy(self)
+        self.proxy.setSourceModel(self.modelo)
+        
+        # Lecturas en segundo plano (se cancelan al salir de la página)
+        self.tareas = GestorTareas(self, al_reanudar=self.cargar_tabla)
+        
         # Configuración inicial
         self.configurar_tabla()
         self.cargar_tabla()
@@ -37,14 +59,18 @@ class IncidenciasController(QWidget, Ui_IncidenciasWidget):
     # =========================================================================
     
     def configurar_tabla(self):
-        """Configura el estilo de la tabla"""
+        """Configura el modelo y el estilo de la tabla"""
+        self.tablaIncidencias.setModel(self.proxy)
+        self.tablaIncidencias.setSortingEnabled(True)
+        # Más recientes primero
+        self.tablaIncidencias.sortByColumn(0, Qt.DescendingOrder)
         self.tablaIncidencias.horizontalHeader().setStretchLastSection(False)
         self.tablaIncidencias.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
     
     def conectar_botones(self):
         """Conecta los botones con sus métodos"""
         self.btnNuevaIncidencia.clicked.connect(self.crear_incidencia)
-        self.btnRecargar.clicked.connect(self.cargar_tabla)
+        self.btnRecargar.clicked.connect(self.recargar_tabla)
         self.btnCambiarEstado.clicked.connect(self.cambiar_estado)
         self.btnEliminar.clicked.connect(self.eliminar_incidencia)
         self.cbFiltroEstado.currentTextChanged.connect(self.aplicar_filtro)
@@ -64,69 +90,45 @@ class IncidenciasController(QWidget, Ui_IncidenciasWidget):
         self.btnEliminar.setText(LanguageService.get_text("delete", idioma))
 
         # Traducir cabeceras de la tabla
-        claves_columnas = {
-            0: "date",
-            1: "time",
-            2: "license_plate",
-            3: "type",
-            4: "status",
-            5: "description",
-            6: "driver"
-        }
-        for col, clave in claves_columnas.items():
-            texto = LanguageService.get_text(clave, idioma)
-            item = self.tablaIncidencias.horizontalHeaderItem(col)
-            if item:
-                item.setText(texto)
+        claves_columnas = ["date", "time", "license_plate", "type", "status", "description", "driver"]
+        self.modelo.set_cabeceras([
+            LanguageService.get_text(clave, idioma) for clave in claves_columnas
+        ])
+
     # =========================================================================
     # GESTION DE TABLA
     # =========================================================================
     
     def cargar_tabla(self):
-        """Carga todas las incidencias desde el servicio"""
-        # Obtener todas las incidencias
-        self.lista_incidencias = self.service.obtener_todas()
+        """Carga todas las incidencias desde el servicio (una sola lectura, en segundo plano)"""
+        self.tareas.ejecutar(self.service.obtener_todas, self.mostrar_datos, clave="cargar")
+    
+    def mostrar_datos(self, lista):
+        """Recibe el resultado de la carga (thread de la UI)"""
+        self.lista_incidencias = lista
         
         # Actualizar caché
         self.cache_incidencias = {
             inc.id_incidencia: inc for inc in self.lista_incidencias
         }
         
-        # Aplicar filtro actual
-        self.aplicar_filtro()
+        # El modelo se construye una vez; el filtro actual lo aplica el proxy
+        self.modelo.set_items(self.lista_incidencias)
+    
+    def recargar_tabla(self):
+        """Recarga manual: ignora la caché y vuelve a descargar"""
+        self.service.forzar_recarga()
+        self.cargar_tabla()
     
     def aplicar_filtro(self):
-        """Aplica el filtro de estado seleccionado"""
+        """Aplica el filtro de estado seleccionado (en memoria, sin red)"""
         filtro = self.cbFiltroEstado.currentText()
         
-        # Obtener incidencias filtradas usando el servicio
-        incidencias_a_mostrar = self.service.obtener_por_estado(filtro)
-        
-        # Llenar tabla
-        self.llenar_tabla(incidencias_a_mostrar)
-    
-    def llenar_tabla(self, incidencias):
-        """Llena la tabla con una lista de incidencias"""
-        # Limpiar tabla
-        self.tablaIncidencias.setRowCount(0)
-        
-        # Llenar filas
-        for i, inc in enumerate(incidencias):
-            self.tablaIncidencias.insertRow(i)
-            self.llenar_fila(i, inc)
-    
-    def llenar_fila(self, fila, incidencia):
-        """Llena una fila de la tabla con datos de una incidencia"""
-        self.tablaIncidencias.setItem(fila, 0, QTableWidgetItem(incidencia.fecha))
-        self.tablaIncidencias.setItem(fila, 1, QTableWidgetItem(incidencia.hora))
-        self.tablaIncidencias.setItem(fila, 2, QTableWidgetItem(incidencia.matricula))
-        self.tablaIncidencias.setItem(fila, 3, QTableWidgetItem(incidencia.tipo))
-        self.tablaIncidencias.setItem(fila, 4, QTableWidgetItem(incidencia.estado))
-        self.tablaIncidencias.setItem(fila, 5, QTableWidgetItem(incidencia.descripcion))
-        
-        # Conductor (puede ser None)
-        conductor = incidencia.nombre_conductor or "-"
-        self.tablaIncidencias.setItem(fila, 6, QTableWidgetItem(conductor))
+        # Índice 0 = "Todas"
+        if self.cbFiltroEstado.currentIndex() <= 0:
+            self.proxy.set_filtro_columna(self.COL_ESTADO, None)
+        else:
+            self.proxy.set_filtro_columna(self.COL_ESTADO, filtro)
     
     # =========================================================================
     # ACTUALIZACIÓN SELECTIVA DE TABLA
@@ -134,98 +136,68 @@ class IncidenciasController(QWidget, Ui_IncidenciasWidget):
     
     def agregar_a_tabla(self, incidencia):
         """Agrega una incidencia a la tabla sin recargar todo"""
-        # Agregar a lista y caché
         self.lista_incidencias.append(incidencia)
         self.cache_incidencias[incidencia.id_incidencia] = incidencia
         
-        # Verificar si debe mostrarse según el filtro actual
-        filtro = self.cbFiltroEstado.currentText()
-        if filtro == "Todas" or incidencia.estado == filtro:
-            # Agregar nueva fila
-            nueva_fila = self.tablaIncidencias.rowCount()
-            self.tablaIncidencias.insertRow(nueva_fila)
-            self.llenar_fila(nueva_fila, incidencia)
+        # Si no cumple el filtro actual, el proxy la oculta
+        self.modelo.agregar(incidencia)
+        
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
-    def actualizar_en_tabla(self, fila, incidencia):
-        """Actualiza una fila específica"""
-        # Actualizar en lista
+    def actualizar_en_tabla(self, incidencia):
+        """Sustituye una incidencia en lista, caché y modelo"""
         for i, inc in enumerate(self.lista_incidencias):
             if inc.id_incidencia == incidencia.id_incidencia:
                 self.lista_incidencias[i] = incidencia
                 break
         
-        # Actualizar en caché
         self.cache_incidencias[incidencia.id_incidencia] = incidencia
         
-        # Actualizar fila en tabla
-        self.llenar_fila(fila, incidencia)
+        # El proxy vuelve a evaluar el filtro para esa fila
+        self.modelo.actualizar(incidencia)
+        
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
     def actualizar_incidencia_especifica(self, id_incidencia):
-        """Actualiza una incidencia específica desde Firebase"""
-        # Buscar fila en tabla actual
-        fila = self.encontrar_fila_en_tabla(id_incidencia)
-        
-        # Obtener datos actualizados
-        incidencia_actualizada = self.service.obtener_por_id(id_incidencia)
-        if not incidencia_actualizada:
-            return
-        
-        # Actualizar en lista y caché siempre
-        for i, inc in enumerate(self.lista_incidencias):
-            if inc.id_incidencia == id_incidencia:
-                self.lista_incidencias[i] = incidencia_actualizada
-                break
-        self.cache_incidencias[id_incidencia] = incidencia_actualizada
-        
-        if fila is None:
-            # No está visible (por filtro), solo actualizamos caché
-            return
-        
-        # Verificar si sigue cumpliendo el filtro
-        filtro = self.cbFiltroEstado.currentText()
-        if filtro != "Todas" and incidencia_actualizada.estado != filtro:
-            # Ya no cumple el filtro: eliminar de la tabla
-            self.tablaIncidencias.removeRow(fila)
-        else:
-            # Actualizar fila
-            self.actualizar_en_tabla(fila, incidencia_actualizada)
+        """Actualiza una incidencia específica desde Firebase (solo ese elemento)"""
+        def al_terminar(incidencia_actualizada):
+            if incidencia_actualizada:
+                self.actualizar_en_tabla(incidencia_actualizada)
+        
+        self.tareas.ejecutar(
+            lambda: self.service.obtener_por_id(id_incidencia),
+            al_terminar,
+            clave=f"incidencia:{id_incidencia}"
+        )
     
     def eliminar_de_tabla(self, id_incidencia):
         """Elimina una incidencia de la tabla"""
-        # Buscar fila
-        fila = self.encontrar_fila_en_tabla(id_incidencia)
-        
-        # Eliminar de lista
         for i, inc in enumerate(self.lista_incidencias):
             if inc.id_incidencia == id_incidencia:
                 del self.lista_incidencias[i]
                 break
         
-        # Eliminar de caché
-        if id_incidencia in self.cache_incidencias:
-            del self.cache_incidencias[id_incidencia]
+        self.cache_incidencias.pop(id_incidencia, None)
+        self.modelo.eliminar(id_incidencia)
         
-        # Eliminar fila de tabla si está visible
-        if fila is not None:
-            self.tablaIncidencias.removeRow(fila)
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
     def encontrar_fila_en_tabla(self, id_incidencia):
         """
         Encuentra la fila de una incidencia en la tabla actual.
         
         Returns:
-            Número de fila o None si no está visible
+            Número de fila visible o None si no está visible
         """
-        # Obtener incidencias visibles según filtro actual
-        filtro = self.cbFiltroEstado.currentText()
-        incidencias_visibles = self.service.obtener_por_estado(filtro)
-        
-        # Buscar en la lista visible
-        for i, inc in enumerate(incidencias_visibles):
-            if inc.id_incidencia == id_incidencia:
-                return i
+        fila_modelo = self.modelo.fila_de(id_incidencia)
+        if fila_modelo is None:
+            return None
         
-        return None
+        indice = self.proxy.mapFromSource(self.modelo.index(fila_modelo, 0))
+        return indice.row() if indice.isValid() else None
     
     # =========================================================================
     # OBTENER INCIDENCIA SELECCIONADA
@@ -233,20 +205,13 @@ class IncidenciasController(QWidget, Ui_IncidenciasWidget):
     
     def obtener_seleccionada(self):
         """Devuelve la incidencia seleccionada en la tabla"""
-        fila = self.tablaIncidencias.currentRow()
+        fila = self.tablaIncidencias.currentIndex().row()
         
         if fila == -1:
             QMessageBox.warning(self, "Aviso", "Selecciona una incidencia de la tabla.")
             return None
         
-        # Obtener incidencias visibles actualmente
-        filtro = self.cbFiltroEstado.currentText()
-        incidencias_visibles = self.service.obtener_por_estado(filtro)
-        
-        if fila >= len(incidencias_visibles):
-            return None
-        
-        return incidencias_visibles[fila]
+        return self.proxy.objeto_en(fila)
     
     # =========================================================================
     # CREAR INCIDENCIA
@@ -343,8 +308,8 @@ class IncidenciasController(QWidget, Ui_IncidenciasWidget):
         exito, estado_actualizado, mensaje = self.service.cambiar_estado_incidencia(incidencia)
         
         if exito:
-            # Actualizar tabla
-            self.actualizar_incidencia_especifica(incidencia.id_incidencia)
+            # Actualizar tabla (el servicio ya modificó el objeto)
+            self.actualizar_en_tabla(incidencia)
             
             # Emitir señales
             self.incidencia_actualizada.emit(incidencia.id_incidencia)
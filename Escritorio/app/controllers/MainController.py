@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import QMainWindow
-from PySide6.QtCore import QDate, QLocale
+from PySide6.QtCore import QDate, QLocale, QTimer
 from app.views.MainWindow_ui import Ui_MainWindow
 from app.controllers.CommandCenterController import CommandCenterController
 from app.utils.language_utils import LanguageService
@@ -9,41 +9,61 @@ from app.controllers.SettingsController import SettingsController
 from app.controllers.RutasController import RutasController
 from app.controllers.AsignacionController import AsignacionController
 from app.controllers.IncidenciasController import IncidenciasController
-import pyrebase
-from app.config.config import FIREBASE_CONFIG
+from app.services.sincronizacion_service import SincronizacionService
+from app.utils.refresh_scheduler import RefreshScheduler
+from app.utils.geocoding_utils import GeocodingUtils
+from app.data.conexion_firebase import conexion_firebase
 
 class MainWindowController(QMainWindow, Ui_MainWindow):
+    
+    # Páginas del menú: clave -> clave de traducción del título
+    TITULOS = {
+        "mapa": "command_center",
+        "vehiculos": "vehicle_management",
+        "conductores": "driver_management",
+        "rutas": "route_creation",
+        "asignaciones": "assignment_management",
+        "incidencias": "incident_management",
+    }
+    
+    # Señal de una vista -> método de otra. Solo se reenvía si la vista
+    # destino ya existe; si no, cargará datos frescos al crearse.
+    REENVIOS = [
+        # Rutas → Asignaciones
+        ("rutas", "ruta_creada", "asignaciones", "agregar_ruta_a_combo"),
+        ("rutas", "ruta_actualizada", "asignaciones", "actualizar_ruta_en_combo"),
+        ("rutas", "ruta_eliminada", "asignaciones", "eliminar_ruta_de_combo"),
+        # Conductores → Asignaciones
+        ("conductores", "conductor_creado", "asignaciones", "agregar_conductor_a_combo"),
+        ("conductores", "conductor_actualizado", "asignaciones", "actualizar_conductor_en_combo"),
+        ("conductores", "conductor_eliminado", "asignaciones", "eliminar_conductor_de_combo"),
+        # Vehículos → Asignaciones
+        ("vehiculos", "vehiculo_creado", "asignaciones", "agregar_vehiculo_a_combo"),
+        ("vehiculos", "vehiculo_actualizado", "asignaciones", "actualizar_vehiculo_en_combo"),
+        ("vehiculos", "vehiculo_eliminado", "asignaciones", "eliminar_vehiculo_de_combo"),
+        ("vehiculos", "vehiculo_estado_cambiado", "asignaciones", "manejar_cambio_estado_vehiculo"),
+    ]
+    
+    # Precarga en segundo plano tras mostrar la ventana (una página cada vez)
+    ORDEN_PRECARGA = ["vehiculos", "conductores", "asignaciones", "incidencias", "rutas"]
+    PAUSA_PRECARGA_MS = 150
+    
     def __init__(self, app_state, settings_service=None):
         super().__init__()
         self.setupUi(self)
         self.app_state = app_state
         self.settings_service = settings_service
         
-        # 1. Inicializar conexión a BD (para pasarla a los hijos)
-        self.firebase = pyrebase.initialize_app(FIREBASE_CONFIG)
-        self.db = self.firebase.database()
+        # 1. Conexión a BD compartida (para pasarla a los hijos)
+        self.db = conexion_firebase.database()
         
-        coords_guardadas = self.app_state.get("empresa_coords")
-
-        # 2. Inicializar Vistas Hijas
-        self.vista_mapa = CommandCenterController(coords_iniciales=self.app_state.get("empresa_coords"))
-        self.vista_vehiculos = VehiclesController(self.db, self.app_state)
-        self.vista_conductores = ConductoresController(self.db)
-        self.vista_rutas = RutasController(self.db, self.app_state)
-        self.vista_asignaciones = AsignacionController(self.db)
-        self.vista_incidencias = IncidenciasController(self.db, self.app_state)
-        
-        self.conectar_senales_vistas()
-
-        # 3. Añadirlas al Stacked Widget
-        self.idx_mapa = self.stackContent.addWidget(self.vista_mapa)
-        self.idx_vehiculos = self.stackContent.addWidget(self.vista_vehiculos)
-        self.idx_conductores = self.stackContent.addWidget(self.vista_conductores)
-        self.idx_rutas = self.stackContent.addWidget(self.vista_rutas)
-        self.idx_asignaciones = self.stackContent.addWidget(self.vista_asignaciones)
-        self.idx_incidencias = self.stackContent.addWidget(self.vista_incidencias)
-
-        # 4. Conectar Botones del Menú Lateral
+        # Backend de geocodificación elegido en settings.json
+        GeocodingUtils.configurar(self.app_state)
+        
+        # 2. Vistas hijas: se crean la primera vez que se navega a ellas
+        self.vistas = {}
+        
+        # 3. Conectar Botones del Menú Lateral
         self.btnCommandCenter.clicked.connect(self.ir_a_mapa)
         self.btnVehicles.clicked.connect(self.ir_a_vehiculos)
         self.btnDrivers.clicked.connect(self.ir_a_conductores)
@@ -53,9 +73,96 @@ class MainWindowController(QMainWindow, Ui_MainWindow):
         self.btnIncidents.clicked.connect(self.ir_a_incidencias)
         
         self.actualizar_fecha()
-        self.ir_a_mapa()
         self.actualizar_textos()
         
+        # 4. Sincronización en tiempo real del resto de colecciones
+        #    (cambios de otros gestores o de la app móvil)
+        self.schedulers_sync = {}
+        self.sincronizacion = SincronizacionService()
+        self.sincronizacion.coleccion_cambiada.connect(self._on_coleccion_cambiada)
+        
+        # 5. La primera página, la sincronización y la precarga después del
+        #    primer pintado
+        QTimer.singleShot(0, self._al_mostrar_ventana)
+    
+    # =========================================================================
+    # CREACIÓN PEREZOSA DE PÁGINAS
+    # =========================================================================
+    
+    def _al_mostrar_ventana(self):
+        """Primera página visible, sincronización y, si está activada, precarga del resto"""
+        self.ir_a_mapa()
+        
+        # Los streams se conectan en un thread del pool (no bloquea la UI)
+        self.sincronizacion.iniciar()
+        
+        if self.app_state.get("precargar_vistas", True):
+            QTimer.singleShot(self.PAUSA_PRECARGA_MS, self._precargar_siguiente)
+    
+    def _precargar_siguiente(self):
+        """Crea la siguiente página pendiente y programa la próxima"""
+        pendientes = [c for c in self.ORDEN_PRECARGA if c not in self.vistas]
+        if not pendientes:
+            return
+        
+        self.obtener_vista(pendientes[0])
+        QTimer.singleShot(self.PAUSA_PRECARGA_MS, self._precargar_siguiente)
+    
+    def _crear_vista(self, clave):
+        """Construye el controlador de una página"""
+        if clave == "mapa":
+            return CommandCenterController(
+                coords_iniciales=self.app_state.get("empresa_coords"),
+                max_fps=self.app_state.get("mapa_max_fps", 4)
+            )
+        if clave == "vehiculos":
+            return VehiclesController(self.db, self.app_state)
+        if clave == "conductores":
+            return ConductoresController(self.db)
+        if clave == "rutas":
+            return RutasController(self.db, self.app_state)
+        if clave == "asignaciones":
+            return AsignacionController(self.db)
+        if clave == "incidencias":
+            return IncidenciasController(self.db, self.app_state)
+        raise ValueError(f"Página desconocida: {clave}")
+    
+    def obtener_vista(self, clave):
+        """
+        Devuelve la vista de una página, creándola si aún no existe.
+        
+        Args:
+            clave: "mapa", "vehiculos", "conductores", "rutas",
+                   "asignaciones" o "incidencias"
+        """
+        vista = self.vistas.get(clave)
+        if vista is not None:
+            return vista
+        
+        vista = self._crear_vista(clave)
+        self.vistas[clave] = vista
+        self.stackContent.addWidget(vista)
+        
+        self.conectar_senales_vista(clave, vista)
+        
+        if hasattr(vista, 'actualizar_idioma'):
+            vista.actualizar_idioma(self.app_state.get("language", "Español"))
+        
+        return vista
+    
+    def _pagina_actual(self):
+        """Clave de la página visible o None"""
+        actual = self.stackContent.currentWidget()
+        for clave, vista in self.vistas.items():
+            if vista is actual:
+                return clave
+        return None
+    
+    def _ir_a(self, clave):
+        """Muestra una página (creándola si hace falta) y actualiza el título"""
+        self.stackContent.setCurrentWidget(self.obtener_vista(clave))
+        idioma = self.app_state.get("language", "Español")
+        self.lblPageTitle.setText(LanguageService.get_text(self.TITULOS[clave], idioma))
         
     def actualizar_textos(self):
         """Actualiza los textos de la ventana principal y propaga a las hijas"""
@@ -71,31 +178,14 @@ class MainWindowController(QMainWindow, Ui_MainWindow):
         self.btnSettings.setText(LanguageService.get_text("settings", idioma))
         
         # Actualizar titulo de pagina segun vista actual
-        idx = self.stackContent.currentIndex()
-        if idx == self.idx_mapa:
-            self.lblPageTitle.setText(LanguageService.get_text("command_center", idioma))
-        elif idx == self.idx_vehiculos:
-            self.lblPageTitle.setText(LanguageService.get_text("vehicle_management", idioma))
-        elif idx == self.idx_conductores:
-            self.lblPageTitle.setText(LanguageService.get_text("driver_management", idioma))
-        elif idx == self.idx_rutas:
-            self.lblPageTitle.setText(LanguageService.get_text("route_creation", idioma))
-        elif idx == self.idx_asignaciones:
-            self.lblPageTitle.setText(LanguageService.get_text("assignment_management", idioma))
-        elif idx == self.idx_incidencias:
-            self.lblPageTitle.setText(LanguageService.get_text("incident_management", idioma))
-        
-        # 2. Propagar a las vistas hijas
-        if hasattr(self.vista_vehiculos, 'actualizar_idioma'):
-            self.vista_vehiculos.actualizar_idioma(idioma)
-        if hasattr(self.vista_conductores, 'actualizar_idioma'):
-            self.vista_conductores.actualizar_idioma(idioma)
-        if hasattr(self.vista_rutas, 'actualizar_idioma'):
-            self.vista_rutas.actualizar_idioma(idioma)
-        if hasattr(self.vista_incidencias, 'actualizar_idioma'):
-            self.vista_incidencias.actualizar_idioma(idioma)
-        if hasattr(self.vista_asignaciones, 'actualizar_idioma'):
-            self.vista_asignaciones.actualizar_idioma(idioma)
+        pagina = self._pagina_actual()
+        if pagina is not None:
+            self.lblPageTitle.setText(LanguageService.get_text(self.TITULOS[pagina], idioma))
+        
+        # 2. Propagar a las vistas hijas ya creadas (las demás se traducen al crearse)
+        for vista in self.vistas.values():
+            if hasattr(vista, 'actualizar_idioma'):
+                vista.actualizar_idioma(idioma)
         
         
     def actualizar_fecha(self):
@@ -104,26 +194,25 @@ class MainWindowController(QMainWindow, Ui_MainWindow):
         texto_fecha = mi_locale.toString(fecha, "dddd, d 'de' MMMM 'de' yyyy")
         self.lblDate.setText(texto_fecha.capitalize())
         
-    def conectar_senales_vistas(self):
-        """Conecta señales entre las diferentes vistas para sincronización"""
-        
-        # Rutas → Asignaciones
-        self.vista_rutas.ruta_creada.connect(self.vista_asignaciones.agregar_ruta_a_combo)
-        self.vista_rutas.ruta_actualizada.connect(self.vista_asignaciones.actualizar_ruta_en_combo)
-        self.vista_rutas.ruta_eliminada.connect(self.vista_asignaciones.eliminar_ruta_de_combo)
-        self.vista_rutas.ruta_estado_cambiada.connect(self._on_ruta_estado_cambiada)
-        
-        # Conductores → Asignaciones
-        self.vista_conductores.conductor_creado.connect(self.vista_asignaciones.agregar_conductor_a_combo)
-        self.vista_conductores.conductor_actualizado.connect(self.vista_asignaciones.actualizar_conductor_en_combo)
-        self.vista_conductores.conductor_eliminado.connect(self.vista_asignaciones.eliminar_conductor_de_combo)
-        self.vista_conductores.conductor_estado_cambiado.connect(self._on_conductor_estado_cambiado)
+    def conectar_senales_vista(self, clave, vista):
+        """Conecta las señales de una vista recién creada para sincronización"""
+        for origen, senal, destino, metodo in self.REENVIOS:
+            if origen != clave:
+                continue
+            getattr(vista, senal).connect(
+                lambda *args, d=destino, m=metodo: self._reenviar(d, m, *args)
+            )
         
-        # Vehículos → Asignaciones
-        self.vista_vehiculos.vehiculo_creado.connect(self.vista_asignaciones.agregar_vehiculo_a_combo)
-        self.vista_vehiculos.vehiculo_actualizado.connect(self.vista_asignaciones.actualizar_vehiculo_en_combo)
-        self.vista_vehiculos.vehiculo_eliminado.connect(self.vista_asignaciones.eliminar_vehiculo_de_combo)
-        self.vista_vehiculos.vehiculo_estado_cambiado.connect(self.vista_asignaciones.manejar_cambio_estado_vehiculo)
+        if clave == "rutas":
+            vista.ruta_estado_cambiada.connect(self._on_ruta_estado_cambiada)
+        elif clave == "conductores":
+            vista.conductor_estado_cambiado.connect(self._on_conductor_estado_cambiado)
+    
+    def _reenviar(self, destino, metodo, *args):
+        """Llama a un método de otra vista solo si ya está creada"""
+        vista = self.vistas.get(destino)
+        if vista is not None:
+            getattr(vista, metodo)(*args)
     
     def _on_ruta_estado_cambiada(self, id_ruta, nuevo_estado):
         print(f"[MainController] Ruta {id_ruta} → {nuevo_estado}")
@@ -134,35 +223,53 @@ class MainWindowController(QMainWindow, Ui_MainWindow):
     def _on_vehiculo_estado_cambiado(self, id_vehiculo, nuevo_estado):
         print(f"[MainController] Vehículo {id_vehiculo} cambió a estado: {nuevo_estado}")
 
+    def _on_coleccion_cambiada(self, coleccion, claves):
+        """Un cambio remoto: agrupa ráfagas y recarga las vistas afectadas"""
+        scheduler = self.schedulers_sync.get(coleccion)
+        if scheduler is None:
+            scheduler = RefreshScheduler(max_fps=1, parent=self)
+            scheduler.refrescar.connect(
+                lambda _claves, c=coleccion: self._recargar_vistas(c)
+            )
+            self.schedulers_sync[coleccion] = scheduler
+        scheduler.solicitar()
+    
+    def _recargar_vistas(self, coleccion):
+        """Recarga las vistas (ya creadas) que muestran datos de la colección"""
+        vistas = {
+            "vehiculos": [("vehiculos", "cargar_tabla"), ("asignaciones", "cargar_datos")],
+            "conductores": [("conductores", "cargar_tabla"), ("asignaciones", "cargar_datos")],
+            "rutas": [("rutas", "cargar_tabla"), ("asignaciones", "cargar_datos")],
+            "asignaciones": [("asignaciones", "cargar_tabla")],
+            "incidencias": [("incidencias", "cargar_tabla")],
+        }
+        for clave, metodo in vistas.get(coleccion, []):
+            vista = self.vistas.get(clave)
+            if vista is None:
+                # Aún no creada: leerá los datos al crearse
+                continue
+            try:
+                getattr(vista, metodo)()
+            except Exception as e:
+                print(f"[MainController] Error recargando vista ({coleccion}): {e}")
+
     def ir_a_mapa(self):
-        self.stackContent.setCurrentIndex(self.idx_mapa)
-        idioma = self.app_state.get("language", "Español")
-        self.lblPageTitle.setText(LanguageService.get_text("command_center", idioma))
+        self._ir_a("mapa")
 
     def ir_a_vehiculos(self):
-        self.stackContent.setCurrentIndex(self.idx_vehiculos)
-        idioma = self.app_state.get("language", "Español")
-        self.lblPageTitle.setText(LanguageService.get_text("vehicle_management", idioma))
+        self._ir_a("vehiculos")
         
     def ir_a_conductores(self):
-        self.stackContent.setCurrentIndex(self.idx_conductores)
-        idioma = self.app_state.get("language", "Español")
-        self.lblPageTitle.setText(LanguageService.get_text("driver_management", idioma))
+        self._ir_a("conductores")
         
     def ir_a_rutas(self):
-        self.stackContent.setCurrentIndex(self.idx_rutas)
-        idioma = self.app_state.get("language", "Español")
-        self.lblPageTitle.setText(LanguageService.get_text("route_creation", idioma))
+        self._ir_a("rutas")
         
     def ir_a_asignaciones(self):
-        self.stackContent.setCurrentIndex(self.idx_asignaciones)
-        idioma = self.app_state.get("language", "Español")
-        self.lblPageTitle.setText(LanguageService.get_text("assignment_management", idioma))
+        self._ir_a("asignaciones")
         
     def ir_a_incidencias(self):
-        self.stackContent.setCurrentIndex(self.idx_incidencias)
-        idioma = self.app_state.get("language", "Español")
-        self.lblPageTitle.setText(LanguageService.get_text("incident_management", idioma))
+        self._ir_a("incidencias")
         
     def abrir_ajustes(self):
         dialog = SettingsController(self, self.app_state)
@@ -174,22 +281,27 @@ class MainWindowController(QMainWindow, Ui_MainWindow):
             if self.settings_service:
                 self.settings_service.save()
             
-            if nuevos.get("empresa_coords"):
-                self.vista_mapa.actualizar_ubicacion_empresa(nuevos["empresa_coords"])
+            if nuevos.get("empresa_coords") and "mapa" in self.vistas:
+                self.vistas["mapa"].actualizar_ubicacion_empresa(nuevos["empresa_coords"])
             
             self.actualizar_textos()
                 
     def closeEvent(self, event):
-        # 1. Detener el listener del Mapa
-        if hasattr(self, 'vista_mapa'):
-            self.vista_mapa.detener_listener()
+        # 1. Detener el listener del Mapa y la sincronización
+        vista_mapa = self.vistas.get("mapa")
+        if vista_mapa is not None:
+            vista_mapa.detener_listener()
+        if hasattr(self, 'sincronizacion'):
+            self.sincronizacion.detener()
+
+        # 2. Cancelar la geocodificación de Rutas (sin terminate: se espera
+        #    a que acabe la petición en curso y se descarta su resultado)
+        vista_rutas = self.vistas.get("rutas")
+        if vista_rutas is not None:
+            vista_rutas.geocoding.cancel_active(esperar_ms=3000)
 
-        # 2. Detener threads de Rutas (si hubiera alguno corriendo)
-        if hasattr(self, 'vista_rutas'):
-            if hasattr(self.vista_rutas, 'geocoding_thread') and self.vista_rutas.geocoding_thread:
-                if self.vista_rutas.geocoding_thread.isRunning():
-                    self.vista_rutas.geocoding_thread.terminate()
-                    self.vista_rutas.geocoding_thread.wait()
+        # 3. Cerrar las conexiones HTTP abiertas con Firebase
+        conexion_firebase.cerrar()
 
-        # 3. Aceptar el cierre
+        # 4. Aceptar el cierre
         event.accept()
\ No newline at end of file
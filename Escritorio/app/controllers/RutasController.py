@@ -1,12 +1,15 @@
-from PySide6.QtWidgets import QWidget, QMessageBox, QTableWidgetItem, QHeaderView, QAbstractItemView
-from PySide6.QtCore import Signal, QDate, QTime
+from PySide6.QtWidgets import QWidget, QMessageBox, QHeaderView, QAbstractItemView
+from PySide6.QtCore import Signal, QDate, QTime, Qt
 
 from app.views.RutasWidget_ui import Ui_RutasWidget
 from app.models.ruta import Ruta
 from app.services.rutas_service import RutasService
 from app.utils.geocoding_utils import GeocodingUtils
+from app.utils.geometria_rutas import GeometriaRutas
 from app.utils.map_utils import MapUtils
 from app.utils.language_utils import LanguageService
+from app.utils.table_models import DataclassTableModel, FiltroTablaProxy, clave_fecha
+from app.utils.workers import GestorTareas
 
 
 class RutasController(QWidget, Ui_RutasWidget):
@@ -17,6 +20,18 @@ class RutasController(QWidget, Ui_RutasWidget):
     ruta_eliminada = Signal(str)
     ruta_estado_cambiada = Signal(str, str)
     
+    # Columnas: (cabecera, atributo de Ruta[, clave de ordenación])
+    COLUMNAS = [
+        ("Nombre", "nombre"),
+        ("Origen", "origen"),
+        ("Destino", "destino"),
+        ("Fecha", "fecha", lambda r: clave_fecha(r.fecha, r.hora_inicio_prevista)),
+        ("Estado", "estado"),
+        ("Nº Paradas", lambda r: len(r.paradas or [])),
+        ("Km", "distancia_km"),
+        ("Duración", lambda r: GeometriaRutas.formatear_duracion(r.duracion_min), lambda r: r.duracion_min),
+    ]
+    
     def __init__(self, db_connection, app_state):
         super().__init__()
         self.setupUi(self)
@@ -34,9 +49,22 @@ class RutasController(QWidget, Ui_RutasWidget):
         self.lista_rutas = []
         self.cache_rutas = {}
         
+        # Modelo en memoria + proxy de orden (sin QTableWidgetItem por celda)
+        self.modelo = DataclassTableModel(self.COLUMNAS, "id_ruta", parent=self)
+        self.proxy = FiltroTablaProxy(self)
+        self.proxy.setSourceModel(self.modelo)
+        
+        # Lecturas en segundo plano (se cancelan al salir de la página)
+        self.tareas = GestorTareas(self, al_reanudar=self.al_reanudar)
+        
+        # Guardados (cálculo de tramos + escritura): no se cancelan al salir
+        self.guardados = GestorTareas(self)
+        
         # Variables para el mapa
         self.coordenadas_origen = None
+        self.texto_origen_buscado = None
         self.lista_paradas = []
+        self.geometria_pendiente = False   # Línea por carretera en cálculo
         
         # Variable temporal para geocoding de paradas
         self.texto_parada_temporal = ""
@@ -59,10 +87,9 @@ class RutasController(QWidget, Ui_RutasWidget):
     def configurar_tabla(self):
         """Configura el estilo de la tabla de rutas"""
         if hasattr(self, 'tablaRutas'):
-            self.tablaRutas.setColumnCount(6)
-            self.tablaRutas.setHorizontalHeaderLabels([
-                "Nombre", "Origen", "Destino", "Fecha", "Estado", "Nº Paradas"
-            ])
+            self.tablaRutas.setModel(self.proxy)
+            self.tablaRutas.setSortingEnabled(True)
+            self.tablaRutas.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
             
             self.tablaRutas.horizontalHeader().setStretchLastSection(False)
             self.tablaRutas.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -79,10 +106,12 @@ class RutasController(QWidget, Ui_RutasWidget):
         """Conecta todos los botones y eventos"""
         # Geocodificación
         self.leOrigen.editingFinished.connect(self.buscar_origen)
+        self.leOrigen.textEdited.connect(self.origen_editado)
         
         # Botones de formulario
         self.btnAgregarParada.clicked.connect(self.agregar_parada)
         self.btnEliminarParada.clicked.connect(self.borrar_parada)
+        self.btnOptimizarRuta.clicked.connect(self.optimizar_paradas)
         self.btnGuardarRuta.clicked.connect(self.guardar_o_actualizar_ruta)
         
         # Botones de gestión de rutas
@@ -107,6 +136,7 @@ class RutasController(QWidget, Ui_RutasWidget):
         self.btnGuardarRuta.setText(LanguageService.get_text("save_route", idioma))
         self.btnAgregarParada.setText(LanguageService.get_text("add_stop", idioma))
         self.btnEliminarParada.setText(LanguageService.get_text("delete_stop", idioma))
+        self.btnOptimizarRuta.setText(LanguageService.get_text("optimize_route", idioma))
         
         if hasattr(self, 'btnEditarRuta'):
             self.btnEditarRuta.setText(LanguageService.get_text("edit", idioma))
@@ -118,93 +148,76 @@ class RutasController(QWidget, Ui_RutasWidget):
             self.btnCancelar.setText(LanguageService.get_text("cancel", idioma))
 
         # Traducir cabeceras de la tabla
-        if hasattr(self, 'tablaRutas'):
-            claves_columnas = {
-                0: "name",
-                1: "origin",
-                2: "destination",
-                3: "date",
-                4: "status",
-                5: "num_stops"
-            }
-            for col, clave in claves_columnas.items():
-                texto = LanguageService.get_text(clave, idioma)
-                item = self.tablaRutas.horizontalHeaderItem(col)
-                if item:
-                    item.setText(texto)
+        claves_columnas = ["name", "origin", "destination", "date", "status", "num_stops", "distance_km", "duration"]
+        self.modelo.set_cabeceras([
+            LanguageService.get_text(clave, idioma) for clave in claves_columnas
+        ])
+
     # =========================================================================
     # GESTION DE TABLA
     # =========================================================================
     
+    def al_reanudar(self):
+        """Repite las tareas canceladas al salir de la página"""
+        self.cargar_tabla()
+        self.btnOptimizarRuta.setEnabled(True)
+        if self.geometria_pendiente:
+            self.actualizar_mapa()
+    
     def cargar_tabla(self):
-        """Carga todas las rutas desde el servicio"""
-        if not hasattr(self, 'tablaRutas'):
-            return
-        
-        self.lista_rutas = self.service.obtener_todas()
-        self.cache_rutas = {r.id_ruta: r for r in self.lista_rutas}
-        
-        self.tablaRutas.setRowCount(0)
-        
-        for i, ruta in enumerate(self.lista_rutas):
-            self.tablaRutas.insertRow(i)
-            self.llenar_fila(i, ruta)
+        """Carga todas las rutas desde el servicio (en segundo plano)"""
+        self.tareas.ejecutar(self.service.obtener_todas, self.mostrar_datos, clave="cargar")
     
-    def llenar_fila(self, fila, ruta):
-        """Llena una fila de la tabla con datos de una ruta"""
-        if not hasattr(self, 'tablaRutas'):
-            return
+    def mostrar_datos(self, lista):
+        """Recibe el resultado de la carga (thread de la UI)"""
+        self.lista_rutas = lista
+        self.cache_rutas = {r.id_ruta: r for r in self.lista_rutas}
         
-        self.tablaRutas.setItem(fila, 0, QTableWidgetItem(ruta.nombre))
-        self.tablaRutas.setItem(fila, 1, QTableWidgetItem(ruta.origen))
-        self.tablaRutas.setItem(fila, 2, QTableWidgetItem(ruta.destino))
-        self.tablaRutas.setItem(fila, 3, QTableWidgetItem(ruta.fecha))
-        self.tablaRutas.setItem(fila, 4, QTableWidgetItem(ruta.estado))
-        self.tablaRutas.setItem(fila, 5, QTableWidgetItem(str(len(ruta.paradas))))
+        # Un único reset del modelo; la vista solo pide las celdas visibles
+        self.modelo.set_items(self.lista_rutas)
     
     def agregar_a_tabla(self, ruta):
         """Agrega una ruta a la tabla sin recargar todo"""
-        if not hasattr(self, 'tablaRutas'):
-            return
-        
         self.lista_rutas.append(ruta)
         self.cache_rutas[ruta.id_ruta] = ruta
+        self.modelo.agregar(ruta)
         
-        nueva_fila = self.tablaRutas.rowCount()
-        self.tablaRutas.insertRow(nueva_fila)
-        self.llenar_fila(nueva_fila, ruta)
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
-    def actualizar_en_tabla(self, fila, ruta):
-        """Actualiza una fila específica"""
-        if not hasattr(self, 'tablaRutas'):
-            return
+    def actualizar_en_tabla(self, ruta):
+        """Actualiza la fila de una ruta"""
+        for i, r in enumerate(self.lista_rutas):
+            if r.id_ruta == ruta.id_ruta:
+                self.lista_rutas[i] = ruta
+                break
         
-        self.lista_rutas[fila] = ruta
         self.cache_rutas[ruta.id_ruta] = ruta
-        self.llenar_fila(fila, ruta)
+        self.modelo.actualizar(ruta)
+        
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
     def eliminar_de_tabla(self, id_ruta):
         """Elimina una ruta de la tabla"""
-        if not hasattr(self, 'tablaRutas'):
-            return
-        
-        # Buscar fila
-        fila = None
-        for i, ruta in enumerate(self.lista_rutas):
-            if ruta.id_ruta == id_ruta:
-                fila = i
-                break
+        self.lista_rutas = [r for r in self.lista_rutas if r.id_ruta != id_ruta]
+        self.cache_rutas.pop(id_ruta, None)
+        self.modelo.eliminar(id_ruta)
         
-        if fila is None:
-            return
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
+    
+    def obtener_seleccionada(self):
+        """Devuelve la ruta seleccionada en la tabla o None"""
+        if not hasattr(self, 'tablaRutas'):
+            return None
         
-        # Eliminar de lista y caché
-        del self.lista_rutas[fila]
-        if id_ruta in self.cache_rutas:
-            del self.cache_rutas[id_ruta]
+        fila = self.tablaRutas.currentIndex().row()
+        if fila < 0:
+            QMessageBox.warning(self, "Aviso", "Selecciona una ruta de la tabla.")
+            return None
         
-        # Eliminar fila de tabla
-        self.tablaRutas.removeRow(fila)
+        return self.proxy.objeto_en(fila)
     
     # =========================================================================
     # GESTIÓN DE MAPA
@@ -212,6 +225,8 @@ class RutasController(QWidget, Ui_RutasWidget):
     
     def dibujar_mapa_vacio(self):
         """Dibuja un mapa vacío centrado en España"""
+        self.tareas.cancelar("geometria")
+        self.geometria_pendiente = False
         mapa = MapUtils.create_base_map()
         self.mostrar_mapa(mapa)
     
@@ -221,17 +236,43 @@ class RutasController(QWidget, Ui_RutasWidget):
         self.webMapRuta.setHtml(html)
     
     def actualizar_mapa(self):
-        """Actualiza el mapa con origen y paradas usando MapUtils"""
+        """
+        Actualiza el mapa con origen y paradas usando MapUtils.
+        
+        Se dibuja al momento en línea recta; si hay grafo viario local, la
+        línea por carretera se calcula en segundo plano y sustituye a la
+        recta al terminar.
+        """
         if not self.coordenadas_origen and not self.lista_paradas:
             self.dibujar_mapa_vacio()
             return
         
+        self.dibujar_ruta()
+        
+        origen = self.coordenadas_origen
+        paradas = [dict(p) for p in self.lista_paradas]
+        self.geometria_pendiente = True
+        self.tareas.ejecutar(
+            lambda: self.service.geometria_mapa(origen, paradas),
+            self.mostrar_geometria,
+            clave="geometria"
+        )
+    
+    def mostrar_geometria(self, geometria):
+        """Recibe la línea por carretera (thread de la UI); None si no hay grafo"""
+        self.geometria_pendiente = False
+        if geometria:
+            self.dibujar_ruta(geometria)
+    
+    def dibujar_ruta(self, geometria=None):
+        """Dibuja origen y paradas (con la línea por carretera si se indica)"""
         origen_label = self.leOrigen.text() if self.leOrigen.text() else "Origen"
         
         mapa = MapUtils.create_route_map(
             origin_coords=self.coordenadas_origen,
             origin_label=origen_label,
-            waypoints=self.lista_paradas
+            waypoints=self.lista_paradas,
+            route_geometry=geometria
         )
         
         self.mostrar_mapa(mapa)
@@ -247,8 +288,20 @@ class RutasController(QWidget, Ui_RutasWidget):
             return
         
         # Usar geocoding asíncrono
+        self.texto_origen_buscado = texto
         self.geocoding.geocode_async(texto, "origen", self.cuando_termine_geocoding)
     
+    def origen_editado(self, texto):
+        """
+        El usuario cambió el texto del origen: las coordenadas anteriores ya
+        no le corresponden. Se descartan hasta que se vuelva a buscar
+        (editingFinished) para no guardar la dirección nueva con el punto viejo.
+        """
+        if self.coordenadas_origen is None:
+            return
+        self.coordenadas_origen = None
+        self.actualizar_mapa()
+    
     def agregar_parada(self):
         """Geocodifica y añade una parada"""
         texto = self.leNuevaParada.text().strip()
@@ -268,6 +321,9 @@ class RutasController(QWidget, Ui_RutasWidget):
             return
         
         if tipo == "origen":
+            # Respuesta de una búsqueda anterior: el texto ya cambió
+            if self.texto_origen_buscado != self.leOrigen.text().strip():
+                return
             self.coordenadas_origen = GeocodingUtils.coords_to_list(ubicacion)
             self.actualizar_mapa()
         
@@ -317,6 +373,53 @@ class RutasController(QWidget, Ui_RutasWidget):
         # Actualizar mapa
         self.actualizar_mapa()
     
+    def optimizar_paradas(self):
+        """
+        Reordena las paradas para tardar lo menos posible (mismos tiempos
+        que la duración estimada). Con grafo viario calcula tramos por
+        carretera, así que se hace en segundo plano.
+        """
+        origen = self.coordenadas_origen
+        paradas = [dict(p) for p in self.lista_paradas]
+        
+        self.btnOptimizarRuta.setEnabled(False)
+        self.tareas.ejecutar(
+            lambda: self.service.optimizar_paradas(
+                origen, paradas, criterio=RutasService.CRITERIO_MINUTOS
+            ),
+            lambda resultado: self.cuando_termine_optimizar(paradas, resultado),
+            lambda error: self.cuando_termine_optimizar(paradas, (False, None, f"Error: {error}")),
+            clave="optimizar"
+        )
+    
+    def cuando_termine_optimizar(self, paradas_originales, resultado):
+        """Resultado de optimizar_paradas (thread de la UI)"""
+        self.btnOptimizarRuta.setEnabled(True)
+        exito, paradas, mensaje = resultado
+        
+        if not exito:
+            QMessageBox.warning(self, "Aviso", mensaje)
+            return
+        
+        # Si las paradas cambiaron mientras tanto, el resultado ya no vale
+        if paradas_originales != self.lista_paradas:
+            return
+        
+        self.lista_paradas = paradas
+        
+        # Actualizar lista visual
+        self.listParadas.clear()
+        for parada in self.lista_paradas:
+            self.listParadas.addItem(f"{parada['orden']}. {parada['direccion']}")
+        
+        # Actualizar destino
+        self.leDestino.setText(self.lista_paradas[-1]['direccion'])
+        
+        # Actualizar mapa
+        self.actualizar_mapa()
+        
+        QMessageBox.information(self, "Éxito", mensaje)
+    
     # =========================================================================
     # GESTIÓN DE MODOS (CREAR vs EDITAR)
     # =========================================================================
@@ -380,8 +483,12 @@ class RutasController(QWidget, Ui_RutasWidget):
         for parada in self.lista_paradas:
             self.listParadas.addItem(f"{parada['orden']}. {parada['direccion']}")
         
-        # Geocodificar origen para mostrar en mapa
-        if ruta.origen:
+        # Origen en el mapa: con las coordenadas guardadas no hace falta red.
+        # Solo las rutas antiguas (sin origen_coords) se geocodifican.
+        if ruta.tiene_geometria():
+            self.coordenadas_origen = list(ruta.origen_coords)
+            self.actualizar_mapa()
+        elif ruta.origen:
             self.buscar_origen()
     
     def limpiar_formulario(self):
@@ -392,6 +499,7 @@ class RutasController(QWidget, Ui_RutasWidget):
         self.leDestino.clear()
         self.listParadas.clear()
         self.coordenadas_origen = None
+        self.texto_origen_buscado = None
         self.lista_paradas = []
         self.dtFecha.setDate(QDate.currentDate())
         self.teHoraInicio.setTime(QTime(8, 0))
@@ -409,6 +517,23 @@ class RutasController(QWidget, Ui_RutasWidget):
         else:
             self.guardar_ruta_nueva()
     
+    def ejecutar_guardado(self, funcion, al_terminar):
+        """
+        Lanza un guardado en segundo plano con el botón desactivado
+        (evita guardar dos veces mientras se calculan los tramos).
+        """
+        self.btnGuardarRuta.setEnabled(False)
+        
+        def terminar(resultado):
+            self.btnGuardarRuta.setEnabled(True)
+            al_terminar(resultado)
+        
+        def fallar(error):
+            self.btnGuardarRuta.setEnabled(True)
+            QMessageBox.critical(self, "Error", f"Error: {error}")
+        
+        self.guardados.ejecutar(funcion, terminar, fallar, clave="guardar")
+    
     def guardar_ruta_nueva(self):
         """Guarda una nueva ruta"""
         # Obtener datos del formulario
@@ -420,7 +545,8 @@ class RutasController(QWidget, Ui_RutasWidget):
         
         # VALIDAR PRIMERO
         valido, mensaje_error = self.service.validar_ruta(
-            nombre, origen, self.lista_paradas, fecha, hora_inicio, hora_fin
+            nombre, origen, self.coordenadas_origen, self.lista_paradas,
+            fecha, hora_inicio, hora_fin
         )
         
         if not valido:
@@ -440,17 +566,25 @@ class RutasController(QWidget, Ui_RutasWidget):
             hora_fin_prevista=hora_fin,
             id_gestor=id_gestor,
             estado="Pendiente",
-            paradas=self.lista_paradas
+            paradas=[dict(p) for p in self.lista_paradas],
+            origen_coords=self.coordenadas_origen
         )
         
-        # Guardar usando el servicio
-        exito, ruta_creada, mensaje = self.service.crear_ruta(nueva_ruta)
+        # Guardar usando el servicio (calcula la duración: en segundo plano)
+        self.ejecutar_guardado(
+            lambda: self.service.crear_ruta(nueva_ruta),
+            self.cuando_termine_crear
+        )
+    
+    def cuando_termine_crear(self, resultado):
+        """Resultado de crear_ruta (thread de la UI)"""
+        exito, ruta_creada, mensaje = resultado
         
         if exito:
             QMessageBox.information(
                 self,
                 "Guardado",
-                f"Ruta '{nombre}' creada correctamente."
+                f"Ruta '{ruta_creada.nombre}' creada correctamente."
             )
             
             # Agregar a tabla
@@ -478,7 +612,8 @@ class RutasController(QWidget, Ui_RutasWidget):
         
         # VALIDAR PRIMERO
         valido, mensaje_error = self.service.validar_ruta(
-            nombre, origen, self.lista_paradas, fecha, hora_inicio, hora_fin
+            nombre, origen, self.coordenadas_origen, self.lista_paradas,
+            fecha, hora_inicio, hora_fin
         )
         
         if not valido:
@@ -502,25 +637,32 @@ class RutasController(QWidget, Ui_RutasWidget):
             hora_fin_prevista=hora_fin,
             id_gestor=id_gestor,
             estado=estado,
-            paradas=self.lista_paradas
+            paradas=[dict(p) for p in self.lista_paradas],
+            origen_coords=self.coordenadas_origen
         )
         
-        # Actualizar usando el servicio
-        exito, mensaje = self.service.actualizar_ruta(ruta_actualizada)
+        # Actualizar usando el servicio (calcula la duración: en segundo plano)
+        self.ejecutar_guardado(
+            lambda: self.service.actualizar_ruta(ruta_actualizada),
+            lambda resultado: self.cuando_termine_actualizar(ruta_actualizada, resultado)
+        )
+    
+    def cuando_termine_actualizar(self, ruta_actualizada, resultado):
+        """Resultado de actualizar_ruta (thread de la UI)"""
+        exito, mensaje = resultado
         
         if exito:
             QMessageBox.information(
                 self,
                 "Actualizado",
-                f"Ruta '{nombre}' actualizada correctamente."
+                f"Ruta '{ruta_actualizada.nombre}' actualizada correctamente."
             )
             
             # Actualizar tabla
-            fila = self.lista_rutas.index(self.ruta_en_edicion)
-            self.actualizar_en_tabla(fila, ruta_actualizada)
+            self.actualizar_en_tabla(ruta_actualizada)
             
             # Emitir señal
-            self.ruta_actualizada.emit(id_ruta)
+            self.ruta_actualizada.emit(ruta_actualizada.id_ruta)
             
             # Volver a modo creación
             self.modo_crear_nueva()
@@ -533,29 +675,18 @@ class RutasController(QWidget, Ui_RutasWidget):
     
     def editar_ruta_seleccionada(self):
         """Carga la ruta seleccionada en el formulario para editarla"""
-        if not hasattr(self, 'tablaRutas'):
+        ruta = self.obtener_seleccionada()
+        if not ruta:
             return
         
-        fila = self.tablaRutas.currentRow()
-        if fila < 0:
-            QMessageBox.warning(self, "Aviso", "Selecciona una ruta de la tabla.")
-            return
-        
-        ruta = self.lista_rutas[fila]
         self.modo_editar(ruta)
     
     def eliminar_ruta_seleccionada(self):
         """Elimina la ruta seleccionada"""
-        if not hasattr(self, 'tablaRutas'):
+        ruta = self.obtener_seleccionada()
+        if not ruta:
             return
         
-        fila = self.tablaRutas.currentRow()
-        if fila < 0:
-            QMessageBox.warning(self, "Aviso", "Selecciona una ruta de la tabla.")
-            return
-        
-        ruta = self.lista_rutas[fila]
-        
         respuesta = QMessageBox.question(
             self,
             "Confirmar",
@@ -2,7 +2,7 @@ from PySide6.QtWidgets import QApplication
 from PySide6.QtWidgets import QDialog, QMessageBox
 from app.views.SettingsDialog_ui import Ui_SettingsDialog 
 from app.styles.style_manager import StyleManager
-from geopy.geocoders import Nominatim
+from app.utils.geocoding_utils import GeocodingUtils
 
 class SettingsController(QDialog, Ui_SettingsDialog):
     def __init__(self, parent=None, app_state=None):
@@ -11,8 +11,8 @@ class SettingsController(QDialog, Ui_SettingsDialog):
         self.app_state = app_state
         self.nuevos_datos = None
 
-        # Inicializar geolocalizador (necesita un user_agent único)
-        self.geolocator = Nominatim(user_agent="fleetsmart_app")
+        # Geolocalizador configurado (Nominatim, nomenclátor local...)
+        self.geolocator = GeocodingUtils.backend()
 
         # Cargar valores actuales
         if self.app_state:
@@ -46,8 +46,8 @@ class SettingsController(QDialog, Ui_SettingsDialog):
         coords = None
         if direccion:
             try:
-                # Intentamos geocodificar
-                location = self.geolocator.geocode(direccion)
+                # Intentamos geocodificar (primero en la caché local)
+                location = GeocodingUtils.geocodificar(self.geolocator, direccion)
                 if location:
                     coords = [location.latitude, location.longitude]
                 else:
@@ -1,11 +1,14 @@
 
-from PySide6.QtWidgets import QWidget, QTableWidgetItem, QMessageBox, QHeaderView
-from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QWidget, QMessageBox, QHeaderView
+from PySide6.QtCore import Signal, Qt
 
 from app.views.VehiculosWidget_ui import Ui_VehiculosWidget
 from app.controllers.VehiculoDialogController import VehiculoDialogController
 from app.services.vehiculos_service import VehiculosService
 from app.utils.language_utils import LanguageService
+from app.utils.table_models import DataclassTableModel, FiltroTablaProxy, clave_fecha
+from app.utils.workers import GestorTareas
+
 class VehiclesController(QWidget, Ui_VehiculosWidget):
     
     # ========== SEÑALES ==========
@@ -14,6 +17,16 @@ class VehiclesController(QWidget, Ui_VehiculosWidget):
     vehiculo_eliminado = Signal(str)
     vehiculo_estado_cambiado = Signal(str, str)
     
+    # Columnas: (cabecera, atributo de Vehiculo[, clave de ordenación])
+    COLUMNAS = [
+        ("Matrícula", "matricula"),
+        ("Marca", "marca"),
+        ("Modelo", "modelo"),
+        ("Estado", "estado"),
+        ("Año", "ano"),
+        ("Próxima ITV", "proxima_itv", lambda v: clave_fecha(v.proxima_itv)),
+    ]
+    
     def __init__(self, db_connection=None, app_state=None):
         super().__init__()
         self.setupUi(self)
@@ -26,6 +39,14 @@ class VehiclesController(QWidget, Ui_VehiculosWidget):
         self.lista_vehiculos = []
         self.cache_vehiculos = {}
         
+        # Modelo en memoria + proxy de orden (sin QTableWidgetItem por celda)
+        self.modelo = DataclassTableModel(self.COLUMNAS, "id_vehiculo", parent=self)
+        self.proxy = FiltroTablaProxy(self)
+        self.proxy.setSourceModel(self.modelo)
+        
+        # Lecturas en segundo plano (se cancelan al salir de la página)
+        self.tareas = GestorTareas(self, al_reanudar=self.cargar_tabla)
+        
         # Configuración inicial
         self.configurar_tabla()
         self.cargar_tabla()
@@ -36,7 +57,10 @@ class VehiclesController(QWidget, Ui_VehiculosWidget):
     # =========================================================================
     
     def configurar_tabla(self):
-        """Configura el estilo de la tabla"""
+        """Configura el modelo y el estilo de la tabla"""
+        self.tablaVehiculos.setModel(self.proxy)
+        self.tablaVehiculos.setSortingEnabled(True)
+        self.tablaVehiculos.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.tablaVehiculos.horizontalHeader().setStretchLastSection(False)
         self.tablaVehiculos.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
     
@@ -59,82 +83,59 @@ class VehiclesController(QWidget, Ui_VehiculosWidget):
         self.btnBorrar.setText(LanguageService.get_text("delete", idioma))
         
         # Traducir cabeceras de la tabla
-        claves_columnas = {
-            0: "license_plate",
-            1: "brand",
-            2: "model",
-            3: "status",
-            4: "year",
-            5: "ITV"
-        }
-        
-        for col, clave in claves_columnas.items():
-            texto = LanguageService.get_text(clave, idioma)
-            item = self.tablaVehiculos.horizontalHeaderItem(col)
-            if item:
-                item.setText(texto)
+        claves_columnas = ["license_plate", "brand", "model", "status", "year", "ITV"]
+        self.modelo.set_cabeceras([
+            LanguageService.get_text(clave, idioma) for clave in claves_columnas
+        ])
     
     # =========================================================================
     # GESTIÓN DE TABLA
     # =========================================================================
     
     def cargar_tabla(self):
-        """Carga todos los vehículos desde el servicio"""
-        # Obtener datos del servicio
-        self.lista_vehiculos = self.service.obtener_todos()
+        """Carga todos los vehículos desde el servicio (en segundo plano)"""
+        self.tareas.ejecutar(self.service.obtener_todos, self.mostrar_datos, clave="cargar")
+    
+    def mostrar_datos(self, lista):
+        """Recibe el resultado de la carga (thread de la UI)"""
+        self.lista_vehiculos = lista
         self.cache_vehiculos = {v.id_vehiculo: v for v in self.lista_vehiculos}
         
-        # Limpiar tabla
-        self.tablaVehiculos.setRowCount(0)
-        
-        # Llenar tabla
-        for i, vehiculo in enumerate(self.lista_vehiculos):
-            self.tablaVehiculos.insertRow(i)
-            self.llenar_fila(i, vehiculo)
-    
-    def llenar_fila(self, fila, vehiculo):
-        """Llena una fila de la tabla con datos de un vehículo"""
-        self.tablaVehiculos.setItem(fila, 0, QTableWidgetItem(vehiculo.matricula))
-        self.tablaVehiculos.setItem(fila, 1, QTableWidgetItem(vehiculo.marca))
-        self.tablaVehiculos.setItem(fila, 2, QTableWidgetItem(vehiculo.modelo))
-        self.tablaVehiculos.setItem(fila, 3, QTableWidgetItem(vehiculo.estado))
-        self.tablaVehiculos.setItem(fila, 4, QTableWidgetItem(str(vehiculo.ano)))
-        self.tablaVehiculos.setItem(fila, 5, QTableWidgetItem(str(vehiculo.proxima_itv)))
+        # Un único reset del modelo; la vista solo pide las celdas visibles
+        self.modelo.set_items(self.lista_vehiculos)
     
     def agregar_a_tabla(self, vehiculo):
         """Agrega un vehículo a la tabla sin recargar todo"""
         self.lista_vehiculos.append(vehiculo)
         self.cache_vehiculos[vehiculo.id_vehiculo] = vehiculo
+        self.modelo.agregar(vehiculo)
         
-        nueva_fila = self.tablaVehiculos.rowCount()
-        self.tablaVehiculos.insertRow(nueva_fila)
-        self.llenar_fila(nueva_fila, vehiculo)
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
-    def actualizar_en_tabla(self, fila, vehiculo):
-        """Actualiza una fila específica"""
-        self.lista_vehiculos[fila] = vehiculo
+    def actualizar_en_tabla(self, vehiculo):
+        """Actualiza la fila de un vehículo"""
+        for i, v in enumerate(self.lista_vehiculos):
+            if v.id_vehiculo == vehiculo.id_vehiculo:
+                self.lista_vehiculos[i] = vehiculo
+                break
+        
         self.cache_vehiculos[vehiculo.id_vehiculo] = vehiculo
-        self.llenar_fila(fila, vehiculo)
+        self.modelo.actualizar(vehiculo)
+        
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
     def eliminar_de_tabla(self, id_vehiculo):
         """Elimina un vehículo de la tabla"""
-        # Buscar fila
-        fila = None
-        for i, vehiculo in enumerate(self.lista_vehiculos):
-            if vehiculo.id_vehiculo == id_vehiculo:
-                fila = i
-                break
-        
-        if fila is None:
-            return
+        self.lista_vehiculos = [
+            v for v in self.lista_vehiculos if v.id_vehiculo != id_vehiculo
+        ]
+        self.cache_vehiculos.pop(id_vehiculo, None)
+        self.modelo.eliminar(id_vehiculo)
         
-        # Eliminar de lista y caché
-        del self.lista_vehiculos[fila]
-        if id_vehiculo in self.cache_vehiculos:
-            del self.cache_vehiculos[id_vehiculo]
-        
-        # Eliminar fila de tabla
-        self.tablaVehiculos.removeRow(fila)
+        # Si la carga sigue en curso pudo leer antes de este cambio
+        self.tareas.repetir("cargar")
     
     # =========================================================================
     # OBTENER SELECCIÓN
@@ -142,13 +143,13 @@ class VehiclesController(QWidget, Ui_VehiculosWidget):
     
     def obtener_seleccionado(self):
         """Devuelve el vehículo seleccionado o None"""
-        fila = self.tablaVehiculos.currentRow()
+        fila = self.tablaVehiculos.currentIndex().row()
         
         if fila == -1:
             QMessageBox.warning(self, "Aviso", "Selecciona un vehículo de la tabla.")
             return None
         
-        return self.lista_vehiculos[fila]
+        return self.proxy.objeto_en(fila)
     
     # =========================================================================
     # CREAR VEHÍCULO
@@ -195,7 +196,6 @@ class VehiclesController(QWidget, Ui_VehiculosWidget):
         if not vehiculo:
             return
         
-        fila_actual = self.tablaVehiculos.currentRow()
         estado_anterior = vehiculo.estado
         
         # 2. Abrir diálogo
@@ -217,7 +217,7 @@ class VehiclesController(QWidget, Ui_VehiculosWidget):
         # 5. Manejar resultado
         if exito:
             # Actualizar tabla
-            self.actualizar_en_tabla(fila_actual, vehiculo_editado)
+            self.actualizar_en_tabla(vehiculo_editado)
             
             # Emitir señales
             self.vehiculo_actualizado.emit(vehiculo_editado.id_vehiculo)
@@ -283,12 +283,7 @@ class VehiclesController(QWidget, Ui_VehiculosWidget):
             
             if vehiculo.estado != nuevo_estado:
                 vehiculo.estado = nuevo_estado
-                
-                # Buscar y actualizar fila
-                for i, v in enumerate(self.lista_vehiculos):
-                    if v.id_vehiculo == id_vehiculo:
-                        self.llenar_fila(i, vehiculo)
-                        break
+                self.modelo.actualizar(vehiculo)
     
     def recargar_vehiculo_especifico(self, id_vehiculo):
         """Recarga un vehículo específico desde Firebase"""
@@ -296,8 +291,5 @@ class VehiclesController(QWidget, Ui_VehiculosWidget):
         if not vehiculo_actualizado:
             return
         
-        # Buscar y actualizar fila
-        for i, v in enumerate(self.lista_vehiculos):
-            if v.id_vehiculo == id_vehiculo:
-                self.actualizar_en_tabla(i, vehiculo_actualizado)
-                break
\ No newline at end of file
+        if id_vehiculo in self.cache_vehiculos:
+            self.actualizar_en_tabla(vehiculo_actualizado)
\ No newline at end of file
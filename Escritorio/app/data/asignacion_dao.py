@@ -1,10 +1,33 @@
-class AsignacionDAO:
+from app.data.base_dao import BaseDAO
+
+
+class AsignacionDAO(BaseDAO):
     def __init__(self, db_connection):
-        self.db = db_connection
+        super().__init__(db_connection)
         self.collection_name = "asignaciones"
 
     def insertar(self, data):
-        return self.db.child(self.collection_name).push(data)
+        return self._insertar(data)
 
     def leer_todos(self):
-        return self.db.child(self.collection_name).get()
\ No newline at end of file
+        return self._leer_coleccion()
+
+    def eliminar(self, id_asignacion):
+        return self._eliminar(id_asignacion)
+
+    def insertar_lote(self, nuevas, ids_a_eliminar=None):
+        """
+        Inserta muchas asignaciones (y borra otras) en una sola escritura atómica.
+
+        Args:
+            nuevas: {id_asignacion: dict} con IDs ya generados (generar_id)
+            ids_a_eliminar: IDs de asignaciones a borrar en la misma operación
+        """
+        actualizaciones = {
+            f"{self.collection_name}/{id_asignacion}": datos
+            for id_asignacion, datos in nuevas.items()
+        }
+        for id_asignacion in ids_a_eliminar or []:
+            actualizaciones[f"{self.collection_name}/{id_asignacion}"] = None
+
+        return self._actualizar_multiruta(actualizaciones)
@@ -0,0 +1,236 @@
+import random
+import threading
+import time
+
+from app.data.consulta_dao import ConsultaDAO
+from app.data.firebase_cache import firebase_cache, RespuestaLocal
+from app.data.replica_local import replica_local
+
+
+class GeneradorIds:
+    """
+    IDs de Firebase (push ids) ordenados por creación, compartidos por
+    todos los DAOs.
+
+    8 caracteres de tiempo (ms) + 12 aleatorios. Si dos IDs caen en el
+    mismo milisegundo, el segundo es el primero + 1 (con acarreo), así que
+    siguen en orden. pyrebase guarda ese estado en cada Database y BaseDAO
+    crea uno por acceso (ver db); además su incremento no acarrea.
+    """
+
+    CARACTERES = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ultimo_ms = 0
+        self._aleatorios = []
+
+    def generar(self):
+        with self._lock:
+            ahora = int(time.time() * 1000)
+            # Reloj hacia atrás: se sigue en el último milisegundo
+            if ahora <= self._ultimo_ms and self._aleatorios:
+                ahora = self._ultimo_ms
+                i = 11
+                while i >= 0 and self._aleatorios[i] == 63:
+                    self._aleatorios[i] = 0
+                    i -= 1
+                if i < 0:
+                    # 64^12 IDs en el mismo milisegundo: pasar al siguiente
+                    ahora += 1
+                    self._aleatorios = [random.randrange(64) for _ in range(12)]
+                else:
+                    self._aleatorios[i] += 1
+            else:
+                self._aleatorios = [random.randrange(64) for _ in range(12)]
+            self._ultimo_ms = ahora
+
+            tiempo = []
+            for _ in range(8):
+                tiempo.append(self.CARACTERES[ahora % 64])
+                ahora //= 64
+            return "".join(reversed(tiempo)) + "".join(self.CARACTERES[c] for c in self._aleatorios)
+
+
+generador_ids = GeneradorIds()
+
+
+class BaseDAO:
+    """
+    Base común de los DAOs de colecciones de Firebase (pyrebase).
+
+    - Si la réplica local está sincronizada, las lecturas salen de ella.
+    - Si no, la colección completa pasa por la caché compartida (TTL).
+    - Las escrituras (insertar/actualizar/eliminar) invalidan la caché y
+      se aplican también sobre la réplica.
+    - Cada acceso a self.db devuelve un handle nuevo (ver db), así que un
+      mismo DAO se puede usar a la vez desde varios threads.
+
+    Las subclases solo tienen que fijar collection_name.
+    """
+
+    collection_name = None
+
+    def __init__(self, db_connection):
+        self._conexion = db_connection
+
+    @property
+    def db(self):
+        """
+        Handle de pyrebase para una operación.
+
+        pyrebase guarda la ruta de child() y los filtros de la consulta en
+        el propio objeto Database, así que compartir uno entre threads
+        mezcla las rutas. Se crea uno nuevo por acceso; comparte la sesión
+        HTTP (y su pool de conexiones) con la conexión original.
+        """
+        conexion = self._conexion
+        if conexion is None:
+            return None
+        return type(conexion)(
+            conexion.credentials,
+            conexion.api_key,
+            conexion.database_url,
+            conexion.requests
+        )
+
+    # =========================================================================
+    # LECTURAS
+    # =========================================================================
+
+    def _leer_coleccion(self):
+        """
+        Devuelve la colección completa (respuesta con .each()/.val()).
+        Usa la réplica o la caché si están disponibles; si no, descarga.
+        """
+        datos = replica_local.obtener(self.collection_name)
+        if datos is not None:
+            return RespuestaLocal(datos, self.collection_name)
+        
+        acierto, datos = firebase_cache.obtener(self.collection_name)
+        if acierto:
+            return RespuestaLocal(datos, self.collection_name)
+
+        version = firebase_cache.version(self.collection_name)
+        respuesta = self.db.child(self.collection_name).get()
+        firebase_cache.guardar(self.collection_name, respuesta.val(), version)
+
+        return respuesta
+
+    def _leer_por_id(self, id_elemento):
+        """
+        Devuelve un elemento (respuesta con .val()).
+        Si la colección está en réplica o caché se responde sin ir a la red.
+        """
+        sincronizada, datos = replica_local.obtener_uno(self.collection_name, id_elemento)
+        if sincronizada:
+            return RespuestaLocal(datos, id_elemento)
+        
+        acierto, datos = firebase_cache.obtener(self.collection_name)
+        if acierto:
+            return RespuestaLocal(datos.get(id_elemento), id_elemento)
+
+        return self.db.child(self.collection_name).child(id_elemento).get()
+
+    def consulta(self):
+        """
+        Devuelve un builder de consultas filtradas sobre la colección.
+
+        Ejemplo: self.consulta().order_by_child("estado").equal_to("Pendiente").get()
+        """
+        return ConsultaDAO(self)
+
+    def _leer_por_campo(self, campo, valor, por_defecto=None):
+        """
+        Elementos cuyo hijo `campo` es igual a `valor` (consulta indexada).
+
+        Args:
+            por_defecto: Valor que el modelo asigna cuando falta el campo
+                         (from_dict). Si coincide con `valor`, se añaden
+                         también los elementos sin el campo, que equalTo
+                         no devuelve.
+        """
+        respuesta = self.consulta().order_by_child(campo).equal_to(valor).get()
+        if por_defecto is None or valor != por_defecto:
+            return respuesta
+
+        datos = dict(respuesta.val() or {})
+        datos.update(self._leer_sin_campo(campo))
+        return RespuestaLocal(datos, self.collection_name)
+
+    def _leer_sin_campo(self, campo):
+        """
+        Elementos que no tienen el hijo `campo` (también consulta indexada:
+        null ordena antes que false, así que basta con endAt(false)).
+
+        Returns:
+            dict {id: datos}
+        """
+        respuesta = self.consulta().order_by_child(campo).end_at(False).get()
+        return {
+            clave: datos for clave, datos in (respuesta.val() or {}).items()
+            if not isinstance(datos, dict) or datos.get(campo) is None
+        }
+
+    # =========================================================================
+    # ESCRITURAS (siempre invalidan la caché)
+    # =========================================================================
+
+    def _insertar(self, datos):
+        try:
+            resultado = self.db.child(self.collection_name).push(datos)
+            replica_local.aplicar_local(self.collection_name, "put", resultado['name'], datos)
+            return resultado
+        finally:
+            self.invalidar_cache()
+
+    def _insertar_con_id(self, id_elemento, datos):
+        try:
+            resultado = self.db.child(self.collection_name).child(id_elemento).set(datos)
+            replica_local.aplicar_local(self.collection_name, "put", id_elemento, datos)
+            return resultado
+        finally:
+            self.invalidar_cache()
+
+    def _actualizar(self, id_elemento, datos):
+        try:
+            resultado = self.db.child(self.collection_name).child(id_elemento).update(datos)
+            replica_local.aplicar_local(self.collection_name, "patch", id_elemento, datos)
+            return resultado
+        finally:
+            self.invalidar_cache()
+
+    def _eliminar(self, id_elemento):
+        try:
+            resultado = self.db.child(self.collection_name).child(id_elemento).remove()
+            replica_local.aplicar_local(self.collection_name, "put", id_elemento, None)
+            return resultado
+        finally:
+            self.invalidar_cache()
+
+    def _actualizar_multiruta(self, actualizaciones):
+        """
+        Escritura atómica en varias rutas a la vez (update en la raíz).
+        Firebase aplica todas o ninguna.
+
+        Args:
+            actualizaciones: {"coleccion/id[/campo]": valor} (None = borrar)
+        """
+        colecciones = {ruta.split("/")[0] for ruta in actualizaciones}
+        try:
+            resultado = self.db.update(actualizaciones)
+            for ruta, valor in actualizaciones.items():
+                coleccion, _, resto = ruta.partition("/")
+                replica_local.aplicar_local(coleccion, "put", resto, valor)
+            return resultado
+        finally:
+            for coleccion in colecciones:
+                firebase_cache.invalidar(coleccion)
+
+    def generar_id(self):
+        """Genera un ID de Firebase (push id) sin escribir nada, en orden de creación"""
+        return generador_ids.generar()
+
+    def invalidar_cache(self):
+        """Fuerza que la próxima lectura vaya a Firebase"""
+        firebase_cache.invalidar(self.collection_name)
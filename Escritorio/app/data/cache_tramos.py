@@ -0,0 +1,162 @@
+"""
+CacheTramos - Caché persistente de tramos calculados por carretera (SQLite)
+
+Las rutas repiten casi siempre los mismos tramos (almacén -> cliente
+habitual), y un A* sobre el grafo viario cuesta bastante más que leer una
+fila. Se guarda por tramo: metros, segundos y la geometría del camino.
+
+- Clave: versión del grafo + coordenadas de los dos extremos redondeadas a
+  5 decimales (~1 m). Al reimportar el grafo las entradas viejas dejan de
+  coincidir y acaban saliendo por LRU.
+- La geometría se guarda como float32 comprimido con zlib.
+- LRU: si se supera MAX_ENTRADAS se borran los menos usados.
+- Thread-safe.
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+
+class CacheTramos:
+    """
+    Caché (origen, destino) -> (metros, segundos, geometría).
+
+    Args:
+        ruta: Fichero SQLite (por defecto app/config/tramos_cache.db)
+    """
+
+    MAX_ENTRADAS = 20000
+    DECIMALES = 5
+
+    def __init__(self, ruta=None):
+        if ruta is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            ruta = os.path.join(base_dir, "config", "tramos_cache.db")
+        self.ruta = ruta
+        self._conexion = None
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # CONEXIÓN
+    # =========================================================================
+
+    def _conectar(self):
+        """Abre la base de datos (la primera vez) y crea la tabla"""
+        if self._conexion is not None:
+            return self._conexion
+
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        conexion = sqlite3.connect(self.ruta, timeout=5, check_same_thread=False)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("""
+            CREATE TABLE IF NOT EXISTS tramos (
+                clave TEXT PRIMARY KEY,
+                metros REAL,
+                segundos REAL,
+                geometria BLOB,
+                ultimo_uso REAL NOT NULL
+            )
+        """)
+        conexion.execute("CREATE INDEX IF NOT EXISTS idx_tramos_uso ON tramos (ultimo_uso)")
+        conexion.commit()
+        self._conexion = conexion
+        return conexion
+
+    def cerrar(self):
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+    @staticmethod
+    def clave(version, origen, destino):
+        """Clave de un tramo: versión del grafo y extremos redondeados"""
+        d = CacheTramos.DECIMALES
+        return (f"{version}|{origen[0]:.{d}f},{origen[1]:.{d}f}"
+                f"|{destino[0]:.{d}f},{destino[1]:.{d}f}")
+
+    # =========================================================================
+    # LECTURA / ESCRITURA
+    # =========================================================================
+
+    def obtener(self, version, origen, destino):
+        """
+        Busca un tramo.
+
+        Returns:
+            (True, (metros, segundos, [[lat, lon], ...])) si está
+            (True, None) si está guardado como "sin camino"
+            (False, None) si no está
+        """
+        clave = self.clave(version, origen, destino)
+        try:
+            with self._lock:
+                conexion = self._conectar()
+                fila = conexion.execute(
+                    "SELECT metros, segundos, geometria FROM tramos WHERE clave = ?", (clave,)
+                ).fetchone()
+                if fila is None:
+                    return (False, None)
+                conexion.execute(
+                    "UPDATE tramos SET ultimo_uso = ? WHERE clave = ?", (time.time(), clave)
+                )
+                conexion.commit()
+        except sqlite3.Error as e:
+            print(f"Error leyendo caché de tramos: {e}")
+            return (False, None)
+
+        metros, segundos, geometria = fila
+        if metros is None:
+            return (True, None)
+
+        puntos = np.frombuffer(zlib.decompress(geometria), dtype=np.float32).reshape(-1, 2)
+        return (True, (metros, segundos, puntos.astype(np.float64).tolist()))
+
+    def guardar(self, version, origen, destino, metros=None, segundos=None, geometria=None):
+        """Guarda un tramo (sin metros se guarda como "sin camino")"""
+        clave = self.clave(version, origen, destino)
+        blob = None
+        if metros is not None:
+            blob = zlib.compress(np.asarray(geometria or [], dtype=np.float32).tobytes())
+
+        try:
+            with self._lock:
+                conexion = self._conectar()
+                conexion.execute(
+                    "INSERT OR REPLACE INTO tramos (clave, metros, segundos, geometria, ultimo_uso) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (clave, metros, segundos, blob, time.time())
+                )
+                self._recortar(conexion)
+                conexion.commit()
+        except sqlite3.Error as e:
+            print(f"Error guardando en caché de tramos: {e}")
+
+    def _recortar(self, conexion):
+        """Borra los tramos menos usados si se supera MAX_ENTRADAS"""
+        total = conexion.execute("SELECT COUNT(*) FROM tramos").fetchone()[0]
+        sobrantes = total - self.MAX_ENTRADAS
+        if sobrantes > 0:
+            conexion.execute(
+                "DELETE FROM tramos WHERE clave IN "
+                "(SELECT clave FROM tramos ORDER BY ultimo_uso LIMIT ?)",
+                (sobrantes,)
+            )
+
+    def limpiar(self):
+        """Vacía la caché"""
+        try:
+            with self._lock:
+                conexion = self._conectar()
+                conexion.execute("DELETE FROM tramos")
+                conexion.commit()
+        except sqlite3.Error as e:
+            print(f"Error vaciando caché de tramos: {e}")
+
+
+# Instancia global compartida
+cache_tramos = CacheTramos()
@@ -1,24 +1,30 @@
-class ConductorDAO:
+from app.data.base_dao import BaseDAO
+
+
+class ConductorDAO(BaseDAO):
     def __init__(self, db_connection):
-        self.db = db_connection
+        super().__init__(db_connection)
         self.collection_name = "conductores"
 
     def insertar(self, conductor_dict):
-        return self.db.child(self.collection_name).push(conductor_dict)
+        return self._insertar(conductor_dict)
     
     def insertar_con_id(self, id_conductor, conductor_dict):
         
-        return self.db.child(self.collection_name).child(id_conductor).set(conductor_dict)
+        return self._insertar_con_id(id_conductor, conductor_dict)
     
     def leer_todos(self):
-        return self.db.child(self.collection_name).get()
+        return self._leer_coleccion()
+    
+    def leer_por_estado(self, estado):
+        return self._leer_por_campo("estado", estado)
     
     def leer_por_id(self, id_conductor):
         
-        return self.db.child(self.collection_name).child(id_conductor).get()
+        return self._leer_por_id(id_conductor)
     
     def eliminar(self, id_conductor):
-        return self.db.child(self.collection_name).child(id_conductor).remove()
+        return self._eliminar(id_conductor)
 
     def actualizar(self, id_conductor, datos_dict):
-        return self.db.child(self.collection_name).child(id_conductor).update(datos_dict)
\ No newline at end of file
+        return self._actualizar(id_conductor, datos_dict)
\ No newline at end of file
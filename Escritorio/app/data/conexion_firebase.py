@@ -0,0 +1,133 @@
+"""
+ConexionFirebase - Conexión única a Firebase (pyrebase) para toda la app
+
+Antes cada pantalla/servicio llamaba a pyrebase.initialize_app(), y cada
+llamada crea su propia requests.Session: conexiones TCP/TLS nuevas, un pool
+por instancia y estado de autenticación duplicado.
+
+Aquí hay una sola app de pyrebase con una sesión HTTP compartida:
+- Keep-alive: las conexiones con Firebase se reutilizan entre peticiones.
+- Pool dimensionado para los threads del QThreadPool (lecturas en paralelo).
+- Reintentos con espera exponencial ante errores de red o 5xx (solo en
+  métodos idempotentes; un push (POST) no se repite para no duplicar datos).
+
+Uso:
+    from app.data.conexion_firebase import conexion_firebase
+    db = conexion_firebase.database()
+    auth = conexion_firebase.auth()
+
+La app se crea la primera vez que se pide (no al importar el módulo).
+AppController la inicializa en segundo plano mientras se muestra el login;
+si algo la pide antes de que termine, espera a esa misma inicialización.
+"""
+import threading
+
+from app.config.config import FIREBASE_CONFIG
+
+
+class ConexionFirebase:
+    """
+    Dueña de la app de pyrebase y de su sesión HTTP.
+    """
+
+    # Conexiones abiertas a la vez con el mismo host (>= threads del pool)
+    TAMANO_POOL = 16
+
+    # Reintentos ante fallos transitorios
+    REINTENTOS = 3
+    ESPERA_REINTENTO = 0.3   # segundos, se duplica en cada intento
+    ESTADOS_REINTENTO = (429, 500, 502, 503, 504)
+    METODOS_REINTENTO = frozenset(["GET", "PUT", "PATCH", "DELETE"])
+
+    def __init__(self, config=None):
+        self._config = config or FIREBASE_CONFIG
+        self._firebase = None
+        self._auth = None
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # INICIALIZACIÓN
+    # =========================================================================
+
+    def inicializar(self):
+        """
+        Crea la app de pyrebase si aún no existe (se puede llamar varias veces).
+
+        Returns:
+            True si la conexión está disponible
+        """
+        with self._lock:
+            if self._firebase is not None:
+                return True
+
+            try:
+                # Import diferido: pyrebase carga oauth2client, google-cloud, etc.
+                import pyrebase
+                firebase = pyrebase.initialize_app(self._config)
+                self._configurar_sesion(firebase.requests)
+                self._firebase = firebase
+                self._auth = firebase.auth()
+                print("Pyrebase inicializado correctamente")
+                return True
+            except Exception as e:
+                print(f"Error al inicializar Pyrebase: {e}")
+                return False
+
+    def _configurar_sesion(self, sesion):
+        """Pool con keep-alive y reintentos en la sesión de pyrebase"""
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        reintentos = Retry(
+            total=self.REINTENTOS,
+            connect=self.REINTENTOS,
+            read=self.REINTENTOS,
+            backoff_factor=self.ESPERA_REINTENTO,
+            status_forcelist=self.ESTADOS_REINTENTO,
+            allowed_methods=self.METODOS_REINTENTO,
+            raise_on_status=False
+        )
+        adaptador = HTTPAdapter(
+            pool_connections=self.TAMANO_POOL,
+            pool_maxsize=self.TAMANO_POOL,
+            max_retries=reintentos
+        )
+        for esquema in ("http://", "https://"):
+            sesion.mount(esquema, adaptador)
+        sesion.headers.update({"Connection": "keep-alive"})
+
+    @property
+    def inicializada(self):
+        return self._firebase is not None
+
+    # =========================================================================
+    # HANDLES
+    # =========================================================================
+
+    def database(self):
+        """
+        Handle de Realtime Database sobre la sesión compartida.
+
+        Cada llamada devuelve un objeto nuevo (pyrebase guarda la ruta y los
+        filtros en él), pero todos usan el mismo pool de conexiones.
+        Devuelve None si no se pudo inicializar.
+        """
+        if not self.inicializar():
+            return None
+        return self._firebase.database()
+
+    def auth(self):
+        """Servicio de autenticación compartido (o None si no hay conexión)"""
+        if not self.inicializar():
+            return None
+        return self._auth
+
+    def cerrar(self):
+        """Cierra las conexiones abiertas del pool (al salir de la app)"""
+        with self._lock:
+            if self._firebase is not None:
+                self._firebase.requests.close()
+
+
+# Instancia global compartida
+conexion_firebase = ConexionFirebase()
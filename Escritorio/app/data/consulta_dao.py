@@ -0,0 +1,178 @@
+"""
+ConsultaDAO - Consultas filtradas sobre una colección de Firebase
+
+Permite pedir a Realtime Database solo los elementos que interesan
+(orderByChild / equalTo / startAt / endAt / limitToFirst / limitToLast)
+en lugar de descargar la colección completa y filtrar en Python.
+
+Uso:
+    dao.consulta().order_by_child("estado").equal_to("Pendiente").get()
+
+Orden de resolución:
+1. Réplica local sincronizada o caché vigente: se evalúa en memoria (sin red)
+2. Consulta en el servidor (requiere ".indexOn" en las reglas; los índices
+   están en firebase/database.indexes.json y hay que añadirlos a las reglas
+   del proyecto en Firebase Console)
+3. Si el servidor la rechaza (p. ej. falta el índice), se descarga la
+   colección y se filtra en memoria
+"""
+from app.data.firebase_cache import firebase_cache, RespuestaLocal
+from app.data.replica_local import replica_local
+
+
+class ConsultaDAO:
+    """
+    Builder de consultas con la misma sintaxis que pyrebase.
+    """
+
+    def __init__(self, dao):
+        self.dao = dao
+        self.orden = None        # "$key" o nombre del hijo
+        self.igual_a = None
+        self.desde = None
+        self.hasta = None
+        self.primeros = None
+        self.ultimos = None
+        self._hay_igual = False
+
+    # =========================================================================
+    # CONSTRUCCIÓN
+    # =========================================================================
+
+    def order_by_child(self, campo):
+        self.orden = campo
+        return self
+
+    def order_by_key(self):
+        self.orden = "$key"
+        return self
+
+    def equal_to(self, valor):
+        self.igual_a = valor
+        self._hay_igual = True
+        return self
+
+    def start_at(self, valor):
+        self.desde = valor
+        return self
+
+    def end_at(self, valor):
+        self.hasta = valor
+        return self
+
+    def limit_to_first(self, n):
+        self.primeros = n
+        return self
+
+    def limit_to_last(self, n):
+        self.ultimos = n
+        return self
+
+    # =========================================================================
+    # EJECUCIÓN
+    # =========================================================================
+
+    def get(self):
+        """
+        Ejecuta la consulta.
+
+        Returns:
+            Respuesta con .each()/.val() (pyrebase o RespuestaLocal)
+        """
+        coleccion = self.dao.collection_name
+
+        # 1. En memoria si ya tenemos la colección
+        datos = replica_local.obtener(coleccion)
+        if datos is None:
+            acierto, datos = firebase_cache.obtener(coleccion)
+            if not acierto:
+                datos = None
+
+        if datos is not None:
+            return RespuestaLocal(self.evaluar(datos), coleccion)
+
+        # 2. En el servidor
+        try:
+            return self._aplicar_a(self.dao.db.child(coleccion)).get()
+        except Exception as e:
+            print(f"Consulta en servidor no disponible para '{coleccion}' ({e}). "
+                  "Filtrando en local.")
+
+        # 3. Respaldo: colección completa y filtro en memoria
+        respuesta = self.dao._leer_coleccion()
+        return RespuestaLocal(self.evaluar(respuesta.val() or {}), coleccion)
+
+    def _aplicar_a(self, referencia):
+        """Traslada los filtros a una referencia de pyrebase"""
+        if self.orden == "$key":
+            referencia = referencia.order_by_key()
+        elif self.orden:
+            referencia = referencia.order_by_child(self.orden)
+
+        if self._hay_igual:
+            referencia = referencia.equal_to(self.igual_a)
+        if self.desde is not None:
+            referencia = referencia.start_at(self.desde)
+        if self.hasta is not None:
+            referencia = referencia.end_at(self.hasta)
+        if self.primeros is not None:
+            referencia = referencia.limit_to_first(self.primeros)
+        if self.ultimos is not None:
+            referencia = referencia.limit_to_last(self.ultimos)
+
+        return referencia
+
+    def evaluar(self, datos):
+        """
+        Evalúa la consulta en memoria con las reglas de Realtime Database.
+
+        Args:
+            datos: dict {id: datos}
+
+        Returns:
+            dict ordenado {id: datos} con el resultado
+        """
+        elementos = list((datos or {}).items())
+
+        if self.orden:
+            elementos.sort(key=lambda item: (self._clave_orden(self._valor(item)), item[0]))
+
+        if self._hay_igual:
+            elementos = [e for e in elementos if self._valor(e) == self.igual_a]
+        if self.desde is not None:
+            inicio = self._clave_orden(self.desde)
+            elementos = [e for e in elementos if self._clave_orden(self._valor(e)) >= inicio]
+        if self.hasta is not None:
+            fin = self._clave_orden(self.hasta)
+            elementos = [e for e in elementos if self._clave_orden(self._valor(e)) <= fin]
+
+        if self.primeros is not None:
+            elementos = elementos[:self.primeros]
+        if self.ultimos is not None:
+            elementos = elementos[-self.ultimos:] if self.ultimos else []
+
+        return dict(elementos)
+
+    def _valor(self, item):
+        """Valor por el que se ordena un elemento"""
+        clave, datos = item
+        if self.orden == "$key":
+            return clave
+        if isinstance(datos, dict):
+            return datos.get(self.orden)
+        return None
+
+    @staticmethod
+    def _clave_orden(valor):
+        """
+        Orden de tipos de Firebase: null < false < true < números < textos < objetos
+        """
+        if valor is None:
+            return (0, 0)
+        if isinstance(valor, bool):
+            return (1, int(valor))
+        if isinstance(valor, (int, float)):
+            return (2, valor)
+        if isinstance(valor, str):
+            return (3, valor)
+        return (4, 0)
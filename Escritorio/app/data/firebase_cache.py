@@ -0,0 +1,195 @@
+"""
+FirebaseCache - Caché local de colecciones de Firebase
+
+Guarda en memoria el contenido de cada colección descargada con leer_todos()
+durante un tiempo (TTL) configurable por colección. Cualquier escritura
+hecha a través de los DAOs invalida la colección afectada, así que lo que
+se lee después de guardar siempre viene de la nube.
+
+Las respuestas se devuelven con la misma interfaz que pyrebase
+(.each(), .val(), .key()), por lo que los repositorios no cambian.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class ItemLocal:
+    """Equivalente a un Pyre de pyrebase (un hijo de la colección)"""
+
+    def __init__(self, clave, valor):
+        self.item = (clave, valor)
+
+    def key(self):
+        return self.item[0]
+
+    def val(self):
+        return self.item[1]
+
+
+class RespuestaLocal:
+    """
+    Equivalente a PyreResponse de pyrebase construido desde datos en memoria.
+
+    - val(): OrderedDict con los hijos (o None si está vacío)
+    - each(): lista de ItemLocal (o None si está vacío)
+    - key(): nombre del nodo
+    """
+
+    def __init__(self, datos, clave=None):
+        self.datos = datos if datos else None
+        self.clave = clave
+
+    def val(self):
+        return self.datos
+
+    def key(self):
+        return self.clave
+
+    def each(self):
+        if not isinstance(self.datos, dict):
+            return None
+        return [ItemLocal(clave, valor) for clave, valor in self.datos.items()]
+
+
+class FirebaseCache:
+    """
+    Caché compartida por todos los DAOs (thread-safe).
+
+    Por cada colección guarda:
+    - los datos (dict {id: datos}) y el instante en que se descargaron
+    - una versión que aumenta con cada cambio (para índices derivados)
+    - contadores de aciertos y fallos
+    """
+
+    # Segundos que se considera válida cada colección
+    TTL_DEFECTO = 60
+    TTL_COLECCIONES = {
+        "vehiculos": 120,
+        "conductores": 120,
+        "rutas": 60,
+        "asignaciones": 30,
+        "incidencias": 15,
+        "gestores": 300,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos = {}        # {coleccion: (instante, OrderedDict)}
+        self._versiones = {}    # {coleccion: int}
+        self._aciertos = {}     # {coleccion: int}
+        self._fallos = {}       # {coleccion: int}
+
+    # =========================================================================
+    # LECTURA / ESCRITURA
+    # =========================================================================
+
+    def ttl(self, coleccion):
+        """Devuelve el TTL (segundos) de una colección"""
+        return self.TTL_COLECCIONES.get(coleccion, self.TTL_DEFECTO)
+
+    def obtener(self, coleccion):
+        """
+        Devuelve una copia de los datos en caché si siguen vigentes.
+
+        Returns:
+            (True, datos) si hay acierto (datos puede ser {} si está vacía)
+            (False, None) si no está o ha caducado
+        """
+        with self._lock:
+            entrada = self._datos.get(coleccion)
+
+            if entrada and time.monotonic() - entrada[0] < self.ttl(coleccion):
+                self._aciertos[coleccion] = self._aciertos.get(coleccion, 0) + 1
+                datos = entrada[1]
+            else:
+                self._fallos[coleccion] = self._fallos.get(coleccion, 0) + 1
+                return (False, None)
+
+        # Copia fuera del lock: quien lee puede modificar los dicts sin
+        # estropear la caché
+        return (True, copy.deepcopy(datos))
+
+    def guardar(self, coleccion, datos, version_leida):
+        """
+        Guarda los datos descargados de una colección.
+
+        Si mientras se descargaban hubo una escritura (la versión cambió),
+        se descartan para no guardar datos anteriores a esa escritura.
+
+        Args:
+            coleccion: Nombre de la colección
+            datos: dict {id: datos} (o None si está vacía)
+            version_leida: Valor de version() antes de descargar
+        """
+        datos = self._normalizar(datos)
+
+        with self._lock:
+            if self._versiones.get(coleccion, 0) != version_leida:
+                return
+            self._datos[coleccion] = (time.monotonic(), copy.deepcopy(datos))
+
+    def invalidar(self, coleccion=None):
+        """
+        Marca una colección (o todas si es None) como no válida.
+        Se llama después de insertar, actualizar o eliminar.
+        """
+        with self._lock:
+            colecciones = [coleccion] if coleccion else list(self._datos.keys())
+            for nombre in colecciones:
+                self._datos.pop(nombre, None)
+                self._versiones[nombre] = self._versiones.get(nombre, 0) + 1
+
+    def version(self, coleccion):
+        """Versión actual de la colección (cambia con cada invalidación)"""
+        with self._lock:
+            return self._versiones.get(coleccion, 0)
+
+    # =========================================================================
+    # ESTADÍSTICAS
+    # =========================================================================
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores por colección.
+
+        Returns:
+            {coleccion: {'aciertos': int, 'fallos': int, 'en_cache': bool}}
+        """
+        with self._lock:
+            nombres = set(self._aciertos) | set(self._fallos) | set(self._datos)
+            return {
+                nombre: {
+                    'aciertos': self._aciertos.get(nombre, 0),
+                    'fallos': self._fallos.get(nombre, 0),
+                    'en_cache': nombre in self._datos,
+                }
+                for nombre in nombres
+            }
+
+    def reiniciar_estadisticas(self):
+        """Pone a cero los contadores de aciertos y fallos"""
+        with self._lock:
+            self._aciertos = {}
+            self._fallos = {}
+
+    # =========================================================================
+    # AUXILIARES
+    # =========================================================================
+
+    @staticmethod
+    def _normalizar(datos):
+        """Convierte la respuesta de Firebase en un OrderedDict {id: datos}"""
+        if not datos:
+            return OrderedDict()
+        if isinstance(datos, list):
+            # Firebase devuelve lista si las claves son 0, 1, 2...
+            return OrderedDict(
+                (str(i), valor) for i, valor in enumerate(datos) if valor is not None
+            )
+        return OrderedDict(datos)
+
+
+# Instancia global compartida por todos los DAOs
+firebase_cache = FirebaseCache()
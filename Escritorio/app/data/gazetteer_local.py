@@ -0,0 +1,426 @@
+"""
+GazetteerLocal - Geocodificador sin conexión (SQLite + índice de trigramas)
+
+Nomenclátor de direcciones importado de un fichero (CSV de direcciones o
+extracto de OpenStreetMap en GeoJSON). Responde como un geocodificador de
+geopy (geocode() -> Location), así que se puede usar como backend de
+GeocodingUtils en lugar de Nominatim o delante de él.
+
+Búsqueda (sobre la dirección normalizada y sin puntuación):
+1. Coincidencia exacta (índice de la clave)
+2. Prefijo: la dirección escrita es el principio de una conocida
+3. Difusa: índice invertido de trigramas en SQLite. Los candidatos salen
+   de los trigramas MENOS frecuentes de la consulta ("cal", "mad"... están
+   en casi todas las filas y no discriminan); después se puntúan con la
+   similitud de Dice de todos los trigramas y se acepta el mejor si supera
+   SIMILITUD_MINIMA
+
+Formatos de importación:
+- CSV con columnas lat/lon (o latitud/longitud, latitude/longitude) y
+  direccion/address/display_name, o las de OSM addr:street,
+  addr:housenumber, addr:postcode, addr:city
+- GeoJSON (FeatureCollection) con propiedades addr:* o name; para
+  geometrías que no son puntos se usa el centro de sus coordenadas
+
+Una dirección (clave normalizada + coordenadas) se guarda una sola vez:
+reimportar el mismo fichero, o uno que se solape, no duplica filas ni
+infla las frecuencias de los trigramas.
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+
+from geopy.location import Location
+
+from app.data.geocoding_cache import GeocodingCache
+
+
+class GazetteerLocal:
+    """
+    Args:
+        ruta: Fichero SQLite (por defecto app/config/gazetteer.db)
+    """
+
+    # Nombre para mostrar / configuración
+    nombre = "local"
+    # Sin límite de peticiones ni caché: la consulta ya es local
+    peticiones_por_segundo = None
+    usar_cache = False
+
+    SIMILITUD_MINIMA = 0.55
+    LONGITUD_MINIMA_PREFIJO = 8
+    MAX_CANDIDATOS = 50
+    TRIGRAMAS_SELECTIVOS = 6   # Los más raros de la consulta, para buscar candidatos
+    LOTE_IMPORTACION = 5000
+
+    COLUMNAS_LAT = ("lat", "latitud", "latitude", "y")
+    COLUMNAS_LON = ("lon", "lng", "longitud", "longitude", "x")
+    COLUMNAS_DIRECCION = ("direccion", "address", "display_name", "name", "nombre")
+
+    def __init__(self, ruta=None):
+        if ruta is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            ruta = os.path.join(base_dir, "config", "gazetteer.db")
+        self.ruta = ruta
+        self._conexion = None
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # CONEXIÓN
+    # =========================================================================
+
+    def _conectar(self):
+        if self._conexion is not None:
+            return self._conexion
+
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        conexion = sqlite3.connect(self.ruta, timeout=5, check_same_thread=False)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS direcciones (
+                id INTEGER PRIMARY KEY,
+                clave TEXT NOT NULL,
+                direccion TEXT NOT NULL,
+                latitud REAL NOT NULL,
+                longitud REAL NOT NULL,
+                n_trigramas INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_direcciones_clave ON direcciones (clave);
+            CREATE TABLE IF NOT EXISTS trigramas (
+                trigrama TEXT NOT NULL,
+                id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_trigramas ON trigramas (trigrama);
+            CREATE TABLE IF NOT EXISTS frecuencias (
+                trigrama TEXT PRIMARY KEY,
+                n INTEGER NOT NULL
+            );
+        """)
+        self._asegurar_unicidad(conexion)
+        conexion.commit()
+        self._conexion = conexion
+        return conexion
+
+    @staticmethod
+    def _asegurar_unicidad(conexion):
+        """
+        Índice único de (clave, latitud, longitud). Los nomenclátores creados
+        antes de existir pueden tener duplicados de reimportaciones: se
+        quitan y se recuentan las frecuencias antes de crearlo.
+        """
+        existe = conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_direcciones_unica'"
+        ).fetchone()
+        if existe:
+            return
+
+        borradas = conexion.execute("""
+            DELETE FROM direcciones WHERE id NOT IN (
+                SELECT MIN(id) FROM direcciones GROUP BY clave, latitud, longitud
+            )
+        """).rowcount
+        if borradas:
+            conexion.execute("DELETE FROM trigramas WHERE id NOT IN (SELECT id FROM direcciones)")
+            conexion.execute("DELETE FROM frecuencias")
+            conexion.execute(
+                "INSERT INTO frecuencias (trigrama, n) "
+                "SELECT trigrama, COUNT(*) FROM trigramas GROUP BY trigrama"
+            )
+            print(f"Nomenclátor: {borradas} direcciones duplicadas eliminadas")
+
+        conexion.execute(
+            "CREATE UNIQUE INDEX idx_direcciones_unica ON direcciones (clave, latitud, longitud)"
+        )
+
+    def cerrar(self):
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+    def disponible(self):
+        """True si el fichero existe y tiene direcciones"""
+        if not os.path.exists(self.ruta):
+            return False
+        return self.total() > 0
+
+    def total(self):
+        with self._lock:
+            return self._conectar().execute("SELECT COUNT(*) FROM direcciones").fetchone()[0]
+
+    # =========================================================================
+    # TEXTO
+    # =========================================================================
+
+    @staticmethod
+    def normalizar(direccion):
+        """
+        Normalización de la caché de geocodificación sin puntuación:
+        "Calle Mayor, 5, Madrid" y "calle mayor 5 madrid" son la misma clave.
+        """
+        texto = GeocodingCache.normalizar(direccion)
+        return " ".join("".join(c if c.isalnum() else " " for c in texto).split())
+
+    @staticmethod
+    def trigramas(clave):
+        """Conjunto de trigramas de una clave normalizada"""
+        texto = "  " + clave + " "
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    # =========================================================================
+    # BÚSQUEDA (interfaz de geopy)
+    # =========================================================================
+
+    def geocode(self, query, exactly_one=True, **kwargs):
+        """
+        Busca una dirección.
+
+        Returns:
+            Location (raw incluye "similitud") o None si no hay ninguna parecida
+        """
+        clave = self.normalizar(query)
+        if not clave:
+            return None
+
+        with self._lock:
+            conexion = self._conectar()
+
+            # 1. Exacta
+            fila = conexion.execute(
+                "SELECT direccion, latitud, longitud FROM direcciones WHERE clave = ? LIMIT 1",
+                (clave,)
+            ).fetchone()
+            if fila:
+                return self._location(fila, 1.0)
+
+            # 2. Prefijo (la más corta que empieza igual). Solo con textos
+            #    largos: "ca" sería el prefijo de media ciudad
+            if len(clave) >= self.LONGITUD_MINIMA_PREFIJO:
+                fila = conexion.execute(
+                    "SELECT direccion, latitud, longitud FROM direcciones "
+                    "WHERE clave >= ? AND clave < ? ORDER BY length(clave) LIMIT 1",
+                    (clave, clave + "\uffff")
+                ).fetchone()
+                if fila:
+                    return self._location(fila, 0.9)
+
+            # 3. Difusa por trigramas
+            trigramas = self.trigramas(clave)
+            candidatos = self._candidatos(conexion, trigramas)
+
+        mejor = None
+        mejor_similitud = 0.0
+        for clave_candidato, direccion, latitud, longitud in candidatos:
+            otros = self.trigramas(clave_candidato)
+            similitud = 2.0 * len(trigramas & otros) / (len(trigramas) + len(otros))
+            if similitud > mejor_similitud:
+                mejor, mejor_similitud = (direccion, latitud, longitud), similitud
+
+        if mejor and mejor_similitud >= self.SIMILITUD_MINIMA:
+            return self._location(mejor, round(mejor_similitud, 3))
+        return None
+
+    def _candidatos(self, conexion, trigramas):
+        """Filas que comparten más trigramas selectivos con la consulta"""
+        if not trigramas:
+            return []
+
+        marcas = ",".join("?" * len(trigramas))
+        frecuencias = conexion.execute(
+            f"SELECT trigrama, n FROM frecuencias WHERE trigrama IN ({marcas})",
+            tuple(trigramas)
+        ).fetchall()
+        if not frecuencias:
+            return []
+
+        selectivos = [t for t, _ in sorted(frecuencias, key=lambda f: f[1])]
+        selectivos = selectivos[:self.TRIGRAMAS_SELECTIVOS]
+        marcas = ",".join("?" * len(selectivos))
+        return conexion.execute(
+            f"""
+            SELECT d.clave, d.direccion, d.latitud, d.longitud
+            FROM (
+                SELECT id, COUNT(*) AS comunes FROM trigramas
+                WHERE trigrama IN ({marcas})
+                GROUP BY id ORDER BY comunes DESC LIMIT ?
+            ) AS c
+            JOIN direcciones AS d ON d.id = c.id
+            """,
+            (*selectivos, self.MAX_CANDIDATOS)
+        ).fetchall()
+
+    @staticmethod
+    def _location(fila, similitud):
+        direccion, latitud, longitud = fila
+        return Location(direccion, (latitud, longitud),
+                        {"fuente": "local", "similitud": similitud})
+
+    # =========================================================================
+    # IMPORTACIÓN
+    # =========================================================================
+
+    def importar(self, ruta_fichero, vaciar=False):
+        """
+        Importa direcciones desde un CSV o GeoJSON.
+
+        Args:
+            ruta_fichero: .csv, .geojson o .json
+            vaciar: Borrar antes el nomenclátor actual
+
+        Las direcciones que ya estén (misma clave y coordenadas) se saltan.
+
+        Returns:
+            (True, num_importadas) si éxito (solo las nuevas)
+            (False, "mensaje de error") si falla
+        """
+        extension = os.path.splitext(ruta_fichero)[1].lower()
+        if extension == ".csv":
+            registros = self._leer_csv(ruta_fichero)
+        elif extension in (".geojson", ".json"):
+            registros = self._leer_geojson(ruta_fichero)
+        else:
+            return (False, f"Formato no soportado: {extension}")
+
+        try:
+            with self._lock:
+                conexion = self._conectar()
+                if vaciar:
+                    conexion.execute("DELETE FROM trigramas")
+                    conexion.execute("DELETE FROM direcciones")
+                    conexion.execute("DELETE FROM frecuencias")
+
+                siguiente_id = conexion.execute(
+                    "SELECT COALESCE(MAX(id), 0) + 1 FROM direcciones"
+                ).fetchone()[0]
+
+                total = 0
+                trigramas = []
+                cursor = conexion.cursor()
+                for direccion, latitud, longitud in registros:
+                    clave = self.normalizar(direccion)
+                    if not clave:
+                        continue
+                    grupo = self.trigramas(clave)
+                    cursor.execute(
+                        "INSERT OR IGNORE INTO direcciones "
+                        "(id, clave, direccion, latitud, longitud, n_trigramas) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (siguiente_id, clave, direccion, latitud, longitud, len(grupo))
+                    )
+                    # Ya estaba: ni trigramas ni frecuencias
+                    if not cursor.rowcount:
+                        continue
+                    trigramas.extend((t, siguiente_id) for t in grupo)
+                    siguiente_id += 1
+                    total += 1
+
+                    if total % self.LOTE_IMPORTACION == 0:
+                        self._insertar_trigramas(conexion, trigramas)
+                        trigramas = []
+
+                self._insertar_trigramas(conexion, trigramas)
+                conexion.commit()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            if self._conexion is not None:
+                self._conexion.rollback()
+            return (False, f"Error importando '{ruta_fichero}': {e}")
+
+        return (True, total)
+
+    @staticmethod
+    def _insertar_trigramas(conexion, trigramas):
+        """Índice de trigramas y frecuencias de las direcciones recién insertadas"""
+        conexion.executemany("INSERT INTO trigramas (trigrama, id) VALUES (?, ?)", trigramas)
+
+        conteo = {}
+        for trigrama, _ in trigramas:
+            conteo[trigrama] = conteo.get(trigrama, 0) + 1
+        conexion.executemany(
+            "INSERT INTO frecuencias (trigrama, n) VALUES (?, ?) "
+            "ON CONFLICT(trigrama) DO UPDATE SET n = n + excluded.n",
+            conteo.items()
+        )
+
+    def _leer_csv(self, ruta_fichero):
+        with open(ruta_fichero, newline="", encoding="utf-8-sig") as f:
+            lector = csv.DictReader(f)
+            columnas = {c.lower().strip(): c for c in (lector.fieldnames or [])}
+            col_lat = next((columnas[c] for c in self.COLUMNAS_LAT if c in columnas), None)
+            col_lon = next((columnas[c] for c in self.COLUMNAS_LON if c in columnas), None)
+            if not col_lat or not col_lon:
+                raise ValueError("el CSV necesita columnas de latitud y longitud")
+
+            for fila in lector:
+                propiedades = {c.lower().strip(): v for c, v in fila.items() if c}
+                direccion = self._direccion_de(propiedades)
+                try:
+                    latitud = float(fila[col_lat])
+                    longitud = float(fila[col_lon])
+                except (TypeError, ValueError):
+                    continue
+                if direccion:
+                    yield (direccion, latitud, longitud)
+
+    def _leer_geojson(self, ruta_fichero):
+        with open(ruta_fichero, encoding="utf-8") as f:
+            datos = json.load(f)
+
+        for feature in datos.get("features", []):
+            propiedades = {k.lower(): v for k, v in (feature.get("properties") or {}).items()}
+            direccion = self._direccion_de(propiedades)
+            punto = self._centro((feature.get("geometry") or {}).get("coordinates"))
+            if direccion and punto:
+                longitud, latitud = punto
+                yield (direccion, latitud, longitud)
+
+    def _direccion_de(self, propiedades):
+        """Dirección legible a partir de columnas/propiedades"""
+        calle = (propiedades.get("addr:street") or "").strip()
+        if calle:
+            numero = (propiedades.get("addr:housenumber") or "").strip()
+            partes = [f"{calle} {numero}".strip()]
+            for campo in ("addr:postcode", "addr:city"):
+                valor = (propiedades.get(campo) or "").strip()
+                if valor:
+                    partes.append(valor)
+            return ", ".join(partes)
+
+        for columna in self.COLUMNAS_DIRECCION:
+            valor = propiedades.get(columna)
+            if valor and str(valor).strip():
+                return str(valor).strip()
+        return ""
+
+    @staticmethod
+    def _centro(coordenadas):
+        """Punto [lon, lat] o centro de los puntos de cualquier geometría"""
+        if not coordenadas:
+            return None
+        if isinstance(coordenadas[0], (int, float)):
+            return coordenadas[:2]
+
+        puntos = []
+        pila = [coordenadas]
+        while pila:
+            actual = pila.pop()
+            if actual and isinstance(actual[0], (int, float)):
+                puntos.append(actual)
+            else:
+                pila.extend(actual)
+        if not puntos:
+            return None
+        return [sum(p[0] for p in puntos) / len(puntos), sum(p[1] for p in puntos) / len(puntos)]
+
+    def vaciar(self):
+        with self._lock:
+            conexion = self._conectar()
+            conexion.execute("DELETE FROM trigramas")
+            conexion.execute("DELETE FROM direcciones")
+            conexion.execute("DELETE FROM frecuencias")
+            conexion.commit()
+
+
+# Instancia global compartida
+gazetteer_local = GazetteerLocal()
@@ -0,0 +1,189 @@
+"""
+GeocodingCache - Caché persistente de geocodificación (SQLite)
+
+Los gestores usan todo el día las mismas direcciones (almacenes, clientes
+habituales) y cada búsqueda en Nominatim tarda ~1 s y tiene límite de uso.
+Esta caché guarda dirección normalizada -> coordenadas en disco, así que
+sirve entre sesiones.
+
+- Se consulta antes de cualquier petición de red (ver geocoding_utils).
+- TTL: los resultados caducan (las direcciones "no encontradas" antes).
+- LRU: si se supera MAX_ENTRADAS se borran las menos usadas.
+- Thread-safe: se usa desde los threads de geocodificación.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+class GeocodingCache:
+    """
+    Caché dirección -> (latitud, longitud, dirección formateada).
+
+    Args:
+        ruta: Fichero SQLite (por defecto app/config/geocoding_cache.db)
+    """
+
+    MAX_ENTRADAS = 5000
+    TTL_ENCONTRADA = 90 * 24 * 3600      # 90 días
+    TTL_NO_ENCONTRADA = 24 * 3600        # 1 día (puede ser un fallo puntual)
+
+    def __init__(self, ruta=None):
+        if ruta is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            ruta = os.path.join(base_dir, "config", "geocoding_cache.db")
+        self.ruta = ruta
+        self._conexion = None
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # CONEXIÓN
+    # =========================================================================
+
+    def _conectar(self):
+        """Abre la base de datos (la primera vez) y crea la tabla"""
+        if self._conexion is not None:
+            return self._conexion
+
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        conexion = sqlite3.connect(self.ruta, timeout=5, check_same_thread=False)
+        # WAL: varias instancias de la app pueden leer mientras otra escribe
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("""
+            CREATE TABLE IF NOT EXISTS geocoding (
+                clave TEXT PRIMARY KEY,
+                latitud REAL,
+                longitud REAL,
+                direccion TEXT,
+                creado REAL NOT NULL,
+                ultimo_uso REAL NOT NULL
+            )
+        """)
+        conexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_geocoding_uso ON geocoding (ultimo_uso)"
+        )
+        conexion.commit()
+        self._conexion = conexion
+        return conexion
+
+    def cerrar(self):
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+    # =========================================================================
+    # NORMALIZACIÓN
+    # =========================================================================
+
+    @staticmethod
+    def normalizar(direccion):
+        """
+        Clave de caché de una dirección: minúsculas, sin tildes, espacios
+        y comas uniformes ("C/ Mayor ,5  Madrid" == "c/ mayor, 5 madrid").
+        """
+        texto = unicodedata.normalize("NFKD", direccion or "")
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+        texto = texto.lower().strip().rstrip(".")
+        texto = re.sub(r"\s*,\s*", ", ", texto)
+        texto = re.sub(r"\s+", " ", texto)
+        return texto.strip(", ")
+
+    # =========================================================================
+    # LECTURA / ESCRITURA
+    # =========================================================================
+
+    def obtener(self, direccion):
+        """
+        Busca una dirección en la caché.
+
+        Returns:
+            (True, (lat, lon, direccion_formateada)) si está y es válida
+            (True, None) si está guardada como "no encontrada"
+            (False, None) si no está o ha caducado
+        """
+        clave = self.normalizar(direccion)
+        if not clave:
+            return (False, None)
+
+        ahora = time.time()
+        try:
+            with self._lock:
+                conexion = self._conectar()
+                fila = conexion.execute(
+                    "SELECT latitud, longitud, direccion, creado FROM geocoding WHERE clave = ?",
+                    (clave,)
+                ).fetchone()
+                if fila is None:
+                    return (False, None)
+
+                latitud, longitud, formateada, creado = fila
+                ttl = self.TTL_NO_ENCONTRADA if latitud is None else self.TTL_ENCONTRADA
+                if ahora - creado > ttl:
+                    conexion.execute("DELETE FROM geocoding WHERE clave = ?", (clave,))
+                    conexion.commit()
+                    return (False, None)
+
+                conexion.execute(
+                    "UPDATE geocoding SET ultimo_uso = ? WHERE clave = ?", (ahora, clave)
+                )
+                conexion.commit()
+        except sqlite3.Error as e:
+            print(f"Error leyendo caché de geocodificación: {e}")
+            return (False, None)
+
+        if latitud is None:
+            return (True, None)
+        return (True, (latitud, longitud, formateada))
+
+    def guardar(self, direccion, latitud=None, longitud=None, formateada=""):
+        """
+        Guarda el resultado de una geocodificación.
+        Sin coordenadas se guarda como "no encontrada".
+        """
+        clave = self.normalizar(direccion)
+        if not clave:
+            return
+
+        ahora = time.time()
+        try:
+            with self._lock:
+                conexion = self._conectar()
+                conexion.execute(
+                    "INSERT OR REPLACE INTO geocoding "
+                    "(clave, latitud, longitud, direccion, creado, ultimo_uso) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (clave, latitud, longitud, formateada or "", ahora, ahora)
+                )
+                self._recortar(conexion)
+                conexion.commit()
+        except sqlite3.Error as e:
+            print(f"Error guardando en caché de geocodificación: {e}")
+
+    def _recortar(self, conexion):
+        """Borra las entradas menos usadas si se supera MAX_ENTRADAS"""
+        total = conexion.execute("SELECT COUNT(*) FROM geocoding").fetchone()[0]
+        sobrantes = total - self.MAX_ENTRADAS
+        if sobrantes > 0:
+            conexion.execute(
+                "DELETE FROM geocoding WHERE clave IN "
+                "(SELECT clave FROM geocoding ORDER BY ultimo_uso LIMIT ?)",
+                (sobrantes,)
+            )
+
+    def limpiar(self):
+        """Vacía la caché"""
+        try:
+            with self._lock:
+                conexion = self._conectar()
+                conexion.execute("DELETE FROM geocoding")
+                conexion.commit()
+        except sqlite3.Error as e:
+            print(f"Error vaciando caché de geocodificación: {e}")
+
+
+# Instancia global compartida
+geocoding_cache = GeocodingCache()
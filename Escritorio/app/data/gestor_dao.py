@@ -1,44 +1,47 @@
-class GestorDAO:
+from app.data.base_dao import BaseDAO
+
+
+class GestorDAO(BaseDAO):
     
     def __init__(self, db_connection):
         """
         Inicializa el DAO con la conexión a Firebase
         """
-        self.db = db_connection
+        super().__init__(db_connection)
         self.collection_name = "gestores"
 
     def insertar(self, gestor_dict):
         """
         Envía el diccionario del gestor a Firebase
         """
-        return self.db.child(self.collection_name).push(gestor_dict)
+        return self._insertar(gestor_dict)
     
     def insertar_con_id(self, id_gestor, gestor_dict):
         """
         Inserta un gestor con un ID específico (el UID de Firebase Auth).
         """
-        return self.db.child(self.collection_name).child(id_gestor).set(gestor_dict)
+        return self._insertar_con_id(id_gestor, gestor_dict)
     
     def leer_todos(self):
         """
         Descarga todos los gestores de la nube
         """
-        return self.db.child(self.collection_name).get()
+        return self._leer_coleccion()
     
     def leer_por_id(self, id_gestor):
         """
         Obtiene un gestor específico por su ID
         """
-        return self.db.child(self.collection_name).child(id_gestor).get()
+        return self._leer_por_id(id_gestor)
     
     def eliminar(self, id_gestor):
         """
         Borra el nodo del gestor
         """
-        return self.db.child(self.collection_name).child(id_gestor).remove()
+        return self._eliminar(id_gestor)
 
     def actualizar(self, id_gestor, datos_dict):
         """
         Actualiza los datos de un gestor existente
         """
-        return self.db.child(self.collection_name).child(id_gestor).update(datos_dict)
\ No newline at end of file
+        return self._actualizar(id_gestor, datos_dict)
\ No newline at end of file
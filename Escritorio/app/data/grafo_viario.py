@@ -0,0 +1,513 @@
+"""
+GrafoViario - Red de carreteras local para calcular rutas sin servicios externos
+
+El grafo se construye una vez a partir de un extracto de OpenStreetMap
+(importar_grafo_viario.py) y se guarda en app/config/grafo_viario.npz como
+arrays NumPy en formato CSR (compressed sparse row):
+- latitud, longitud (float32): coordenadas de cada nodo
+- indptr (int32, n+1): las aristas que salen del nodo i son
+  indices[indptr[i]:indptr[i+1]]
+- indices (int32): nodo destino de cada arista
+- metros, segundos (float32): longitud y tiempo de cada arista
+
+Ocupa una fracción de lo que ocuparía un grafo de objetos/diccionarios y
+se carga en milisegundos.
+
+Consultas:
+- nodo_mas_cercano: rejilla de celdas de ~1 km ordenadas (searchsorted)
+- ruta_mas_corta: A* sobre el tiempo, con la distancia en línea recta a la
+  velocidad máxima del grafo como heurística (admisible: nunca sobreestima).
+  La heurística se calcula solo para los nodos que entran en la cola, no
+  para todo el grafo en cada consulta
+"""
+import math
+import os
+import threading
+from heapq import heappop, heappush
+
+import numpy as np
+
+
+class GrafoViario:
+    """
+    Grafo de carreteras en arrays CSR.
+
+    Args:
+        ruta: Fichero .npz (por defecto app/config/grafo_viario.npz)
+    """
+
+    # Velocidad por tipo de vía OSM (km/h) si no tiene maxspeed
+    VELOCIDADES_KMH = {
+        'motorway': 110, 'motorway_link': 60,
+        'trunk': 90, 'trunk_link': 50,
+        'primary': 70, 'primary_link': 40,
+        'secondary': 60, 'secondary_link': 40,
+        'tertiary': 50, 'tertiary_link': 30,
+        'unclassified': 40, 'residential': 30,
+        'living_street': 10, 'service': 20, 'road': 40,
+    }
+    # Vías de sentido único aunque no lleven oneway=yes
+    SENTIDO_UNICO_IMPLICITO = ('motorway', 'motorway_link')
+
+    # Rejilla para buscar el nodo más cercano
+    TAMANO_CELDA = 0.01      # grados (~1 km)
+    MAX_ANILLOS = 5          # hasta ~5 km de distancia
+
+    def __init__(self, ruta=None):
+        if ruta is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            ruta = os.path.join(base_dir, "config", "grafo_viario.npz")
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._datos = None
+        self._version = None
+
+    # =========================================================================
+    # CARGA
+    # =========================================================================
+
+    def disponible(self):
+        """True si hay un grafo importado"""
+        return self._cargar() is not None
+
+    @property
+    def version(self):
+        """Identifica el grafo cargado (cambia al reimportar; para cachés)"""
+        self._cargar()
+        return self._version
+
+    def _cargar(self):
+        """Carga el .npz la primera vez (o si ha cambiado en disco)"""
+        try:
+            estado = os.stat(self.ruta)
+        except OSError:
+            return None
+
+        version = f"{estado.st_size}-{estado.st_mtime_ns}"
+        with self._lock:
+            if self._datos is not None and self._version == version:
+                return self._datos
+
+            try:
+                with np.load(self.ruta) as fichero:
+                    datos = {clave: fichero[clave] for clave in fichero.files}
+            except Exception as e:
+                print(f"Error cargando grafo viario: {e}")
+                return None
+
+            # Vistas de memoria para los bucles de A*/Dijkstra: indexarlas
+            # escalar a escalar devuelve int/float de Python casi tan rápido
+            # como una lista, sin copiar los arrays (indexar el ndarray es
+            # mucho más lento)
+            datos['_vistas'] = {
+                clave: memoryview(np.ascontiguousarray(datos[clave]))
+                for clave in ('indptr', 'indices', 'segundos', 'latitud', 'longitud')
+            }
+            datos['_rejilla'] = self._crear_rejilla(datos['latitud'], datos['longitud'])
+            datos['_velocidad_max'] = float(
+                (datos['metros'] / np.maximum(datos['segundos'], 1e-6)).max()
+            ) if len(datos['metros']) else 1.0
+
+            self._datos = datos
+            self._version = version
+            return datos
+
+    def resumen(self):
+        """(nodos, aristas) del grafo cargado o None"""
+        datos = self._cargar()
+        if datos is None:
+            return None
+        return (len(datos['latitud']), len(datos['indices']))
+
+    # =========================================================================
+    # CONSTRUCCIÓN
+    # =========================================================================
+
+    @staticmethod
+    def construir(coordenadas, vias):
+        """
+        Construye los arrays CSR.
+
+        Args:
+            coordenadas: dict {id_nodo_osm: (lat, lon)}
+            vias: Lista de (ids_nodos, highway, oneway, maxspeed) con las
+                  etiquetas OSM tal cual (oneway/maxspeed pueden ser None)
+
+        Returns:
+            dict de arrays (latitud, longitud, indptr, indices, metros, segundos)
+        """
+        origenes, destinos, velocidades = [], [], []
+
+        for nodos, highway, oneway, maxspeed in vias:
+            nodos = [n for n in nodos if n in coordenadas]
+            if len(nodos) < 2:
+                continue
+
+            velocidad = GrafoViario._velocidad(highway, maxspeed)
+            sentido = GrafoViario._sentido(highway, oneway)
+            pares_ida = list(zip(nodos, nodos[1:]))
+
+            if sentido >= 0:
+                for u, v in pares_ida:
+                    origenes.append(u)
+                    destinos.append(v)
+                    velocidades.append(velocidad)
+            if sentido <= 0:
+                for u, v in pares_ida:
+                    origenes.append(v)
+                    destinos.append(u)
+                    velocidades.append(velocidad)
+
+        # Ids OSM -> índices compactos 0..n-1 (solo nodos con aristas)
+        origenes = np.asarray(origenes, dtype=np.int64)
+        destinos = np.asarray(destinos, dtype=np.int64)
+        ids = np.unique(np.concatenate([origenes, destinos]))
+        u = np.searchsorted(ids, origenes).astype(np.int32)
+        v = np.searchsorted(ids, destinos).astype(np.int32)
+
+        coords = np.array([coordenadas[i] for i in ids.tolist()], dtype=np.float64).reshape(-1, 2)
+        metros = GrafoViario._haversine_m(coords[u], coords[v])
+        segundos = metros / (np.asarray(velocidades, dtype=np.float64) / 3.6)
+
+        # CSR: aristas ordenadas por nodo de origen
+        orden = np.argsort(u, kind="stable")
+        indptr = np.zeros(len(ids) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(u, minlength=len(ids)), out=indptr[1:])
+
+        return {
+            'latitud': coords[:, 0].astype(np.float32),
+            'longitud': coords[:, 1].astype(np.float32),
+            'indptr': indptr,
+            'indices': v[orden],
+            'metros': metros[orden].astype(np.float32),
+            'segundos': segundos[orden].astype(np.float32),
+        }
+
+    def guardar(self, arrays):
+        """Escribe el grafo en disco (sustituye al anterior)"""
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        temporal = self.ruta + ".tmp.npz"
+        np.savez_compressed(temporal, **arrays)
+        os.replace(temporal, self.ruta)
+        with self._lock:
+            self._datos = None
+            self._version = None
+
+    def importar(self, fichero):
+        """
+        Importa un extracto de OpenStreetMap.
+
+        Formatos:
+        - .osm / .osm.gz / .osm.bz2 (XML, sin dependencias)
+        - .pbf (necesita el paquete 'osmium'; si no, convertir antes con
+          'osmium cat extracto.osm.pbf -o extracto.osm')
+
+        Returns:
+            (True, (nodos, aristas)) si éxito
+            (False, "mensaje de error") si falla
+        """
+        try:
+            if fichero.lower().endswith(".pbf"):
+                coordenadas, vias = self._leer_pbf(fichero)
+            else:
+                coordenadas, vias = self._leer_xml(fichero)
+        except ImportError:
+            return (False, "Para leer .pbf instala 'osmium' (pip install osmium) "
+                           "o conviértelo a .osm con la herramienta osmium.")
+        except Exception as e:
+            return (False, f"Error leyendo {fichero}: {e}")
+
+        if not vias:
+            return (False, "El fichero no contiene carreteras.")
+
+        try:
+            arrays = self.construir(coordenadas, vias)
+            self.guardar(arrays)
+        except Exception as e:
+            return (False, f"Error construyendo el grafo: {e}")
+
+        return (True, (len(arrays['latitud']), len(arrays['indices'])))
+
+    @staticmethod
+    def _leer_xml(fichero):
+        """Lee nodos y vías de un .osm (XML) sin cargarlo entero en memoria"""
+        import bz2
+        import gzip
+        import xml.etree.ElementTree as ET
+
+        if fichero.endswith(".gz"):
+            entrada = gzip.open(fichero, "rb")
+        elif fichero.endswith(".bz2"):
+            entrada = bz2.open(fichero, "rb")
+        else:
+            entrada = open(fichero, "rb")
+
+        coordenadas = {}
+        vias = []
+        with entrada:
+            for _, elemento in ET.iterparse(entrada, events=("end",)):
+                if elemento.tag == "node":
+                    coordenadas[int(elemento.get("id"))] = (
+                        float(elemento.get("lat")), float(elemento.get("lon"))
+                    )
+                    elemento.clear()
+                elif elemento.tag == "way":
+                    etiquetas = {t.get("k"): t.get("v") for t in elemento.iter("tag")}
+                    highway = etiquetas.get("highway")
+                    if highway in GrafoViario.VELOCIDADES_KMH:
+                        nodos = [int(nd.get("ref")) for nd in elemento.iter("nd")]
+                        vias.append((nodos, highway, etiquetas.get("oneway"),
+                                     etiquetas.get("maxspeed")))
+                    elemento.clear()
+                elif elemento.tag == "relation":
+                    elemento.clear()
+
+        return coordenadas, vias
+
+    @staticmethod
+    def _leer_pbf(fichero):
+        """Lee vías de un .pbf con osmium (dependencia opcional)"""
+        import osmium
+
+        coordenadas = {}
+        vias = []
+
+        class _Lector(osmium.SimpleHandler):
+            def way(self, via):
+                highway = via.tags.get("highway")
+                if highway not in GrafoViario.VELOCIDADES_KMH:
+                    return
+                nodos = []
+                for nodo in via.nodes:
+                    if nodo.location.valid():
+                        coordenadas[nodo.ref] = (nodo.location.lat, nodo.location.lon)
+                        nodos.append(nodo.ref)
+                vias.append((nodos, highway, via.tags.get("oneway"), via.tags.get("maxspeed")))
+
+        _Lector().apply_file(fichero, locations=True)
+        return coordenadas, vias
+
+    @staticmethod
+    def _velocidad(highway, maxspeed):
+        """km/h de una vía: maxspeed numérico si lo tiene, si no por tipo"""
+        if maxspeed:
+            try:
+                return max(5.0, float(str(maxspeed).split()[0]))
+            except ValueError:
+                pass
+        return float(GrafoViario.VELOCIDADES_KMH.get(highway, 30))
+
+    @staticmethod
+    def _sentido(highway, oneway):
+        """1 = solo ida, -1 = solo vuelta, 0 = doble sentido"""
+        if oneway in ("yes", "true", "1"):
+            return 1
+        if oneway == "-1":
+            return -1
+        if oneway == "no":
+            return 0
+        return 1 if highway in GrafoViario.SENTIDO_UNICO_IMPLICITO else 0
+
+    @staticmethod
+    def _haversine_m(a, b):
+        """Metros entre filas de dos arrays (k, 2) de [lat, lon]"""
+        a = np.radians(a)
+        b = np.radians(b)
+        h = (np.sin((b[:, 0] - a[:, 0]) / 2) ** 2
+             + np.cos(a[:, 0]) * np.cos(b[:, 0]) * np.sin((b[:, 1] - a[:, 1]) / 2) ** 2)
+        return 2 * 6371008.8 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+    # =========================================================================
+    # NODO MÁS CERCANO
+    # =========================================================================
+
+    @staticmethod
+    def _celda(lat, lon):
+        fila = np.floor(np.asarray(lat, dtype=np.float64) / GrafoViario.TAMANO_CELDA).astype(np.int64)
+        columna = np.floor(np.asarray(lon, dtype=np.float64) / GrafoViario.TAMANO_CELDA).astype(np.int64)
+        # Columna desplazada a positivo para que divmod(celda, 100000) la recupere
+        return fila * 100000 + (columna + 50000)
+
+    @staticmethod
+    def _crear_rejilla(latitud, longitud):
+        """Nodos ordenados por celda (para buscar con searchsorted)"""
+        celdas = GrafoViario._celda(latitud, longitud)
+        orden = np.argsort(celdas, kind="stable")
+        return {'celdas': celdas[orden], 'orden': orden}
+
+    def nodo_mas_cercano(self, lat, lon):
+        """
+        Nodo del grafo más cercano a un punto.
+
+        Returns:
+            (indice_nodo, metros_hasta_el_nodo) o None si no hay nodos cerca
+        """
+        datos = self._cargar()
+        if datos is None:
+            return None
+
+        rejilla = datos['_rejilla']
+        centro = int(self._celda(lat, lon))
+        fila, columna = divmod(centro, 100000)
+
+        for anillo in range(1, self.MAX_ANILLOS + 1):
+            candidatos = []
+            for df in range(-anillo, anillo + 1):
+                inicio = (fila + df) * 100000 + columna - anillo
+                izquierda = np.searchsorted(rejilla['celdas'], inicio, side="left")
+                derecha = np.searchsorted(rejilla['celdas'], inicio + 2 * anillo, side="right")
+                if derecha > izquierda:
+                    candidatos.append(rejilla['orden'][izquierda:derecha])
+
+            if candidatos:
+                nodos = np.concatenate(candidatos)
+                puntos = np.column_stack([datos['latitud'][nodos], datos['longitud'][nodos]])
+                origen = np.repeat([[lat, lon]], len(nodos), axis=0)
+                distancias = self._haversine_m(origen, puntos.astype(np.float64))
+                mejor = int(np.argmin(distancias))
+                return (int(nodos[mejor]), float(distancias[mejor]))
+
+        return None
+
+    # =========================================================================
+    # CAMINO MÁS CORTO (A*)
+    # =========================================================================
+
+    def ruta_mas_corta(self, origen, destino):
+        """
+        Camino más rápido entre dos nodos.
+
+        Args:
+            origen: Índice de nodo
+            destino: Índice de nodo
+
+        Returns:
+            (segundos, metros, [indices de nodos]) o None si no hay camino
+        """
+        datos = self._cargar()
+        if datos is None:
+            return None
+        if origen == destino:
+            return (0.0, 0.0, [origen])
+
+        vistas = datos['_vistas']
+        indptr = vistas['indptr']
+        indices = vistas['indices']
+        segundos = vistas['segundos']
+        latitud = vistas['latitud']
+        longitud = vistas['longitud']
+
+        # Heurística: segundos en línea recta a la velocidad máxima del
+        # grafo. Se calcula la primera vez que un nodo entra en la cola (no
+        # para todo el grafo en cada consulta) y se guarda en 'estimadas'
+        radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+        lat_objetivo = radians(latitud[destino])
+        lon_objetivo = radians(longitud[destino])
+        cos_objetivo = cos(lat_objetivo)
+        segundos_por_radian = 2 * 6371008.8 / datos['_velocidad_max']
+
+        def heuristica(nodo):
+            lat = radians(latitud[nodo])
+            h = (sin((lat_objetivo - lat) / 2) ** 2
+                 + cos(lat) * cos_objetivo * sin((lon_objetivo - radians(longitud[nodo])) / 2) ** 2)
+            return segundos_por_radian * asin(sqrt(min(h, 1.0)))
+
+        coste = {origen: 0.0}
+        estimadas = {origen: heuristica(origen)}
+        arista_previa = {origen: -1}
+        previo = {origen: -1}
+        cerrados = set()
+        abiertos = [(estimadas[origen], origen)]
+
+        while abiertos:
+            _, nodo = heappop(abiertos)
+            if nodo in cerrados:
+                continue
+            if nodo == destino:
+                break
+            cerrados.add(nodo)
+
+            base = coste[nodo]
+            for arista in range(indptr[nodo], indptr[nodo + 1]):
+                vecino = indices[arista]
+                nuevo = base + segundos[arista]
+                anterior = coste.get(vecino)
+                if anterior is None:
+                    estimadas[vecino] = heuristica(vecino)
+                elif nuevo >= anterior:
+                    continue
+                coste[vecino] = nuevo
+                previo[vecino] = nodo
+                arista_previa[vecino] = arista
+                heappush(abiertos, (nuevo + estimadas[vecino], vecino))
+        else:
+            return None
+
+        # Reconstruir el camino
+        camino = []
+        aristas = []
+        nodo = destino
+        while nodo != -1:
+            camino.append(nodo)
+            if arista_previa[nodo] >= 0:
+                aristas.append(arista_previa[nodo])
+            nodo = previo[nodo]
+        camino.reverse()
+
+        metros = float(datos['metros'][aristas].sum()) if aristas else 0.0
+        return (float(coste[destino]), metros, camino)
+
+    def tiempos_desde(self, origen, destinos):
+        """
+        Segundos del camino más rápido desde un nodo a varios (Dijkstra
+        que para en cuanto ha fijado todos los destinos). Para matrices de
+        tiempos: una búsqueda por fila en lugar de un A* por pareja.
+
+        Args:
+            origen: Índice de nodo
+            destinos: Índices de nodo
+
+        Returns:
+            Lista de segundos (inf si no hay camino) o None si no hay grafo
+        """
+        datos = self._cargar()
+        if datos is None:
+            return None
+
+        vistas = datos['_vistas']
+        indptr = vistas['indptr']
+        indices = vistas['indices']
+        segundos = vistas['segundos']
+
+        pendientes = set(destinos)
+        coste = {origen: 0.0}
+        cerrados = set()
+        abiertos = [(0.0, origen)]
+
+        while abiertos and pendientes:
+            base, nodo = heappop(abiertos)
+            if nodo in cerrados:
+                continue
+            cerrados.add(nodo)
+            pendientes.discard(nodo)
+
+            for arista in range(indptr[nodo], indptr[nodo + 1]):
+                vecino = indices[arista]
+                nuevo = base + segundos[arista]
+                if nuevo < coste.get(vecino, float("inf")):
+                    coste[vecino] = nuevo
+                    heappush(abiertos, (nuevo, vecino))
+
+        return [coste[d] if d in cerrados else float("inf") for d in destinos]
+
+    def coordenadas(self, nodos):
+        """[[lat, lon], ...] de una lista de nodos"""
+        datos = self._cargar()
+        if datos is None:
+            return []
+        nodos = np.asarray(nodos, dtype=np.int64)
+        return np.column_stack([datos['latitud'][nodos], datos['longitud'][nodos]]).astype(np.float64).tolist()
+
+
+# Instancia global compartida
+grafo_viario = GrafoViario()
@@ -1,11 +1,14 @@
-class IncidenciaDAO:
+from app.data.base_dao import BaseDAO
+
+
+class IncidenciaDAO(BaseDAO):
     """
     Data Access Object para Incidencias.
     Maneja la comunicación con Firebase Realtime Database.
     """
     
     def __init__(self, db_connection):
-        self.db = db_connection
+        super().__init__(db_connection)
         self.collection_name = "incidencias"
 
     def insertar(self, incidencia_dict):
@@ -13,29 +16,32 @@ class IncidenciaDAO:
         Guarda una nueva incidencia en Firebase.
         Firebase genera el ID automáticamente.
         """
-        return self.db.child(self.collection_name).push(incidencia_dict)
+        return self._insertar(incidencia_dict)
     
     def leer_todos(self):
         """Obtiene todas las incidencias"""
-        return self.db.child(self.collection_name).get()
+        return self._leer_coleccion()
     
     def leer_por_id(self, id_incidencia):
         """Obtiene una incidencia específica por su ID"""
-        return self.db.child(self.collection_name).child(id_incidencia).get()
+        return self._leer_por_id(id_incidencia)
     
     def leer_por_vehiculo(self, id_vehiculo):
         """
         Obtiene todas las incidencias de un vehículo específico.
-        
-        Nota: Firebase Realtime Database no soporta queries complejas,
-        así que obtenemos todas y filtramos en el repository.
+        Consulta indexada (orderByChild + equalTo) sobre id_vehiculo.
         """
-        return self.db.child(self.collection_name).get()
+        return self._leer_por_campo("id_vehiculo", id_vehiculo)
+    
+    def leer_por_estado(self, estado):
+        """Obtiene las incidencias con un estado concreto (consulta indexada)"""
+        # Sin estado cuentan como "Pendiente" (valor por defecto de from_dict)
+        return self._leer_por_campo("estado", estado, por_defecto="Pendiente")
     
     def eliminar(self, id_incidencia):
         """Elimina una incidencia"""
-        return self.db.child(self.collection_name).child(id_incidencia).remove()
+        return self._eliminar(id_incidencia)
 
     def actualizar(self, id_incidencia, datos_dict):
         """Actualiza los datos de una incidencia"""
-        return self.db.child(self.collection_name).child(id_incidencia).update(datos_dict)
\ No newline at end of file
+        return self._actualizar(id_incidencia, datos_dict)
\ No newline at end of file
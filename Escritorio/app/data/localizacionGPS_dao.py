@@ -8,12 +8,14 @@ class LocalizacionGPSDAO:
     Estructura en Firebase:
     /localizaciones_actuales/{id_asignacion}  <- Última ubicación de cada conductor
     /historial_localizaciones/{id_asignacion}/{timestamp_id}  <- Historial completo
+    /historial_compacto/{id_asignacion}  <- Historial archivado (ver HistorialCompacto)
     """
     
     def __init__(self):
         self.db = get_admin_db()
         self.ref_actual = self.db.child('localizaciones_actuales')
         self.ref_historial = self.db.child('historial_localizaciones')
+        self.ref_compacto = self.db.child('historial_compacto')
 
     def guardar_ubicacion_actual(self, id_asignacion, localizacion_dict):
         """
@@ -58,14 +60,121 @@ class LocalizacionGPSDAO:
             print(f"Error leyendo ubicaciones: {e}")
             return None
     
-    def leer_historial(self, id_asignacion):
-        """Obtiene el historial completo de ubicaciones de una asignación"""
+    def leer_historial(self, id_asignacion, estricto=False):
+        """
+        Obtiene el historial completo de ubicaciones de una asignación.
+        
+        Args:
+            estricto: Si True, los errores de lectura se propagan (para no
+                      confundir un fallo con un historial vacío)
+        """
         try:
             return self.ref_historial.child(id_asignacion).get()
         except Exception as e:
+            if estricto:
+                raise
             print(f"Error leyendo historial: {e}")
             return None
     
+    def leer_historial_pagina(self, id_asignacion, desde_clave=None, limite=500):
+        """
+        Una página del historial en orden de clave (las claves push de
+        Firebase van en orden de creación).
+        
+        Args:
+            desde_clave: Primera clave de la página (incluida) o None
+            limite: Máximo de pings
+        """
+        try:
+            consulta = self.ref_historial.child(id_asignacion).order_by_key()
+            if desde_clave is not None:
+                consulta = consulta.start_at(desde_clave)
+            return consulta.limit_to_first(limite).get()
+        except Exception as e:
+            print(f"Error leyendo página de historial: {e}")
+            return None
+    
+    def leer_historial_por_tiempo(self, id_asignacion, desde=None, hasta=None, limite=500):
+        """
+        Una página del historial ordenada por timestamp (necesita el índice
+        de 'timestamp' en las reglas de la base de datos).
+        
+        Args:
+            desde, hasta: Timestamps 'yyyy-MM-ddTHH:mm:ss' (incluidos) o None
+            limite: Máximo de pings
+        """
+        try:
+            consulta = self.ref_historial.child(id_asignacion).order_by_child('timestamp')
+            if desde is not None:
+                consulta = consulta.start_at(desde)
+            if hasta is not None:
+                consulta = consulta.end_at(hasta)
+            return consulta.limit_to_first(limite).get()
+        except Exception as e:
+            print(f"Error leyendo historial por tiempo: {e}")
+            return None
+    
+    def leer_resumen_compacto(self, id_asignacion):
+        """Datos del historial archivado sin los bloques (lectura 'shallow')"""
+        try:
+            return self.ref_compacto.child(id_asignacion).get(shallow=True)
+        except Exception as e:
+            print(f"Error leyendo resumen de historial compacto: {e}")
+            return None
+    
+    def leer_bloques_compactos(self, id_asignacion, desde_clave=None, limite=1):
+        """Bloques del historial archivado en orden de clave"""
+        try:
+            consulta = self.ref_compacto.child(id_asignacion).child('bloques').order_by_key()
+            if desde_clave is not None:
+                consulta = consulta.start_at(desde_clave)
+            return consulta.limit_to_first(limite).get()
+        except Exception as e:
+            print(f"Error leyendo bloques de historial compacto: {e}")
+            return None
+    
+    def leer_historial_compacto(self, id_asignacion):
+        """
+        Obtiene el historial archivado (bloques comprimidos) de una asignación.
+        Los errores de lectura se propagan: se usa al archivar, donde un
+        fallo no puede tomarse por "aún no hay nada archivado".
+        """
+        return self.ref_compacto.child(id_asignacion).get()
+    
+    def anadir_bloques_compactos(self, id_asignacion, bloques, resumen):
+        """
+        Añade bloques al historial archivado sin tocar los que ya hay.
+        Una sola escritura (update multiruta): bloques/{clave} y los datos
+        del resumen (puntos, inicio, fin...).
+        
+        Args:
+            bloques: {clave: bloque} con claves nuevas
+            resumen: Campos de primer nivel a actualizar
+        """
+        try:
+            cambios = {f"bloques/{clave}": bloque for clave, bloque in bloques.items()}
+            cambios.update(resumen)
+            self.ref_compacto.child(id_asignacion).update(cambios)
+            return True
+        except Exception as e:
+            print(f"Error guardando historial compacto: {e}")
+            return False
+    
+    def eliminar_del_historial(self, id_asignacion, ids_localizacion):
+        """
+        Borra pings concretos del historial (una única escritura).
+        Los que lleguen mientras tanto no se tocan.
+        """
+        try:
+            if ids_localizacion:
+                self.ref_historial.child(id_asignacion).update(
+                    {id_loc: None for id_loc in ids_localizacion}
+                )
+            return True
+        except Exception as e:
+            print(f"Error podando historial: {e}")
+            return False
+    
     def eliminar_ubicacion_actual(self, id_asignacion):
         """
         Elimina la ubicación actual de una asignación.
@@ -0,0 +1,241 @@
+"""
+ReplicaLocal - Réplica en memoria de las colecciones de Firebase
+
+Hace una carga inicial de cada colección y la mantiene al día con los
+listeners en tiempo real del Admin SDK (ref.listen). Mientras una colección
+está sincronizada, los DAOs leen de aquí en lugar de ir a la red.
+
+Estructura:
+    {coleccion: {id: datos}}
+
+Los listeners notifican en sus propios threads; todo el acceso a los datos
+va protegido con un lock y las lecturas devuelven copias.
+"""
+import copy
+import threading
+
+from app.data.firebase_cache import firebase_cache
+from app.utils.firebase_event_utils import FirebaseEventUtils
+
+
+class ReplicaLocal:
+    """
+    Réplica local sincronizada por streaming.
+
+    Uso:
+        replica_local.iniciar(on_cambio)   # on_cambio(coleccion, claves|None)
+        replica_local.sincronizada("rutas")
+        replica_local.obtener("rutas")     # copia {id: datos}
+        replica_local.detener()
+    """
+
+    COLECCIONES = ["vehiculos", "conductores", "rutas", "asignaciones", "incidencias"]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos = {}           # {coleccion: {id: datos}}
+        self._sincronizadas = set()
+        self._listeners = {}       # {coleccion: ListenerRegistration}
+        self._on_cambio = None
+        self._generacion = 0       # Sube con cada detener()
+
+    # =========================================================================
+    # CICLO DE VIDA
+    # =========================================================================
+
+    @property
+    def generacion(self):
+        """Cambia cada vez que se llama a detener()"""
+        return self._generacion
+
+    def iniciar(self, on_cambio=None, colecciones=None, generacion=None):
+        """
+        Abre un listener por colección (la primera respuesta es la carga inicial).
+
+        Bloquea: cada listen() conecta el stream HTTP antes de volver. Se
+        llama desde un thread del pool (ver SincronizacionService).
+
+        Args:
+            on_cambio: Función (coleccion, claves) llamada tras cada cambio real.
+                       claves es un set de IDs o None si cambió la colección entera.
+                       Se llama desde el thread del listener.
+            colecciones: Lista de colecciones (por defecto COLECCIONES)
+            generacion: Valor de `generacion` al programar el arranque. Si
+                        entretanto se llamó a detener(), no se abre nada más
+                        y se cierra lo recién abierto.
+
+        Returns:
+            True si se pudo iniciar al menos un listener
+        """
+        from app.config.config import get_admin_db
+
+        if generacion is None:
+            generacion = self._generacion
+        if generacion != self._generacion:
+            return False
+
+        self._on_cambio = on_cambio
+
+        db = get_admin_db()
+        if db is None:
+            print("Réplica local no disponible (Admin SDK no inicializado)")
+            return False
+
+        for coleccion in colecciones or self.COLECCIONES:
+            if coleccion in self._listeners:
+                continue
+            try:
+                listener = db.child(coleccion).listen(self._crear_callback(coleccion))
+            except Exception as e:
+                print(f"Error iniciando sincronización de '{coleccion}': {e}")
+                continue
+
+            with self._lock:
+                vigente = generacion == self._generacion
+                if vigente:
+                    self._listeners[coleccion] = listener
+            if not vigente:
+                # detener() llegó mientras se conectaba
+                listener.close()
+                return False
+
+        return bool(self._listeners)
+
+    def detener(self):
+        """Cierra todos los listeners y deja de servir datos"""
+        with self._lock:
+            self._generacion += 1
+            listeners = self._listeners
+            self._listeners = {}
+            self._sincronizadas = set()
+            self._datos = {}
+
+        for coleccion, listener in listeners.items():
+            try:
+                listener.close()
+            except Exception as e:
+                print(f"Error deteniendo sincronización de '{coleccion}': {e}")
+
+        self._on_cambio = None
+
+    # =========================================================================
+    # CONSULTAS
+    # =========================================================================
+
+    def sincronizada(self, coleccion):
+        """True si la colección ya recibió la carga inicial"""
+        with self._lock:
+            return coleccion in self._sincronizadas
+
+    def obtener(self, coleccion):
+        """Devuelve una copia de la colección ({id: datos}) o None si no está"""
+        with self._lock:
+            if coleccion not in self._sincronizadas:
+                return None
+            datos = self._datos.get(coleccion, {})
+            return copy.deepcopy(datos)
+
+    def obtener_uno(self, coleccion, id_elemento):
+        """
+        Devuelve una copia de un elemento.
+
+        Returns:
+            (True, datos|None) si la colección está sincronizada
+            (False, None) si no lo está
+        """
+        with self._lock:
+            if coleccion not in self._sincronizadas:
+                return (False, None)
+            datos = self._datos.get(coleccion, {}).get(id_elemento)
+            return (True, copy.deepcopy(datos))
+
+    # =========================================================================
+    # APLICAR CAMBIOS
+    # =========================================================================
+
+    def aplicar_local(self, coleccion, tipo_evento, ruta, valor):
+        """
+        Aplica una escritura hecha desde esta app (write-through).
+
+        Así lo que se lee justo después de guardar ya incluye el cambio,
+        sin esperar a que llegue el eco del listener. No se notifica: la
+        vista que escribe ya se ha actualizado, y cuando llegue el eco no
+        habrá diferencias.
+        """
+        with self._lock:
+            if coleccion not in self._sincronizadas:
+                return
+        self._aplicar(coleccion, tipo_evento, ruta, copy.deepcopy(valor), notificar=False)
+
+    def _crear_callback(self, coleccion):
+        """Callback del listener de una colección (thread de Firebase)"""
+        def on_evento(event):
+            try:
+                self._aplicar(coleccion, event.event_type, event.path or "/", event.data)
+            except Exception as e:
+                print(f"Error aplicando evento de '{coleccion}': {e}")
+        return on_evento
+
+    def _aplicar(self, coleccion, tipo_evento, ruta, valor, notificar=True):
+        """Aplica un evento y avisa solo si algo cambió de verdad"""
+        segmentos = FirebaseEventUtils.dividir_ruta(ruta)
+        es_reinicio = not segmentos and tipo_evento == "put"
+
+        with self._lock:
+            datos = self._datos.setdefault(coleccion, {})
+            primera_carga = coleccion not in self._sincronizadas
+
+            # Copia de lo que puede cambiar para detectar ecos sin cambios
+            if es_reinicio:
+                antes = dict(datos)
+            else:
+                antes = {
+                    clave: copy.deepcopy(datos.get(clave))
+                    for clave in self._claves_evento(segmentos, tipo_evento, valor)
+                }
+
+            _, afectadas = FirebaseEventUtils.aplicar_evento(
+                datos, tipo_evento, ruta, valor
+            )
+
+            if es_reinicio:
+                self._sincronizadas.add(coleccion)
+                cambiadas = None if antes != datos else set()
+            else:
+                cambiadas = {
+                    clave for clave in afectadas
+                    if antes.get(clave) != datos.get(clave)
+                }
+
+        if cambiadas is not None and not cambiadas:
+            return
+
+        # Las lecturas ya no deben salir de la caché TTL (sube la versión)
+        firebase_cache.invalidar(coleccion)
+
+        if primera_carga or not notificar:
+            # La carga inicial no es un cambio para las vistas
+            return
+
+        if self._on_cambio:
+            try:
+                self._on_cambio(coleccion, cambiadas)
+            except Exception as e:
+                print(f"Error notificando cambio de '{coleccion}': {e}")
+
+    @staticmethod
+    def _claves_evento(segmentos, tipo_evento, valor):
+        """Claves de primer nivel que puede tocar un evento"""
+        if segmentos:
+            return {segmentos[0]}
+        if tipo_evento == "patch" and isinstance(valor, dict):
+            return {
+                FirebaseEventUtils.dividir_ruta(clave)[0]
+                for clave in valor
+                if FirebaseEventUtils.dividir_ruta(clave)
+            }
+        return set()
+
+
+# Instancia global compartida por los DAOs y el servicio de sincronización
+replica_local = ReplicaLocal()
@@ -1,24 +1,32 @@
-class RutaDAO:
+from app.data.base_dao import BaseDAO
+
+
+class RutaDAO(BaseDAO):
     def __init__(self, db_connection):
-        self.db = db_connection
+        super().__init__(db_connection)
         self.collection_name = "rutas"
 
     def insertar(self, ruta_dict):
         """Guarda una nueva ruta en la nube"""
-        return self.db.child(self.collection_name).push(ruta_dict)
+        return self._insertar(ruta_dict)
     
     def leer_todas(self):
         """Descarga todas las rutas existentes"""
-        return self.db.child(self.collection_name).get()
+        return self._leer_coleccion()
+    
+    def leer_por_estado(self, estado):
+        """Descarga solo las rutas con un estado concreto (consulta indexada)"""
+        # Sin estado cuentan como "Pendiente" (valor por defecto de from_dict)
+        return self._leer_por_campo("estado", estado, por_defecto="Pendiente")
     
     def leer_una(self, id_ruta):
         """Obtiene una ruta específica por su ID"""
-        return self.db.child(self.collection_name).child(id_ruta).get().val()
+        return self._leer_por_id(id_ruta).val()
     
     def eliminar(self, id_ruta):
         """Elimina una ruta de Firebase"""
-        return self.db.child(self.collection_name).child(id_ruta).remove()
+        return self._eliminar(id_ruta)
     
     def actualizar(self, id_ruta, ruta_dict):
         """Actualiza una ruta completa"""
-        return self.db.child(self.collection_name).child(id_ruta).update(ruta_dict)
\ No newline at end of file
+        return self._actualizar(id_ruta, ruta_dict)
\ No newline at end of file
@@ -1,24 +1,31 @@
-class VehiculoDAO:
+from app.data.base_dao import BaseDAO
+
+
+class VehiculoDAO(BaseDAO):
     def __init__(self, db_connection):
-        self.db = db_connection
+        super().__init__(db_connection)
         self.collection_name = "vehiculos"
 
     def insertar(self, vehiculo_dict):
         """Envía el diccionario a Firebase y devuelve el resultado"""
-        return self.db.child(self.collection_name).push(vehiculo_dict)
+        return self._insertar(vehiculo_dict)
     
     def leer_todos(self):
         """Descarga todos los vehículos de la nube"""
-        return self.db.child(self.collection_name).get()
+        return self._leer_coleccion()
+    
+    def leer_por_estado(self, estado):
+        """Descarga solo los vehículos con un estado concreto (consulta indexada)"""
+        return self._leer_por_campo("estado", estado)
     
     def leer_uno(self, id_vehiculo):
         """Obtiene un vehículo específico por su ID"""
-        return self.db.child(self.collection_name).child(id_vehiculo).get().val()
+        return self._leer_por_id(id_vehiculo).val()
     
     def eliminar(self, id_vehiculo):
         """Borra el nodo del vehículo"""
-        return self.db.child(self.collection_name).child(id_vehiculo).remove()
+        return self._eliminar(id_vehiculo)
 
     def actualizar(self, id_vehiculo, datos_dict):
         """Actualiza los datos de un vehículo existente"""
-        return self.db.child(self.collection_name).child(id_vehiculo).update(datos_dict)
\ No newline at end of file
+        return self._actualizar(id_vehiculo, datos_dict)
\ No newline at end of file
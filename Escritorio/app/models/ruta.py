@@ -1,6 +1,9 @@
 from dataclasses import dataclass, asdict, field
 from typing import Optional, List
 
+from app.utils.geo_utils import GeoUtils
+from app.utils.geometria_rutas import GeometriaRutas
+
 @dataclass
 class Ruta:
     """
@@ -20,8 +23,27 @@ class Ruta:
     # Lista de paradas intermedias: [{'direccion': '...', 'coords': [lat, lon], 'orden': 1}]
     paradas: List[dict] = field(default_factory=list) 
     
+    # Coordenadas del origen [lat, lon] (así no hay que geocodificarlo al abrir)
+    origen_coords: Optional[List[float]] = None
+    # Geometría derivada (ver calcular_geometria)
+    bbox: Optional[List[float]] = None         # [lat_min, lon_min, lat_max, lon_max]
+    distancia_km: Optional[float] = None       # Origen -> paradas (recta o por carretera)
+    duracion_min: Optional[int] = None         # Estimada (ver GeometriaRutas)
+    
     id_ruta: Optional[str] = None
 
+    def puntos(self):
+        """Coordenadas en orden de recorrido: origen (si se conoce) y paradas"""
+        return GeometriaRutas.puntos_recorrido(self.origen_coords, self.paradas)
+
+    def calcular_geometria(self):
+        """Recalcula bbox, distancia_km y duracion_min a partir de origen_coords y paradas"""
+        GeometriaRutas.completar([self], forzar=True)
+
+    def tiene_geometria(self):
+        """True si la ruta ya tiene guardadas las coordenadas del origen"""
+        return GeoUtils.es_coordenada(self.origen_coords)
+
     def to_dict(self):
         """
         Convierte la ruta a diccionario para Firebase.
@@ -37,7 +59,7 @@ class Ruta:
         """
         Crea un objeto Ruta desde los datos de Firebase.
         """
-        return Ruta(
+        ruta = Ruta(
             id_ruta=id_firebase,
             nombre=data.get("nombre", "Ruta sin nombre"),
             origen=data.get("origen", ""),
@@ -47,5 +69,13 @@ class Ruta:
             hora_fin_prevista=data.get("hora_fin_prevista", "00:00"),
             id_gestor=data.get("id_gestor", ""),
             estado=data.get("estado", "Pendiente"),
-            paradas=data.get("paradas", [])
-        )
\ No newline at end of file
+            paradas=data.get("paradas", []),
+            origen_coords=data.get("origen_coords"),
+            bbox=data.get("bbox"),
+            distancia_km=data.get("distancia_km"),
+            duracion_min=data.get("duracion_min")
+        )
+        
+        # Rutas antiguas (sin bbox/distancia/duración): el repositorio las
+        # completa todas juntas con GeometriaRutas.completar
+        return ruta
\ No newline at end of file
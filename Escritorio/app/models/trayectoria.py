@@ -0,0 +1,213 @@
+from typing import List, Optional
+
+import numpy as np
+
+from app.models.localizacionGPS import LocalizacionGPS
+from app.utils.historial_compacto import HistorialCompacto
+
+
+class PuntoTrayectoria:
+    """
+    Vista de un punto de una Trayectoria (no copia datos).
+    """
+    __slots__ = ("_trayectoria", "_indice")
+
+    def __init__(self, trayectoria, indice):
+        self._trayectoria = trayectoria
+        self._indice = indice
+
+    @property
+    def latitud(self) -> float:
+        return float(self._trayectoria.latitudes[self._indice])
+
+    @property
+    def longitud(self) -> float:
+        return float(self._trayectoria.longitudes[self._indice])
+
+    @property
+    def tiempo_ms(self) -> int:
+        return int(self._trayectoria.tiempos_ms[self._indice])
+
+    @property
+    def timestamp(self) -> str:
+        return HistorialCompacto.a_timestamp(self.tiempo_ms // 1000)
+
+    def a_localizacion(self) -> LocalizacionGPS:
+        """Convierte el punto al modelo LocalizacionGPS"""
+        t = self._trayectoria
+        return LocalizacionGPS(
+            id_asignacion=t.id_asignacion,
+            latitud=self.latitud,
+            longitud=self.longitud,
+            timestamp=self.timestamp,
+            nombre_conductor=t.nombre_conductor,
+            matricula_vehiculo=t.matricula_vehiculo,
+            nombre_ruta=t.nombre_ruta
+        )
+
+    def __repr__(self):
+        return f"PuntoTrayectoria({self.timestamp}, {self.latitud}, {self.longitud})"
+
+
+class Trayectoria:
+    """
+    Recorrido GPS de una asignación guardado por columnas.
+
+    En lugar de un LocalizacionGPS por punto (8 campos, tres textos
+    repetidos, cientos de bytes) guarda tres arrays NumPy y los datos
+    comunes una sola vez: 24 bytes por punto (latitud y longitud float64,
+    tiempo en milisegundos int64).
+
+    - t[i] devuelve una vista PuntoTrayectoria (con __slots__)
+    - t[a:b] devuelve otra Trayectoria sobre los mismos arrays (sin copiar)
+    - entre(desde_ms, hasta_ms) recorta por tiempo con búsqueda binaria
+    """
+    __slots__ = ("latitudes", "longitudes", "tiempos_ms",
+                 "id_asignacion", "nombre_conductor", "matricula_vehiculo", "nombre_ruta")
+
+    def __init__(self, latitudes, longitudes, tiempos_ms, id_asignacion="",
+                 nombre_conductor="", matricula_vehiculo="", nombre_ruta=""):
+        # asarray no copia si ya son arrays del tipo correcto
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.tiempos_ms = np.asarray(tiempos_ms, dtype=np.int64)
+        if not (len(self.latitudes) == len(self.longitudes) == len(self.tiempos_ms)):
+            raise ValueError("Las columnas de la trayectoria tienen distinta longitud")
+
+        self.id_asignacion = id_asignacion
+        self.nombre_conductor = nombre_conductor
+        self.matricula_vehiculo = matricula_vehiculo
+        self.nombre_ruta = nombre_ruta
+
+    # =========================================================================
+    # ACCESO
+    # =========================================================================
+
+    def __len__(self):
+        return len(self.tiempos_ms)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return self._con_columnas(
+                self.latitudes[indice], self.longitudes[indice], self.tiempos_ms[indice]
+            )
+
+        n = len(self)
+        if indice < 0:
+            indice += n
+        if not 0 <= indice < n:
+            raise IndexError("Índice fuera de la trayectoria")
+        return PuntoTrayectoria(self, indice)
+
+    def __iter__(self):
+        for indice in range(len(self)):
+            yield PuntoTrayectoria(self, indice)
+
+    def __repr__(self):
+        return (f"Trayectoria({self.id_asignacion!r}, {len(self)} puntos, "
+                f"{self.nbytes} bytes)")
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes de las columnas (los arrays compartidos cuentan en cada vista)"""
+        return self.latitudes.nbytes + self.longitudes.nbytes + self.tiempos_ms.nbytes
+
+    def entre(self, desde_ms: Optional[int] = None, hasta_ms: Optional[int] = None):
+        """
+        Puntos con desde_ms <= tiempo <= hasta_ms (sin copiar). Los tiempos
+        deben estar ordenados (como vienen del historial).
+        """
+        inicio = 0 if desde_ms is None else int(np.searchsorted(self.tiempos_ms, desde_ms, side="left"))
+        fin = len(self) if hasta_ms is None else int(np.searchsorted(self.tiempos_ms, hasta_ms, side="right"))
+        return self[inicio:fin]
+
+    def _con_columnas(self, latitudes, longitudes, tiempos_ms):
+        """Otra trayectoria con los mismos datos comunes"""
+        return Trayectoria(latitudes, longitudes, tiempos_ms, self.id_asignacion,
+                           self.nombre_conductor, self.matricula_vehiculo, self.nombre_ruta)
+
+    # =========================================================================
+    # CONVERSIONES
+    # =========================================================================
+
+    @staticmethod
+    def desde_localizaciones(localizaciones: List[LocalizacionGPS], id_asignacion=None):
+        """
+        Crea una trayectoria a partir de objetos LocalizacionGPS (ordenados
+        por tiempo). Los que tienen timestamp ilegible se ignoran.
+        """
+        localizaciones = list(localizaciones)
+        validas = []
+        for loc in localizaciones:
+            segundos = HistorialCompacto.a_segundos(loc.timestamp)
+            if segundos is not None:
+                validas.append((segundos * 1000, loc.latitud, loc.longitud))
+        validas.sort(key=lambda v: v[0])
+
+        primera = localizaciones[0] if localizaciones else None
+        columnas = np.array(validas, dtype=np.float64).reshape(-1, 3)
+        return Trayectoria(
+            latitudes=columnas[:, 1],
+            longitudes=columnas[:, 2],
+            tiempos_ms=columnas[:, 0].astype(np.int64),
+            id_asignacion=id_asignacion or (primera.id_asignacion if primera else ""),
+            nombre_conductor=primera.nombre_conductor if primera else "",
+            matricula_vehiculo=primera.matricula_vehiculo if primera else "",
+            nombre_ruta=primera.nombre_ruta if primera else ""
+        )
+
+    @staticmethod
+    def desde_dicts(id_asignacion: str, pings):
+        """
+        Crea una trayectoria directamente de los dicts de Firebase (sin
+        crear un LocalizacionGPS por ping). Se ordena por tiempo.
+        """
+        pings = list(pings)
+        tiempos, latitudes, longitudes = [], [], []
+        for datos in pings:
+            segundos = HistorialCompacto.a_segundos(datos.get("timestamp"))
+            if segundos is None:
+                continue
+            tiempos.append(segundos * 1000)
+            latitudes.append(datos.get("latitud", 0.0))
+            longitudes.append(datos.get("longitud", 0.0))
+
+        orden = np.argsort(np.asarray(tiempos, dtype=np.int64), kind="stable")
+        primero = pings[0] if pings else {}
+        return Trayectoria(
+            latitudes=np.asarray(latitudes, dtype=np.float64)[orden],
+            longitudes=np.asarray(longitudes, dtype=np.float64)[orden],
+            tiempos_ms=np.asarray(tiempos, dtype=np.int64)[orden],
+            id_asignacion=id_asignacion,
+            nombre_conductor=primero.get("nombre_conductor", ""),
+            matricula_vehiculo=primero.get("matricula_vehiculo", ""),
+            nombre_ruta=primero.get("nombre_ruta", "")
+        )
+
+    def a_localizaciones(self) -> List[LocalizacionGPS]:
+        """Convierte a una lista de LocalizacionGPS (el modelo de siempre)"""
+        return [punto.a_localizacion() for punto in self]
+
+    @staticmethod
+    def concatenar(trayectorias):
+        """
+        Une varias trayectorias de la misma asignación (copia los datos).
+        
+        El resultado queda ordenado por tiempo aunque las partes se solapen
+        o lleguen desordenadas (bloques archivados y pings recientes), para
+        que entre() pueda usar búsqueda binaria.
+        """
+        trayectorias = [t for t in trayectorias if t is not None]
+        if not trayectorias:
+            return Trayectoria([], [], [])
+        
+        latitudes = np.concatenate([t.latitudes for t in trayectorias])
+        longitudes = np.concatenate([t.longitudes for t in trayectorias])
+        tiempos_ms = np.concatenate([t.tiempos_ms for t in trayectorias])
+        
+        # Lo normal es que ya vengan en orden: solo se reordena si hace falta
+        if len(tiempos_ms) > 1 and (np.diff(tiempos_ms) < 0).any():
+            orden = np.argsort(tiempos_ms, kind="stable")
+            latitudes, longitudes, tiempos_ms = latitudes[orden], longitudes[orden], tiempos_ms[orden]
+        
+        return trayectorias[0]._con_columnas(latitudes, longitudes, tiempos_ms)
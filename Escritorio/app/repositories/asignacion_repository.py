@@ -1,7 +1,20 @@
+import threading
+import time
+
 from app.data.asignacion_dao import AsignacionDAO
+from app.data.firebase_cache import firebase_cache
 from app.models.asignacion import Asignacion
 
 class AsignacionRepository:
+    
+    # Índices secundarios compartidos por todas las instancias:
+    # {campo: {valor: [Asignacion, ...]}}
+    CAMPOS_INDICE = ("id_conductor", "id_vehiculo", "id_ruta")
+    _indices = None
+    _indices_version = None
+    _indices_instante = 0.0
+    _indices_lock = threading.Lock()
+    
     def __init__(self, db_connection):
         self.dao = AsignacionDAO(db_connection)
         
@@ -12,10 +25,9 @@ class AsignacionRepository:
         Verifica si un conductor ya tiene una ruta asignada.
         """
         try:
-            todas = self.obtener_todas()
-            for asig in todas:
-                if asig.id_conductor == id_conductor:
-                    return True, asig.nombre_ruta
+            asignaciones = self.obtener_por_conductor(id_conductor)
+            if asignaciones:
+                return True, asignaciones[0].nombre_ruta
             return False, ""
         except Exception as e:
             print(f"Error verificando conductor: {e}")
@@ -28,10 +40,9 @@ class AsignacionRepository:
         Verifica si un vehículo ya tiene una ruta asignada.
         """
         try:
-            todas = self.obtener_todas()
-            for asig in todas:
-                if asig.id_vehiculo == id_vehiculo:
-                    return True, asig.nombre_ruta
+            asignaciones = self.obtener_por_vehiculo(id_vehiculo)
+            if asignaciones:
+                return True, asignaciones[0].nombre_ruta
             return False, ""
         except Exception as e:
             print(f"Error verificando vehículo: {e}")
@@ -44,26 +55,135 @@ class AsignacionRepository:
         Verifica si una ruta ya está asignada.
         """
         try:
-            todas = self.obtener_todas()
-            for asig in todas:
-                if asig.id_ruta == id_ruta:
-                    return True
-            return False
+            return bool(self.obtener_por_ruta(id_ruta))
         except Exception as e:
             print(f"Error verificando ruta: {e}")
             return False
 
 
 
+    # =========================================================================
+    # ÍNDICES SECUNDARIOS
+    # =========================================================================
+    
+    def obtener_por_conductor(self, id_conductor):
+        """Asignaciones de un conductor (búsqueda por índice)"""
+        return self._buscar("id_conductor", id_conductor)
+    
+    def obtener_por_vehiculo(self, id_vehiculo):
+        """Asignaciones de un vehículo (búsqueda por índice)"""
+        return self._buscar("id_vehiculo", id_vehiculo)
+    
+    def obtener_por_ruta(self, id_ruta):
+        """Asignaciones de una ruta (búsqueda por índice)"""
+        return self._buscar("id_ruta", id_ruta)
+    
+    def _buscar(self, campo, valor):
+        self._asegurar_indices()
+        with self._indices_lock:
+            return list(AsignacionRepository._indices[campo].get(valor, []))
+    
+    def _asegurar_indices(self):
+        """
+        Reconstruye los índices si la colección cambió (versión de la caché)
+        o si son más antiguos que el TTL de asignaciones.
+        """
+        coleccion = self.dao.collection_name
+        version = firebase_cache.version(coleccion)
+        
+        with self._indices_lock:
+            caducados = (
+                time.monotonic() - AsignacionRepository._indices_instante
+                > firebase_cache.ttl(coleccion)
+            )
+            if (AsignacionRepository._indices is not None
+                    and AsignacionRepository._indices_version == version
+                    and not caducados):
+                return
+        
+        # Lectura fuera del lock (réplica, caché o red)
+        todas = self.obtener_todas()
+        
+        indices = {campo: {} for campo in self.CAMPOS_INDICE}
+        for asignacion in todas:
+            self._indexar(indices, asignacion)
+        
+        with self._indices_lock:
+            AsignacionRepository._indices = indices
+            AsignacionRepository._indices_version = version
+            AsignacionRepository._indices_instante = time.monotonic()
+    
+    def _indexar(self, indices, asignacion):
+        for campo in self.CAMPOS_INDICE:
+            valor = getattr(asignacion, campo)
+            if valor:
+                indices[campo].setdefault(valor, []).append(asignacion)
+    
+    def _desindexar(self, indices, id_asignacion):
+        for campo in self.CAMPOS_INDICE:
+            for valor, lista in list(indices[campo].items()):
+                restantes = [a for a in lista if a.id_asignacion != id_asignacion]
+                if restantes:
+                    indices[campo][valor] = restantes
+                else:
+                    del indices[campo][valor]
+    
+    def _actualizar_indices(self, version_antes, agregar=None, quitar=None):
+        """
+        Aplica una escritura propia sobre los índices sin releer la colección.
+        Solo si estaban al día antes de escribir; si no, se reconstruirán.
+        """
+        with self._indices_lock:
+            indices = AsignacionRepository._indices
+            if indices is None or AsignacionRepository._indices_version != version_antes:
+                return
+            
+            if quitar:
+                self._desindexar(indices, quitar)
+            if agregar:
+                self._indexar(indices, agregar)
+            
+            AsignacionRepository._indices_version = firebase_cache.version(
+                self.dao.collection_name
+            )
+
+
+
     def guardar_asignacion(self, asignacion_obj):
         try:
-            self.dao.insertar(asignacion_obj.to_dict())
+            version = firebase_cache.version(self.dao.collection_name)
+            resultado = self.dao.insertar(asignacion_obj.to_dict())
+            asignacion_obj.id_asignacion = resultado['name']
+            self._actualizar_indices(version, agregar=asignacion_obj)
             print("Asignación guardada correctamente")
             return True
         except Exception as e:
             print(f"Error guardando asignación: {e}")
             return False
         
+    def guardar_lote(self, asignaciones, ids_a_eliminar=None):
+        """
+        Guarda muchas asignaciones en una sola escritura atómica.
+        Asigna a cada objeto su id_asignacion.
+        
+        Returns:
+            True si se guardaron todas, False si no se guardó ninguna
+        """
+        try:
+            nuevas = {}
+            for asignacion in asignaciones:
+                asignacion.id_asignacion = self.dao.generar_id()
+                nuevas[asignacion.id_asignacion] = asignacion.to_dict()
+            
+            self.dao.insertar_lote(nuevas, ids_a_eliminar)
+            print(f"{len(nuevas)} asignaciones guardadas correctamente")
+            return True
+        except Exception as e:
+            for asignacion in asignaciones:
+                asignacion.id_asignacion = None
+            print(f"Error guardando lote de asignaciones: {e}")
+            return False
+        
     def obtener_todas(self):
         lista = []
         try:
@@ -80,7 +200,9 @@ class AsignacionRepository:
     
     def eliminar_asignacion(self, id_asignacion):
         try:
-            self.dao.db.child(self.dao.collection_name).child(id_asignacion).remove()
+            version = firebase_cache.version(self.dao.collection_name)
+            self.dao.eliminar(id_asignacion)
+            self._actualizar_indices(version, quitar=id_asignacion)
             print(f"Asignación {id_asignacion} eliminada.")
             return True
         except Exception as e:
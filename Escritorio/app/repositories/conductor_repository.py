@@ -46,6 +46,21 @@ class ConductorRepository:
             
         return lista
     
+    def obtener_por_estado(self, estado):
+        """Devuelve los conductores con un estado (filtrado en Firebase)"""
+        lista = []
+        try:
+            respuesta = self.dao.leer_por_estado(estado)
+            
+            if respuesta.each():
+                for item in respuesta.each():
+                    lista.append(Conductor.from_dict(item.key(), item.val()))
+                    
+        except Exception as e:
+            print(f"Error al obtener conductores por estado: {e}")
+            
+        return lista
+    
     def obtener_por_id(self, id_conductor):
         """
         Obtiene un conductor específico por su ID.
@@ -48,15 +48,29 @@ class IncidenciaRepository:
         """
         Obtiene todas las incidencias de un vehículo específico.
         """
-        todas = self.obtener_todas()
-        return [inc for inc in todas if inc.id_vehiculo == id_vehiculo]
+        try:
+            return self._convertir(self.dao.leer_por_vehiculo(id_vehiculo))
+        except Exception as e:
+            print(f"Error al obtener incidencias del vehículo: {e}")
+            return []
     
     def obtener_por_estado(self, estado):
         """
         Obtiene incidencias filtradas por estado.
         """
-        todas = self.obtener_todas()
-        return [inc for inc in todas if inc.estado == estado]
+        try:
+            return self._convertir(self.dao.leer_por_estado(estado))
+        except Exception as e:
+            print(f"Error al obtener incidencias por estado: {e}")
+            return []
+    
+    def _convertir(self, respuesta):
+        """Convierte una respuesta de Firebase en lista de Incidencia"""
+        lista = []
+        if respuesta.each():
+            for item in respuesta.each():
+                lista.append(Incidencia.from_dict(item.key(), item.val()))
+        return lista
     
     def obtener_por_id(self, id_incidencia):
         """
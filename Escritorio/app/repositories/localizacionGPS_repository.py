@@ -1,5 +1,9 @@
+import json
+
 from app.data.localizacionGPS_dao import LocalizacionGPSDAO
 from app.models.localizacionGPS import LocalizacionGPS
+from app.models.trayectoria import Trayectoria
+from app.utils.historial_compacto import HistorialCompacto
 
 class LocalizacionGPSRepository:
     """
@@ -90,27 +94,282 @@ class LocalizacionGPSRepository:
     def obtener_historial_asignacion(self, id_asignacion):
         """
         Obtiene el historial completo de ubicaciones de una asignación.
-        Útil para ver la ruta recorrida.
+        Útil para ver la ruta recorrida. Une la parte archivada (compacta)
+        y los pings que aún no se han archivado.
+        
+        Para historiales largos mejor iterar_historial (memoria acotada).
         
         Returns:
             Lista de objetos LocalizacionGPS ordenados por timestamp
         """
-        lista = []
         try:
-            snapshot = self.dao.leer_historial(id_asignacion)
-            
-            if snapshot:
-                for id_loc, datos in snapshot.items():
-                    localizacion = LocalizacionGPS.from_dict(id_loc, datos)
-                    lista.append(localizacion)
-            
-            # Ordenar por timestamp
-            lista.sort(key=lambda x: x.timestamp)
-                    
+            # iterar_historial solo ordena dentro de cada bloque/página
+            return sorted(self.iterar_historial(id_asignacion), key=lambda loc: loc.timestamp)
         except Exception as e:
             print(f"Error al obtener historial: {e}")
+            return []
+    
+    # =========================================================================
+    # LECTURA POR PÁGINAS
+    # =========================================================================
+    
+    def iterar_historial(self, id_asignacion, desde=None, hasta=None, tamano_pagina=500):
+        """
+        Recorre el historial de una asignación por páginas.
+        
+        Primero la parte archivada (bloque a bloque) y después los pings
+        sin archivar. Solo hay en memoria una página o un bloque, y si quien
+        consume deja de iterar no se descarga nada más.
+        
+        El orden por tiempo solo está garantizado dentro de cada bloque o
+        página: un bloque archivado más tarde puede traer pings que llegaron
+        con retraso y son anteriores al bloque previo. No cortar la iteración
+        por timestamp; para el recorrido completo en orden usar
+        obtener_historial_asignacion u obtener_trayectoria.
+        
+        Args:
+            id_asignacion: Asignación
+            desde, hasta: Ventana 'yyyy-MM-ddTHH:mm:ss' (incluidos) o None
+            tamano_pagina: Pings por petición a Firebase
+        
+        Yields:
+            Objetos LocalizacionGPS
+        """
+        yield from self._iterar_compacto(id_asignacion, desde, hasta)
+        
+        if desde is None and hasta is None:
+            paginas = self._paginar_por_clave(
+                lambda clave, limite: self.dao.leer_historial_pagina(id_asignacion, clave, limite),
+                tamano_pagina
+            )
+        else:
+            paginas = self._paginar_por_tiempo(id_asignacion, desde, hasta, tamano_pagina)
+        
+        for id_loc, datos in paginas:
+            yield LocalizacionGPS.from_dict(id_loc, datos)
+    
+    def _iterar_compacto(self, id_asignacion, desde, hasta):
+        """Pings archivados dentro de la ventana, decodificando un bloque cada vez"""
+        for trayectoria in self._trayectorias_compactas(id_asignacion, desde, hasta):
+            for punto in trayectoria:
+                yield punto.a_localizacion()
+    
+    def _trayectorias_compactas(self, id_asignacion, desde, hasta):
+        """Una Trayectoria por bloque archivado, ya recortada a la ventana"""
+        resumen = self.dao.leer_resumen_compacto(id_asignacion)
+        if not resumen or not isinstance(resumen, dict):
+            return
+        if (desde and resumen.get('fin', '') < desde) or (hasta and resumen.get('inicio', '') > hasta):
+            return
+        
+        minimo = HistorialCompacto.a_segundos(desde) * 1000 if desde else None
+        maximo = HistorialCompacto.a_segundos(hasta) * 1000 if hasta else None
+        
+        bloques = self._paginar_por_clave(
+            lambda clave, limite: self.dao.leer_bloques_compactos(id_asignacion, clave, limite),
+            1
+        )
+        for _, bloque in bloques:
+            # Sin cortar en el primero posterior: un archivado nuevo puede
+            # añadir pings que llegaron tarde en un bloque con clave mayor
+            if (desde and bloque.get('fin', '') < desde) or (hasta and bloque.get('inicio', '') > hasta):
+                continue
             
-        return lista
+            segundos, latitudes, longitudes = HistorialCompacto.decodificar_bloque(bloque)
+            trayectoria = Trayectoria(
+                latitudes, longitudes, segundos * 1000, id_asignacion,
+                resumen.get('nombre_conductor', ''),
+                resumen.get('matricula_vehiculo', ''),
+                resumen.get('nombre_ruta', '')
+            )
+            yield trayectoria.entre(minimo, maximo)
+    
+    # =========================================================================
+    # TRAYECTORIAS (COLUMNAS NUMPY)
+    # =========================================================================
+    
+    def iterar_trayectoria(self, id_asignacion, desde=None, hasta=None, tamano_pagina=2000):
+        """
+        Como iterar_historial, pero por trozos: una Trayectoria por bloque
+        archivado o página de pings (sin crear un objeto por punto). Para
+        análisis sobre muchas asignaciones con memoria acotada.
+        
+        Cada trozo está ordenado por tiempo, pero los trozos entre sí no
+        (ver iterar_historial); obtener_trayectoria los une y los ordena.
+        
+        Yields:
+            Objetos Trayectoria (pueden estar vacíos)
+        """
+        yield from self._trayectorias_compactas(id_asignacion, desde, hasta)
+        
+        if desde is None and hasta is None:
+            paginas = self._paginar_por_clave(
+                lambda clave, limite: self.dao.leer_historial_pagina(id_asignacion, clave, limite),
+                tamano_pagina
+            )
+        else:
+            paginas = self._paginar_por_tiempo(id_asignacion, desde, hasta, tamano_pagina)
+        
+        pagina = []
+        for _, datos in paginas:
+            pagina.append(datos)
+            if len(pagina) == tamano_pagina:
+                yield Trayectoria.desde_dicts(id_asignacion, pagina)
+                pagina = []
+        if pagina:
+            yield Trayectoria.desde_dicts(id_asignacion, pagina)
+    
+    def obtener_trayectoria(self, id_asignacion, desde=None, hasta=None):
+        """
+        Historial de una asignación como una sola Trayectoria (~24 bytes
+        por punto en lugar de un LocalizacionGPS por punto).
+        
+        Returns:
+            Objeto Trayectoria (vacío si no hay historial o falla la lectura)
+        """
+        try:
+            return Trayectoria.concatenar(list(self.iterar_trayectoria(id_asignacion, desde, hasta)))
+        except Exception as e:
+            print(f"Error al obtener trayectoria: {e}")
+            return Trayectoria([], [], [], id_asignacion)
+    
+    @staticmethod
+    def _paginar_por_clave(leer_pagina, tamano_pagina):
+        """
+        Recorre un nodo por páginas de claves.
+        
+        Args:
+            leer_pagina: Función (desde_clave, limite) -> dict ordenado
+            tamano_pagina: Elementos nuevos por página
+        
+        Yields:
+            (clave, valor)
+        """
+        ultima = None
+        while True:
+            # start_at incluye la última clave ya devuelta: se pide una más
+            limite = tamano_pagina + (0 if ultima is None else 1)
+            pagina = leer_pagina(ultima, limite)
+            if not pagina:
+                return
+            
+            nuevos = [(clave, valor) for clave, valor in pagina.items() if clave != ultima]
+            yield from nuevos
+            
+            if len(pagina) < limite or not nuevos:
+                return
+            ultima = nuevos[-1][0]
+    
+    def _paginar_por_tiempo(self, id_asignacion, desde, hasta, tamano_pagina):
+        """
+        Recorre los pings sin archivar de una ventana de tiempo.
+        
+        Al paginar por valor, start_at(ultimo_timestamp) repite los pings de
+        ese mismo timestamp: se recuerdan sus claves para no repetirlos.
+        
+        Yields:
+            (clave, valor)
+        """
+        inicio = desde
+        vistos = set()
+        while True:
+            limite = tamano_pagina + len(vistos)
+            pagina = self.dao.leer_historial_por_tiempo(id_asignacion, inicio, hasta, limite)
+            if not pagina:
+                return
+            
+            nuevos = [(clave, valor) for clave, valor in pagina.items() if clave not in vistos]
+            yield from nuevos
+            
+            if len(pagina) < limite or not nuevos:
+                return
+            inicio = nuevos[-1][1].get('timestamp')
+            if inicio is None:
+                return
+            vistos = {clave for clave, valor in pagina.items() if valor.get('timestamp') == inicio}
+    
+    # =========================================================================
+    # ARCHIVADO DEL HISTORIAL
+    # =========================================================================
+    
+    def archivar_historial(self, id_asignacion, podar=True):
+        """
+        Pasa el historial de una asignación al formato compacto y borra los
+        pings originales.
+        
+        Los pings nuevos se añaden como bloques nuevos (update), sin
+        reescribir lo ya archivado. Si no se puede leer el historial o lo
+        archivado, se aborta sin escribir ni borrar nada. Solo se poda
+        después de releer lo guardado y comprobar que están todos los puntos.
+        
+        Args:
+            id_asignacion: Asignación (normalmente ya completada)
+            podar: Si False, se archiva pero no se borra nada
+        
+        Returns:
+            (True, resumen) con puntos, podados, descartados, bytes_antes y
+            bytes_despues si éxito
+            (False, "mensaje de error") si falla
+        """
+        try:
+            snapshot = self.dao.leer_historial(id_asignacion, estricto=True) or {}
+            
+            # Sin campos de coordenadas from_dict pondría (0, 0): no se archivan
+            pings = []
+            sin_coordenadas = 0
+            for id_loc, datos in snapshot.items():
+                if self._tiene_coordenadas(datos):
+                    pings.append(LocalizacionGPS.from_dict(id_loc, datos))
+                else:
+                    sin_coordenadas += 1
+            
+            resumen = {'puntos': 0, 'podados': 0, 'descartados': sin_coordenadas,
+                       'bytes_antes': len(json.dumps(snapshot)), 'bytes_despues': 0}
+            if not pings:
+                return (True, resumen)
+            
+            archivado = self.dao.leer_historial_compacto(id_asignacion)
+            datos, ids, descartados = HistorialCompacto.empaquetar(pings, archivado)
+            resumen['descartados'] += len(descartados)
+            
+            if datos is None:
+                if not ids:
+                    return (False, "El historial no tiene ubicaciones válidas.")
+                # Todo estaba ya archivado (un archivado que no llegó a podar)
+                resumen['puntos'] = len(HistorialCompacto.columnas(archivado)[0])
+            else:
+                bloques = datos.pop('bloques')
+                if not self.dao.anadir_bloques_compactos(id_asignacion, bloques, datos):
+                    return (False, "Error al guardar el historial compacto.")
+                
+                # Comprobar lo escrito antes de borrar nada
+                guardado = self.dao.leer_historial_compacto(id_asignacion) or {}
+                segundos, _, _ = HistorialCompacto.columnas(guardado)
+                bloques_guardados = HistorialCompacto.bloques(guardado)
+                if (len(segundos) != datos['puntos']
+                        or any(clave not in bloques_guardados for clave in bloques)):
+                    return (False, "El historial compacto guardado no coincide; no se poda.")
+                
+                resumen['puntos'] = datos['puntos']
+                resumen['bytes_despues'] = len(json.dumps(guardado))
+            
+            if podar:
+                if not self.dao.eliminar_del_historial(id_asignacion, ids):
+                    return (False, "Historial archivado, pero no se pudieron borrar los originales.")
+                resumen['podados'] = len(ids)
+            
+            return (True, resumen)
+        
+        except Exception as e:
+            print(f"Error al archivar historial: {e}")
+            return (False, f"Error: {str(e)}")
+    
+    @staticmethod
+    def _tiene_coordenadas(datos):
+        """True si el ping trae latitud y longitud (aunque sean 0)"""
+        return (isinstance(datos, dict)
+                and datos.get("latitud") is not None
+                and datos.get("longitud") is not None)
     
     def limpiar_ubicacion(self, id_asignacion):
         """
@@ -1,5 +1,6 @@
 from app.data.ruta_dao import RutaDAO
 from app.models.ruta import Ruta
+from app.utils.geometria_rutas import GeometriaRutas
 
 class RutaRepository:
     def __init__(self, db_connection):
@@ -28,17 +29,34 @@ class RutaRepository:
                     ruta = Ruta.from_dict(item.key(), item.val())
                     lista_rutas.append(ruta)
             
+            # Rutas antiguas sin geometría: un solo cálculo para todas
+            GeometriaRutas.completar(lista_rutas)
             print(f"✅ Se cargaron {len(lista_rutas)} rutas desde Firebase")
         except Exception as e:
             print(f"❌ Error obteniendo rutas: {e}")
         return lista_rutas
+    
+    def obtener_por_estado(self, estado):
+        """Devuelve las rutas con un estado (filtrado en Firebase)"""
+        lista_rutas = []
+        try:
+            respuesta = self.dao.leer_por_estado(estado)
+            if respuesta.each():
+                for item in respuesta.each():
+                    lista_rutas.append(Ruta.from_dict(item.key(), item.val()))
+                GeometriaRutas.completar(lista_rutas)
+        except Exception as e:
+            print(f"❌ Error obteniendo rutas por estado: {e}")
+        return lista_rutas
 
     def obtener_por_id(self, id_ruta):
         """Busca una ruta específica por su ID único"""
         try:
             datos = self.dao.leer_una(id_ruta)
             if datos:
-                return Ruta.from_dict(id_ruta, datos)
+                ruta = Ruta.from_dict(id_ruta, datos)
+                GeometriaRutas.completar([ruta])
+                return ruta
             else:
                 print(f"Ruta {id_ruta} no encontrada.")
                 return None
@@ -58,6 +76,22 @@ class RutaRepository:
             print(f"Error actualizando ruta: {e}")
             return False
     
+    def actualizar_geometria(self, ruta_obj):
+        """Guarda solo origen_coords, bbox, distancia_km y duracion_min de una ruta"""
+        try:
+            if not ruta_obj.id_ruta:
+                return False
+            self.dao.actualizar(ruta_obj.id_ruta, {
+                "origen_coords": ruta_obj.origen_coords,
+                "bbox": ruta_obj.bbox,
+                "distancia_km": ruta_obj.distancia_km,
+                "duracion_min": ruta_obj.duracion_min
+            })
+            return True
+        except Exception as e:
+            print(f"Error actualizando geometría de la ruta: {e}")
+            return False
+    
     def eliminar_ruta(self, id_ruta):
         """Elimina una ruta de Firebase"""
         try:
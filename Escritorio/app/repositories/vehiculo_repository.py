@@ -42,6 +42,21 @@ class VehiculoRepository:
             
         return lista
     
+    def obtener_por_estado(self, estado):
+        """Devuelve los vehículos con un estado (filtrado en Firebase)"""
+        lista = []
+        try:
+            respuesta = self.dao.leer_por_estado(estado)
+            
+            if respuesta.each():
+                for item in respuesta.each():
+                    lista.append(Vehiculo.from_dict(item.key(), item.val()))
+                    
+        except Exception as e:
+            print(f"Error al obtener vehículos por estado: {e}")
+            
+        return lista
+    
     
     def obtener_por_id(self, id_vehiculo):
         """Obtiene un vehículo específico por su ID"""
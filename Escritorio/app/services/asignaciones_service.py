@@ -1,4 +1,6 @@
 
+import csv
+
 from app.models.asignacion import Asignacion
 from app.repositories.asignacion_repository import AsignacionRepository
 from app.repositories.ruta_repository import RutaRepository
@@ -99,6 +101,168 @@ class AsignacionesService:
         
         return (True, "")
     
+    # =========================================================================
+    # VALIDACIÓN EN UNA SOLA PASADA (UNO O VARIOS CANDIDATOS)
+    # =========================================================================
+    
+    def validar_candidato(self, id_ruta, id_conductor, id_vehiculo,
+                          nombre_ruta="", nombre_conductor="", matricula=""):
+        """
+        Valida una asignación (ruta, conductor, vehículo) de una sola vez.
+        
+        Returns:
+            Lista de conflictos (vacía si no hay ninguno). Ver validar_candidatos().
+        """
+        candidato = {
+            'id_ruta': id_ruta,
+            'id_conductor': id_conductor,
+            'id_vehiculo': id_vehiculo,
+            'nombre_ruta': nombre_ruta,
+            'nombre_conductor': nombre_conductor,
+            'matricula': matricula,
+        }
+        return self.validar_candidatos([candidato])[0]
+    
+    def validar_candidatos(self, candidatos):
+        """
+        Valida muchos candidatos contra una única foto de los datos.
+        
+        Lee una vez asignaciones, rutas, conductores y vehículos y devuelve
+        todos los conflictos de cada candidato, incluidos los que hay entre
+        candidatos del mismo lote (misma ruta, conductor o vehículo dos veces).
+        
+        Args:
+            candidatos: Lista de dicts con id_ruta, id_conductor, id_vehiculo
+                        (y opcionalmente nombre_ruta, nombre_conductor, matricula)
+        
+        Returns:
+            Lista (una por candidato, en el mismo orden) de listas de conflictos.
+            Cada conflicto es un dict:
+                {'campo': 'ruta'|'conductor'|'vehiculo',
+                 'titulo': str, 'mensaje': str,
+                 'bloqueante': bool}   # False = se puede confirmar (reasignación)
+            Los de reasignación llevan además 'ids_asignacion': las
+            asignaciones del conductor que se eliminarían.
+        """
+        # 1. Foto única de los datos
+        asignaciones = self.repo_asignacion.obtener_todas()
+        rutas = {r.id_ruta: r for r in self.repo_rutas.obtener_todas()}
+        conductores = {c.id_conductor: c for c in self.repo_conductores.obtener_todos()}
+        vehiculos = {v.id_vehiculo: v for v in self.repo_vehiculos.obtener_todos()}
+        
+        asig_por_ruta = {a.id_ruta: a for a in asignaciones if a.id_ruta}
+        asig_por_conductor = {a.id_conductor: a for a in asignaciones if a.id_conductor}
+        ids_por_conductor = {}
+        for a in asignaciones:
+            if a.id_conductor:
+                ids_por_conductor.setdefault(a.id_conductor, []).append(a.id_asignacion)
+        asig_por_vehiculo = {a.id_vehiculo: a for a in asignaciones if a.id_vehiculo}
+        
+        # Lo que ya han pedido los candidatos anteriores del lote
+        en_lote = {'ruta': {}, 'conductor': {}, 'vehiculo': {}}
+        
+        resultados = []
+        for posicion, candidato in enumerate(candidatos, start=1):
+            id_ruta = candidato.get('id_ruta')
+            id_conductor = candidato.get('id_conductor')
+            id_vehiculo = candidato.get('id_vehiculo')
+            
+            ruta = rutas.get(id_ruta)
+            conductor = conductores.get(id_conductor)
+            vehiculo = vehiculos.get(id_vehiculo)
+            
+            nombre_ruta = candidato.get('nombre_ruta') or (ruta.nombre if ruta else id_ruta)
+            nombre_conductor = candidato.get('nombre_conductor') or (conductor.nombre if conductor else id_conductor)
+            matricula = candidato.get('matricula') or (vehiculo.matricula if vehiculo else id_vehiculo)
+            
+            conflictos = []
+            
+            # 2. Celdas vacías o ambiguas (resolver_candidatos)
+            problemas = candidato.get('problemas') or {}
+            if problemas:
+                for campo, mensaje in problemas.items():
+                    conflictos.append(self._conflicto(campo, "Dato No Válido", mensaje))
+                resultados.append(conflictos)
+                continue
+            
+            # 3. Datos obligatorios y existencia
+            valido, mensaje = self.validar_asignacion_basica(id_ruta, id_conductor, id_vehiculo)
+            if not valido:
+                conflictos.append(self._conflicto('datos', "Faltan datos", mensaje))
+                resultados.append(conflictos)
+                continue
+            
+            if ruta is None:
+                conflictos.append(self._conflicto('ruta', "Ruta No Encontrada",
+                                                  f"La ruta '{nombre_ruta}' no existe."))
+            if conductor is None:
+                conflictos.append(self._conflicto('conductor', "Conductor No Encontrado",
+                                                  f"El conductor '{nombre_conductor}' no existe."))
+            if vehiculo is None:
+                conflictos.append(self._conflicto('vehiculo', "Vehículo No Encontrado",
+                                                  f"El vehículo {matricula} no existe."))
+            
+            # 4. Conflictos con asignaciones ya guardadas
+            if id_ruta in asig_por_ruta:
+                conflictos.append(self._conflicto(
+                    'ruta', "Ruta Ya Asignada",
+                    f"La ruta '{nombre_ruta}' ya está asignada.\n\n"
+                    "Primero elimina la asignación existente."
+                ))
+            
+            if id_conductor in asig_por_conductor:
+                ruta_actual = asig_por_conductor[id_conductor].nombre_ruta
+                conflictos.append(self._conflicto(
+                    'conductor', "Conductor Ya Asignado",
+                    f"El conductor '{nombre_conductor}' ya tiene asignada la ruta:\n"
+                    f"'{ruta_actual}'\n\n"
+                    "¿Quieres reasignarlo a esta nueva ruta?\n"
+                    "(La asignación anterior se eliminará)",
+                    bloqueante=False
+                ))
+                conflictos[-1]['ids_asignacion'] = ids_por_conductor[id_conductor]
+            
+            if id_vehiculo in asig_por_vehiculo:
+                ruta_actual = asig_por_vehiculo[id_vehiculo].nombre_ruta
+                conflictos.append(self._conflicto(
+                    'vehiculo', "Vehículo Ya Asignado",
+                    f"El vehículo {matricula} ya está asignado a:\n"
+                    f"'{ruta_actual}'\n\n"
+                    "Selecciona otro vehículo o elimina la asignación existente."
+                ))
+            
+            # 5. Conflictos dentro del propio lote
+            for campo, valor, texto in (
+                ('ruta', id_ruta, f"La ruta '{nombre_ruta}'"),
+                ('conductor', id_conductor, f"El conductor '{nombre_conductor}'"),
+                ('vehiculo', id_vehiculo, f"El vehículo {matricula}"),
+            ):
+                if valor in en_lote[campo]:
+                    conflictos.append(self._conflicto(
+                        campo, "Duplicado en el Lote",
+                        f"{texto} ya aparece en la fila {en_lote[campo][valor]} del lote."
+                    ))
+                else:
+                    en_lote[campo][valor] = posicion
+            
+            resultados.append(conflictos)
+        
+        return resultados
+    
+    @staticmethod
+    def hay_bloqueantes(conflictos):
+        """True si algún conflicto impide crear la asignación"""
+        return any(c['bloqueante'] for c in conflictos)
+    
+    @staticmethod
+    def _conflicto(campo, titulo, mensaje, bloqueante=True):
+        return {
+            'campo': campo,
+            'titulo': titulo,
+            'mensaje': mensaje,
+            'bloqueante': bloqueante,
+        }
+    
     # =========================================================================
     # CREAR ASIGNACIÓN
     # =========================================================================
@@ -125,6 +289,218 @@ class AsignacionesService:
         except Exception as e:
             return (False, None, f"Error: {str(e)}")
     
+    # =========================================================================
+    # ASIGNACIÓN MASIVA (CSV O LISTA DE TRIPLES)
+    # =========================================================================
+    
+    # Cabeceras aceptadas en el CSV (en cualquier orden)
+    COLUMNAS_CSV = ("ruta", "conductor", "vehiculo")
+    
+    def leer_csv_asignaciones(self, ruta_archivo):
+        """
+        Lee un CSV con columnas ruta, conductor, vehiculo.
+        Admite ',' o ';' como separador y cabecera opcional.
+        
+        Returns:
+            (True, [(ruta, conductor, vehiculo), ...], "") si se pudo leer
+            (False, [], "mensaje") si no
+        """
+        try:
+            with open(ruta_archivo, "r", encoding="utf-8-sig", newline="") as f:
+                contenido = f.read()
+        except Exception as e:
+            return (False, [], f"No se pudo abrir el archivo: {e}")
+        
+        try:
+            dialecto = csv.Sniffer().sniff(contenido[:2048], delimiters=",;\t")
+        except csv.Error:
+            dialecto = csv.excel
+        
+        filas = [
+            [celda.strip() for celda in fila]
+            for fila in csv.reader(contenido.splitlines(), dialecto)
+            if any(celda.strip() for celda in fila)
+        ]
+        if not filas:
+            return (False, [], "El archivo está vacío.")
+        
+        # Cabecera: si existe, define el orden de las columnas
+        cabecera = [c.lower().replace("í", "i") for c in filas[0]]
+        if all(col in cabecera for col in self.COLUMNAS_CSV):
+            posiciones = [cabecera.index(col) for col in self.COLUMNAS_CSV]
+            filas = filas[1:]
+        else:
+            posiciones = [0, 1, 2]
+        
+        triples = []
+        for numero, fila in enumerate(filas, start=1):
+            if len(fila) <= max(posiciones):
+                return (False, [], f"La fila {numero} no tiene las 3 columnas (ruta, conductor, vehículo).")
+            triples.append(tuple(fila[p] for p in posiciones))
+        
+        return (True, triples, "")
+    
+    def resolver_candidatos(self, triples):
+        """
+        Convierte triples de texto en candidatos con IDs.
+        
+        Cada valor puede ser el ID de Firebase o:
+        - ruta: nombre
+        - conductor: DNI o nombre
+        - vehículo: matrícula
+        
+        Lo que no se encuentre se deja tal cual, y validar_candidatos()
+        lo marcará como "no existe". Las celdas vacías y los textos que
+        coinciden con varios registros (p. ej. dos conductores con el mismo
+        nombre) no se resuelven: van en 'problemas' y validar_candidatos()
+        los marca como bloqueantes.
+        
+        Args:
+            triples: Lista de (ruta, conductor, vehiculo)
+            
+        Returns:
+            Lista de dicts para validar_candidatos() / crear_asignaciones_lote()
+        """
+        rutas = self.repo_rutas.obtener_todas()
+        conductores = self.repo_conductores.obtener_todos()
+        vehiculos = self.repo_vehiculos.obtener_todos()
+        
+        def normalizar(texto):
+            return "".join(str(texto or "").upper().split()).replace("-", "")
+        
+        def indexar(registros, id_de, claves_de):
+            """{id: registro} y {clave normalizada: {id: registro}} sin claves vacías"""
+            por_id = {}
+            por_clave = {}
+            for registro in registros:
+                id_registro = id_de(registro)
+                if id_registro:
+                    por_id[id_registro] = registro
+                for clave in claves_de(registro):
+                    clave = normalizar(clave)
+                    if clave:
+                        por_clave.setdefault(clave, {})[id_registro] = registro
+            return por_id, por_clave
+        
+        def buscar(texto, indices, nombre_tipo, plural):
+            """(registro o None, problema o None)"""
+            por_id, por_clave = indices
+            if not texto or not texto.strip():
+                return (None, f"La celda de {nombre_tipo} está vacía.")
+            if texto in por_id:
+                return (por_id[texto], None)
+            
+            coincidencias = por_clave.get(normalizar(texto), {})
+            if len(coincidencias) > 1:
+                return (None, f"'{texto}' coincide con {len(coincidencias)} {plural}. "
+                              "Usa un dato único (ID, DNI o matrícula).")
+            return (next(iter(coincidencias.values()), None), None)
+        
+        indices_rutas = indexar(rutas, lambda r: r.id_ruta, lambda r: [r.nombre])
+        indices_conductores = indexar(conductores, lambda c: c.id_conductor, lambda c: [c.nombre, c.dni])
+        indices_vehiculos = indexar(vehiculos, lambda v: v.id_vehiculo, lambda v: [v.matricula])
+        
+        candidatos = []
+        for texto_ruta, texto_conductor, texto_vehiculo in triples:
+            ruta, problema_ruta = buscar(texto_ruta, indices_rutas, "ruta", "rutas")
+            conductor, problema_conductor = buscar(texto_conductor, indices_conductores, "conductor", "conductores")
+            vehiculo, problema_vehiculo = buscar(texto_vehiculo, indices_vehiculos, "vehículo", "vehículos")
+            
+            problemas = {
+                campo: problema for campo, problema in (
+                    ('ruta', problema_ruta),
+                    ('conductor', problema_conductor),
+                    ('vehiculo', problema_vehiculo),
+                ) if problema
+            }
+            
+            candidatos.append({
+                'id_ruta': ruta.id_ruta if ruta else texto_ruta,
+                'nombre_ruta': ruta.nombre if ruta else texto_ruta,
+                'id_conductor': conductor.id_conductor if conductor else texto_conductor,
+                'nombre_conductor': conductor.nombre if conductor else texto_conductor,
+                'id_vehiculo': vehiculo.id_vehiculo if vehiculo else texto_vehiculo,
+                'matricula': vehiculo.matricula if vehiculo else texto_vehiculo,
+                'problemas': problemas,
+            })
+        
+        return candidatos
+    
+    def crear_asignaciones_lote(self, candidatos, fecha_inicio, reasignar_conductores=False,
+                                resultados=None):
+        """
+        Valida todo el lote en memoria y lo guarda en una sola escritura
+        atómica: o se crean todas las asignaciones o ninguna.
+        
+        Args:
+            candidatos: Lista de dicts (ver resolver_candidatos)
+            fecha_inicio: Fecha de inicio común ("dd/MM/yyyy HH:mm")
+            reasignar_conductores: Si True, los conductores que ya tenían ruta
+                                   se reasignan (su asignación anterior se borra
+                                   en la misma escritura). Si False, es un error.
+            resultados: Salida de validar_candidatos(candidatos) si ya se
+                        validó (p. ej. preparar_importacion); si es None se
+                        valida aquí
+        
+        Returns:
+            (True, asignaciones, [], "mensaje") si se guardó todo
+            (False, [], informe, "mensaje") si no se guardó nada;
+            informe es una lista de (numero_fila, [conflictos])
+        """
+        if not candidatos:
+            return (False, [], [], "No hay asignaciones que importar.")
+        
+        # 1. Validar todo el lote contra una sola foto (si no se hizo ya)
+        if resultados is None:
+            resultados = self.validar_candidatos(candidatos)
+        
+        informe = []
+        for fila, conflictos in enumerate(resultados, start=1):
+            impiden = [
+                c for c in conflictos
+                if c['bloqueante'] or not reasignar_conductores
+            ]
+            if impiden:
+                informe.append((fila, impiden))
+        
+        if informe:
+            return (
+                False, [], informe,
+                f"{len(informe)} de {len(candidatos)} filas tienen conflictos. "
+                "No se ha guardado ninguna asignación."
+            )
+        
+        # 2. Asignaciones anteriores de los conductores que se reasignan
+        #    (ya vienen en los conflictos, de la misma foto)
+        ids_a_eliminar = []
+        if reasignar_conductores:
+            for conflictos in resultados:
+                for conflicto in conflictos:
+                    ids_a_eliminar.extend(conflicto.get('ids_asignacion', []))
+        
+        # 3. Crear objetos y guardar de una vez
+        asignaciones = [
+            Asignacion(
+                id_ruta=c['id_ruta'],
+                nombre_ruta=c['nombre_ruta'],
+                id_conductor=c['id_conductor'],
+                nombre_conductor=c['nombre_conductor'],
+                id_vehiculo=c['id_vehiculo'],
+                matricula_vehiculo=c['matricula'],
+                fecha_inicio=fecha_inicio,
+                estado="Asignada"
+            )
+            for c in candidatos
+        ]
+        
+        if not self.repo_asignacion.guardar_lote(asignaciones, ids_a_eliminar):
+            return (
+                False, [], [],
+                "Error al guardar el lote. No se ha guardado ninguna asignación."
+            )
+        
+        return (True, asignaciones, [], f"{len(asignaciones)} asignaciones creadas correctamente.")
+    
     # =========================================================================
     # ELIMINAR ASIGNACIÓN
     # =========================================================================
@@ -171,8 +547,7 @@ class AsignacionesService:
     
     def obtener_vehiculos_disponibles(self):
         """Obtiene solo vehículos con estado Disponible"""
-        todos = self.repo_vehiculos.obtener_todos()
-        return [v for v in todos if getattr(v, 'estado', 'Disponible') == "Disponible"]
+        return self.repo_vehiculos.obtener_por_estado("Disponible")
     
     def obtener_ruta_por_id(self, id_ruta):
         """Obtiene una ruta por ID"""
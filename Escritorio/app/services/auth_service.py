@@ -1,14 +1,17 @@
-import pyrebase
-from app.config.config import FIREBASE_CONFIG
+from app.data.conexion_firebase import conexion_firebase
 
 class AuthService:
-    def __init__(self):
-        try:
-            self.firebase = pyrebase.initialize_app(FIREBASE_CONFIG)
-            self.auth = self.firebase.auth()
-            self.db = self.firebase.database()
-        except Exception as e:
-            print(f"Error al conectar con Firebase: {e}")
+    @property
+    def auth(self):
+        """
+        Auth de la conexión compartida. Se pide en cada uso para no
+        bloquear al construir el servicio (la conexión se crea en segundo
+        plano mientras se muestra el login).
+        """
+        auth = conexion_firebase.auth()
+        if auth is None:
+            raise Exception("Error al conectar con Firebase")
+        return auth
 
     # Escritorio/app/services/auth_service.py
 
@@ -21,10 +24,11 @@ class AuthService:
             user = self.auth.sign_in_with_email_and_password(email, password)
             uid = user['localId']
             token = user['idToken']  # <--- GUARDAMOS EL TOKEN
+            db = conexion_firebase.database()
             
             # 2. Buscar perfil en /gestores/{uid} USANDO EL TOKEN
             # Pasamos el token como argumento al método get()
-            gestor_data = self.db.child('gestores').child(uid).get(token) 
+            gestor_data = db.child('gestores').child(uid).get(token) 
             
             if gestor_data.val():
                 return {
@@ -36,7 +40,7 @@ class AuthService:
                 }
             
             # 3. Si no es gestor, buscar en /conductores/{uid} USANDO EL TOKEN
-            conductor_data = self.db.child('conductores').child(uid).get(token)
+            conductor_data = db.child('conductores').child(uid).get(token)
             
             if conductor_data.val():
                 return {
@@ -1,5 +1,6 @@
 from PySide6.QtCore import QObject, Signal
 from app.repositories.localizacionGPS_repository import LocalizacionGPSRepository
+from app.services.fleet_state_store import FleetStateStore
 
 
 class FirebaseListenerBridge(QObject):
@@ -7,8 +8,11 @@ class FirebaseListenerBridge(QObject):
     Bridge para emitir señales Qt desde el listener de Firebase.
     Firebase notifica en un thread separado, esta clase permite
     conectar esa notificación con el thread de la UI.
+    
+    Se reenvía el evento tal cual (tipo, ruta, datos) para que el estado
+    en memoria lo aplique sin volver a leer el nodo completo.
     """
-    ubicacion_actualizada = Signal()
+    evento_recibido = Signal(str, str, object)  # tipo_evento, ruta, datos
 
 
 class CommandCenterService:
@@ -23,27 +27,33 @@ class CommandCenterService:
         self.repo = LocalizacionGPSRepository()
         self.listener_activo = None
         self.bridge = FirebaseListenerBridge()
+        
+        # Estado de la flota en memoria (vive en el thread de la UI)
+        self.estado_flota = FleetStateStore()
     
     # =========================================================================
     # LISTENER DE FIREBASE
     # =========================================================================
     
-    def iniciar_listener(self, callback):
+    def iniciar_listener(self):
         """
         Inicia el listener de Firebase para actualizaciones GPS en tiempo real.
         
-        
-        
-        
-        Args:
-            callback: Función a llamar cuando haya actualización
+        Cada evento se aplica sobre estado_flota, que emite una señal
+        por vehículo (agregado/actualizado/eliminado). El primer evento
+        trae el nodo completo y provoca flota_reiniciada.
         """
         try:
             def on_cambio(event):
-                self.bridge.ubicacion_actualizada.emit()
+                # Thread de Firebase: solo reenviar, el bridge lo pasa a la UI
+                self.bridge.evento_recibido.emit(
+                    event.event_type,
+                    event.path or "/",
+                    event.data
+                )
             
-            # Conectar señal con el callback
-            self.bridge.ubicacion_actualizada.connect(callback)
+            # Conectar el bridge con el estado en memoria
+            self.bridge.evento_recibido.connect(self.estado_flota.aplicar_evento)
             
             # Crear listener
             self.listener_activo = self.repo.crear_listener(on_cambio)
@@ -63,7 +73,7 @@ class CommandCenterService:
         
         # Desconectar señal del bridge para evitar llamadas fantasma
         try:
-            self.bridge.ubicacion_actualizada.disconnect()
+            self.bridge.evento_recibido.disconnect()
         except Exception:
             pass
     
@@ -80,6 +90,25 @@ class CommandCenterService:
         """
         return self.repo.obtener_ubicaciones_activas()
     
+    def recargar_ubicaciones(self):
+        """
+        Descarga de nuevo todas las ubicaciones y reemplaza el estado en memoria.
+        Solo se usa en la recarga manual; el listener mantiene el estado al día.
+        """
+        self.estado_flota.reemplazar(self.descargar_ubicaciones())
+    
+    def descargar_ubicaciones(self):
+        """
+        Descarga todas las ubicaciones activas sin tocar el estado en memoria.
+        Se puede llamar desde un thread en segundo plano; el resultado se
+        aplica después con estado_flota.reemplazar() en el thread de la UI.
+        """
+        return self.repo.obtener_ubicaciones_activas()
+    
+    def obtener_ubicaciones_en_memoria(self):
+        """Devuelve las ubicaciones del estado en memoria (sin red)"""
+        return self.estado_flota.obtener_todas()
+    
     def preparar_datos_mapa(self, ubicaciones):
         """
         Convierte ubicaciones del repositorio al formato que necesita MapUtils.
@@ -94,6 +123,7 @@ class CommandCenterService:
         
         for ubicacion in ubicaciones:
             vehiculos.append({
+                'id_asignacion': ubicacion.id_localizacion or ubicacion.id_asignacion,
                 'latitud': ubicacion.latitud,
                 'longitud': ubicacion.longitud,
                 'matricula_vehiculo': ubicacion.matricula_vehiculo,
@@ -102,4 +132,31 @@ class CommandCenterService:
                 'timestamp': ubicacion.timestamp
             })
         
-        return vehiculos
\ No newline at end of file
+        return vehiculos
+    
+    def calcular_cambios(self, vehiculos_en_mapa, vehiculos):
+        """
+        Compara lo que ya está dibujado con las ubicaciones nuevas.
+        
+        Args:
+            vehiculos_en_mapa: Dict {id_asignacion: datos} de lo que hay en el mapa
+            vehiculos: Lista de dicts de preparar_datos_mapa()
+            
+        Returns:
+            (upserts, removes, nuevo_estado)
+            - upserts: vehículos nuevos o que han cambiado
+            - removes: IDs de asignación que ya no están activos
+            - nuevo_estado: dict a guardar como vehiculos_en_mapa
+        """
+        nuevo_estado = {v['id_asignacion']: v for v in vehiculos}
+        
+        upserts = [
+            v for id_asignacion, v in nuevo_estado.items()
+            if vehiculos_en_mapa.get(id_asignacion) != v
+        ]
+        removes = [
+            id_asignacion for id_asignacion in vehiculos_en_mapa
+            if id_asignacion not in nuevo_estado
+        ]
+        
+        return upserts, removes, nuevo_estado
@@ -187,8 +187,7 @@ class ConductoresService:
     
     def obtener_disponibles(self):
         """Obtiene solo conductores disponibles"""
-        todos = self.repo.obtener_todos()
-        return [c for c in todos if c.estado == "Disponible"]
+        return self.repo.obtener_por_estado("Disponible")
     
     # =========================================================================
     # MÉTODOS AUXILIARES
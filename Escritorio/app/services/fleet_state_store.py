@@ -0,0 +1,102 @@
+from PySide6.QtCore import QObject, Signal
+from app.models.localizacionGPS import LocalizacionGPS
+from app.utils.firebase_event_utils import FirebaseEventUtils
+
+
+class FleetStateStore(QObject):
+    """
+    Estado de la flota en memoria (última ubicación de cada asignación).
+
+    Se alimenta con los eventos del listener de /localizaciones_actuales:
+    cada evento se aplica sobre la copia local y se avisa solo del vehículo
+    que ha cambiado, sin volver a descargar el nodo completo.
+
+    Debe usarse desde el thread de la UI (el bridge del servicio se encarga
+    de pasar los eventos de Firebase a ese thread).
+    """
+
+    # ========== SEÑALES ==========
+    vehiculo_agregado = Signal(object)     # LocalizacionGPS
+    vehiculo_actualizado = Signal(object)  # LocalizacionGPS
+    vehiculo_eliminado = Signal(str)       # Clave en /localizaciones_actuales
+    flota_reiniciada = Signal()            # Se sustituyó el estado completo
+
+    def __init__(self):
+        super().__init__()
+        # {clave Firebase: dict con los datos tal y como están en Firebase}
+        # (la clave de /localizaciones_actuales es el id de la asignación)
+        self._datos = {}
+
+    # =========================================================================
+    # APLICAR CAMBIOS
+    # =========================================================================
+
+    def aplicar_evento(self, tipo_evento, ruta, datos):
+        """
+        Aplica un evento put/patch del listener de Firebase.
+
+        Args:
+            tipo_evento: 'put' o 'patch'
+            ruta: Ruta relativa a /localizaciones_actuales
+            datos: Datos del evento (None = borrado)
+        """
+        existian = set(self._datos.keys())
+
+        reiniciado, afectadas = FirebaseEventUtils.aplicar_evento(
+            self._datos, tipo_evento, ruta, datos
+        )
+
+        if reiniciado:
+            self.flota_reiniciada.emit()
+            return
+
+        for id_asignacion in afectadas:
+            if id_asignacion not in self._datos:
+                if id_asignacion in existian:
+                    self.vehiculo_eliminado.emit(id_asignacion)
+            elif id_asignacion in existian:
+                self.vehiculo_actualizado.emit(self.obtener(id_asignacion))
+            else:
+                self.vehiculo_agregado.emit(self.obtener(id_asignacion))
+
+    def reemplazar(self, ubicaciones):
+        """
+        Sustituye todo el estado (por ejemplo tras una recarga manual).
+
+        Args:
+            ubicaciones: Lista de objetos LocalizacionGPS
+        """
+        self._datos = {}
+        for ubicacion in ubicaciones:
+            # La clave es la de Firebase (igual que en el listener)
+            clave = ubicacion.id_localizacion or ubicacion.id_asignacion
+            self._datos[clave] = ubicacion.to_dict()
+
+        self.flota_reiniciada.emit()
+
+    # =========================================================================
+    # CONSULTAS
+    # =========================================================================
+
+    def obtener(self, id_asignacion):
+        """Devuelve la LocalizacionGPS de una asignación o None"""
+        datos = self._datos.get(id_asignacion)
+        if not isinstance(datos, dict):
+            return None
+
+        localizacion = LocalizacionGPS.from_dict(id_asignacion, datos)
+        if not localizacion.id_asignacion:
+            localizacion.id_asignacion = id_asignacion
+        return localizacion
+
+    def obtener_todas(self):
+        """Devuelve la lista de LocalizacionGPS en memoria"""
+        lista = []
+        for id_asignacion in self._datos:
+            localizacion = self.obtener(id_asignacion)
+            if localizacion:
+                lista.append(localizacion)
+        return lista
+
+    def __len__(self):
+        return len(self._datos)
@@ -194,6 +194,14 @@ class IncidenciasService:
         """Obtiene todas las incidencias"""
         return self.repo_incidencias.obtener_todas()
     
+    def forzar_recarga(self):
+        """
+        Descarta la caché local de incidencias.
+        Las crean también los conductores desde la app móvil, así que la
+        recarga manual debe ir siempre a Firebase.
+        """
+        self.repo_incidencias.dao.invalidar_cache()
+    
     def obtener_por_id(self, id_incidencia):
         """Obtiene una incidencia por ID"""
         return self.repo_incidencias.obtener_por_id(id_incidencia)
@@ -208,12 +216,10 @@ class IncidenciasService:
         Returns:
             Lista de incidencias filtradas
         """
-        todas = self.repo_incidencias.obtener_todas()
-        
         if estado == "Todas":
-            return todas
+            return self.repo_incidencias.obtener_todas()
         
-        return [inc for inc in todas if inc.estado == estado]
+        return self.repo_incidencias.obtener_por_estado(estado)
     
     def obtener_pendientes(self):
         """Obtiene solo incidencias pendientes"""
@@ -6,7 +6,7 @@ push notifications a los conductores cuando se les asigna una ruta
 o cuando hay actualizaciones de incidencias.
 """
 import requests
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from app.config.config import API_NOTIFICACIONES_URL
 
 
@@ -16,6 +16,7 @@ class NotificacionesAPIService:
     
     Endpoints:
     - POST /ruta-asignada: Notifica a conductor de nueva ruta
+    - POST /rutas-asignadas: Notifica muchas asignaciones en una sola peticion
     - POST /incidencia-nueva: Notifica a gestor de nueva incidencia
     - POST /incidencia-actualizada: Notifica a conductor de actualizacion
     """
@@ -24,13 +25,14 @@ class NotificacionesAPIService:
         self.base_url = API_NOTIFICACIONES_URL
         self.timeout = 2  # segundos
     
-    def _hacer_peticion(self, endpoint: str, datos: dict) -> Tuple[bool, str]:
+    def _hacer_peticion(self, endpoint: str, datos: dict, timeout: Optional[float] = None) -> Tuple[bool, str]:
         """
         Realiza una peticion POST a la API.
         
         Args:
             endpoint: Ruta del endpoint (ej: "/ruta-asignada")
             datos: Diccionario con los datos a enviar
+            timeout: Segundos de espera (por defecto self.timeout)
             
         Returns:
             Tupla (exito, mensaje)
@@ -41,12 +43,15 @@ class NotificacionesAPIService:
             response = requests.post(
                 url,
                 json=datos,
-                timeout=self.timeout,
+                timeout=timeout or self.timeout,
                 headers={"Content-Type": "application/json"}
             )
             
             if response.status_code == 200:
                 resultado = response.json()
+                # Lotes: la API responde 200 aunque fallen algunas
+                if resultado.get("fallidas"):
+                    return False, resultado.get("mensaje", "Algunas notificaciones no se enviaron")
                 return True, resultado.get("mensaje", "Notificacion enviada")
             else:
                 # Error de la API
@@ -81,6 +86,29 @@ class NotificacionesAPIService:
         }
         return self._hacer_peticion("/ruta-asignada", datos)
     
+    def notificar_rutas_asignadas(self, asignaciones: List[Tuple[str, str]]) -> Tuple[bool, str]:
+        """
+        Notifica de una vez muchas asignaciones (importacion masiva).
+        
+        Args:
+            asignaciones: Lista de tuplas (id_conductor, id_ruta)
+            
+        Returns:
+            Tupla (exito, mensaje). exito es False si falla alguna
+            (mensaje: "X de N notificaciones enviadas")
+        """
+        if not asignaciones:
+            return True, "Sin notificaciones que enviar"
+        
+        datos = {
+            "asignaciones": [
+                {"id_conductor": id_conductor, "id_ruta": id_ruta}
+                for id_conductor, id_ruta in asignaciones
+            ]
+        }
+        # El servidor envia todo el lote a FCM: se le da mas margen
+        return self._hacer_peticion("/rutas-asignadas", datos, timeout=self.timeout * 5)
+    
     def notificar_incidencia_asignada(self, id_incidencia: str) -> Tuple[bool, str]:
         """
         Notifica al conductor de una nueva incidencia registrada por el gestor.
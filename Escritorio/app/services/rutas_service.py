@@ -13,6 +13,10 @@ NO SE ENCARGA DE:
 """
 from app.models.ruta import Ruta
 from app.repositories.ruta_repository import RutaRepository
+from app.utils.enrutador_viario import EnrutadorViario
+from app.utils.geo_utils import GeoUtils
+from app.utils.geometria_rutas import GeometriaRutas
+from app.utils.optimizador_rutas import OptimizadorRutas
 
 
 class RutasService:
@@ -27,13 +31,19 @@ class RutasService:
     # VALIDACIONES
     # =========================================================================
     
-    def validar_ruta(self, nombre, origen, paradas, fecha, hora_inicio, hora_fin):
+    def validar_ruta(self, nombre, origen, origen_coords, paradas, fecha, hora_inicio, hora_fin):
         """
         Valida que una ruta tenga todos los datos correctos.
         
+        Solo comprueba el formulario (no calcula tramos). Que la ruta quepa
+        en la franja horaria lo comprueban crear_ruta y actualizar_ruta con
+        la duración que calculan al guardar (ver validar_franja).
+        
         Args:
             nombre: Nombre de la ruta
             origen: Dirección de origen
+            origen_coords: [lat, lon] del origen geocodificado (None si el
+                           texto del origen cambió y no se ha vuelto a buscar)
             paradas: Lista de paradas
             fecha: Fecha de la ruta
             hora_inicio: Hora de inicio
@@ -51,6 +61,11 @@ class RutasService:
         if not origen or not origen.strip():
             return (False, "Define un punto de origen.")
         
+        # El origen tiene que estar geocodificado: las coordenadas son las
+        # que se guardan y las que usan mapa, duración y optimización
+        if not GeoUtils.es_coordenada(origen_coords):
+            return (False, "Busca el origen en el mapa antes de guardar.")
+        
         # Validar paradas
         if not paradas or len(paradas) == 0:
             return (False, "Añade al menos una parada.")
@@ -84,6 +99,62 @@ class RutasService:
         
         return (True, "")
     
+    def validar_franja(self, ruta):
+        """
+        Comprueba que la duración estimada (ruta.duracion_min, ya calculada)
+        quepa entre la hora de inicio y la de fin.
+        
+        Returns:
+            (True, "") si cabe o no hay estimación
+            (False, "mensaje de error") si no cabe
+        """
+        if not ruta.duracion_min:
+            return (True, "")
+        
+        try:
+            h_inicio = ruta.hora_inicio_prevista.split(":")
+            h_fin = ruta.hora_fin_prevista.split(":")
+            franja = (int(h_fin[0]) * 60 + int(h_fin[1])) - (int(h_inicio[0]) * 60 + int(h_inicio[1]))
+        except (AttributeError, IndexError, ValueError):
+            return (False, "Formato de hora inválido.")
+        
+        if ruta.duracion_min > franja:
+            return (False,
+                    f"La ruta necesita unos {GeometriaRutas.formatear_duracion(ruta.duracion_min)} "
+                    f"y la franja horaria es de {GeometriaRutas.formatear_duracion(franja)}.")
+        return (True, "")
+    
+    # =========================================================================
+    # DISTANCIAS Y TIEMPOS
+    # =========================================================================
+    
+    def geometria_mapa(self, origen_coords, paradas):
+        """
+        Línea del recorrido por carretera para el mapa.
+        
+        Bloquea (A* de los tramos que no estén en caché): llamar desde un
+        thread del pool.
+        
+        Returns:
+            [[lat, lon], ...] o None si no hay grafo viario
+        """
+        return EnrutadorViario.geometria(GeometriaRutas.puntos_recorrido(origen_coords, paradas))
+    
+    def calcular_geometria(self, ruta):
+        """
+        Recalcula bbox, distancia_km y duracion_min de una ruta. Con grafo
+        viario, distancia y duración son por carretera.
+        """
+        ruta.calcular_geometria()
+        
+        por_carretera = EnrutadorViario.estimar(ruta.puntos())
+        if por_carretera is not None:
+            km, minutos = por_carretera
+            ruta.distancia_km = round(km, 2)
+            ruta.duracion_min = int(round(
+                minutos + GeometriaRutas.MINUTOS_POR_PARADA * len(ruta.paradas or [])
+            ))
+    
     # =========================================================================
     # CREAR RUTA
     # =========================================================================
@@ -93,6 +164,9 @@ class RutasService:
         Crea una nueva ruta.
         
         NOTA: Se asume que los datos ya fueron validados en el controlador.
+        Aquí se calcula la duración (una vez) y se comprueba la franja
+        horaria. Puede calcular tramos por carretera: llamar desde un
+        thread del pool.
         
         Args:
             ruta: Objeto Ruta con los datos
@@ -102,6 +176,11 @@ class RutasService:
             (False, None, "mensaje de error") si falla
         """
         try:
+            self.calcular_geometria(ruta)
+            valido, mensaje = self.validar_franja(ruta)
+            if not valido:
+                return (False, None, mensaje)
+            
             if self.repo.guardar_ruta(ruta):
                 return (True, ruta, "Ruta creada correctamente.")
             else:
@@ -119,6 +198,7 @@ class RutasService:
         Actualiza una ruta existente.
         
         NOTA: Se asume que los datos ya fueron validados en el controlador.
+        Como crear_ruta, calcula la duración y comprueba la franja horaria.
         
         Args:
             ruta: Objeto Ruta con los datos actualizados
@@ -128,6 +208,11 @@ class RutasService:
             (False, "mensaje de error") si falla
         """
         try:
+            self.calcular_geometria(ruta)
+            valido, mensaje = self.validar_franja(ruta)
+            if not valido:
+                return (False, mensaje)
+            
             if self.repo.actualizar_ruta(ruta):
                 return (True, "Ruta actualizada correctamente.")
             else:
@@ -136,6 +221,136 @@ class RutasService:
         except Exception as e:
             return (False, f"Error: {str(e)}")
     
+    # =========================================================================
+    # OPTIMIZAR ORDEN DE PARADAS
+    # =========================================================================
+    
+    # Criterios de optimizar_paradas
+    CRITERIO_KM = "km"
+    CRITERIO_MINUTOS = "min"
+    
+    def optimizar_paradas(self, origen_coords, paradas, volver_al_origen=False, criterio=CRITERIO_KM):
+        """
+        Reordena las paradas para recorrer la menor distancia o tardar el
+        menor tiempo posible.
+        
+        El origen se queda fijo como punto de salida.
+        - criterio "km": distancias en línea recta (haversine)
+        - criterio "min": minutos de conducción por carretera si hay grafo
+          viario local (los mismos tiempos que la ETA); si no, el perfil de
+          velocidad de GeometriaRutas sobre las distancias en línea recta
+        
+        Con grafo viario calcula tramos por carretera: llamar desde un
+        thread del pool.
+        
+        Args:
+            origen_coords: [lat, lon] del origen
+            paradas: Lista de dicts {'direccion', 'coords', 'orden'}
+            volver_al_origen: Si True el recorrido termina en el origen
+            criterio: CRITERIO_KM o CRITERIO_MINUTOS
+            
+        Returns:
+            (True, paradas_ordenadas, "mensaje") si éxito
+            (False, None, "mensaje de error") si falla
+        """
+        if criterio not in (self.CRITERIO_KM, self.CRITERIO_MINUTOS):
+            return (False, None, f"Criterio de optimización desconocido: {criterio}")
+        
+        if not GeoUtils.es_coordenada(origen_coords):
+            return (False, None, "Define un punto de origen.")
+        
+        if not paradas or len(paradas) < 2:
+            return (False, None, "Añade al menos dos paradas para optimizar.")
+        
+        for i, parada in enumerate(paradas):
+            if not GeoUtils.es_coordenada(parada.get('coords')):
+                return (False, None, f"La parada {i+1} no tiene coordenadas.")
+        
+        try:
+            puntos = [list(origen_coords)] + [list(p['coords']) for p in paradas]
+            costes = self._matriz_costes(puntos, criterio)
+            
+            # 2-opt supone costes simétricos: con tiempos por carretera
+            # (sentidos únicos) se optimiza sobre la media de ida y vuelta
+            # y se compara con los costes reales
+            orden = OptimizadorRutas.optimizar((costes + costes.T) / 2.0, volver_al_origen)
+            
+            actual = list(range(len(puntos)))
+            nuevo = [0] + orden
+            if volver_al_origen:
+                actual.append(0)
+                nuevo.append(0)
+            
+            antes = OptimizadorRutas.coste(costes, actual)
+            despues = OptimizadorRutas.coste(costes, nuevo)
+            
+            if despues >= antes - OptimizadorRutas.EPSILON:
+                return (True, list(paradas), "Las paradas ya están en el mejor orden encontrado.")
+            
+            ordenadas = []
+            for posicion, indice in enumerate(orden, start=1):
+                parada = dict(paradas[indice - 1])
+                parada['orden'] = posicion
+                ordenadas.append(parada)
+            
+            if criterio == self.CRITERIO_KM:
+                resumen = f"{antes:.1f} km → {despues:.1f} km"
+            else:
+                resumen = (f"{GeometriaRutas.formatear_duracion(antes)} → "
+                           f"{GeometriaRutas.formatear_duracion(despues)} de conducción")
+            return (True, ordenadas, f"Recorrido optimizado: {resumen}.")
+        
+        except Exception as e:
+            return (False, None, f"Error: {str(e)}")
+    
+    def _matriz_costes(self, puntos, criterio):
+        """Matriz de km o de minutos entre todos los puntos"""
+        if criterio == self.CRITERIO_MINUTOS:
+            por_carretera = EnrutadorViario.matriz_minutos(puntos)
+            if por_carretera is not None:
+                return por_carretera
+            return GeometriaRutas.duracion_tramos_min(GeoUtils.matriz_distancias_km(puntos))
+        return GeoUtils.matriz_distancias_km(puntos)
+    
+    # =========================================================================
+    # GEOMETRÍA (MIGRACIÓN DE RUTAS ANTIGUAS)
+    # =========================================================================
+    
+    def obtener_sin_geometria(self):
+        """Rutas guardadas antes de existir origen_coords"""
+        return [ruta for ruta in self.repo.obtener_todas() if not ruta.tiene_geometria()]
+    
+    def migrar_geometria(self, geocodificar, rutas=None):
+        """
+        Completa origen_coords, bbox, distancia_km y duracion_min de las rutas que no los tienen.
+        
+        Args:
+            geocodificar: Función (direccion) -> [lat, lon] o None. La
+                          geocodificación no es cosa de este servicio.
+            rutas: Rutas a migrar (por defecto obtener_sin_geometria())
+            
+        Returns:
+            (migradas, fallidas): listas de rutas
+        """
+        migradas = []
+        fallidas = []
+        
+        for ruta in (self.obtener_sin_geometria() if rutas is None else rutas):
+            coords = geocodificar(ruta.origen) if ruta.origen else None
+            if not coords:
+                fallidas.append(ruta)
+                continue
+            
+            ruta.origen_coords = list(coords)
+            self.calcular_geometria(ruta)
+            
+            if self.repo.actualizar_geometria(ruta):
+                migradas.append(ruta)
+            else:
+                fallidas.append(ruta)
+        
+        return (migradas, fallidas)
+    
     # =========================================================================
     # ELIMINAR RUTA
     # =========================================================================
@@ -174,5 +389,4 @@ class RutasService:
     
     def obtener_pendientes(self):
         """Obtiene solo rutas pendientes"""
-        todas = self.repo.obtener_todas()
-        return [r for r in todas if r.estado == "Pendiente"]
\ No newline at end of file
+        return self.repo.obtener_por_estado("Pendiente")
\ No newline at end of file
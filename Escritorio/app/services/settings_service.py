@@ -13,6 +13,10 @@ class SettingsService:
             "theme": "Oscuro", 
             "empresa_direccion": "",
             "empresa_coords": None,
+            "mapa_max_fps": 4,
+            "precargar_vistas": True,
+            "geocoding_backend": "nominatim",
+            "geocoding_url": "",
             "user": None
         }
         
@@ -0,0 +1,49 @@
+from PySide6.QtCore import QObject, Signal
+from app.data.replica_local import replica_local
+from app.utils.workers import GestorTareas
+
+
+class SincronizacionBridge(QObject):
+    """
+    Bridge para pasar los cambios de la réplica local al thread de la UI.
+    Los listeners de Firebase notifican en threads separados.
+    """
+    coleccion_cambiada = Signal(str, object)  # coleccion, set de IDs o None
+
+
+class SincronizacionService:
+    """
+    Servicio que arranca la réplica local de colecciones y avisa a la UI
+    de los cambios remotos (otros gestores o la app móvil).
+    """
+
+    def __init__(self):
+        self.bridge = SincronizacionBridge()
+        self.coleccion_cambiada = self.bridge.coleccion_cambiada
+        self.tareas = GestorTareas()
+
+    def iniciar(self):
+        """
+        Inicia la sincronización en segundo plano: espera al Admin SDK y
+        abre un stream por colección en un thread del pool, sin bloquear
+        la UI. Mientras tanto los DAOs siguen leyendo de la red.
+        """
+        generacion = replica_local.generacion
+        self.tareas.ejecutar(
+            lambda: replica_local.iniciar(self._on_cambio, generacion=generacion),
+            al_fallar=lambda e: print(f"Error iniciando sincronización: {e}"),
+            clave="iniciar"
+        )
+
+    def detener(self):
+        """Detiene los listeners de la réplica (también si aún se están abriendo)"""
+        self.tareas.cancelar()
+        replica_local.detener()
+
+    def esta_sincronizada(self, coleccion):
+        """True si la colección ya se sirve desde la réplica local"""
+        return replica_local.sincronizada(coleccion)
+
+    def _on_cambio(self, coleccion, claves):
+        # Thread de Firebase: solo reenviar a la UI
+        self.bridge.coleccion_cambiada.emit(coleccion, claves)
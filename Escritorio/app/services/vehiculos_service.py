@@ -162,5 +162,4 @@ class VehiculosService:
     
     def obtener_disponibles(self):
         """Obtiene solo vehículos disponibles"""
-        todos = self.repo.obtener_todos()
-        return [v for v in todos if v.estado == "Disponible"]
\ No newline at end of file
+        return self.repo.obtener_por_estado("Disponible")
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+EnrutadorViario - Tramos por carretera con el grafo viario local
+
+Une el grafo (app/data/grafo_viario.py) y la caché de tramos
+(app/data/cache_tramos.py):
+1. Busca el tramo en la caché
+2. Si no está, engancha cada extremo al nodo más cercano y calcula el
+   camino con A*
+3. Guarda el resultado (también los tramos sin camino)
+
+Sin grafo importado todas las funciones devuelven None y quien llama usa
+las distancias en línea recta (GeometriaRutas).
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.data.cache_tramos import cache_tramos
+from app.data.grafo_viario import grafo_viario
+
+
+class EnrutadorViario:
+    """
+    Rutas por carretera sin servicios externos.
+    """
+
+    # Del punto al nodo más cercano (aparcamiento, acceso): despacio
+    VELOCIDAD_ACCESO_KMH = 15.0
+
+    @staticmethod
+    def disponible() -> bool:
+        """True si hay un grafo viario importado"""
+        return grafo_viario.disponible()
+
+    # =========================================================================
+    # TRAMOS
+    # =========================================================================
+
+    @staticmethod
+    def tramo(origen: Sequence[float], destino: Sequence[float]) -> Optional[dict]:
+        """
+        Camino por carretera entre dos puntos.
+
+        Returns:
+            {'metros', 'segundos', 'geometria': [[lat, lon], ...]} o None si
+            no hay grafo o no hay camino
+        """
+        version = grafo_viario.version
+        if version is None:
+            return None
+
+        encontrado, valor = cache_tramos.obtener(version, origen, destino)
+        if encontrado:
+            if valor is None:
+                return None
+            metros, segundos, geometria = valor
+            return {'metros': metros, 'segundos': segundos, 'geometria': geometria}
+
+        resultado = EnrutadorViario._calcular(origen, destino)
+        if resultado is None:
+            cache_tramos.guardar(version, origen, destino)
+        else:
+            cache_tramos.guardar(version, origen, destino, resultado['metros'],
+                                 resultado['segundos'], resultado['geometria'])
+        return resultado
+
+    @staticmethod
+    def _calcular(origen, destino):
+        """A* entre los nodos más cercanos a origen y destino"""
+        inicio = grafo_viario.nodo_mas_cercano(origen[0], origen[1])
+        fin = grafo_viario.nodo_mas_cercano(destino[0], destino[1])
+        if inicio is None or fin is None:
+            return None
+
+        camino = grafo_viario.ruta_mas_corta(inicio[0], fin[0])
+        if camino is None:
+            return None
+
+        segundos, metros, nodos = camino
+        acceso_m = inicio[1] + fin[1]
+        segundos += acceso_m / (EnrutadorViario.VELOCIDAD_ACCESO_KMH / 3.6)
+        metros += acceso_m
+
+        geometria = [list(origen)] + grafo_viario.coordenadas(nodos) + [list(destino)]
+        return {'metros': metros, 'segundos': segundos, 'geometria': geometria}
+
+    # =========================================================================
+    # RECORRIDOS (VARIOS TRAMOS)
+    # =========================================================================
+
+    @staticmethod
+    def recorrido(puntos: Sequence[Sequence[float]]) -> Optional[List[Optional[dict]]]:
+        """
+        Tramos entre puntos consecutivos.
+
+        Returns:
+            Lista de tramos (None en los que no tienen camino) o None si no
+            hay grafo
+        """
+        if len(puntos) < 2 or not EnrutadorViario.disponible():
+            return None
+        return [EnrutadorViario.tramo(a, b) for a, b in zip(puntos, puntos[1:])]
+
+    @staticmethod
+    def estimar(puntos: Sequence[Sequence[float]]):
+        """
+        Distancia y tiempo de conducción por carretera.
+
+        Returns:
+            (km, minutos) o None si falta el grafo o algún tramo no tiene camino
+        """
+        tramos = EnrutadorViario.recorrido(puntos)
+        if not tramos or any(t is None for t in tramos):
+            return None
+        return (sum(t['metros'] for t in tramos) / 1000.0,
+                sum(t['segundos'] for t in tramos) / 60.0)
+
+    @staticmethod
+    def geometria(puntos: Sequence[Sequence[float]]) -> Optional[List[List[float]]]:
+        """
+        Línea del recorrido siguiendo las carreteras (para el mapa). Los
+        tramos sin camino se dibujan en línea recta.
+
+        Returns:
+            [[lat, lon], ...] o None si no hay grafo
+        """
+        tramos = EnrutadorViario.recorrido(puntos)
+        if tramos is None:
+            return None
+
+        linea = [list(puntos[0])]
+        for b, tramo in zip(puntos[1:], tramos):
+            linea.extend(tramo['geometria'][1:] if tramo else [list(b)])
+        return linea
+
+    # =========================================================================
+    # MATRICES (OPTIMIZACIÓN DE PARADAS)
+    # =========================================================================
+
+    @staticmethod
+    def matriz_minutos(puntos: Sequence[Sequence[float]]) -> Optional[np.ndarray]:
+        """
+        Minutos de conducción por carretera entre cada par de puntos. Una
+        búsqueda por punto (grafo_viario.tiempos_desde) en lugar de un A*
+        por pareja. No es simétrica (sentidos únicos).
+
+        Bloquea: llamar desde un thread del pool.
+
+        Returns:
+            ndarray (n, n) o None si no hay grafo o algún punto no tiene
+            camino a otro
+        """
+        if len(puntos) < 2 or not EnrutadorViario.disponible():
+            return None
+
+        cercanos = [grafo_viario.nodo_mas_cercano(p[0], p[1]) for p in puntos]
+        if any(c is None for c in cercanos):
+            return None
+
+        nodos = [c[0] for c in cercanos]
+        acceso_s = np.array([c[1] for c in cercanos]) / (EnrutadorViario.VELOCIDAD_ACCESO_KMH / 3.6)
+
+        matriz = np.array([grafo_viario.tiempos_desde(nodo, nodos) for nodo in nodos], dtype=np.float64)
+        if not np.isfinite(matriz).all():
+            return None
+
+        matriz += acceso_s[:, None] + acceso_s[None, :]
+        np.fill_diagonal(matriz, 0.0)
+        return matriz / 60.0
@@ -0,0 +1,99 @@
+"""
+FirebaseEventUtils - Utilidades para eventos de listeners en tiempo real
+
+Los listeners de Firebase (Admin SDK) notifican cada cambio como un evento
+con tipo ('put' o 'patch'), una ruta relativa al nodo escuchado y los datos.
+Estas utilidades aplican ese evento sobre una copia local en memoria,
+de forma que no hace falta volver a descargar el nodo completo.
+"""
+from typing import Any, Dict, List, Set, Tuple
+
+
+class FirebaseEventUtils:
+    """
+    Aplica eventos put/patch sobre un dict local {clave_hijo: datos}.
+    """
+
+    @staticmethod
+    def dividir_ruta(ruta: str) -> List[str]:
+        """
+        Convierte una ruta de Firebase en segmentos.
+
+        Ejemplo: "/abc123/latitud" -> ["abc123", "latitud"]
+        """
+        if not ruta:
+            return []
+        return [segmento for segmento in ruta.split("/") if segmento]
+
+    @staticmethod
+    def aplicar_evento(
+        datos: Dict[str, Any],
+        tipo_evento: str,
+        ruta: str,
+        valor: Any
+    ) -> Tuple[bool, Set[str]]:
+        """
+        Aplica un evento de Firebase sobre el dict local (se modifica in situ).
+
+        Args:
+            datos: Dict con los hijos directos del nodo escuchado
+            tipo_evento: 'put' o 'patch'
+            ruta: Ruta del evento relativa al nodo (ej: "/", "/id", "/id/campo")
+            valor: Datos del evento (None significa borrado)
+
+        Returns:
+            (reiniciado, claves_afectadas)
+            - reiniciado: True si el evento sustituyó el nodo completo
+            - claves_afectadas: claves de primer nivel que han cambiado
+        """
+        segmentos = FirebaseEventUtils.dividir_ruta(ruta)
+
+        # Put en la raíz: es la carga inicial o un reemplazo completo
+        if not segmentos and tipo_evento == "put":
+            claves_anteriores = set(datos.keys())
+            datos.clear()
+            if isinstance(valor, dict):
+                datos.update(valor)
+            return True, claves_anteriores | set(datos.keys())
+
+        afectadas = set()
+
+        if tipo_evento == "patch":
+            # En un patch cada clave puede ser a su vez una ruta ("id/campo")
+            for clave, sub_valor in (valor or {}).items():
+                destino = segmentos + FirebaseEventUtils.dividir_ruta(clave)
+                if destino:
+                    FirebaseEventUtils._asignar(datos, destino, sub_valor)
+                    afectadas.add(destino[0])
+        else:
+            FirebaseEventUtils._asignar(datos, segmentos, valor)
+            afectadas.add(segmentos[0])
+
+        return False, afectadas
+
+    @staticmethod
+    def _asignar(nodo: Dict[str, Any], segmentos: List[str], valor: Any):
+        """
+        Escribe (o borra si valor es None) el valor en la ruta indicada.
+        Igual que en Firebase, un nodo que se queda sin hijos desaparece.
+        """
+        clave = segmentos[0]
+
+        if len(segmentos) == 1:
+            if valor is None:
+                nodo.pop(clave, None)
+            else:
+                nodo[clave] = valor
+            return
+
+        hijo = nodo.get(clave)
+        if not isinstance(hijo, dict):
+            if valor is None:
+                return
+            hijo = {}
+            nodo[clave] = hijo
+
+        FirebaseEventUtils._asignar(hijo, segmentos[1:], valor)
+
+        if not hijo:
+            del nodo[clave]
@@ -0,0 +1,136 @@
+"""
+GeoUtils - Cálculos geográficos sencillos
+
+Distancias en línea recta (haversine) y caja envolvente de una lista de
+puntos [lat, lon]. No hace peticiones de red.
+
+distancias_tramos_km y matriz_distancias_km calculan muchas distancias de
+una vez con NumPy (geometría de rutas y optimizador).
+"""
+import math
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+class GeoUtils:
+    """
+    Utilidades de geometría sobre coordenadas [latitud, longitud].
+    """
+
+    RADIO_TIERRA_KM = 6371.0088
+
+    # =========================================================================
+    # DISTANCIAS
+    # =========================================================================
+
+    @staticmethod
+    def haversine_km(a: Sequence[float], b: Sequence[float]) -> float:
+        """
+        Distancia en línea recta (círculo máximo) entre dos puntos.
+
+        Args:
+            a: [lat, lon] en grados
+            b: [lat, lon] en grados
+
+        Returns:
+            Distancia en kilómetros
+        """
+        lat1, lon1 = math.radians(a[0]), math.radians(a[1])
+        lat2, lon2 = math.radians(b[0]), math.radians(b[1])
+
+        dlat = lat2 - lat1
+        dlon = lon2 - lon1
+        h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+
+        return 2 * GeoUtils.RADIO_TIERRA_KM * math.asin(min(1.0, math.sqrt(h)))
+
+    @staticmethod
+    def distancia_recorrido_km(puntos: Sequence[Sequence[float]]) -> float:
+        """
+        Suma de las distancias entre puntos consecutivos.
+
+        Args:
+            puntos: Lista de [lat, lon] en orden de recorrido
+
+        Returns:
+            Kilómetros totales (0 si hay menos de dos puntos)
+        """
+        total = 0.0
+        for anterior, siguiente in zip(puntos, puntos[1:]):
+            total += GeoUtils.haversine_km(anterior, siguiente)
+        return total
+
+    @staticmethod
+    def distancias_tramos_km(puntos: Sequence[Sequence[float]]) -> np.ndarray:
+        """
+        Distancia de cada tramo entre puntos consecutivos, de una vez.
+
+        Args:
+            puntos: Lista (o array (n, 2)) de [lat, lon] en grados
+
+        Returns:
+            ndarray float64 (n-1,) en kilómetros (vacío si hay menos de dos puntos)
+        """
+        coords = np.radians(np.asarray(puntos, dtype=np.float64).reshape(-1, 2))
+        if len(coords) < 2:
+            return np.zeros(0)
+
+        lat1, lon1 = coords[:-1, 0], coords[:-1, 1]
+        lat2, lon2 = coords[1:, 0], coords[1:, 1]
+        h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+
+        return 2 * GeoUtils.RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+    @staticmethod
+    def matriz_distancias_km(puntos: Sequence[Sequence[float]]) -> np.ndarray:
+        """
+        Matriz n x n de distancias haversine entre todos los puntos.
+
+        Args:
+            puntos: Lista de [lat, lon] en grados
+
+        Returns:
+            ndarray float64 (n, n) en kilómetros, con ceros en la diagonal
+        """
+        coords = np.radians(np.asarray(puntos, dtype=np.float64).reshape(-1, 2))
+        lat = coords[:, 0]
+        lon = coords[:, 1]
+
+        dlat = lat[:, None] - lat[None, :]
+        dlon = lon[:, None] - lon[None, :]
+        h = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+
+        return 2 * GeoUtils.RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+    # =========================================================================
+    # CAJA ENVOLVENTE
+    # =========================================================================
+
+    @staticmethod
+    def bbox(puntos: Sequence[Sequence[float]]) -> Optional[List[float]]:
+        """
+        Caja envolvente de los puntos.
+
+        Returns:
+            [lat_min, lon_min, lat_max, lon_max] o None si no hay puntos
+        """
+        if not puntos:
+            return None
+
+        latitudes = [p[0] for p in puntos]
+        longitudes = [p[1] for p in puntos]
+        return [min(latitudes), min(longitudes), max(latitudes), max(longitudes)]
+
+    # =========================================================================
+    # CONVERSIONES
+    # =========================================================================
+
+    @staticmethod
+    def es_coordenada(valor) -> bool:
+        """True si valor es un par [lat, lon] numérico y dentro de rango"""
+        try:
+            lat, lon = float(valor[0]), float(valor[1])
+        except (TypeError, ValueError, IndexError):
+            return False
+        return -90 <= lat <= 90 and -180 <= lon <= 180
@@ -3,11 +3,54 @@ GeocodingUtils - Utilidades para geocodificación
 
 Maneja la conversión de direcciones a coordenadas geográficas.
 Proporciona geocodificación asíncrona para no bloquear la UI.
+Antes de ir a Nominatim se consulta la caché persistente (geocoding_cache).
+
+- GeocodingThread: una dirección (buscar origen / añadir parada)
+- GeocodificadorLotes: muchas direcciones (ej: CSV de paradas), sin
+  duplicados, respetando el límite de peticiones del proveedor y con
+  resultados en el mismo orden de entrada
+- GeocodingLoteThread: GeocodificadorLotes en un QThread, con señales
+
+Backends (cualquier objeto con geocode(direccion) -> Location | None, la
+interfaz de geopy), elegidos en settings.json con "geocoding_backend":
+- "nominatim": Nominatim público, o uno propio si hay "geocoding_url"
+- "local": nomenclátor sin conexión (app/data/gazetteer_local.py)
+- "local+nominatim": primero el local y, si no lo encuentra, Nominatim
+
+Ningún thread se mata con terminate(): se cancelan de forma cooperativa y
+su resultado se descarta.
 """
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Tuple
+
 from PySide6.QtCore import QThread, Signal
 from geopy.geocoders import Nominatim
 from geopy.location import Location
-from typing import Optional, Tuple
+
+from app.data.geocoding_cache import geocoding_cache
+
+USER_AGENT = "tfg_fleetsmart_v1"
+
+
+class BackendEncadenado:
+    """
+    Prueba varios geocodificadores en orden y devuelve el primer resultado.
+    """
+    
+    def __init__(self, backends):
+        self.backends = list(backends)
+        self.nombre = "+".join(GeocodingUtils.nombre_backend(b) for b in self.backends)
+        # Se cachea si alguno de los backends lo haría (los remotos)
+        self.usar_cache = any(getattr(b, "usar_cache", True) for b in self.backends)
+    
+    def geocode(self, query, exactly_one=True, **kwargs):
+        for backend in self.backends:
+            ubicacion = backend.geocode(query)
+            if ubicacion is not None:
+                return ubicacion
+        return None
 
 
 class GeocodingThread(QThread):
@@ -15,22 +58,192 @@ class GeocodingThread(QThread):
     Thread para geocodificar direcciones sin bloquear la UI.
     Se ejecuta en segundo plano y emite señal cuando termina.
     """
-    finished = Signal(object, str)  # (ubicacion, tipo)
+    resultado = Signal(object, str)  # (ubicacion, tipo)
     
     def __init__(self, direccion: str, tipo: str):
         super().__init__()
         self.direccion = direccion
         self.tipo = tipo
-        self.geolocalizador = Nominatim(user_agent="tfg_fleetsmart_v1")
+        self.geolocalizador = GeocodingUtils.backend()
+        self._cancelado = threading.Event()
+    
+    def cancelar(self):
+        """El thread termina su petición pero no emite el resultado"""
+        self._cancelado.set()
     
     def run(self):
         """Ejecuta la geocodificación en segundo plano"""
         try:
-            ubicacion = self.geolocalizador.geocode(self.direccion)
-            self.finished.emit(ubicacion, self.tipo)
+            ubicacion = GeocodingUtils.geocodificar(self.geolocalizador, self.direccion)
         except Exception as e:
             print(f"Error geocodificando '{self.direccion}': {e}")
-            self.finished.emit(None, self.tipo)
+            ubicacion = None
+        
+        if not self._cancelado.is_set():
+            self.resultado.emit(ubicacion, self.tipo)
+
+
+# ============================================================================
+# GEOCODIFICACIÓN POR LOTES
+# ============================================================================
+
+class LimitadorPeticiones:
+    """
+    Reparte turnos separados al menos 1/peticiones_por_segundo entre todos
+    los threads que lo comparten (política de Nominatim: 1 petición/s).
+    """
+    
+    def __init__(self, peticiones_por_segundo: float = 1.0):
+        self.intervalo = 1.0 / peticiones_por_segundo
+        self._siguiente = 0.0
+        self._lock = threading.Lock()
+    
+    def esperar_turno(self, cancelado: Optional[threading.Event] = None) -> bool:
+        """
+        Bloquea hasta el siguiente turno libre.
+        
+        Returns:
+            False si se canceló mientras esperaba
+        """
+        with self._lock:
+            ahora = time.monotonic()
+            turno = max(ahora, self._siguiente)
+            self._siguiente = turno + self.intervalo
+        
+        espera = turno - time.monotonic()
+        if cancelado is None:
+            if espera > 0:
+                time.sleep(espera)
+            return True
+        
+        if espera > 0:
+            return not cancelado.wait(espera)
+        return not cancelado.is_set()
+
+
+class GeocodificadorLotes:
+    """
+    Geocodifica muchas direcciones con un pool acotado de threads.
+    
+    - Las direcciones repetidas (misma forma normalizada) se piden una vez.
+    - Las que están en caché no consumen turno del limitador.
+    - geocodificar() devuelve los resultados en el orden de entrada según
+      van estando listos.
+    - cancelar() es cooperativo: nadie empieza una petición nueva y el
+      generador deja de producir resultados.
+    
+    Args:
+        geolocalizador: Backend (por defecto el configurado, ver backend())
+        peticiones_por_segundo: Límite del proveedor remoto (por defecto el
+                                del backend; los locales no tienen límite)
+        max_trabajadores: Peticiones en vuelo a la vez
+    """
+    
+    def __init__(self, geolocalizador=None, peticiones_por_segundo: Optional[float] = None,
+                 max_trabajadores: int = 2):
+        self.geolocalizador = geolocalizador or GeocodingUtils.backend()
+        if peticiones_por_segundo is None:
+            peticiones_por_segundo = GeocodingUtils.limite_peticiones(self.geolocalizador)
+        self.limitador = LimitadorPeticiones(peticiones_por_segundo) if peticiones_por_segundo else None
+        self.max_trabajadores = max(1, max_trabajadores)
+        self._cancelado = threading.Event()
+    
+    def cancelar(self):
+        self._cancelado.set()
+    
+    @property
+    def cancelado(self) -> bool:
+        return self._cancelado.is_set()
+    
+    def geocodificar(self, direcciones: Iterable[str]):
+        """
+        Generador de (indice, direccion, ubicacion) en el orden de entrada.
+        ubicacion es un Location de geopy o None si no se encontró.
+        
+        Si se cancela, termina sin producir el resto.
+        """
+        direcciones = list(direcciones)
+        claves = [geocoding_cache.normalizar(d) for d in direcciones]
+        
+        # Una petición por clave distinta: la primera dirección con esa clave
+        resueltas = {}
+        pendientes = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_trabajadores) as pool:
+            for direccion, clave in zip(direcciones, claves):
+                if not clave or clave in resueltas or clave in pendientes:
+                    continue
+                
+                en_cache = False
+                if getattr(self.geolocalizador, "usar_cache", True):
+                    en_cache, _ = geocoding_cache.obtener(direccion)
+                if en_cache:
+                    resueltas[clave] = GeocodingUtils.geocodificar(self.geolocalizador, direccion)
+                else:
+                    pendientes[clave] = pool.submit(self._geocodificar_una, direccion)
+            
+            try:
+                for indice, (direccion, clave) in enumerate(zip(direcciones, claves)):
+                    if self.cancelado:
+                        return
+                    
+                    if clave and clave not in resueltas:
+                        resueltas[clave] = pendientes.pop(clave).result()
+                    
+                    if self.cancelado:
+                        return
+                    yield (indice, direccion, resueltas.get(clave))
+            finally:
+                # Generador abandonado o cancelado: no lanzar lo que falta
+                if pendientes:
+                    self.cancelar()
+                    for futuro in pendientes.values():
+                        futuro.cancel()
+    
+    def _geocodificar_una(self, direccion):
+        """Una petición al proveedor (thread del pool)"""
+        try:
+            return GeocodingUtils.geocodificar(
+                self.geolocalizador, direccion, antes_de_peticion=self._esperar_turno
+            )
+        except Exception as e:
+            print(f"Error geocodificando '{direccion}': {e}")
+            return None
+    
+    def _esperar_turno(self, backend):
+        """Solo los backends remotos esperan turno del limitador"""
+        if self.cancelado:
+            return False
+        if self.limitador is None or GeocodingUtils.limite_peticiones(backend) is None:
+            return True
+        return self.limitador.esperar_turno(self._cancelado)
+
+
+class GeocodingLoteThread(QThread):
+    """
+    GeocodificadorLotes en segundo plano.
+    
+    Señales:
+        resultado(indice, direccion, ubicacion): en orden de entrada
+        progreso(hechas, total)
+    Al terminar (o cancelar) se emite la señal finished de QThread.
+    """
+    resultado = Signal(int, str, object)
+    progreso = Signal(int, int)
+    
+    def __init__(self, direcciones, **opciones):
+        super().__init__()
+        self.direcciones = list(direcciones)
+        self.lote = GeocodificadorLotes(**opciones)
+    
+    def cancelar(self):
+        self.lote.cancelar()
+    
+    def run(self):
+        total = len(self.direcciones)
+        for indice, direccion, ubicacion in self.lote.geocodificar(self.direcciones):
+            self.resultado.emit(indice, direccion, ubicacion)
+            self.progreso.emit(indice + 1, total)
 
 
 class GeocodingUtils:
@@ -39,9 +252,104 @@ class GeocodingUtils:
     Proporciona métodos síncronos y asíncronos simples.
     """
     
-    def __init__(self, user_agent: str = "tfg_fleetsmart_v1"):
-        self.geolocalizador = Nominatim(user_agent=user_agent)
+    # Configuración del backend (ver configurar) y backend compartido
+    _config = {}
+    _backend = None
+    _lock_backend = threading.Lock()
+    
+    def __init__(self, geolocalizador=None):
+        self.geolocalizador = geolocalizador or GeocodingUtils.backend()
         self.active_thread: Optional[GeocodingThread] = None
+        # Threads cancelados que aún no han terminado su petición
+        self._threads_vivos = set()
+    
+    # =========================================================================
+    # BACKENDS
+    # =========================================================================
+    
+    @staticmethod
+    def configurar(app_state):
+        """
+        Fija el backend a partir de la configuración de la app. El backend
+        se crea la próxima vez que se pida (backend()).
+        
+        Claves usadas: geocoding_backend, geocoding_url,
+        geocoding_peticiones_por_segundo
+        """
+        with GeocodingUtils._lock_backend:
+            GeocodingUtils._config = {
+                clave: app_state.get(clave)
+                for clave in ("geocoding_backend", "geocoding_url",
+                              "geocoding_peticiones_por_segundo")
+            }
+            GeocodingUtils._backend = None
+    
+    @staticmethod
+    def backend():
+        """Backend compartido según la configuración (Nominatim por defecto)"""
+        with GeocodingUtils._lock_backend:
+            if GeocodingUtils._backend is None:
+                GeocodingUtils._backend = GeocodingUtils.crear_backend(GeocodingUtils._config)
+            return GeocodingUtils._backend
+    
+    @staticmethod
+    def crear_backend(config):
+        """
+        Construye el backend indicado en config (ver configurar).
+        Si se pide el local y no hay nomenclátor importado, se usa Nominatim.
+        """
+        tipo = (config.get("geocoding_backend") or "nominatim").lower()
+        
+        remoto = GeocodingUtils._crear_nominatim(
+            config.get("geocoding_url"), config.get("geocoding_peticiones_por_segundo")
+        )
+        if tipo not in ("local", "local+nominatim"):
+            return remoto
+        
+        from app.data.gazetteer_local import gazetteer_local
+        if not gazetteer_local.disponible():
+            print("Nomenclátor local vacío (importar_gazetteer.py). Se usa Nominatim.")
+            return remoto
+        
+        if tipo == "local":
+            return gazetteer_local
+        return BackendEncadenado([gazetteer_local, remoto])
+    
+    @staticmethod
+    def _crear_nominatim(url=None, peticiones_por_segundo=None):
+        """Nominatim público o propio (url: "https://geo.miempresa.es")"""
+        if not url:
+            geolocalizador = Nominatim(user_agent=USER_AGENT)
+            geolocalizador.nombre = "nominatim"
+            geolocalizador.peticiones_por_segundo = peticiones_por_segundo or 1.0
+            return geolocalizador
+        
+        esquema, _, dominio = url.rpartition("://")
+        geolocalizador = Nominatim(
+            user_agent=USER_AGENT,
+            domain=dominio.rstrip("/"),
+            scheme=esquema or "https"
+        )
+        geolocalizador.nombre = f"nominatim ({dominio})"
+        # Servidor propio: sin la política de 1 petición/s del público
+        geolocalizador.peticiones_por_segundo = peticiones_por_segundo or 20.0
+        return geolocalizador
+    
+    @staticmethod
+    def nombre_backend(backend) -> str:
+        return getattr(backend, "nombre", type(backend).__name__.lower())
+    
+    @staticmethod
+    def limite_peticiones(backend) -> Optional[float]:
+        """
+        Peticiones por segundo que admite el backend (None = sin límite).
+        En una cadena, el del primer backend con límite.
+        """
+        for b in getattr(backend, "backends", [backend]):
+            limite = getattr(b, "peticiones_por_segundo", 1.0)
+            if limite is not None:
+                return limite
+        return None
     
     # =========================================================================
     # GEOCODIFICACIÓN SÍNCRONA (bloquea la UI)
@@ -59,11 +367,58 @@ class GeocodingUtils:
             Location con latitude/longitude o None si falla
         """
         try:
-            return self.geolocalizador.geocode(direccion)
+            return GeocodingUtils.geocodificar(self.geolocalizador, direccion)
         except Exception as e:
             print(f"Error geocodificando '{direccion}': {e}")
             return None
     
+    @staticmethod
+    def geocodificar(geolocalizador, direccion: str, antes_de_peticion=None) -> Optional[Location]:
+        """
+        Geocodifica consultando antes la caché persistente.
+        Los resultados de los backends remotos (también "no encontrada") se
+        guardan; los errores de red no, y se propagan. Los backends locales
+        (usar_cache = False) no pasan por la caché.
+        
+        Args:
+            geolocalizador: Backend (Nominatim, GazetteerLocal, BackendEncadenado...)
+            direccion: Dirección a geocodificar
+            antes_de_peticion: Función (backend) -> bool llamada antes de
+                               consultar cada backend; si devuelve False se
+                               abandona sin guardar nada (cancelación)
+            
+        Returns:
+            Location con latitude/longitude o None si no existe
+        """
+        usar_cache = getattr(geolocalizador, "usar_cache", True)
+        
+        if usar_cache:
+            acierto, resultado = geocoding_cache.obtener(direccion)
+            if acierto:
+                if resultado is None:
+                    return None
+                latitud, longitud, formateada = resultado
+                return Location(formateada or direccion, (latitud, longitud), {})
+        
+        ubicacion = None
+        for backend in getattr(geolocalizador, "backends", [geolocalizador]):
+            if antes_de_peticion is not None and not antes_de_peticion(backend):
+                return None
+            ubicacion = backend.geocode(direccion)
+            if ubicacion is not None:
+                break
+        
+        if not usar_cache:
+            return ubicacion
+        
+        if ubicacion is None:
+            geocoding_cache.guardar(direccion)
+        else:
+            geocoding_cache.guardar(
+                direccion, ubicacion.latitude, ubicacion.longitude, ubicacion.address
+            )
+        return ubicacion
+    
     # =========================================================================
     # GEOCODIFICACIÓN ASÍNCRONA (no bloquea la UI)
     # =========================================================================
@@ -89,27 +444,39 @@ class GeocodingUtils:
             geocoding = GeocodingUtils()
             geocoding.geocode_async("Madrid, España", "origen", cuando_termine)
         """
-        # Cancelar thread anterior si existe
-        if self.active_thread and self.active_thread.isRunning():
-            self.active_thread.terminate()
-            self.active_thread.wait()
+        # Descartar el resultado del thread anterior (si sigue en marcha)
+        if self.active_thread:
+            self.active_thread.cancelar()
         
         # Crear y ejecutar nuevo thread
-        self.active_thread = GeocodingThread(direccion, tipo)
-        self.active_thread.finished.connect(callback)
-        self.active_thread.start()
+        thread = GeocodingThread(direccion, tipo)
+        thread.resultado.connect(callback)
+        thread.finished.connect(lambda t=thread: self._thread_terminado(t))
+        self._threads_vivos.add(thread)
+        self.active_thread = thread
+        thread.start()
         
-        return self.active_thread
+        return thread
     
-    def cancel_active(self):
+    def cancel_active(self, esperar_ms: int = 0):
         """
-        Cancela la geocodificación activa.
+        Cancela la geocodificación activa (su resultado ya no llegará).
         Útil cuando el usuario cambia de vista o cierra el formulario.
+        
+        Args:
+            esperar_ms: Si > 0, espera a que los threads terminen su
+                        petición (al cerrar la aplicación)
         """
-        if self.active_thread and self.active_thread.isRunning():
-            self.active_thread.terminate()
-            self.active_thread.wait()
-            self.active_thread = None
+        for thread in list(self._threads_vivos):
+            thread.cancelar()
+            if esperar_ms > 0:
+                thread.wait(esperar_ms)
+        self.active_thread = None
+    
+    def _thread_terminado(self, thread):
+        """Suelta la referencia a un thread cuando ha terminado de verdad"""
+        thread.wait()
+        self._threads_vivos.discard(thread)
     
     # =========================================================================
     # MÉTODOS DE CONVERSIÓN
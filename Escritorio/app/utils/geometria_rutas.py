@@ -0,0 +1,192 @@
+"""
+GeometriaRutas - Distancia, caja envolvente y duración estimada de rutas
+
+Todo sale de las coordenadas guardadas (origen_coords + paradas), sin
+peticiones de red:
+- Distancia: suma de tramos en línea recta (haversine)
+- Duración: cada tramo se convierte a minutos con un perfil de velocidad
+  (los tramos cortos son urbanos y más lentos) más un tiempo fijo por
+  parada
+
+calcular_lote procesa muchas rutas de una vez: concatena todos los puntos
+en un único array, calcula todos los tramos con NumPy y suma por ruta con
+bincount. Así cargar cientos de rutas no cuesta un bucle Python por tramo.
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.utils.geo_utils import GeoUtils
+
+
+class GeometriaRutas:
+    """
+    Geometría derivada de rutas (distancias, bbox y ETA).
+    """
+
+    # Perfil de velocidad: (tramos de hasta X km en línea recta, km/h medios)
+    PERFIL_VELOCIDAD = (
+        (2.0, 25.0),             # Ciudad
+        (10.0, 40.0),            # Periferia
+        (50.0, 70.0),            # Carretera
+        (float("inf"), 90.0),    # Autovía
+    )
+    # La carretera no va en línea recta: km reales ~ km en línea recta x factor
+    FACTOR_DESVIO = 1.3
+    # Tiempo de servicio en cada parada (carga/descarga)
+    MINUTOS_POR_PARADA = 5.0
+
+    # =========================================================================
+    # PUNTOS
+    # =========================================================================
+
+    @staticmethod
+    def puntos_recorrido(origen_coords, paradas) -> List[List[float]]:
+        """Coordenadas en orden de recorrido: origen (si se conoce) y paradas"""
+        puntos = []
+        if GeoUtils.es_coordenada(origen_coords):
+            puntos.append(list(origen_coords))
+        for parada in paradas or []:
+            coords = parada.get('coords') if isinstance(parada, dict) else None
+            if GeoUtils.es_coordenada(coords):
+                puntos.append(list(coords))
+        return puntos
+
+    # =========================================================================
+    # TIEMPOS
+    # =========================================================================
+
+    @staticmethod
+    def duracion_tramos_min(tramos_km) -> np.ndarray:
+        """
+        Minutos de conducción de cada tramo según PERFIL_VELOCIDAD.
+
+        Args:
+            tramos_km: Distancias en línea recta (array o lista)
+
+        Returns:
+            ndarray float64 con los minutos de cada tramo
+        """
+        tramos_km = np.asarray(tramos_km, dtype=np.float64)
+        limites = np.array([limite for limite, _ in GeometriaRutas.PERFIL_VELOCIDAD[:-1]])
+        velocidades = np.array([velocidad for _, velocidad in GeometriaRutas.PERFIL_VELOCIDAD])
+
+        velocidad = velocidades[np.searchsorted(limites, tramos_km, side="left")]
+        return tramos_km * GeometriaRutas.FACTOR_DESVIO / velocidad * 60.0
+
+    @staticmethod
+    def estimar_duracion_min(puntos: Sequence[Sequence[float]], num_paradas: int) -> float:
+        """Minutos estimados para recorrer los puntos y atender las paradas"""
+        conduccion = GeometriaRutas.duracion_tramos_min(GeoUtils.distancias_tramos_km(puntos)).sum()
+        return float(conduccion + GeometriaRutas.MINUTOS_POR_PARADA * num_paradas)
+
+    @staticmethod
+    def formatear_duracion(minutos: Optional[float]) -> str:
+        """'45 min', '2 h 05 min' o '' si no hay duración"""
+        if minutos is None:
+            return ""
+        minutos = int(round(minutos))
+        if minutos < 60:
+            return f"{minutos} min"
+        return f"{minutos // 60} h {minutos % 60:02d} min"
+
+    # =========================================================================
+    # LOTES
+    # =========================================================================
+
+    @staticmethod
+    def calcular_lote(lista_puntos, paradas_por_ruta=None):
+        """
+        Distancia, duración y bbox de muchas rutas a la vez.
+
+        Args:
+            lista_puntos: Una lista de [lat, lon] por ruta (puede estar vacía)
+            paradas_por_ruta: Nº de paradas de cada ruta (para el tiempo de
+                              servicio). Por defecto, ninguna.
+
+        Returns:
+            dict con arrays de una fila por ruta:
+            - 'distancia_km': (n,)
+            - 'duracion_min': (n,)
+            - 'bbox': (n, 4) [lat_min, lon_min, lat_max, lon_max], NaN sin puntos
+            - 'con_puntos': (n,) bool
+        """
+        n = len(lista_puntos)
+        longitudes = np.fromiter((len(p) for p in lista_puntos), dtype=np.int64, count=n)
+        paradas = (np.zeros(n) if paradas_por_ruta is None
+                   else np.asarray(paradas_por_ruta, dtype=np.float64))
+
+        resultado = {
+            'distancia_km': np.zeros(n),
+            'duracion_min': paradas * GeometriaRutas.MINUTOS_POR_PARADA,
+            'bbox': np.full((n, 4), np.nan),
+            'con_puntos': longitudes > 0,
+        }
+        if not longitudes.any():
+            return resultado
+
+        todos = np.concatenate([
+            np.asarray(puntos, dtype=np.float64).reshape(-1, 2)
+            for puntos in lista_puntos if len(puntos)
+        ])
+        ruta_de_punto = np.repeat(np.arange(n), longitudes)
+
+        # Tramos entre puntos consecutivos; los que unen dos rutas no cuentan
+        tramos = GeoUtils.distancias_tramos_km(todos)
+        mismo = ruta_de_punto[1:] == ruta_de_punto[:-1]
+        ruta_de_tramo = ruta_de_punto[1:][mismo]
+        km = tramos[mismo]
+
+        resultado['distancia_km'] = np.bincount(ruta_de_tramo, weights=km, minlength=n)
+        resultado['duracion_min'] += np.bincount(
+            ruta_de_tramo, weights=GeometriaRutas.duracion_tramos_min(km), minlength=n
+        )
+
+        # Caja envolvente: mínimos/máximos por bloque de puntos de cada ruta
+        con_puntos = resultado['con_puntos']
+        inicios = (np.cumsum(longitudes) - longitudes)[con_puntos]
+        resultado['bbox'][con_puntos, 0] = np.minimum.reduceat(todos[:, 0], inicios)
+        resultado['bbox'][con_puntos, 1] = np.minimum.reduceat(todos[:, 1], inicios)
+        resultado['bbox'][con_puntos, 2] = np.maximum.reduceat(todos[:, 0], inicios)
+        resultado['bbox'][con_puntos, 3] = np.maximum.reduceat(todos[:, 1], inicios)
+
+        return resultado
+
+    @staticmethod
+    def completar(rutas, forzar=False):
+        """
+        Rellena bbox, distancia_km y duracion_min de las rutas (en un lote).
+
+        Args:
+            rutas: Lista de objetos Ruta
+            forzar: Si False solo se calculan las que no tienen todos los datos
+
+        Returns:
+            Número de rutas calculadas
+        """
+        if forzar:
+            pendientes = list(rutas)
+        else:
+            pendientes = [
+                r for r in rutas
+                if r.bbox is None or r.distancia_km is None or r.duracion_min is None
+            ]
+        if not pendientes:
+            return 0
+
+        lote = GeometriaRutas.calcular_lote(
+            [r.puntos() for r in pendientes],
+            [len(r.paradas or []) for r in pendientes]
+        )
+
+        for i, ruta in enumerate(pendientes):
+            if lote['con_puntos'][i]:
+                ruta.bbox = lote['bbox'][i].tolist()
+                ruta.distancia_km = round(float(lote['distancia_km'][i]), 2)
+                ruta.duracion_min = int(round(lote['duracion_min'][i]))
+            else:
+                ruta.bbox = None
+                ruta.distancia_km = None
+                ruta.duracion_min = None
+
+        return len(pendientes)
@@ -0,0 +1,226 @@
+"""
+HistorialCompacto - Formato columnar comprimido del historial GPS
+
+En /historial_localizaciones cada ping es un nodo con el nombre del
+conductor, la matrícula, la ruta y el timestamp en texto (~200 bytes). Una
+jornada de 10 h a 5 s son 7.200 nodos por conductor.
+
+Al archivar, los pings de una asignación se guardan en bloques:
+- Columnas: timestamp (segundos), latitud y longitud (microgrados, ~0,1 m)
+- Cada columna se guarda como diferencias con el valor anterior (int32):
+  entre pings consecutivos son números pequeños
+- Bytes agrupados por posición (todos los primeros bytes, luego los
+  segundos...) y comprimidos con zlib, en base64 para Firebase
+Los datos que no cambian (conductor, vehículo, ruta) se guardan una vez.
+
+Resultado: unos 4-6 bytes por ping en lugar de ~200.
+"""
+import base64
+import calendar
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+class HistorialCompacto:
+    """
+    Codificación/decodificación de bloques de historial GPS.
+    """
+
+    FORMATO = 1
+    PUNTOS_POR_BLOQUE = 2000
+    ESCALA_COORDS = 1_000_000          # microgrados
+    FORMATO_TIMESTAMP = "%Y-%m-%dT%H:%M:%S"
+
+    # =========================================================================
+    # TIMESTAMPS
+    # =========================================================================
+
+    @staticmethod
+    def a_segundos(timestamp):
+        """'yyyy-MM-ddTHH:mm:ss' -> segundos (sin zona horaria) o None"""
+        try:
+            fecha = datetime.strptime(timestamp, HistorialCompacto.FORMATO_TIMESTAMP)
+        except (TypeError, ValueError):
+            return None
+        return calendar.timegm(fecha.timetuple())
+
+    @staticmethod
+    def a_timestamp(segundos):
+        """Inverso de a_segundos"""
+        fecha = datetime.fromtimestamp(int(segundos), tz=timezone.utc)
+        return fecha.strftime(HistorialCompacto.FORMATO_TIMESTAMP)
+
+    # =========================================================================
+    # BLOQUES
+    # =========================================================================
+
+    @staticmethod
+    def codificar_bloque(segundos, latitudes, longitudes):
+        """
+        Empaqueta columnas ya ordenadas por tiempo.
+
+        Args:
+            segundos: Secuencia de enteros
+            latitudes, longitudes: Secuencias de grados
+
+        Returns:
+            dict para Firebase {'formato', 'puntos', 'inicio', 'fin', 'base', 'datos'}
+        """
+        columnas = np.vstack([
+            np.asarray(segundos, dtype=np.int64),
+            np.round(np.asarray(latitudes, dtype=np.float64) * HistorialCompacto.ESCALA_COORDS),
+            np.round(np.asarray(longitudes, dtype=np.float64) * HistorialCompacto.ESCALA_COORDS),
+        ]).astype(np.int64)
+
+        # Primer valor absoluto, el resto diferencias (caben en int32)
+        deltas = np.diff(columnas, axis=1, prepend=0)
+        primeros = deltas[:, 0].tolist()
+        deltas[:, 0] = 0
+
+        crudo = deltas.astype("<i4").view(np.uint8).reshape(-1, 4).T.tobytes()
+        return {
+            'formato': HistorialCompacto.FORMATO,
+            'puntos': int(columnas.shape[1]),
+            'inicio': HistorialCompacto.a_timestamp(columnas[0, 0]),
+            'fin': HistorialCompacto.a_timestamp(columnas[0, -1]),
+            'base': primeros,
+            'datos': base64.b64encode(zlib.compress(crudo, 9)).decode("ascii"),
+        }
+
+    @staticmethod
+    def decodificar_bloque(bloque):
+        """
+        Inverso de codificar_bloque.
+
+        Returns:
+            (segundos int64, latitudes float64, longitudes float64)
+        """
+        if bloque.get('formato') != HistorialCompacto.FORMATO:
+            raise ValueError(f"Formato de historial no soportado: {bloque.get('formato')}")
+
+        puntos = int(bloque['puntos'])
+        crudo = zlib.decompress(base64.b64decode(bloque['datos']))
+        deltas = (np.frombuffer(crudo, dtype=np.uint8).reshape(4, -1).T.copy()
+                  .view("<i4").reshape(3, puntos).astype(np.int64))
+        deltas[:, 0] = bloque['base']
+        columnas = np.cumsum(deltas, axis=1)
+
+        return (
+            columnas[0],
+            columnas[1] / HistorialCompacto.ESCALA_COORDS,
+            columnas[2] / HistorialCompacto.ESCALA_COORDS,
+        )
+
+    # =========================================================================
+    # HISTORIAL COMPLETO
+    # =========================================================================
+
+    @staticmethod
+    def empaquetar(localizaciones, archivado=None):
+        """
+        Convierte pings (objetos LocalizacionGPS) al formato compacto.
+
+        Los pings con timestamp ilegible o coordenadas no numéricas no se
+        pueden codificar y se devuelven aparte (no deben borrarse del
+        historial). Los pings sin campos de coordenadas hay que apartarlos
+        antes: from_dict los convierte en (0, 0).
+
+        Args:
+            localizaciones: Pings a archivar
+            archivado: Historial compacto ya guardado o None. Sus puntos no
+                se repiten y los bloques nuevos se numeran después de los suyos
+
+        Returns:
+            (datos_compactos, ids_empaquetados, descartados). datos_compactos
+            lleva solo los bloques nuevos y el resumen del historial completo
+            (None si no hay puntos nuevos)
+        """
+        validos = []
+        descartados = []
+        for loc in localizaciones:
+            segundos = HistorialCompacto.a_segundos(loc.timestamp)
+            try:
+                lat, lon = float(loc.latitud), float(loc.longitud)
+            except (TypeError, ValueError):
+                segundos = None
+            if segundos is None:
+                descartados.append(loc)
+            else:
+                validos.append((segundos, lat, lon, loc))
+
+        # Los ids se devuelven todos (también los repetidos, para podarlos)
+        ids = [v[3].id_localizacion for v in validos if v[3].id_localizacion]
+
+        # Sin duplicados, tampoco con lo ya archivado (p. ej. un archivado
+        # anterior que no llegó a podar)
+        segundos_prev, latitudes_prev, longitudes_prev = HistorialCompacto.columnas(archivado)
+        vistos = set(zip(
+            segundos_prev.tolist(),
+            np.round(latitudes_prev * HistorialCompacto.ESCALA_COORDS).astype(np.int64).tolist(),
+            np.round(longitudes_prev * HistorialCompacto.ESCALA_COORDS).astype(np.int64).tolist(),
+        ))
+        unicos = {}
+        for v in validos:
+            clave = (v[0], round(v[1] * HistorialCompacto.ESCALA_COORDS),
+                     round(v[2] * HistorialCompacto.ESCALA_COORDS))
+            if clave not in vistos:
+                unicos.setdefault(clave, v)
+        validos = sorted(unicos.values(), key=lambda v: v[0])
+        if not validos:
+            return (None, ids, descartados)
+
+        # Claves nuevas después de las existentes (b0000, b0001...)
+        numeros = [int(k[1:]) for k in HistorialCompacto.bloques(archivado)
+                   if k.startswith("b") and k[1:].isdigit()]
+        bloques = {}
+        for numero, inicio in enumerate(range(0, len(validos), HistorialCompacto.PUNTOS_POR_BLOQUE),
+                                        start=max(numeros, default=-1) + 1):
+            trozo = validos[inicio:inicio + HistorialCompacto.PUNTOS_POR_BLOQUE]
+            bloques[f"b{numero:04d}"] = HistorialCompacto.codificar_bloque(
+                [v[0] for v in trozo], [v[1] for v in trozo], [v[2] for v in trozo]
+            )
+
+        primero = validos[0][3]
+        archivado = archivado or {}
+        extremos = [validos[0][0], validos[-1][0]]
+        if len(segundos_prev):
+            extremos += [int(segundos_prev[0]), int(segundos_prev[-1])]
+        datos = {
+            'nombre_conductor': archivado.get('nombre_conductor', primero.nombre_conductor),
+            'matricula_vehiculo': archivado.get('matricula_vehiculo', primero.matricula_vehiculo),
+            'nombre_ruta': archivado.get('nombre_ruta', primero.nombre_ruta),
+            'puntos': len(segundos_prev) + len(validos),
+            'inicio': HistorialCompacto.a_timestamp(min(extremos)),
+            'fin': HistorialCompacto.a_timestamp(max(extremos)),
+            'bloques': bloques,
+        }
+        return (datos, ids, descartados)
+
+    @staticmethod
+    def bloques(datos):
+        """{clave: bloque} de un historial compacto"""
+        bloques = (datos or {}).get('bloques') or {}
+        if isinstance(bloques, list):
+            bloques = {str(i): b for i, b in enumerate(bloques) if b}
+        return bloques
+
+    @staticmethod
+    def columnas(datos):
+        """
+        Todas las columnas de un historial compacto, ordenadas por tiempo
+        (un archivado posterior puede traer pings antiguos que llegaron tarde).
+
+        Returns:
+            (segundos, latitudes, longitudes) como arrays
+        """
+        bloques = HistorialCompacto.bloques(datos)
+        if not bloques:
+            vacio = np.zeros(0)
+            return (vacio.astype(np.int64), vacio, vacio)
+
+        partes = [HistorialCompacto.decodificar_bloque(bloques[k]) for k in sorted(bloques)]
+        columnas = [np.concatenate([p[i] for p in partes]) for i in range(3)]
+        orden = np.argsort(columnas[0], kind="stable")
+        return tuple(c[orden] for c in columnas)
@@ -6,9 +6,89 @@ Se usa desde controladores que necesiten mostrar mapas.
 """
 import folium
 import io
+import json
+from branca.element import MacroElement
+from jinja2 import Template
 from typing import List, Dict, Any, Optional
 
 
+class _LiveFleetLayer(MacroElement):
+    """
+    Capa JavaScript que mantiene los marcadores de vehículos dentro de la página.
+    Expone window.fleetSmart.applyUpdates() para mover, añadir o quitar
+    marcadores sin recargar el mapa (se conserva el zoom y la posición).
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var company = L.latLng({{ this.company_coords|tojson }});
+            var icon = L.AwesomeMarkers.icon({{ this.icon_options|tojson }});
+            var markers = {};
+
+            function upsert(v) {
+                var latlng = L.latLng(v.lat, v.lon);
+                var marker = markers[v.id];
+                if (marker) {
+                    marker.setLatLng(latlng);
+                    marker.setPopupContent(v.popup);
+                    if (marker.getTooltip()) {
+                        marker.setTooltipContent(v.tooltip || "");
+                    } else if (v.tooltip) {
+                        marker.bindTooltip(v.tooltip);
+                    }
+                    return;
+                }
+                marker = L.marker(latlng, {icon: icon}).bindPopup(v.popup);
+                if (v.tooltip) {
+                    marker.bindTooltip(v.tooltip);
+                }
+                marker.addTo(map);
+                markers[v.id] = marker;
+            }
+
+            function remove(id) {
+                if (markers[id]) {
+                    map.removeLayer(markers[id]);
+                    delete markers[id];
+                }
+            }
+
+            function fitAll() {
+                var points = [company];
+                for (var id in markers) {
+                    points.push(markers[id].getLatLng());
+                }
+                if (points.length > 1) {
+                    map.fitBounds(L.latLngBounds(points), {padding: [30, 30]});
+                }
+            }
+
+            window.fleetSmart = {
+                applyUpdates: function(updates) {
+                    (updates.upserts || []).forEach(upsert);
+                    (updates.removes || []).forEach(remove);
+                    if (updates.fit) {
+                        fitAll();
+                    }
+                }
+            };
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, company_coords: List[float], icon_style: Dict[str, str]):
+        super().__init__()
+        self._name = "LiveFleetLayer"
+        self.company_coords = list(company_coords)
+        self.icon_options = {
+            'markerColor': icon_style.get('color', 'green'),
+            'icon': icon_style.get('icon', 'truck'),
+            'prefix': icon_style.get('prefix', 'fa'),
+            'iconColor': 'white'
+        }
+
+
 class MapUtils:
     """
     Utilidad que encapsula operaciones de Folium.
@@ -146,7 +226,8 @@ class MapUtils:
         origin_coords: Optional[List[float]],
         origin_label: str,
         waypoints: List[Dict[str, Any]],
-        center: List[float] = None
+        center: List[float] = None,
+        route_geometry: Optional[List[List[float]]] = None
     ) -> folium.Map:
         """
         Crea un mapa completo de ruta con origen, paradas y líneas.
@@ -156,6 +237,8 @@ class MapUtils:
             origin_label: Etiqueta para el popup del origen
             waypoints: Lista de dicts con 'coords', 'direccion', 'orden'
             center: Centro del mapa (si None, usa origen o España)
+            route_geometry: Línea por carretera [[lat, lon], ...] (si None,
+                            se unen los puntos en línea recta)
             
         Returns:
             Mapa completo con la ruta
@@ -193,8 +276,8 @@ class MapUtils:
         
         # Añadir línea y ajustar zoom
         if len(all_points) > 1:
-            MapUtils.add_polyline(mapa, all_points)
-            MapUtils.fit_bounds(mapa, all_points)
+            MapUtils.add_polyline(mapa, route_geometry or all_points)
+            MapUtils.fit_bounds(mapa, route_geometry or all_points)
         
         return mapa
     
@@ -235,17 +318,10 @@ class MapUtils:
             coords = [vehicle['latitud'], vehicle['longitud']]
             all_coords.append(coords)
             
-            popup_text = (
-                f"<b>Vehículo:</b> {vehicle.get('matricula_vehiculo', 'N/A')}<br>"
-                f"<b>Conductor:</b> {vehicle.get('nombre_conductor', 'N/A')}<br>"
-                f"<b>Ruta:</b> {vehicle.get('nombre_ruta', 'N/A')}<br>"
-                f"<small>{vehicle.get('timestamp', '')}</small>"
-            )
-            
             MapUtils.add_marker(
                 mapa,
                 coords=coords,
-                popup_text=popup_text,
+                popup_text=MapUtils.vehicle_popup_html(vehicle),
                 tooltip_text=vehicle.get('matricula_vehiculo', ''),
                 icon_type='vehicle'
             )
@@ -254,4 +330,90 @@ class MapUtils:
         if fit_to_bounds and len(all_coords) > 1:
             MapUtils.fit_bounds(mapa, all_coords)
         
-        return mapa
\ No newline at end of file
+        return mapa
+    
+    # =========================================================================
+    # MAPA EN VIVO (actualizaciones incrementales)
+    # =========================================================================
+    
+    @staticmethod
+    def vehicle_popup_html(vehicle: Dict[str, Any]) -> str:
+        """
+        Genera el HTML del popup de un vehículo.
+        
+        Args:
+            vehicle: Dict con info del vehículo
+            
+        Returns:
+            HTML del popup
+        """
+        return (
+            f"<b>Vehículo:</b> {vehicle.get('matricula_vehiculo', 'N/A')}<br>"
+            f"<b>Conductor:</b> {vehicle.get('nombre_conductor', 'N/A')}<br>"
+            f"<b>Ruta:</b> {vehicle.get('nombre_ruta', 'N/A')}<br>"
+            f"<small>{vehicle.get('timestamp', '')}</small>"
+        )
+    
+    @staticmethod
+    def create_live_fleet_map(company_coords: List[float], company_name: str) -> folium.Map:
+        """
+        Crea el mapa persistente del centro de mando.
+        
+        Solo contiene la empresa; los vehículos se añaden después desde Python
+        con build_fleet_update_js() + runJavaScript(), sin volver a renderizar
+        la página.
+        
+        Args:
+            company_coords: Coordenadas de la empresa [lat, lon]
+            company_name: Nombre de la empresa
+            
+        Returns:
+            Mapa con la capa de actualizaciones en vivo
+        """
+        mapa = MapUtils.create_base_map(center=company_coords, zoom=MapUtils.DEFAULT_ZOOM)
+        
+        MapUtils.add_marker(
+            mapa,
+            coords=company_coords,
+            popup_text=f"<b>Centro de Operaciones</b><br>{company_name}",
+            icon_type='company'
+        )
+        
+        _LiveFleetLayer(company_coords, MapUtils.ICON_STYLES['vehicle']).add_to(mapa)
+        
+        return mapa
+    
+    @staticmethod
+    def build_fleet_update_js(
+        upserts: List[Dict[str, Any]],
+        removes: List[str],
+        fit_to_bounds: bool = False
+    ) -> str:
+        """
+        Genera la llamada JavaScript que aplica cambios de marcadores
+        sobre el mapa creado con create_live_fleet_map().
+        
+        Args:
+            upserts: Vehículos nuevos o movidos (dicts con 'id_asignacion',
+                     'latitud', 'longitud' y datos del popup)
+            removes: IDs de asignación cuyos marcadores hay que quitar
+            fit_to_bounds: Si True, ajusta el zoom a todos los marcadores
+            
+        Returns:
+            Código JavaScript para QWebEnginePage.runJavaScript()
+        """
+        updates = {
+            'upserts': [
+                {
+                    'id': vehicle['id_asignacion'],
+                    'lat': vehicle['latitud'],
+                    'lon': vehicle['longitud'],
+                    'popup': MapUtils.vehicle_popup_html(vehicle),
+                    'tooltip': vehicle.get('matricula_vehiculo', '')
+                }
+                for vehicle in upserts
+            ],
+            'removes': list(removes),
+            'fit': fit_to_bounds
+        }
+        return f"window.fleetSmart && window.fleetSmart.applyUpdates({json.dumps(updates)});"
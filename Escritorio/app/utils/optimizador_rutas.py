@@ -0,0 +1,247 @@
+"""
+OptimizadorRutas - Orden de paradas de menor coste
+
+Problema: salir del origen (fijo) y visitar todas las paradas una vez, en
+el orden que minimiza la suma de costes (km, minutos...). Es un TSP de
+camino abierto: no se vuelve al origen salvo que se pida.
+
+Heurísticas (resultado muy bueno, no necesariamente el óptimo):
+1. Vecino más próximo: solución inicial
+2. 2-opt: invertir tramos mientras mejore
+3. Or-opt: mover bloques de 1 a 3 paradas a otra posición (también
+   invertidos) mientras mejore
+Se repiten 2-opt y Or-opt hasta que ninguno mejora.
+
+Cada paso evalúa todas las alternativas de golpe con NumPy (una fila de
+la matriz de costes por operación), así 200+ paradas tardan milisegundos.
+
+La matriz de costes la da quien llama: distancias haversine
+(GeoUtils.matriz_distancias_km), tiempos, distancias por carretera...
+"""
+import numpy as np
+
+
+class OptimizadorRutas:
+    """
+    Optimizador de orden de visita sobre una matriz de costes.
+    El índice 0 de la matriz es el origen.
+    """
+
+    # Mejora mínima para aceptar un cambio (evita bucles por redondeo)
+    EPSILON = 1e-9
+    # Longitudes de bloque que prueba Or-opt
+    BLOQUES_OR_OPT = (1, 2, 3)
+    # Límite de vueltas 2-opt + Or-opt
+    MAX_ITERACIONES = 100
+
+    # =========================================================================
+    # API
+    # =========================================================================
+
+    @staticmethod
+    def optimizar(costes, volver_al_origen=False):
+        """
+        Calcula el orden de visita.
+
+        Args:
+            costes: Matriz (n+1) x (n+1); fila/columna 0 = origen
+            volver_al_origen: Si True se minimiza también la vuelta al origen
+
+        Returns:
+            Lista de índices de paradas (1..n) en orden de visita
+        """
+        costes = np.asarray(costes, dtype=np.float64)
+        n = costes.shape[0]
+        if n <= 2:
+            return list(range(1, n))
+
+        if volver_al_origen:
+            # Circuito: el "final" vuelve al origen; se modela con un nodo
+            # final que es una copia del origen y se fija al final
+            costes = OptimizadorRutas._con_vuelta(costes)
+
+        recorrido = OptimizadorRutas.vecino_mas_proximo(costes, fijar_ultimo=volver_al_origen)
+
+        for _ in range(OptimizadorRutas.MAX_ITERACIONES):
+            mejora = OptimizadorRutas.dos_opt(costes, recorrido, fijar_ultimo=volver_al_origen)
+            mejora |= OptimizadorRutas.or_opt(costes, recorrido, fijar_ultimo=volver_al_origen)
+            if not mejora:
+                break
+
+        orden = recorrido[1:]
+        if volver_al_origen:
+            orden = orden[:-1]
+        return [int(i) for i in orden]
+
+    @staticmethod
+    def coste(costes, recorrido):
+        """Coste total de un recorrido (lista de índices, empezando en 0)"""
+        costes = np.asarray(costes, dtype=np.float64)
+        recorrido = np.asarray(recorrido)
+        return float(costes[recorrido[:-1], recorrido[1:]].sum())
+
+    # =========================================================================
+    # HEURÍSTICAS
+    # =========================================================================
+
+    @staticmethod
+    def vecino_mas_proximo(costes, fijar_ultimo=False):
+        """
+        Recorrido inicial: desde el origen, siempre a la parada más cercana
+        que falte. Con fijar_ultimo, el último nodo se deja para el final.
+        """
+        n = costes.shape[0]
+        visitado = np.zeros(n, dtype=bool)
+        visitado[0] = True
+        if fijar_ultimo:
+            visitado[n - 1] = True
+
+        recorrido = [0]
+        actual = 0
+        for _ in range(n - 1 - int(fijar_ultimo)):
+            fila = np.where(visitado, np.inf, costes[actual])
+            actual = int(np.argmin(fila))
+            visitado[actual] = True
+            recorrido.append(actual)
+
+        if fijar_ultimo:
+            recorrido.append(n - 1)
+        return recorrido
+
+    @staticmethod
+    def dos_opt(costes, recorrido, fijar_ultimo=False):
+        """
+        Invierte tramos recorrido[i..j] mientras el coste baje (modifica
+        recorrido). El origen (posición 0) no se mueve nunca.
+
+        Returns:
+            True si hubo alguna mejora
+        """
+        ruta = np.asarray(recorrido)
+        n = len(ruta)
+        ultimo_movil = n - 2 if fijar_ultimo else n - 1
+        hubo_mejora = False
+
+        mejorado = True
+        while mejorado:
+            mejorado = False
+            for i in range(1, ultimo_movil):
+                a = ruta[i - 1]
+                b = ruta[i]
+                j = np.arange(i + 1, ultimo_movil + 1)
+                c = ruta[j]
+
+                # Arista tras el tramo (no existe si j es el final abierto)
+                siguiente = np.minimum(j + 1, n - 1)
+                d = ruta[siguiente]
+                hay_d = (j + 1) < n
+
+                antes = costes[a, b] + np.where(hay_d, costes[c, d], 0.0)
+                despues = costes[a, c] + np.where(hay_d, costes[b, d], 0.0)
+                delta = despues - antes
+
+                k = int(np.argmin(delta))
+                if delta[k] < -OptimizadorRutas.EPSILON:
+                    fin = j[k]
+                    ruta[i:fin + 1] = ruta[i:fin + 1][::-1].copy()
+                    mejorado = True
+                    hubo_mejora = True
+
+        recorrido[:] = ruta.tolist()
+        return hubo_mejora
+
+    @staticmethod
+    def or_opt(costes, recorrido, fijar_ultimo=False):
+        """
+        Mueve bloques de BLOQUES_OR_OPT paradas consecutivas a la mejor
+        posición (en su sentido o invertidos) mientras el coste baje
+        (modifica recorrido).
+
+        Returns:
+            True si hubo alguna mejora
+        """
+        hubo_mejora = False
+
+        mejorado = True
+        while mejorado:
+            mejorado = False
+            for longitud in OptimizadorRutas.BLOQUES_OR_OPT:
+                if OptimizadorRutas._or_opt_bloques(costes, recorrido, longitud, fijar_ultimo):
+                    mejorado = True
+                    hubo_mejora = True
+
+        return hubo_mejora
+
+    @staticmethod
+    def _or_opt_bloques(costes, recorrido, longitud, fijar_ultimo):
+        """Una pasada de Or-opt con bloques de una longitud"""
+        hubo_mejora = False
+        i = 1
+        while True:
+            n = len(recorrido)
+            ultimo_movil = n - 2 if fijar_ultimo else n - 1
+            if i + longitud - 1 > ultimo_movil:
+                break
+
+            bloque = recorrido[i:i + longitud]
+            anterior = recorrido[i - 1]
+            siguiente = recorrido[i + longitud] if i + longitud < n else None
+            primero, ultimo = bloque[0], bloque[-1]
+
+            # Lo que se ahorra al sacar el bloque
+            if siguiente is None:
+                ahorro = costes[anterior, primero]
+            else:
+                ahorro = (costes[anterior, primero] + costes[ultimo, siguiente]
+                          - costes[anterior, siguiente])
+
+            resto = np.asarray(recorrido[:i] + recorrido[i + longitud:])
+            m = len(resto)
+            # Insertar entre resto[k] y resto[k+1] (k = m-1: al final, si se puede)
+            k = np.arange(0, m if not fijar_ultimo else m - 1)
+            izquierda = resto[k]
+            tiene_derecha = (k + 1) < m
+            derecha = resto[np.minimum(k + 1, m - 1)]
+
+            arista = np.where(tiene_derecha, costes[izquierda, derecha], 0.0)
+            directo = (costes[izquierda, primero]
+                       + np.where(tiene_derecha, costes[ultimo, derecha], 0.0) - arista)
+            invertido = (costes[izquierda, ultimo]
+                         + np.where(tiene_derecha, costes[primero, derecha], 0.0) - arista)
+
+            # Volver a ponerlo donde estaba no cuenta
+            directo[i - 1] = np.inf
+            if longitud == 1:
+                invertido[i - 1] = np.inf
+
+            mejor_directo = int(np.argmin(directo))
+            mejor_invertido = int(np.argmin(invertido))
+            if directo[mejor_directo] <= invertido[mejor_invertido]:
+                posicion, coste, invertir = mejor_directo, directo[mejor_directo], False
+            else:
+                posicion, coste, invertir = mejor_invertido, invertido[mejor_invertido], True
+
+            if coste < ahorro - OptimizadorRutas.EPSILON:
+                nuevo = list(bloque[::-1] if invertir else bloque)
+                resto = resto.tolist()
+                recorrido[:] = resto[:posicion + 1] + nuevo + resto[posicion + 1:]
+                hubo_mejora = True
+            else:
+                i += 1
+
+        return hubo_mejora
+
+    # =========================================================================
+    # AUXILIARES
+    # =========================================================================
+
+    @staticmethod
+    def _con_vuelta(costes):
+        """Añade un nodo final que es el origen (para circuitos cerrados)"""
+        n = costes.shape[0]
+        ampliada = np.empty((n + 1, n + 1), dtype=np.float64)
+        ampliada[:n, :n] = costes
+        ampliada[:n, n] = costes[:, 0]
+        ampliada[n, :n] = costes[0, :]
+        ampliada[n, n] = 0.0
+        return ampliada
@@ -0,0 +1,98 @@
+"""
+RefreshScheduler - Agrupa peticiones de refresco de la UI
+
+Cuando llegan muchos eventos seguidos (por ejemplo, decenas de conductores
+enviando su GPS en el mismo segundo) no tiene sentido repintar una vez por
+evento. Este scheduler junta las peticiones y emite como mucho N refrescos
+por segundo, con el conjunto de claves que han cambiado desde el anterior.
+
+Quien recibe la señal debe leer el estado más reciente en ese momento,
+así siempre se pinta lo último aunque se hayan saltado eventos intermedios.
+"""
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer, Signal
+
+
+class RefreshScheduler(QObject):
+    """
+    Limita los refrescos a max_fps por segundo (throttle con coalescencia).
+
+    Uso:
+        scheduler = RefreshScheduler(max_fps=4)
+        scheduler.refrescar.connect(mi_funcion)  # recibe set de claves o None
+        scheduler.solicitar("id_1")              # refresco parcial
+        scheduler.solicitar()                    # refresco completo
+    """
+
+    # set con las claves pendientes, o None si hay que refrescar todo
+    refrescar = Signal(object)
+
+    FPS_DEFECTO = 4
+
+    def __init__(self, max_fps=FPS_DEFECTO, parent=None):
+        super().__init__(parent)
+
+        self._pendientes = set()
+        self._completo = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._emitir)
+
+        # Tiempo desde el último refresco emitido
+        self._reloj = QElapsedTimer()
+
+        self.set_max_fps(max_fps)
+
+    def set_max_fps(self, max_fps):
+        """Cambia el máximo de refrescos por segundo (mínimo 1)"""
+        try:
+            max_fps = float(max_fps)
+        except (TypeError, ValueError):
+            max_fps = self.FPS_DEFECTO
+
+        max_fps = max(1.0, max_fps)
+        self._intervalo_ms = int(1000 / max_fps)
+
+    def solicitar(self, clave=None):
+        """
+        Pide un refresco.
+
+        Args:
+            clave: Elemento que ha cambiado. None = refrescar todo.
+        """
+        if clave is None:
+            self._completo = True
+        else:
+            self._pendientes.add(clave)
+
+        if self._timer.isActive():
+            # Ya hay un refresco programado; se incluirá en él
+            return
+
+        # Si ha pasado suficiente tiempo se emite en la siguiente vuelta del
+        # event loop (así también se agrupan los eventos que llegan juntos)
+        espera = 0
+        if self._reloj.isValid():
+            espera = max(0, self._intervalo_ms - self._reloj.elapsed())
+
+        self._timer.start(espera)
+
+    def cancelar(self):
+        """Descarta los refrescos pendientes"""
+        self._timer.stop()
+        self._pendientes = set()
+        self._completo = False
+
+    def _emitir(self):
+        """Emite un único refresco con todo lo acumulado"""
+        if self._completo:
+            claves = None
+        else:
+            claves = self._pendientes
+
+        self._pendientes = set()
+        self._completo = False
+        self._reloj.start()
+
+        if claves is None or claves:
+            self.refrescar.emit(claves)
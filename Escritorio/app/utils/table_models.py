@@ -0,0 +1,279 @@
+"""
+TableModels - Modelos de tabla compartidos (Qt model/view)
+
+Sustituyen a QTableWidget en las pantallas de listas:
+- Los datos viven en una lista de dataclasses; no se crea un
+  QTableWidgetItem por celda, la vista pide solo lo que pinta (data()).
+- Añadir/actualizar/quitar un elemento no recarga la tabla completa.
+- El filtrado y la ordenación se hacen con un proxy, en memoria.
+
+Uso típico en un controlador:
+    self.modelo = DataclassTableModel(
+        columnas=[("Matrícula", "matricula"), ("Estado", "estado")],
+        campo_id="id_vehiculo"
+    )
+    self.proxy = FiltroTablaProxy()
+    self.proxy.setSourceModel(self.modelo)
+    self.tabla.setModel(self.proxy)
+"""
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+
+
+# Rol con el valor sin formatear (para ordenar y filtrar)
+ROL_VALOR = Qt.UserRole + 1
+# Rol con el objeto completo de la fila
+ROL_OBJETO = Qt.UserRole + 2
+# Rol con la clave de ordenación de la celda
+ROL_ORDEN = Qt.UserRole + 3
+
+
+def clave_fecha(texto, hora=""):
+    """
+    Clave de ordenación para fechas "dd/MM/yyyy" (y hora "HH:mm" opcional).
+    Los textos que no son fechas van al principio, en orden alfabético.
+    """
+    partes = (texto or "").split("/")
+    if len(partes) != 3:
+        return ("", "", "", texto or "")
+    dia, mes, anio = partes
+    return (anio.zfill(4), mes.zfill(2), dia.zfill(2), hora or "")
+
+
+class DataclassTableModel(QAbstractTableModel):
+    """
+    Modelo de tabla respaldado por una lista de dataclasses.
+
+    Args:
+        columnas: Lista de (cabecera, valor[, clave_orden]) donde valor es el
+                  nombre de un atributo o una función que recibe el objeto, y
+                  clave_orden (opcional) una función objeto -> clave para
+                  ordenar (ej: fechas "dd/MM/yyyy")
+        campo_id: Atributo que identifica cada objeto (ej: "id_vehiculo")
+        vacio: Texto a mostrar cuando el valor es None o cadena vacía
+    """
+
+    def __init__(self, columnas, campo_id, vacio="", parent=None):
+        super().__init__(parent)
+        self._cabeceras = [columna[0] for columna in columnas]
+        self._valores = [columna[1] for columna in columnas]
+        self._ordenes = [columna[2] if len(columna) > 2 else None for columna in columnas]
+        self._campo_id = campo_id
+        self._vacio = vacio
+
+        self._items = []
+        self._filas = {}   # {id: fila} para localizar en O(1)
+
+    # =========================================================================
+    # INTERFAZ QAbstractTableModel
+    # =========================================================================
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._cabeceras)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        item = self._items[index.row()]
+
+        if role == ROL_OBJETO:
+            return item
+
+        if role == ROL_ORDEN:
+            clave_orden = self._ordenes[index.column()]
+            if clave_orden:
+                return clave_orden(item)
+            return self._valor(item, index.column())
+
+        if role in (Qt.DisplayRole, Qt.ToolTipRole, ROL_VALOR):
+            valor = self._valor(item, index.column())
+            if role == ROL_VALOR:
+                return valor
+            if valor is None or valor == "":
+                return self._vacio
+            return str(valor)
+
+        return None
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientacion == Qt.Horizontal:
+            if 0 <= seccion < len(self._cabeceras):
+                return self._cabeceras[seccion]
+        return None
+
+    # =========================================================================
+    # CABECERAS (TRADUCCIÓN)
+    # =========================================================================
+
+    def set_cabeceras(self, cabeceras):
+        """Cambia los textos de las cabeceras (p. ej. al cambiar idioma)"""
+        for i, texto in enumerate(cabeceras[:len(self._cabeceras)]):
+            self._cabeceras[i] = texto
+        self.headerDataChanged.emit(Qt.Horizontal, 0, len(self._cabeceras) - 1)
+
+    # =========================================================================
+    # DATOS
+    # =========================================================================
+
+    def set_items(self, items):
+        """Sustituye todos los datos (recarga completa)"""
+        self.beginResetModel()
+        self._items = list(items)
+        self._reindexar()
+        self.endResetModel()
+
+    def items(self):
+        """Copia de la lista de objetos (orden del modelo, sin filtro)"""
+        return list(self._items)
+
+    def agregar(self, item):
+        """Añade un objeto al final"""
+        fila = len(self._items)
+        self.beginInsertRows(QModelIndex(), fila, fila)
+        self._items.append(item)
+        self._filas[self._id(item)] = fila
+        self.endInsertRows()
+
+    def agregar_varios(self, items):
+        """Añade varios objetos de una vez (una sola notificación a la vista)"""
+        items = list(items)
+        if not items:
+            return
+        inicio = len(self._items)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(items) - 1)
+        for i, item in enumerate(items):
+            self._items.append(item)
+            self._filas[self._id(item)] = inicio + i
+        self.endInsertRows()
+
+    def actualizar(self, item):
+        """
+        Sustituye el objeto con el mismo ID (o lo añade si no está).
+
+        Returns:
+            True si existía, False si se ha añadido
+        """
+        fila = self._filas.get(self._id(item))
+        if fila is None:
+            self.agregar(item)
+            return False
+
+        self._items[fila] = item
+        self.dataChanged.emit(
+            self.index(fila, 0),
+            self.index(fila, self.columnCount() - 1)
+        )
+        return True
+
+    def eliminar(self, id_item):
+        """
+        Quita el objeto con ese ID.
+
+        Returns:
+            True si existía
+        """
+        fila = self._filas.get(id_item)
+        if fila is None:
+            return False
+
+        self.beginRemoveRows(QModelIndex(), fila, fila)
+        del self._items[fila]
+        self._reindexar()
+        self.endRemoveRows()
+        return True
+
+    def obtener(self, id_item):
+        """Devuelve el objeto con ese ID o None"""
+        fila = self._filas.get(id_item)
+        return None if fila is None else self._items[fila]
+
+    def fila_de(self, id_item):
+        """Fila (del modelo, no de la vista) del objeto o None"""
+        return self._filas.get(id_item)
+
+    def item_en(self, fila):
+        """Objeto de una fila del modelo o None"""
+        if 0 <= fila < len(self._items):
+            return self._items[fila]
+        return None
+
+    # =========================================================================
+    # AUXILIARES
+    # =========================================================================
+
+    def _id(self, item):
+        return getattr(item, self._campo_id, None)
+
+    def _reindexar(self):
+        self._filas = {self._id(item): i for i, item in enumerate(self._items)}
+
+    def _valor(self, item, columna):
+        valor = self._valores[columna]
+        if callable(valor):
+            return valor(item)
+        return getattr(item, valor, None)
+
+
+class FiltroTablaProxy(QSortFilterProxyModel):
+    """
+    Proxy de filtrado y ordenación en memoria.
+
+    - set_filtro_columna(columna, valor): solo filas con ese valor exacto
+      (None para quitar el filtro)
+    - set_texto(texto): filas que contienen el texto en alguna columna
+    - Ordena por la clave de ordenación de cada columna (ROL_ORDEN)
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filtros = {}    # {columna: valor}
+        self._texto = ""
+        self.setSortRole(ROL_ORDEN)
+        self.setSortCaseSensitivity(Qt.CaseInsensitive)
+
+    def set_filtro_columna(self, columna, valor):
+        if valor is None:
+            self._filtros.pop(columna, None)
+        else:
+            self._filtros[columna] = valor
+        self.invalidateFilter()
+
+    def set_texto(self, texto):
+        self._texto = (texto or "").strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, fila, padre):
+        modelo = self.sourceModel()
+
+        for columna, valor in self._filtros.items():
+            if modelo.data(modelo.index(fila, columna, padre), ROL_VALOR) != valor:
+                return False
+
+        if self._texto:
+            for columna in range(modelo.columnCount()):
+                texto = modelo.data(modelo.index(fila, columna, padre), Qt.DisplayRole)
+                if texto and self._texto in texto.lower():
+                    return True
+            return False
+
+        return True
+
+    def lessThan(self, izquierda, derecha):
+        a = izquierda.data(ROL_ORDEN)
+        b = derecha.data(ROL_ORDEN)
+        # None siempre al principio; tipos distintos se comparan como texto
+        if a is None or b is None:
+            return a is None and b is not None
+        try:
+            return a < b
+        except TypeError:
+            return str(a) < str(b)
+
+    def objeto_en(self, fila_vista):
+        """Objeto de una fila de la vista (ya filtrada/ordenada) o None"""
+        if fila_vista < 0 or fila_vista >= self.rowCount():
+            return None
+        return self.data(self.index(fila_vista, 0), ROL_OBJETO)
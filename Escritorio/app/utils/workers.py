@@ -0,0 +1,206 @@
+"""
+Workers - Tareas en segundo plano para los controladores
+
+Las lecturas de Firebase (pyrebase) son peticiones HTTP bloqueantes. Si se
+hacen en el thread de la UI la ventana se congela mientras dura la petición.
+
+- Tarea: QRunnable que ejecuta una función en el QThreadPool global.
+- GestorTareas: lanza tareas y entrega el resultado en el thread de la UI
+  mediante una señal. Permite cancelarlas (por clave o todas).
+
+Cancelar no corta la petición HTTP en curso (requests no lo permite), pero
+garantiza que su resultado se descarta y no llega nunca a la vista.
+
+Uso en un controlador:
+    self.tareas = GestorTareas(self, al_reanudar=self.cargar_tabla)
+    self.tareas.ejecutar(self.service.obtener_todos, self.mostrar_datos,
+                         clave="cargar")
+
+Con al_reanudar, las cargas se cancelan al salir de la página (hideEvent)
+y se repiten al volver a ella (showEvent) si alguna quedó sin terminar.
+"""
+import itertools
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QEvent, Signal
+
+
+class Tarea(QRunnable):
+    """
+    Una llamada a función en un thread del pool.
+
+    El resultado se entrega a través del gestor; la tarea no toca la UI.
+    """
+
+    _contador = itertools.count(1)
+
+    def __init__(self, gestor, funcion, clave=None):
+        super().__init__()
+        self.setAutoDelete(True)
+        self.id = next(Tarea._contador)
+        self.clave = clave
+        self._gestor = gestor
+        self._funcion = funcion
+        self._cancelada = threading.Event()
+
+    def cancelar(self):
+        self._cancelada.set()
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+    def run(self):
+        if self.cancelada:
+            return
+
+        try:
+            resultado = self._funcion()
+            ok = True
+        except Exception as e:
+            resultado = e
+            ok = False
+
+        if self.cancelada:
+            return
+
+        try:
+            # La señal pertenece al gestor (thread de la UI): conexión en cola
+            self._gestor._tarea_terminada.emit(self.id, ok, resultado)
+        except RuntimeError:
+            # El gestor (y su vista) ya se destruyó
+            pass
+
+
+class GestorTareas(QObject):
+    """
+    Lanza tareas en el QThreadPool global y entrega los resultados en el
+    thread de la UI.
+
+    Args:
+        parent: Widget dueño de las tareas (normalmente el controlador)
+        al_reanudar: Función a llamar cuando el widget vuelve a mostrarse
+                     después de haber cancelado alguna tarea al ocultarse.
+                     Si es None no se cancela nada automáticamente.
+        pool: QThreadPool a usar (por defecto el global)
+    """
+
+    # id de tarea, ok, resultado o excepción
+    _tarea_terminada = Signal(int, bool, object)
+
+    def __init__(self, parent=None, al_reanudar=None, pool=None):
+        super().__init__(parent)
+        self._pool = pool or QThreadPool.globalInstance()
+        self._pendientes = {}   # {id: (tarea, al_terminar, al_fallar)}
+        self._al_reanudar = al_reanudar
+        self._reanudar = False
+
+        self._tarea_terminada.connect(self._entregar)
+
+        if al_reanudar is not None and parent is not None:
+            parent.installEventFilter(self)
+
+    # =========================================================================
+    # EJECUCIÓN
+    # =========================================================================
+
+    def ejecutar(self, funcion, al_terminar=None, al_fallar=None, clave=None):
+        """
+        Ejecuta funcion() en segundo plano.
+
+        Args:
+            funcion: Función bloqueante sin argumentos (lectura de
+                     servicio/repositorio; usar lambda si hacen falta)
+            al_terminar: Función(resultado), se llama en el thread de la UI
+            al_fallar: Función(excepcion), en el thread de la UI
+                       (por defecto se imprime el error)
+            clave: Si se indica, cancela antes la tarea anterior con la
+                   misma clave (una recarga sustituye a la anterior)
+
+        Returns:
+            La Tarea lanzada
+        """
+        if clave is not None:
+            self.cancelar(clave)
+
+        tarea = Tarea(self, funcion, clave)
+        self._pendientes[tarea.id] = (tarea, al_terminar, al_fallar)
+        self._pool.start(tarea)
+        return tarea
+
+    def cancelar(self, clave=None):
+        """
+        Cancela las tareas pendientes (todas o solo las de una clave).
+
+        Returns:
+            Número de tareas canceladas
+        """
+        canceladas = 0
+        for id_tarea, (tarea, _, _) in list(self._pendientes.items()):
+            if clave is None or tarea.clave == clave:
+                tarea.cancelar()
+                del self._pendientes[id_tarea]
+                canceladas += 1
+        return canceladas
+
+    def repetir(self, clave):
+        """
+        Si hay una tarea pendiente con esa clave, la relanza desde cero.
+
+        Sirve cuando la vista escribe algo mientras su carga está en curso:
+        la lectura pudo hacerse antes de la escritura y traer datos viejos.
+
+        Returns:
+            True si se relanzó
+        """
+        for tarea, al_terminar, al_fallar in list(self._pendientes.values()):
+            if tarea.clave == clave:
+                self.ejecutar(tarea._funcion, al_terminar, al_fallar, clave)
+                return True
+        return False
+
+    def ocupado(self, clave=None):
+        """True si hay tareas pendientes (de la clave indicada o de cualquiera)"""
+        if clave is None:
+            return bool(self._pendientes)
+        return any(t.clave == clave for t, _, _ in self._pendientes.values())
+
+    def esperar(self, milisegundos=-1):
+        """Espera a que termine el pool (útil al cerrar la aplicación)"""
+        return self._pool.waitForDone(milisegundos)
+
+    # =========================================================================
+    # ENTREGA (THREAD DE LA UI)
+    # =========================================================================
+
+    def _entregar(self, id_tarea, ok, resultado):
+        entrada = self._pendientes.pop(id_tarea, None)
+        if entrada is None:
+            # Cancelada mientras terminaba: se descarta
+            return
+
+        tarea, al_terminar, al_fallar = entrada
+        if tarea.cancelada:
+            return
+
+        if ok:
+            if al_terminar:
+                al_terminar(resultado)
+        elif al_fallar:
+            al_fallar(resultado)
+        else:
+            print(f"Error en tarea en segundo plano: {resultado}")
+
+    # =========================================================================
+    # CANCELACIÓN AL SALIR DE LA PÁGINA
+    # =========================================================================
+
+    def eventFilter(self, objeto, evento):
+        if evento.type() == QEvent.Hide:
+            if self.cancelar():
+                self._reanudar = True
+        elif evento.type() == QEvent.Show:
+            if self._reanudar:
+                self._reanudar = False
+                self._al_reanudar()
+        return False
@@ -17,7 +17,7 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QApplication, QComboBox, QDateTimeEdit, QGroupBox,
     QHBoxLayout, QHeaderView, QLabel, QPushButton,
-    QSizePolicy, QSpacerItem, QTableWidget, QTableWidgetItem,
+    QSizePolicy, QSpacerItem, QTableView,
     QVBoxLayout, QWidget)
 
 class Ui_AsignacionWidget(object):
@@ -117,6 +117,15 @@ class Ui_AsignacionWidget(object):
 
         self.verticalLayout_4.addWidget(self.btnConfirmar)
 
+        self.btnImportarCSV = QPushButton(self.groupBox)
+        self.btnImportarCSV.setObjectName(u"btnImportarCSV")
+        self.btnImportarCSV.setMinimumSize(QSize(0, 40))
+        self.btnImportarCSV.setMaximumSize(QSize(16777215, 40))
+        self.btnImportarCSV.setFont(font2)
+        self.btnImportarCSV.setStyleSheet(u"background-color: #64748b; color: white;")
+
+        self.verticalLayout_4.addWidget(self.btnImportarCSV)
+
         self.verticalSpacer = QSpacerItem(20, 40, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding)
 
         self.verticalLayout_4.addItem(self.verticalSpacer)
@@ -134,17 +143,7 @@ class Ui_AsignacionWidget(object):
         self.groupBox_2.setFont(font)
         self.verticalLayout_2 = QVBoxLayout(self.groupBox_2)
         self.verticalLayout_2.setObjectName(u"verticalLayout_2")
-        self.tableWidget = QTableWidget(self.groupBox_2)
-        if (self.tableWidget.columnCount() < 4):
-            self.tableWidget.setColumnCount(4)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(2, __qtablewidgetitem2)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(3, __qtablewidgetitem3)
+        self.tableWidget = QTableView(self.groupBox_2)
         self.tableWidget.setObjectName(u"tableWidget")
 
         self.verticalLayout_2.addWidget(self.tableWidget)
@@ -182,15 +181,8 @@ class Ui_AsignacionWidget(object):
         self.lblVehiculo.setText(QCoreApplication.translate("AsignacionWidget", u"Veh\u00edculo: ", None))
         self.lblFechaHora.setText(QCoreApplication.translate("AsignacionWidget", u"Fecha y hora de inicio: ", None))
         self.btnConfirmar.setText(QCoreApplication.translate("AsignacionWidget", u"Confirmar asignaci\u00f3n", None))
+        self.btnImportarCSV.setText(QCoreApplication.translate("AsignacionWidget", u"Importar asignaciones (CSV)", None))
         self.groupBox_2.setTitle(QCoreApplication.translate("AsignacionWidget", u"Rutas Disponibles y Asignadas", None))
-        ___qtablewidgetitem = self.tableWidget.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("AsignacionWidget", u"Ruta", None));
-        ___qtablewidgetitem1 = self.tableWidget.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("AsignacionWidget", u"Conductor", None));
-        ___qtablewidgetitem2 = self.tableWidget.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("AsignacionWidget", u"Veh\u00edculo", None));
-        ___qtablewidgetitem3 = self.tableWidget.horizontalHeaderItem(3)
-        ___qtablewidgetitem3.setText(QCoreApplication.translate("AsignacionWidget", u"Estado", None));
         self.btnEliminarAsignacion.setText(QCoreApplication.translate("AsignacionWidget", u"Eliminar Asignaci\u00f3n", None))
     # retranslateUi
 
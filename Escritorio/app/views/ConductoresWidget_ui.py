@@ -17,7 +17,7 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QAbstractItemView, QApplication, QFrame, QHBoxLayout,
     QHeaderView, QLabel, QPushButton, QSizePolicy,
-    QSpacerItem, QTableWidget, QTableWidgetItem, QVBoxLayout,
+    QSpacerItem, QTableView, QVBoxLayout,
     QWidget)
 
 class Ui_ConductoresWidget(object):
@@ -68,28 +68,13 @@ class Ui_ConductoresWidget(object):
 
         self.verticalLayout.addWidget(self.frameConductoresTop)
 
-        self.tablaCondcutores = QTableWidget(ConductoresWidget)
-        if (self.tablaCondcutores.columnCount() < 6):
-            self.tablaCondcutores.setColumnCount(6)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.tablaCondcutores.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.tablaCondcutores.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.tablaCondcutores.setHorizontalHeaderItem(2, __qtablewidgetitem2)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.tablaCondcutores.setHorizontalHeaderItem(3, __qtablewidgetitem3)
-        __qtablewidgetitem4 = QTableWidgetItem()
-        self.tablaCondcutores.setHorizontalHeaderItem(4, __qtablewidgetitem4)
-        __qtablewidgetitem5 = QTableWidgetItem()
-        self.tablaCondcutores.setHorizontalHeaderItem(5, __qtablewidgetitem5)
+        self.tablaCondcutores = QTableView(ConductoresWidget)
         self.tablaCondcutores.setObjectName(u"tablaCondcutores")
         self.tablaCondcutores.setMaximumSize(QSize(1000, 600))
         self.tablaCondcutores.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.tablaCondcutores.setAlternatingRowColors(True)
         self.tablaCondcutores.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.tablaCondcutores.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.tablaCondcutores.setColumnCount(6)
         self.tablaCondcutores.horizontalHeader().setCascadingSectionResizes(True)
         self.tablaCondcutores.horizontalHeader().setProperty(u"showSortIndicator", False)
         self.tablaCondcutores.horizontalHeader().setStretchLastSection(False)
@@ -133,18 +118,6 @@ class Ui_ConductoresWidget(object):
         ConductoresWidget.setWindowTitle(QCoreApplication.translate("ConductoresWidget", u"Form", None))
         self.label_4.setText(QCoreApplication.translate("ConductoresWidget", u"Gesti\u00f3n de Conductores", None))
         self.btnNuevoConductor.setText(QCoreApplication.translate("ConductoresWidget", u"+ A\u00f1adir Conductor", None))
-        ___qtablewidgetitem = self.tablaCondcutores.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("ConductoresWidget", u"Nombre", None));
-        ___qtablewidgetitem1 = self.tablaCondcutores.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("ConductoresWidget", u"DNI", None));
-        ___qtablewidgetitem2 = self.tablaCondcutores.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("ConductoresWidget", u"Licencia", None));
-        ___qtablewidgetitem3 = self.tablaCondcutores.horizontalHeaderItem(3)
-        ___qtablewidgetitem3.setText(QCoreApplication.translate("ConductoresWidget", u"Estado", None));
-        ___qtablewidgetitem4 = self.tablaCondcutores.horizontalHeaderItem(4)
-        ___qtablewidgetitem4.setText(QCoreApplication.translate("ConductoresWidget", u"Email", None));
-        ___qtablewidgetitem5 = self.tablaCondcutores.horizontalHeaderItem(5)
-        ___qtablewidgetitem5.setText(QCoreApplication.translate("ConductoresWidget", u"Tel\u00e9fono", None));
         self.btnEditar.setText(QCoreApplication.translate("ConductoresWidget", u"Editar Conductor", None))
         self.btnBorrar.setText(QCoreApplication.translate("ConductoresWidget", u"Borrar Conductor", None))
     # retranslateUi
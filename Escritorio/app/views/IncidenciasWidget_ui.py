@@ -16,8 +16,8 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QAbstractItemView, QApplication, QComboBox, QGridLayout,
-    QHeaderView, QPushButton, QSizePolicy, QTableWidget,
-    QTableWidgetItem, QVBoxLayout, QWidget)
+    QHeaderView, QPushButton, QSizePolicy, QTableView,
+    QVBoxLayout, QWidget)
 
 class Ui_IncidenciasWidget(object):
     def setupUi(self, IncidenciasWidget):
@@ -41,23 +41,7 @@ class Ui_IncidenciasWidget(object):
 
         self.verticalLayout.addWidget(self.cbFiltroEstado)
 
-        self.tablaIncidencias = QTableWidget(IncidenciasWidget)
-        if (self.tablaIncidencias.columnCount() < 7):
-            self.tablaIncidencias.setColumnCount(7)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.tablaIncidencias.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.tablaIncidencias.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.tablaIncidencias.setHorizontalHeaderItem(2, __qtablewidgetitem2)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.tablaIncidencias.setHorizontalHeaderItem(3, __qtablewidgetitem3)
-        __qtablewidgetitem4 = QTableWidgetItem()
-        self.tablaIncidencias.setHorizontalHeaderItem(4, __qtablewidgetitem4)
-        __qtablewidgetitem5 = QTableWidgetItem()
-        self.tablaIncidencias.setHorizontalHeaderItem(5, __qtablewidgetitem5)
-        __qtablewidgetitem6 = QTableWidgetItem()
-        self.tablaIncidencias.setHorizontalHeaderItem(6, __qtablewidgetitem6)
+        self.tablaIncidencias = QTableView(IncidenciasWidget)
         self.tablaIncidencias.setObjectName(u"tablaIncidencias")
         font1 = QFont()
         font1.setFamilies([u"Montserrat"])
@@ -66,7 +50,6 @@ class Ui_IncidenciasWidget(object):
         self.tablaIncidencias.setAlternatingRowColors(True)
         self.tablaIncidencias.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.tablaIncidencias.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.tablaIncidencias.setColumnCount(7)
 
         self.verticalLayout.addWidget(self.tablaIncidencias)
 
@@ -132,21 +115,6 @@ class Ui_IncidenciasWidget(object):
         self.cbFiltroEstado.setItemText(1, QCoreApplication.translate("IncidenciasWidget", u"Pendiente", None))
         self.cbFiltroEstado.setItemText(2, QCoreApplication.translate("IncidenciasWidget", u"En Proceso", None))
         self.cbFiltroEstado.setItemText(3, QCoreApplication.translate("IncidenciasWidget", u"Resuelta", None))
-
-        ___qtablewidgetitem = self.tablaIncidencias.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("IncidenciasWidget", u"Fecha", None));
-        ___qtablewidgetitem1 = self.tablaIncidencias.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("IncidenciasWidget", u"Hora", None));
-        ___qtablewidgetitem2 = self.tablaIncidencias.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("IncidenciasWidget", u"Veh\u00edculo", None));
-        ___qtablewidgetitem3 = self.tablaIncidencias.horizontalHeaderItem(3)
-        ___qtablewidgetitem3.setText(QCoreApplication.translate("IncidenciasWidget", u"Tipo", None));
-        ___qtablewidgetitem4 = self.tablaIncidencias.horizontalHeaderItem(4)
-        ___qtablewidgetitem4.setText(QCoreApplication.translate("IncidenciasWidget", u"Estado", None));
-        ___qtablewidgetitem5 = self.tablaIncidencias.horizontalHeaderItem(5)
-        ___qtablewidgetitem5.setText(QCoreApplication.translate("IncidenciasWidget", u"Descripci\u00f3n", None));
-        ___qtablewidgetitem6 = self.tablaIncidencias.horizontalHeaderItem(6)
-        ___qtablewidgetitem6.setText(QCoreApplication.translate("IncidenciasWidget", u"Conductor", None));
         self.btnRecargar.setText(QCoreApplication.translate("IncidenciasWidget", u"Recargar", None))
         self.btnNuevaIncidencia.setText(QCoreApplication.translate("IncidenciasWidget", u"+ Nueva Incidencia", None))
         self.btnCambiarEstado.setText(QCoreApplication.translate("IncidenciasWidget", u"Cambiar Estado", None))
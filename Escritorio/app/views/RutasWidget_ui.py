@@ -19,7 +19,7 @@ from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtWidgets import (QApplication, QDateTimeEdit, QFormLayout, QGroupBox,
     QHBoxLayout, QHeaderView, QLabel, QLineEdit,
     QListWidget, QListWidgetItem, QPushButton, QSizePolicy,
-    QSpacerItem, QTableWidget, QTableWidgetItem, QTimeEdit,
+    QSpacerItem, QTableView, QTimeEdit,
     QVBoxLayout, QWidget)
 
 class Ui_RutasWidget(object):
@@ -168,6 +168,19 @@ class Ui_RutasWidget(object):
 
         self.horizontalLayout_4.addWidget(self.btnEliminarParada)
 
+        self.btnOptimizarRuta = QPushButton(self.groupBox)
+        self.btnOptimizarRuta.setObjectName(u"btnOptimizarRuta")
+        self.btnOptimizarRuta.setEnabled(True)
+        self.btnOptimizarRuta.setMaximumSize(QSize(120, 60))
+        font_optimizar = QFont()
+        font_optimizar.setFamilies([u"Montserrat"])
+        font_optimizar.setPointSize(10)
+        font_optimizar.setBold(True)
+        self.btnOptimizarRuta.setFont(font_optimizar)
+        self.btnOptimizarRuta.setStyleSheet(u"background-color: #10b981; color: white;")
+
+        self.horizontalLayout_4.addWidget(self.btnOptimizarRuta)
+
 
         self.horizontalLayout_5.addLayout(self.horizontalLayout_4)
 
@@ -219,7 +232,7 @@ class Ui_RutasWidget(object):
         self.widget.setObjectName(u"widget")
         self.verticalLayout_2 = QVBoxLayout(self.widget)
         self.verticalLayout_2.setObjectName(u"verticalLayout_2")
-        self.tablaRutas = QTableWidget(self.widget)
+        self.tablaRutas = QTableView(self.widget)
         self.tablaRutas.setObjectName(u"tablaRutas")
 
         self.verticalLayout_2.addWidget(self.tablaRutas)
@@ -297,6 +310,7 @@ class Ui_RutasWidget(object):
         self.lblConductor_2.setText(QCoreApplication.translate("RutasWidget", u"Nueva Parada: ", None))
         self.btnAgregarParada.setText(QCoreApplication.translate("RutasWidget", u"+", None))
         self.btnEliminarParada.setText(QCoreApplication.translate("RutasWidget", u"-", None))
+        self.btnOptimizarRuta.setText(QCoreApplication.translate("RutasWidget", u"Optimizar", None))
         self.leNuevaParada.setPlaceholderText(QCoreApplication.translate("RutasWidget", u"Escribe una direcci\u00f3n y pulsa + ", None))
         self.btnGuardarRuta.setText(QCoreApplication.translate("RutasWidget", u"Guardar Ruta", None))
         self.btnCancelar.setText(QCoreApplication.translate("RutasWidget", u"Cancelar", None))
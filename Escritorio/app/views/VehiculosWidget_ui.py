@@ -17,7 +17,7 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QAbstractItemView, QApplication, QFrame, QHBoxLayout,
     QHeaderView, QLabel, QPushButton, QSizePolicy,
-    QSpacerItem, QTableWidget, QTableWidgetItem, QVBoxLayout,
+    QSpacerItem, QTableView, QVBoxLayout,
     QWidget)
 
 class Ui_VehiculosWidget(object):
@@ -68,28 +68,13 @@ class Ui_VehiculosWidget(object):
 
         self.verticalLayout.addWidget(self.frameVehiculosTop)
 
-        self.tablaVehiculos = QTableWidget(VehiculosWidget)
-        if (self.tablaVehiculos.columnCount() < 6):
-            self.tablaVehiculos.setColumnCount(6)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.tablaVehiculos.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.tablaVehiculos.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.tablaVehiculos.setHorizontalHeaderItem(2, __qtablewidgetitem2)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.tablaVehiculos.setHorizontalHeaderItem(3, __qtablewidgetitem3)
-        __qtablewidgetitem4 = QTableWidgetItem()
-        self.tablaVehiculos.setHorizontalHeaderItem(4, __qtablewidgetitem4)
-        __qtablewidgetitem5 = QTableWidgetItem()
-        self.tablaVehiculos.setHorizontalHeaderItem(5, __qtablewidgetitem5)
+        self.tablaVehiculos = QTableView(VehiculosWidget)
         self.tablaVehiculos.setObjectName(u"tablaVehiculos")
         self.tablaVehiculos.setMaximumSize(QSize(1000, 600))
         self.tablaVehiculos.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.tablaVehiculos.setAlternatingRowColors(True)
         self.tablaVehiculos.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.tablaVehiculos.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.tablaVehiculos.setColumnCount(6)
         self.tablaVehiculos.horizontalHeader().setCascadingSectionResizes(True)
         self.tablaVehiculos.horizontalHeader().setProperty(u"showSortIndicator", False)
         self.tablaVehiculos.horizontalHeader().setStretchLastSection(False)
@@ -133,18 +118,6 @@ class Ui_VehiculosWidget(object):
         VehiculosWidget.setWindowTitle(QCoreApplication.translate("VehiculosWidget", u"Form", None))
         self.label_4.setText(QCoreApplication.translate("VehiculosWidget", u"Gesti\u00f3n de Veh\u00edculos", None))
         self.btnNuevoVehiculo.setText(QCoreApplication.translate("VehiculosWidget", u"+ A\u00f1adir Veh\u00edculo", None))
-        ___qtablewidgetitem = self.tablaVehiculos.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("VehiculosWidget", u"Matr\u00edcula", None));
-        ___qtablewidgetitem1 = self.tablaVehiculos.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("VehiculosWidget", u"Marca", None));
-        ___qtablewidgetitem2 = self.tablaVehiculos.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("VehiculosWidget", u"Modelo", None));
-        ___qtablewidgetitem3 = self.tablaVehiculos.horizontalHeaderItem(3)
-        ___qtablewidgetitem3.setText(QCoreApplication.translate("VehiculosWidget", u"Estado", None));
-        ___qtablewidgetitem4 = self.tablaVehiculos.horizontalHeaderItem(4)
-        ___qtablewidgetitem4.setText(QCoreApplication.translate("VehiculosWidget", u"A\u00f1o", None));
-        ___qtablewidgetitem5 = self.tablaVehiculos.horizontalHeaderItem(5)
-        ___qtablewidgetitem5.setText(QCoreApplication.translate("VehiculosWidget", u"Pr\u00f3xima ITV", None));
         self.btnEditar.setText(QCoreApplication.translate("VehiculosWidget", u"Editar Veh\u00edculo", None))
         self.btnBorrar.setText(QCoreApplication.translate("VehiculosWidget", u"Borrar Veh\u00edculo", None))
     # retranslateUi
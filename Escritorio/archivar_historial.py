@@ -0,0 +1,70 @@
+"""
+Archiva el historial GPS de las asignaciones completadas
+
+Pasa /historial_localizaciones/{id_asignacion} (un nodo por ping) a
+/historial_compacto/{id_asignacion} (bloques columnares comprimidos, ver
+app/utils/historial_compacto.py) y borra los pings originales.
+
+Uso:
+    python archivar_historial.py                  # asignaciones "Completada"
+    python archivar_historial.py --asignacion ID  # una asignación concreta
+    python archivar_historial.py --no-podar       # archiva sin borrar
+
+Se puede ejecutar varias veces (p. ej. cada noche): solo quedan pings
+sueltos de lo que se haya recibido después del último archivado.
+"""
+import argparse
+import sys
+
+from app.data.conexion_firebase import conexion_firebase
+from app.repositories.asignacion_repository import AsignacionRepository
+from app.repositories.localizacionGPS_repository import LocalizacionGPSRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archiva el historial GPS")
+    parser.add_argument("--asignacion", metavar="ID", action="append",
+                        help="Archiva solo esta asignación (se puede repetir)")
+    parser.add_argument("--no-podar", action="store_true",
+                        help="Guarda el historial compacto pero no borra los pings")
+    args = parser.parse_args()
+
+    if args.asignacion:
+        ids = args.asignacion
+    else:
+        db = conexion_firebase.database()
+        if db is None:
+            print("No se pudo conectar con Firebase")
+            return 1
+        ids = [a.id_asignacion for a in AsignacionRepository(db).obtener_todas()
+               if a.estado == "Completada"]
+    print(f"Asignaciones a archivar: {len(ids)}")
+
+    repo = LocalizacionGPSRepository()
+    total_antes = total_despues = 0
+    errores = 0
+
+    for id_asignacion in ids:
+        exito, resultado = repo.archivar_historial(id_asignacion, podar=not args.no_podar)
+        if not exito:
+            errores += 1
+            print(f"  ✗ {id_asignacion}: {resultado}")
+            continue
+
+        total_antes += resultado['bytes_antes']
+        total_despues += resultado['bytes_despues']
+        if resultado['puntos']:
+            print(f"  ✓ {id_asignacion}: {resultado['puntos']} puntos, "
+                  f"{resultado['bytes_antes'] / 1024:.0f} KB -> {resultado['bytes_despues'] / 1024:.0f} KB, "
+                  f"{resultado['podados']} pings borrados"
+                  + (f", {resultado['descartados']} sin archivar" if resultado['descartados'] else ""))
+
+    if total_despues:
+        print(f"Total: {total_antes / 1024:.0f} KB -> {total_despues / 1024:.0f} KB "
+              f"({total_antes / total_despues:.0f}x)")
+
+    return 0 if not errores else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Benchmark de arranque de FleetSmart Escritorio
+
+Mide el arranque en frío (cada medición en un proceso Python nuevo, sin
+módulos importados) hasta:
+- Ventana de login visible (primer evento de pintado procesado)
+- Ventana principal visible, simulando un login de gestor correcto justo
+  después de mostrarse el login (sin credenciales ni petición de auth)
+
+Uso:
+    python benchmark_startup.py                 # 5 ejecuciones
+    python benchmark_startup.py -n 10
+    QT_QPA_PLATFORM=offscreen python benchmark_startup.py   # sin pantalla
+
+Los tiempos incluyen el import de PySide6 y de la app. Las lecturas de
+Firebase de la ventana principal van en segundo plano y no se esperan.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+INICIO = time.perf_counter()
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+# ============================================================================
+# MEDICIÓN (PROCESO HIJO)
+# ============================================================================
+
+def medir_una_vez():
+    """Arranca la app en este proceso e imprime los tiempos en JSON"""
+    sys.path.insert(0, DIRECTORIO)
+
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QTimer
+
+    app = QApplication(sys.argv)
+    app.setApplicationName("FleetSmart Escritorio")
+
+    from app.controllers.AppController import AppController
+
+    tiempos = {}
+
+    def ms():
+        return round((time.perf_counter() - INICIO) * 1000, 1)
+
+    def terminar():
+        print(json.dumps(tiempos))
+        app.quit()
+
+    def main_visible():
+        tiempos["main"] = ms()
+        terminar()
+
+    def login_visible():
+        tiempos["login"] = ms()
+
+        # Login de gestor simulado (no se llama a Firebase Auth)
+        usuario = {
+            "uid": "benchmark",
+            "email": "benchmark@fleetsmart",
+            "rol": "gestor",
+            "perfil_data": {},
+            "token": None
+        }
+        try:
+            controlador.abrir_menu_principal(usuario)
+        except Exception as e:
+            tiempos["error"] = f"{type(e).__name__}: {e}"
+            terminar()
+            return
+        QTimer.singleShot(0, main_visible)
+
+    controlador = AppController()
+    # singleShot(0) se atiende tras procesar el show/pintado pendiente
+    QTimer.singleShot(0, login_visible)
+
+    app.exec()
+    # Sin esperar a hilos de fondo (listeners, lecturas)
+    os._exit(0)
+
+
+# ============================================================================
+# ORQUESTACIÓN
+# ============================================================================
+
+def ejecutar(n):
+    resultados = {"login": [], "main": []}
+
+    for i in range(n):
+        proceso = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--hijo"],
+            cwd=DIRECTORIO,
+            capture_output=True,
+            text=True,
+            timeout=120
+        )
+        linea = next(
+            (l for l in reversed(proceso.stdout.splitlines()) if l.startswith("{")),
+            None
+        )
+        if linea is None:
+            print(f"Ejecución {i + 1}: sin resultado")
+            print(proceso.stderr[-2000:])
+            continue
+
+        tiempos = json.loads(linea)
+        if "main" in tiempos:
+            print(f"Ejecución {i + 1}: login {tiempos['login']:.0f} ms, "
+                  f"principal {tiempos['main']:.0f} ms")
+        else:
+            print(f"Ejecución {i + 1}: login {tiempos['login']:.0f} ms, "
+                  f"principal no disponible ({tiempos.get('error')})")
+        for clave in resultados:
+            if clave in tiempos:
+                resultados[clave].append(tiempos[clave])
+
+    if not resultados["login"]:
+        return 1
+
+    print()
+    print(f"{'':<22}{'mediana':>10}{'mín':>10}{'máx':>10}")
+    for clave, texto in (("login", "Ventana de login"), ("main", "Ventana principal")):
+        valores = resultados[clave]
+        if not valores:
+            print(f"{texto:<22}{'-':>10}{'-':>10}{'-':>10}")
+            continue
+        print(f"{texto:<22}{statistics.median(valores):>8.0f}ms"
+              f"{min(valores):>8.0f}ms{max(valores):>8.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de arranque en frío")
+    parser.add_argument("-n", type=int, default=5, help="Número de ejecuciones")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        medir_una_vez()
+    else:
+        sys.exit(ejecutar(args.n))
@@ -0,0 +1,61 @@
+"""
+Importa un nomenclátor de direcciones para geocodificar sin conexión
+
+Crea/actualiza app/config/gazetteer.db a partir de:
+- Un CSV con lat, lon y direccion (o columnas OSM addr:street,
+  addr:housenumber, addr:postcode, addr:city)
+- Un GeoJSON exportado de OpenStreetMap (p. ej. con osmium export)
+
+Uso:
+    python importar_gazetteer.py direcciones.csv
+    python importar_gazetteer.py extracto.geojson --vaciar
+    python importar_gazetteer.py --buscar "Calle Mayor 5, Madrid"
+
+Para usarlo en la aplicación, en app/config/settings.json:
+    "geocoding_backend": "local"             (solo el nomenclátor)
+    "geocoding_backend": "local+nominatim"   (y Nominatim si no lo encuentra)
+"""
+import argparse
+import sys
+import time
+
+from app.data.gazetteer_local import gazetteer_local
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nomenclátor local de direcciones")
+    parser.add_argument("fichero", nargs="?", help="CSV o GeoJSON a importar")
+    parser.add_argument("--vaciar", action="store_true",
+                        help="Borra las direcciones importadas antes")
+    parser.add_argument("--buscar", metavar="DIRECCION",
+                        help="Prueba una búsqueda en el nomenclátor")
+    args = parser.parse_args()
+
+    if not args.fichero and not args.buscar:
+        parser.print_help()
+        return 1
+
+    if args.fichero:
+        inicio = time.perf_counter()
+        exito, resultado = gazetteer_local.importar(args.fichero, vaciar=args.vaciar)
+        if not exito:
+            print(resultado)
+            return 1
+        print(f"Importadas {resultado} direcciones nuevas en {time.perf_counter() - inicio:.1f} s "
+              f"(total: {gazetteer_local.total()})")
+
+    if args.buscar:
+        inicio = time.perf_counter()
+        ubicacion = gazetteer_local.geocode(args.buscar)
+        milisegundos = (time.perf_counter() - inicio) * 1000
+        if ubicacion is None:
+            print(f"Sin resultados ({milisegundos:.1f} ms)")
+        else:
+            print(f"{ubicacion.address}: {ubicacion.latitude}, {ubicacion.longitude} "
+                  f"(similitud {ubicacion.raw['similitud']}, {milisegundos:.1f} ms)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
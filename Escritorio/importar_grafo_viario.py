@@ -0,0 +1,75 @@
+"""
+Importa la red de carreteras para calcular rutas sin conexión
+
+Crea/sustituye app/config/grafo_viario.npz a partir de un extracto de
+OpenStreetMap (p. ej. de download.geofabrik.de):
+- .osm / .osm.gz / .osm.bz2 (XML)
+- .osm.pbf (necesita 'pip install osmium')
+
+Con el grafo importado, los mapas de rutas siguen las carreteras y la
+distancia y duración de las rutas se calculan por carretera. Los tramos
+calculados se guardan en app/config/tramos_cache.db.
+
+Uso:
+    python importar_grafo_viario.py comunidad-valenciana.osm.pbf
+    python importar_grafo_viario.py --ruta 38.3452,-0.4810 39.4699,-0.3763
+"""
+import argparse
+import sys
+import time
+
+from app.data.grafo_viario import grafo_viario
+from app.utils.enrutador_viario import EnrutadorViario
+
+
+def leer_punto(texto):
+    """'lat,lon' -> [lat, lon]"""
+    lat, lon = texto.split(",")
+    return [float(lat), float(lon)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grafo viario local")
+    parser.add_argument("fichero", nargs="?", help="Extracto OSM (.osm, .osm.gz, .osm.bz2, .pbf)")
+    parser.add_argument("--ruta", nargs=2, metavar="LAT,LON",
+                        help="Prueba un tramo entre dos puntos")
+    args = parser.parse_args()
+
+    if not args.fichero and not args.ruta:
+        parser.print_help()
+        return 1
+
+    if args.fichero:
+        inicio = time.perf_counter()
+        exito, resultado = grafo_viario.importar(args.fichero)
+        if not exito:
+            print(resultado)
+            return 1
+        nodos, aristas = resultado
+        print(f"Grafo importado: {nodos} nodos, {aristas} aristas "
+              f"({time.perf_counter() - inicio:.1f} s)")
+
+    if args.ruta:
+        if not EnrutadorViario.disponible():
+            print("No hay grafo viario importado")
+            return 1
+        try:
+            origen, destino = leer_punto(args.ruta[0]), leer_punto(args.ruta[1])
+        except ValueError:
+            print("Formato de punto inválido (usa lat,lon)")
+            return 1
+
+        inicio = time.perf_counter()
+        tramo = EnrutadorViario.tramo(origen, destino)
+        milisegundos = (time.perf_counter() - inicio) * 1000
+        if tramo is None:
+            print(f"Sin camino ({milisegundos:.0f} ms)")
+        else:
+            print(f"{tramo['metros'] / 1000:.1f} km, {tramo['segundos'] / 60:.0f} min, "
+                  f"{len(tramo['geometria'])} puntos ({milisegundos:.0f} ms)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
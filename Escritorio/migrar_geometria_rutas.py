@@ -0,0 +1,68 @@
+"""
+Migración: coordenadas de origen y geometría de las rutas existentes
+
+Las rutas creadas antes de existir origen_coords solo guardan el texto del
+origen, y al abrirlas hay que geocodificarlo. Este script lo geocodifica una
+vez (pasando por la caché local) y guarda en Firebase origen_coords, bbox y
+distancia_km de cada ruta.
+
+Uso:
+    python migrar_geometria_rutas.py            # migra
+    python migrar_geometria_rutas.py --simular  # solo lista lo que haría
+
+Se puede ejecutar varias veces: solo toca las rutas sin origen_coords.
+Los orígenes se geocodifican por lotes (sin repetir direcciones y a 1
+petición por segundo, el límite de Nominatim). Ctrl+C cancela.
+"""
+import argparse
+import sys
+
+from app.data.conexion_firebase import conexion_firebase
+from app.services.rutas_service import RutasService
+from app.utils.geocoding_utils import GeocodificadorLotes, GeocodingUtils
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Completa la geometría de las rutas")
+    parser.add_argument("--simular", action="store_true",
+                        help="No escribe en Firebase, solo muestra las rutas pendientes")
+    args = parser.parse_args()
+
+    db = conexion_firebase.database()
+    if db is None:
+        print("No se pudo conectar con Firebase")
+        return 1
+
+    service = RutasService(db)
+    pendientes = service.obtener_sin_geometria()
+    print(f"Rutas sin coordenadas de origen: {len(pendientes)}")
+
+    if args.simular:
+        for ruta in pendientes:
+            print(f"  - {ruta.id_ruta}: {ruta.nombre} ({ruta.origen or 'sin origen'})")
+        return 0
+
+    origenes = [ruta.origen for ruta in pendientes if ruta.origen]
+    coordenadas = {}
+    lote = GeocodificadorLotes()
+    try:
+        for indice, direccion, ubicacion in lote.geocodificar(origenes):
+            coordenadas[direccion] = GeocodingUtils.coords_to_list(ubicacion)
+            print(f"  [{indice + 1}/{len(origenes)}] {direccion}: "
+                  f"{coordenadas[direccion] or 'no encontrada'}")
+    except KeyboardInterrupt:
+        lote.cancelar()
+        print("Cancelado. Se guardan solo las rutas ya geocodificadas.")
+        pendientes = [r for r in pendientes if r.origen in coordenadas]
+
+    migradas, fallidas = service.migrar_geometria(coordenadas.get, pendientes)
+
+    print(f"Migradas: {len(migradas)}")
+    for ruta in fallidas:
+        print(f"  ✗ {ruta.id_ruta}: {ruta.nombre} (origen '{ruta.origen}' no localizado)")
+
+    return 0 if not fallidas else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())